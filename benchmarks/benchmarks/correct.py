@@ -0,0 +1,54 @@
+"""
+Benchmarks for the Doppler velocity dealiasing and phase processing
+routines in :py:mod:`pyart.correct`.
+"""
+
+import pyart
+
+from .volumes import make_vcp_radar
+
+
+class DealiasRegionBased(object):
+    """ Dealias the lowest four sweeps of a VCP volume. """
+
+    timeout = 600
+
+    def setup(self):
+        self.radar = make_vcp_radar(nsweeps=4)
+
+    def time_dealias_region_based(self):
+        pyart.correct.dealias_region_based(self.radar)
+
+    def peakmem_dealias_region_based(self):
+        pyart.correct.dealias_region_based(self.radar)
+
+
+class DealiasUnwrapPhase(object):
+    """ Dealias the lowest four sweeps of a VCP volume. """
+
+    params = ['sweep', 'volume']
+    param_names = ['unwrap_unit']
+    timeout = 600
+
+    def setup(self, unwrap_unit):
+        self.radar = make_vcp_radar(nsweeps=4)
+
+    def time_dealias_unwrap_phase(self, unwrap_unit):
+        pyart.correct.dealias_unwrap_phase(
+            self.radar, unwrap_unit=unwrap_unit)
+
+    def peakmem_dealias_unwrap_phase(self, unwrap_unit):
+        pyart.correct.dealias_unwrap_phase(
+            self.radar, unwrap_unit=unwrap_unit)
+
+
+class DespeckleField(object):
+    """ Despeckle the reflectivity of a VCP volume. """
+
+    timeout = 300
+
+    def setup(self):
+        self.radar = make_vcp_radar()
+
+    def time_despeckle_field(self):
+        pyart.correct.despeckle_field(self.radar, 'reflectivity')
@@ -0,0 +1,70 @@
+"""
+Benchmarks for building gate filters and computing field textures.
+"""
+
+import pyart
+
+from .volumes import make_vcp_radar
+
+
+class GateFilterVolume(object):
+    """ Build a typical gate filter for a VCP volume. """
+
+    params = ['GateFilter', 'LazyGateFilter']
+    param_names = ['gatefilter']
+
+    def setup(self, gatefilter):
+        self.radar = make_vcp_radar()
+        self.gatefilter_class = getattr(pyart.filters, gatefilter)
+
+    def _build(self):
+        gatefilter = self.gatefilter_class(self.radar)
+        gatefilter.exclude_transition()
+        gatefilter.exclude_masked('reflectivity')
+        gatefilter.exclude_below('reflectivity', 5.)
+        gatefilter.exclude_below('cross_correlation_ratio', 0.8)
+        gatefilter.exclude_outside('differential_reflectivity', -2., 6.)
+        return gatefilter.gate_excluded
+
+    def time_build_gatefilter(self, gatefilter):
+        self._build()
+
+    def peakmem_build_gatefilter(self, gatefilter):
+        self._build()
+
+
+class MomentAndTextureGateFilter(object):
+    """ Filter a volume on the texture of its moments. """
+
+    timeout = 300
+
+    def setup(self):
+        self.radar = make_vcp_radar(nsweeps=4)
+
+    def time_moment_and_texture_based_gate_filter(self):
+        pyart.filters.moment_and_texture_based_gate_filter(self.radar)
+
+
+class VelocityTexture(object):
+    """ Compute the texture of the Doppler velocities of a VCP volume. """
+
+    params = [None, 4]
+    param_names = ['n_workers']
+    timeout = 300
+
+    def setup(self, n_workers):
+        self.radar = make_vcp_radar()
+
+    def time_calculate_velocity_texture(self, n_workers):
+        pyart.filters.calculate_velocity_texture(
+            self.radar, 'velocity', n_workers=n_workers)
+
+
+class TextureAlongRay(object):
+    """ Compute the texture along the rays of a VCP volume. """
+
+    def setup(self):
+        self.radar = make_vcp_radar()
+
+    def time_texture_along_ray(self):
+        pyart.util.texture_along_ray(self.radar, 'differential_phase')
@@ -0,0 +1,31 @@
+"""
+Benchmarks for plotting radar data.
+"""
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pyart
+
+from .volumes import make_vcp_radar
+
+
+class PlotPPI(object):
+    """ Plot the lowest sweep of a VCP volume. """
+
+    def setup(self):
+        self.radar = make_vcp_radar(nsweeps=2)
+        self.display = pyart.graph.RadarDisplay(self.radar)
+
+    def teardown(self):
+        plt.close('all')
+
+    def time_plot_ppi(self):
+        fig = plt.figure()
+        self.display.plot_ppi('reflectivity', 0, fig=fig)
+        fig.canvas.draw()
+
+    def peakmem_plot_ppi(self):
+        fig = plt.figure()
+        self.display.plot_ppi('reflectivity', 0, fig=fig)
+        fig.canvas.draw()
@@ -0,0 +1,59 @@
+"""
+Benchmarks for writing CF/Radial files.
+
+Compares the default writer with the sweep chunked, threaded and packed
+modes of :py:func:`pyart.io.write_cfradial`.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pyart
+
+
+NFIELDS = 20
+
+
+def _make_volume():
+    """ Return a 10 sweep, 20 field radar with noisy masked fields. """
+    radar = pyart.testing.make_empty_ppi_radar(1000, 360, 10)
+    random_state = np.random.RandomState(0)
+    for i in range(NFIELDS):
+        data = random_state.normal(20, 10, (radar.nrays, radar.ngates))
+        data = np.ma.masked_less(data.astype('float32'), 0)
+        radar.add_field('field_%d' % i, {
+            'data': data, 'units': 'dBZ', '_FillValue': -9999.})
+    return radar
+
+
+class WriteCFRadial(object):
+    """ Write a 20 field volume to a CF/Radial file. """
+
+    params = ['default', 'chunk_by_sweep', 'threaded', 'int16']
+    param_names = ['mode']
+    timeout = 300
+
+    def setup(self, mode):
+        self.radar = _make_volume()
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'bench.nc')
+        self.kwargs = {
+            'default': {},
+            'chunk_by_sweep': {'chunk_by_sweep': True},
+            'threaded': {'chunk_by_sweep': True, 'n_workers': 4},
+            'int16': {'chunk_by_sweep': True, 'n_workers': 4,
+                      'pack_dtype': 'int16'},
+        }[mode]
+
+    def teardown(self, mode):
+        shutil.rmtree(self.tmpdir)
+
+    def time_write_cfradial(self, mode):
+        pyart.io.write_cfradial(self.filename, self.radar, **self.kwargs)
+
+    def track_file_size(self, mode):
+        pyart.io.write_cfradial(self.filename, self.radar, **self.kwargs)
+        return os.path.getsize(self.filename)
+    track_file_size.unit = 'bytes'
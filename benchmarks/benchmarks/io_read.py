@@ -0,0 +1,85 @@
+"""
+Benchmarks for reading radar files.
+
+The small sample files distributed with Py-ART are read to track the fixed
+costs of each reader, a full-size synthetic volume is written to and read
+from a CF/Radial file to track the cost which scales with the volume size.
+"""
+
+import bz2
+import os
+import shutil
+import tempfile
+
+import pyart
+
+from .volumes import make_vcp_radar
+
+
+class ReadSampleFiles(object):
+    """ Read the sample files of each supported format. """
+
+    params = ['nexrad_archive', 'nexrad_archive_compressed', 'nexrad_cdm',
+              'nexrad_level3', 'cfradial', 'sigmet', 'mdv', 'uf', 'chl']
+    param_names = ['format']
+
+    def setup(self, fmt):
+        self.read, self.filename = {
+            'nexrad_archive': (pyart.io.read_nexrad_archive,
+                               pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE),
+            'nexrad_archive_compressed': (
+                pyart.io.read_nexrad_archive,
+                pyart.testing.NEXRAD_ARCHIVE_MSG31_COMPRESSED_FILE),
+            'nexrad_cdm': (pyart.io.read_nexrad_cdm,
+                           pyart.testing.NEXRAD_CDM_FILE),
+            'nexrad_level3': (pyart.io.read_nexrad_level3,
+                              pyart.testing.NEXRAD_LEVEL3_MSG19),
+            'cfradial': (pyart.io.read_cfradial,
+                         pyart.testing.CFRADIAL_PPI_FILE),
+            'sigmet': (pyart.io.read_sigmet, pyart.testing.SIGMET_PPI_FILE),
+            'mdv': (pyart.io.read_mdv, pyart.testing.MDV_PPI_FILE),
+            'uf': (pyart.io.read_uf, pyart.testing.UF_FILE),
+            'chl': (pyart.io.read_chl, pyart.testing.CHL_RHI_FILE),
+        }[fmt]
+        self.tmpdir = None
+        if fmt == 'nexrad_cdm':
+            # the sample is bzip2 compressed, netCDF4 reads it uncompressed
+            self.tmpdir = tempfile.mkdtemp()
+            filename = os.path.join(self.tmpdir, 'nexrad_cdm.nc')
+            with open(filename, 'wb') as f:
+                f.write(bz2.BZ2File(self.filename).read())
+            self.filename = filename
+
+    def teardown(self, fmt):
+        if self.tmpdir is not None:
+            shutil.rmtree(self.tmpdir)
+
+    def time_read(self, fmt):
+        self.read(self.filename)
+
+    def peakmem_read(self, fmt):
+        self.read(self.filename)
+
+
+class ReadCFRadialVolume(object):
+    """ Read a full-size volume from a CF/Radial file. """
+
+    timeout = 300
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'volume.nc')
+        pyart.io.write_cfradial(self.filename, make_vcp_radar())
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def time_read_cfradial(self):
+        radar = pyart.io.read_cfradial(self.filename)
+        for field in radar.fields.values():
+            field['data']
+
+    def peakmem_read_cfradial(self):
+        radar = pyart.io.read_cfradial(self.filename)
+        for field in radar.fields.values():
+            field['data']
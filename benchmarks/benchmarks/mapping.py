@@ -0,0 +1,65 @@
+"""
+Benchmarks for mapping radar volumes to Cartesian grids.
+"""
+
+import pyart
+
+from .volumes import make_vcp_radar
+
+
+GRID_SHAPE = (21, 241, 241)
+GRID_LIMITS = ((0., 10000.), (-120000., 120000.), (-120000., 120000.))
+
+
+class MapGatesToGrid(object):
+    """ Map the reflectivity of a VCP volume to a 1 km grid. """
+
+    params = [1, 4]
+    param_names = ['n_threads']
+    timeout = 600
+
+    def setup(self, n_threads):
+        self.radar = make_vcp_radar()
+
+    def time_map_gates_to_grid(self, n_threads):
+        pyart.map.map_gates_to_grid(
+            self.radar, GRID_SHAPE, GRID_LIMITS, fields=['reflectivity'],
+            n_threads=n_threads)
+
+    def peakmem_map_gates_to_grid(self, n_threads):
+        pyart.map.map_gates_to_grid(
+            self.radar, GRID_SHAPE, GRID_LIMITS, fields=['reflectivity'],
+            n_threads=n_threads)
+
+
+class GridFromRadars(object):
+    """ Grid the reflectivity of a VCP volume with map_to_grid. """
+
+    timeout = 600
+
+    def setup(self):
+        self.radar = make_vcp_radar()
+
+    def time_grid_from_radars_map_to_grid(self):
+        pyart.map.grid_from_radars(
+            self.radar, GRID_SHAPE, GRID_LIMITS, fields=['reflectivity'],
+            gridding_algo='map_to_grid')
+
+
+class GateCoordinates(object):
+    """ Compute the Cartesian and geographic gate coordinates. """
+
+    def setup(self):
+        self.radar = make_vcp_radar()
+
+    def time_gate_coordinates(self):
+        self.radar.init_gate_x_y_z()
+        self.radar.init_gate_longitude_latitude()
+        self.radar.gate_x['data']
+        self.radar.gate_longitude['data']
+
+    def peakmem_gate_coordinates(self):
+        self.radar.init_gate_x_y_z()
+        self.radar.init_gate_longitude_latitude()
+        self.radar.gate_x['data']
+        self.radar.gate_longitude['data']
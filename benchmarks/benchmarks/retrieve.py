@@ -0,0 +1,95 @@
+"""
+Benchmarks for the retrievals in :py:mod:`pyart.retrieve`.
+
+The specific differential phase retrievals are expensive per gate and use
+a single sweep with fewer gates, the classifications use full-size volumes
+and composites.
+"""
+
+import pyart
+
+from .volumes import make_vcp_radar, make_composite, make_composite_grid
+
+
+class KdpMaesaka(object):
+    """ Retrieve Kdp on a single sweep with a variational method. """
+
+    timeout = 600
+
+    def setup(self):
+        self.radar = make_vcp_radar(nsweeps=1, rays_per_sweep=360,
+                                    ngates=500)
+
+    def time_kdp_maesaka(self):
+        pyart.retrieve.kdp_maesaka(self.radar)
+
+    def peakmem_kdp_maesaka(self):
+        pyart.retrieve.kdp_maesaka(self.radar)
+
+
+class KdpSchneebeli(object):
+    """ Retrieve Kdp on a single sweep with an ensemble Kalman filter. """
+
+    params = ['profile', 'batched']
+    param_names = ['method']
+    timeout = 600
+
+    def setup(self, method):
+        self.radar = make_vcp_radar(nsweeps=1, rays_per_sweep=90,
+                                    ngates=500)
+
+    def time_kdp_schneebeli(self, method):
+        pyart.retrieve.kdp_schneebeli(
+            self.radar, parallel=False, method=method)
+
+
+class HydroclassSemisupervised(object):
+    """ Classify the hydrometeors of the lowest four sweeps of a volume. """
+
+    params = ['array', 'blocked']
+    param_names = ['engine']
+    timeout = 300
+
+    def setup(self, engine):
+        self.radar = make_vcp_radar(nsweeps=4)
+        self.mass_centers = pyart.retrieve.echo_class._mass_centers_table()[
+            'C']
+
+    def time_hydroclass_semisupervised(self, engine):
+        pyart.retrieve.hydroclass_semisupervised(
+            self.radar, mass_centers=self.mass_centers,
+            temp_field='temperature', engine=engine)
+
+    def peakmem_hydroclass_semisupervised(self, engine):
+        pyart.retrieve.hydroclass_semisupervised(
+            self.radar, mass_centers=self.mass_centers,
+            temp_field='temperature', engine=engine)
+
+
+class SteinerConvStrat(object):
+    """ Classify a 1 km, 1000 by 1000 composite. """
+
+    params = ['fortran', 'array']
+    param_names = ['engine']
+    timeout = 300
+
+    def setup(self, engine):
+        if (engine == 'fortran' and
+                not pyart.retrieve.echo_class._F90_EXTENSIONS_AVAILABLE):
+            raise NotImplementedError('Fortran extension not available')
+        self.grid = make_composite_grid()
+
+    def time_steiner_conv_strat(self, engine):
+        pyart.retrieve.steiner_conv_strat(self.grid, engine=engine)
+
+
+class SteinerConvStratStack(object):
+    """ Classify a stack of 24 500 by 500 composites. """
+
+    timeout = 300
+
+    def setup(self):
+        self.refl = make_composite(500, 500, ntimes=24)
+
+    def time_steiner_conv_strat_array(self):
+        pyart.retrieve.steiner_conv_strat_array(self.refl, 1000., 1000.)
@@ -0,0 +1,185 @@
+"""
+Synthetic, full-size radar volumes and grids used by the benchmarks.
+
+The volumes are generated from :py:func:`pyart.testing.make_empty_ppi_radar`
+with the dimensions of a NEXRAD super-resolution volume coverage pattern so
+that the benchmarks do not require any data files.  The fields are smooth
+analytic storms with noise, aliased Doppler velocities and consistent
+polarimetric variables.
+"""
+
+import numpy as np
+import pyart
+
+
+# dimensions of a NEXRAD VCP 212 super-resolution volume
+VCP_NGATES = 1832
+VCP_RAYS_PER_SWEEP = 720
+VCP_ELEVATIONS = [0.5, 0.9, 1.3, 1.8, 2.4, 3.1, 4.0, 5.1, 6.4, 8.0, 10.0,
+                  12.5, 15.6, 19.5]
+VCP_GATE_SPACING = 250.
+VCP_NYQUIST = 10.
+
+# storm cells as (range in m, azimuth in degrees, peak reflectivity in dBZ)
+_CELLS = [(40000., 45., 55.), (75000., 120., 50.), (110000., 200., 60.),
+          (60000., 300., 45.), (150000., 250., 40.)]
+
+
+def make_vcp_radar(nsweeps=None, rays_per_sweep=VCP_RAYS_PER_SWEEP,
+                   ngates=VCP_NGATES, seed=0):
+    """
+    Return a PPI volume with synthetic reflectivity, velocity and
+    polarimetric fields.
+
+    Parameters
+    ----------
+    nsweeps : int or None
+        Number of sweeps, taken from the lowest VCP elevations. None uses
+        all of the elevations in VCP_ELEVATIONS.
+    rays_per_sweep, ngates : int
+        Number of rays in each sweep and gates in each ray.
+    seed : int
+        Seed of the random noise added to the fields.
+
+    Returns
+    -------
+    radar : Radar
+        Volume with reflectivity, velocity, differential_reflectivity,
+        cross_correlation_ratio, differential_phase,
+        specific_differential_phase, normalized_coherent_power and
+        temperature fields.
+
+    """
+    if nsweeps is None:
+        nsweeps = len(VCP_ELEVATIONS)
+    radar = pyart.testing.make_empty_ppi_radar(
+        ngates, rays_per_sweep, nsweeps)
+    nrays = radar.nrays
+    elevations = np.array(VCP_ELEVATIONS[:nsweeps], dtype='float32')
+    sweep_azimuths = np.linspace(
+        0, 360, rays_per_sweep, endpoint=False).astype('float32')
+    radar.range['data'] = (
+        np.arange(ngates, dtype='float32') * VCP_GATE_SPACING + 2125.)
+    radar.range['meters_between_gates'] = VCP_GATE_SPACING
+    radar.azimuth['data'] = np.tile(sweep_azimuths, nsweeps)
+    radar.elevation['data'] = np.repeat(elevations, rays_per_sweep)
+    radar.fixed_angle['data'] = elevations
+    radar.instrument_parameters = {
+        'nyquist_velocity': {
+            'data': np.full(nrays, VCP_NYQUIST, dtype='float32')}}
+
+    names = ['reflectivity', 'velocity', 'differential_reflectivity',
+             'cross_correlation_ratio', 'differential_phase',
+             'specific_differential_phase', 'normalized_coherent_power',
+             'temperature']
+    data = dict((name, np.empty((nrays, ngates), dtype='float32'))
+                for name in names)
+    mask = np.empty((nrays, ngates), dtype=bool)
+
+    # the fields are generated one sweep at a time to limit the memory used
+    random_state = np.random.RandomState(seed)
+    rng = radar.range['data'].astype('float64')[np.newaxis, :]
+    for sweep in range(nsweeps):
+        rays = slice(sweep * rays_per_sweep, (sweep + 1) * rays_per_sweep)
+        azimuth = np.deg2rad(radar.azimuth['data'][rays])[:, np.newaxis]
+        elevation = np.deg2rad(radar.elevation['data'][rays])[:, np.newaxis]
+        height = rng * np.sin(elevation) + rng ** 2 / (2 * 8494666.)
+
+        def noise(scale):
+            return random_state.normal(0, scale, (rays_per_sweep, ngates))
+
+        # stratiform rain decreasing with range and height plus convection
+        refl = 25. - rng / 10000. - height / 500.
+        for cell_range, cell_azimuth, cell_peak in _CELLS:
+            dx = rng * np.cos(azimuth) - cell_range * np.cos(
+                np.deg2rad(cell_azimuth))
+            dy = rng * np.sin(azimuth) - cell_range * np.sin(
+                np.deg2rad(cell_azimuth))
+            dist2 = (dx ** 2 + dy ** 2) / 8000. ** 2 + (height / 6000.) ** 2
+            refl = np.maximum(refl, cell_peak * np.exp(-dist2))
+        refl += noise(2.)
+        mask[rays] = refl < -5.
+
+        # linear wind profile projected on the beam, aliased
+        wind = 5. + height / 250.
+        vel = (wind * np.cos(azimuth - np.pi / 4.) * np.cos(elevation) +
+               noise(1.))
+        vel = (vel + VCP_NYQUIST) % (2 * VCP_NYQUIST) - VCP_NYQUIST
+
+        # polarimetric variables consistent with the reflectivity
+        kdp = np.where(refl > 35., (refl - 35.) * 0.1, 0.02)
+        phidp = 20. + 2. * np.cumsum(kdp, axis=1) * VCP_GATE_SPACING / 1000.
+
+        data['reflectivity'][rays] = refl
+        data['velocity'][rays] = vel
+        data['differential_reflectivity'][rays] = (
+            np.clip(refl / 20., -1., 4.) + noise(0.3))
+        data['cross_correlation_ratio'][rays] = np.clip(
+            0.99 - noise(0.02) ** 2, 0., 1.)
+        data['differential_phase'][rays] = phidp + noise(3.)
+        data['specific_differential_phase'][rays] = kdp
+        data['normalized_coherent_power'][rays] = np.clip(
+            0.9 - noise(0.1) ** 2, 0., 1.)
+        data['temperature'][rays] = 15. - 6.5 * height / 1000.
+
+    for name in names:
+        field = pyart.config.get_metadata(name)
+        if name == 'temperature':
+            field['data'] = np.ma.masked_array(data[name])
+        else:
+            field['data'] = np.ma.masked_array(data[name], mask=mask.copy())
+        radar.add_field(name, field)
+    return radar
+
+
+def make_composite(nx=1000, ny=1000, ntimes=1, resolution=1000., seed=0):
+    """
+    Return working level reflectivity composites with convective cells
+    embedded in stratiform rain.
+
+    Parameters
+    ----------
+    nx, ny : int
+        Number of grid points.
+    ntimes : int
+        Number of composites.
+    resolution : float
+        Grid resolution in meters.
+    seed : int
+        Seed of the random cells and noise.
+
+    Returns
+    -------
+    refl : masked array
+        Reflectivity with dimensions (time, y, x).
+
+    """
+    random_state = np.random.RandomState(seed)
+    y, x = np.mgrid[0:ny, 0:nx] * resolution
+    refl = np.empty((ntimes, ny, nx))
+    for i in range(ntimes):
+        refl[i] = 20. + 5. * np.sin(x / 50000. + i) * np.cos(y / 70000.)
+        for j in range(50):
+            cx = random_state.uniform(0, nx * resolution)
+            cy = random_state.uniform(0, ny * resolution)
+            size = random_state.uniform(2000., 10000.)
+            peak = random_state.uniform(35., 60.)
+            cell = peak * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / size ** 2)
+            np.maximum(refl[i], cell, out=refl[i])
+    refl += random_state.normal(0, 2., refl.shape)
+    return np.ma.masked_less(refl, 12.)
+
+
+def make_composite_grid(nx=1000, ny=1000, resolution=1000.):
+    """
+    Return a Grid with a two level reflectivity field from
+    :py:func:`make_composite`, the working level is at 3000 m.
+    """
+    half_x = (nx - 1) * resolution / 2.
+    half_y = (ny - 1) * resolution / 2.
+    grid = pyart.testing.make_empty_grid(
+        (2, ny, nx), ((0., 3000.), (-half_y, half_y), (-half_x, half_x)))
+    refl = make_composite(nx, ny, resolution=resolution)[0]
+    data = np.ma.array([refl - 5., refl])
+    grid.fields = {'reflectivity': {'data': data}}
+    return grid
@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+Compare the Py-ART benchmarks between two revisions without asv.
+
+Each revision is checked out into a temporary git worktree and its
+extensions are built in place, no packages are installed or downloaded.
+The benchmarks of the current checkout are then run against each build,
+every benchmark in a fresh process so that peak memory is measured
+independently, and the results are compared.
+
+Usage::
+
+    python benchmarks/compare.py [-b REGEX] [-f FACTOR] BASE [HEAD]
+
+HEAD defaults to the working tree, which must already be built in place.
+The exit status is 1 when a benchmark is slower, uses more memory or fails
+in HEAD but not in BASE.
+"""
+
+from __future__ import print_function
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+PREFIXES = ('time_', 'peakmem_', 'track_')
+DEFAULT_TIMEOUT = 60
+
+
+###########
+# Workers #
+###########
+
+def _discover():
+    """ Return a dictionary of the benchmark functions by name. """
+    import benchmarks
+    found = {}
+    for _, module_name, _ in pkgutil.iter_modules(benchmarks.__path__):
+        module = importlib.import_module('benchmarks.' + module_name)
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for attr in dir(cls):
+                if attr.startswith(PREFIXES):
+                    name = '.'.join([module_name, class_name, attr])
+                    found[name] = (cls, attr)
+    return found
+
+
+def _param_sets(cls):
+    """ Return the list of parameter tuples of a benchmark class. """
+    params = getattr(cls, 'params', [])
+    if not params:
+        return [()]
+    if len(getattr(cls, 'param_names', [])) > 1:
+        return list(itertools.product(*params))
+    return [(param, ) for param in params]
+
+
+def _list_benchmarks(regex):
+    """ List the benchmarks, their parameters and timeouts. """
+    listing = []
+    for name, (cls, attr) in sorted(_discover().items()):
+        for index, params in enumerate(_param_sets(cls)):
+            label = name
+            if params:
+                label += '(%s)' % ', '.join(repr(p) for p in params)
+            if regex is not None and not re.search(regex, label):
+                continue
+            listing.append({
+                'name': name, 'index': index, 'label': label,
+                'timeout': getattr(cls, 'timeout', DEFAULT_TIMEOUT)})
+    return listing
+
+
+def _run_benchmark(name, index, repeat):
+    """ Run a single benchmark, returning a result dictionary. """
+    cls, attr = _discover()[name]
+    params = _param_sets(cls)[index]
+    instance = cls()
+    func = getattr(instance, attr)
+    try:
+        if hasattr(instance, 'setup'):
+            instance.setup(*params)
+    except NotImplementedError:
+        return {'skipped': True}
+    try:
+        if attr.startswith('time_'):
+            times = []
+            for _ in range(repeat):
+                start = time.time()
+                func(*params)
+                times.append(time.time() - start)
+            return {'value': min(times), 'unit': 'seconds'}
+        elif attr.startswith('peakmem_'):
+            func(*params)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform != 'darwin':
+                maxrss *= 1024  # kilobytes on Linux
+            return {'value': maxrss, 'unit': 'bytes'}
+        else:
+            value = func(*params)
+            return {'value': value, 'unit': getattr(func, 'unit', '')}
+    finally:
+        if hasattr(instance, 'teardown'):
+            instance.teardown(*params)
+
+
+def _worker(args):
+    """ Entry point of the worker processes. """
+    sys.path.insert(0, args.source)
+    sys.path.insert(0, BENCHMARK_DIR)
+    if args.list:
+        result = _list_benchmarks(args.bench)
+    else:
+        try:
+            result = _run_benchmark(args.run, args.index, args.repeat)
+        except Exception:
+            result = {'error': traceback.format_exc()}
+    print(json.dumps(result))
+
+
+##########
+# Runner #
+##########
+
+def _call_worker(source, extra, timeout=None):
+    """ Run a worker process and return its decoded output. """
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', source]
+    output = subprocess.check_output(
+        cmd + extra, cwd=tempfile.gettempdir(), timeout=timeout)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def _checkout(revision, directory):
+    """ Check out and build a revision in a temporary worktree. """
+    subprocess.check_call(
+        ['git', 'worktree', 'add', '--detach', directory, revision],
+        cwd=REPO_DIR)
+    try:
+        subprocess.check_output(
+            [sys.executable, 'setup.py', 'build_ext', '--inplace'],
+            cwd=directory, stderr=subprocess.STDOUT)
+    except subprocess.CalledProcessError as error:
+        print(error.output.decode('utf-8', 'replace'), file=sys.stderr)
+        raise
+
+
+def _remove_checkout(directory):
+    """ Remove a temporary worktree. """
+    subprocess.call(['git', 'worktree', 'remove', '--force', directory],
+                    cwd=REPO_DIR)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_benchmarks(source, regex=None, repeat=3):
+    """
+    Run the benchmarks against the Py-ART source in a directory.
+
+    Parameters
+    ----------
+    source : str
+        Directory containing the built pyart package.
+    regex : str or None
+        Only run benchmarks whose label matches this regular expression.
+    repeat : int
+        Number of times each timing benchmark is run, the minimum time is
+        reported.
+
+    Returns
+    -------
+    results : dict
+        Result dictionary of each benchmark by label.
+
+    """
+    extra = ['--list']
+    if regex is not None:
+        extra += ['--bench', regex]
+    results = {}
+    for benchmark in _call_worker(source, extra):
+        label = benchmark['label']
+        try:
+            result = _call_worker(
+                source, ['--run', benchmark['name'],
+                         '--index', str(benchmark['index']),
+                         '--repeat', str(repeat)],
+                timeout=benchmark['timeout'] * (repeat + 1))
+        except subprocess.TimeoutExpired:
+            result = {'error': 'timeout'}
+        except subprocess.CalledProcessError as error:
+            result = {'error': 'exit status %d' % error.returncode}
+        results[label] = result
+        print('  %-70s %s' % (label, _format(result)), file=sys.stderr)
+    return results
+
+
+def _format(result):
+    """ Format a benchmark result. """
+    if result is None:
+        return 'n/a'
+    if result.get('skipped'):
+        return 'skipped'
+    if 'error' in result:
+        return 'failed'
+    value, unit = result['value'], result['unit']
+    if unit == 'seconds':
+        for scale, suffix in [(1., 's'), (1e-3, 'ms'), (1e-6, 'us')]:
+            if value >= scale:
+                break
+        return '%.3g%s' % (value / scale, suffix)
+    if unit == 'bytes':
+        return '%.3gM' % (value / 1e6)
+    return '%s %s' % (value, unit)
+
+
+def compare(base, head, factor):
+    """
+    Compare two sets of benchmark results.
+
+    Returns
+    -------
+    regressions : list
+        Labels of the benchmarks which regressed or failed in head.
+
+    """
+    regressions = []
+    print('%10s %10s %7s  %s' % ('before', 'after', 'ratio', 'benchmark'))
+    for label in sorted(set(base) | set(head)):
+        before, after = base.get(label), head.get(label)
+        ratio = ''
+        status = ' '
+        if after is not None and 'error' in after:
+            if before is not None and 'error' not in before:
+                status = '!'
+                regressions.append(label)
+        elif (before is not None and after is not None and
+                'value' in before and 'value' in after and
+                isinstance(after['value'], (int, float)) and
+                before['value']):
+            value = float(after['value']) / before['value']
+            ratio = '%.2f' % value
+            if value > factor:
+                status = '+'
+                regressions.append(label)
+            elif value < 1. / factor:
+                status = '-'
+        print('%s%9s %10s %7s  %s' % (
+            status, _format(before), _format(after), ratio, label))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('base', nargs='?', help='base git revision')
+    parser.add_argument('head', nargs='?', default=None,
+                        help='git revision to compare, default working tree')
+    parser.add_argument('-b', '--bench', default=None,
+                        help='regular expression selecting benchmarks')
+    parser.add_argument('-f', '--factor', type=float, default=1.1,
+                        help='ratio above which a change is reported')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='number of runs of each timing benchmark')
+    parser.add_argument('--worker', dest='source', help=argparse.SUPPRESS)
+    parser.add_argument('--list', action='store_true',
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    parser.add_argument('--index', type=int, default=0,
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.source is not None:
+        _worker(args)
+        return 0
+    if args.base is None:
+        parser.error('a base revision is required')
+
+    results = []
+    for revision in [args.base, args.head]:
+        if revision is None:
+            print('Running benchmarks on the working tree', file=sys.stderr)
+            results.append(run_benchmarks(REPO_DIR, args.bench, args.repeat))
+            continue
+        directory = tempfile.mkdtemp(prefix='pyart-bench-')
+        os.rmdir(directory)
+        try:
+            print('Building %s' % revision, file=sys.stderr)
+            _checkout(revision, directory)
+            print('Running benchmarks on %s' % revision, file=sys.stderr)
+            results.append(
+                run_benchmarks(directory, args.bench, args.repeat))
+        finally:
+            _remove_checkout(directory)
+
+    regressions = compare(results[0], results[1], args.factor)
+    if regressions:
+        print('\n%d benchmarks regressed' % len(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -56,6 +56,7 @@ else:
     from . import util
     from . import testing
     from . import config
+    from . import profiling
     from . import aux_io
     from . import retrieve
     from . import bridge
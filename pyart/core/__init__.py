@@ -25,12 +25,24 @@ Coordinate transformations
 
     antenna_to_cartesian
     antenna_vectors_to_cartesian
+    antenna_vectors_to_geographic
     cartesian_to_geographic
     cartesian_vectors_to_geographic
     cartesian_to_geographic_aeqd
     geographic_to_cartesian
     geographic_to_cartesian_aeqd
 
+Gate coordinate cache
+=====================
+
+.. autosummary::
+    :toctree: generated/
+
+    enable_geometry_cache
+    disable_geometry_cache
+    clear_geometry_cache
+    geometry_cache_info
+
 """
 
 from .radar import Radar
@@ -39,10 +51,14 @@ from .wind_profile import HorizontalWindProfile
 
 from .transforms import antenna_to_cartesian
 from .transforms import antenna_vectors_to_cartesian
+from .transforms import antenna_vectors_to_geographic
 from .transforms import cartesian_to_geographic
 from .transforms import cartesian_vectors_to_geographic
 from .transforms import cartesian_to_geographic_aeqd
 from .transforms import geographic_to_cartesian
 from .transforms import geographic_to_cartesian_aeqd
 
+from .geometry_cache import enable_geometry_cache, disable_geometry_cache
+from .geometry_cache import clear_geometry_cache, geometry_cache_info
+
 __all__ = [s for s in dir() if not s.startswith('_')]
@@ -0,0 +1,281 @@
+"""
+pyart.core.geometry_cache
+=========================
+
+A process-wide cache of radar gate coordinates.
+
+The Cartesian, geographic and altitude coordinates of the gates of a radar
+volume depend only on the radar location, the range gates, the antenna
+angles and the map projection.  These are identical from one volume to the
+next for a fixed site and scan strategy, so when the cache is enabled the
+gate coordinate arrays of a :py:class:`Radar` are computed once and shared,
+as read-only arrays, by all volumes with the same geometry.  The cache can
+optionally persist the arrays as ``.npy`` files which are memory-mapped,
+allowing multiple processes to share a single copy.
+
+.. autosummary::
+    :toctree: generated/
+
+    enable_geometry_cache
+    disable_geometry_cache
+    clear_geometry_cache
+    geometry_cache_info
+    geometry_key
+    get_cached_arrays
+    _cache_enabled
+    _load_arrays
+    _store_arrays
+
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+_GEOMETRY_CACHE = {
+    'enabled': False,
+    'maxsize': 16,
+    'directory': None,
+    'arrays': OrderedDict(),
+    'hits': 0,
+    'misses': 0,
+}
+_GEOMETRY_CACHE_LOCK = threading.Lock()
+
+# os.replace overwrites existing files on all platforms, Python >= 3.3
+_replace = getattr(os, 'replace', os.rename)
+
+
+def enable_geometry_cache(maxsize=16, directory=None):
+    """
+    Enable the gate coordinate cache.
+
+    Once enabled, the gate_x, gate_y, gate_z, gate_longitude, gate_latitude
+    and gate_altitude attributes of Radar objects whose coordinates have not
+    yet been computed are taken from the cache.  These arrays are read-only
+    and shared between Radar objects, copy them before modifying.  The
+    cached coordinates are keyed on the range gates, antenna angles, radar
+    altitude and projection, gate coordinates set directly on a Radar are
+    not taken into account.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of coordinate groups held in memory.  A group is the
+        set of arrays computed together, for example the gate_x, gate_y and
+        gate_z arrays of one geometry.  The least recently used groups are
+        discarded when the limit is exceeded.
+    directory : str or None
+        Directory in which the coordinate arrays are stored as ``.npy``
+        files.  Arrays found in the directory are memory-mapped rather than
+        computed, so processes using the same directory share one copy.
+        None keeps the arrays in memory only.
+
+    """
+    if maxsize < 1:
+        raise ValueError('maxsize must be at least 1')
+    if directory is not None and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with _GEOMETRY_CACHE_LOCK:
+        _GEOMETRY_CACHE['enabled'] = True
+        _GEOMETRY_CACHE['maxsize'] = maxsize
+        _GEOMETRY_CACHE['directory'] = directory
+        _trim_cache()
+
+
+def disable_geometry_cache():
+    """
+    Disable and clear the gate coordinate cache.
+
+    Files in the cache directory, if one was used, are not removed.
+    """
+    with _GEOMETRY_CACHE_LOCK:
+        _GEOMETRY_CACHE['enabled'] = False
+        _GEOMETRY_CACHE['directory'] = None
+    clear_geometry_cache()
+
+
+def clear_geometry_cache():
+    """ Discard all coordinate arrays held in memory by the cache. """
+    with _GEOMETRY_CACHE_LOCK:
+        _GEOMETRY_CACHE['arrays'].clear()
+        _GEOMETRY_CACHE['hits'] = 0
+        _GEOMETRY_CACHE['misses'] = 0
+
+
+def geometry_cache_info():
+    """
+    Return information on the gate coordinate cache.
+
+    Returns
+    -------
+    info : dict
+        Dictionary with the keys 'enabled', 'maxsize', 'directory',
+        'currsize' (number of coordinate groups in memory), 'hits',
+        'misses' and 'nbytes' (bytes held by the in-memory arrays, excluding
+        memory-mapped arrays).
+
+    """
+    with _GEOMETRY_CACHE_LOCK:
+        arrays = _GEOMETRY_CACHE['arrays']
+        nbytes = sum(
+            array.nbytes for group in arrays.values() for array in group
+            if not isinstance(array, np.memmap))
+        return {
+            'enabled': _GEOMETRY_CACHE['enabled'],
+            'maxsize': _GEOMETRY_CACHE['maxsize'],
+            'directory': _GEOMETRY_CACHE['directory'],
+            'currsize': len(arrays),
+            'hits': _GEOMETRY_CACHE['hits'],
+            'misses': _GEOMETRY_CACHE['misses'],
+            'nbytes': nbytes}
+
+
+def geometry_key(group, *items):
+    """
+    Return the cache key for a group of coordinate arrays.
+
+    Parameters
+    ----------
+    group : str
+        Name of the group of coordinates, for example 'xyz'.
+    items : array-like, dict or str
+        Values which determine the coordinates.  Arrays are hashed using
+        their dtype, shape and contents, dictionaries (projections) using
+        their sorted items.
+
+    Returns
+    -------
+    key : str
+        Key identifying the group of coordinates.
+
+    """
+    digest = hashlib.sha1()
+    for item in items:
+        if isinstance(item, dict):
+            item = repr(sorted(item.items()))
+        if isinstance(item, str):
+            digest.update(item.encode('utf-8'))
+        else:
+            item = np.ascontiguousarray(np.ma.getdata(item))
+            digest.update(item.dtype.str.encode('utf-8'))
+            digest.update(repr(item.shape).encode('utf-8'))
+            digest.update(item.view(np.uint8).ravel())
+        digest.update(b'|')
+    return group + '_' + digest.hexdigest()
+
+
+def get_cached_arrays(key, compute):
+    """
+    Return a group of coordinate arrays from the cache.
+
+    Parameters
+    ----------
+    key : str
+        Key of the group, as returned by :py:func:`geometry_key`.
+    compute : callable
+        Function called without arguments which returns a sequence of the
+        arrays in the group, used when the group is not in the cache.
+
+    Returns
+    -------
+    arrays : tuple of ndarray
+        Read-only arrays of the group.
+
+    """
+    with _GEOMETRY_CACHE_LOCK:
+        arrays = _GEOMETRY_CACHE['arrays']
+        directory = _GEOMETRY_CACHE['directory']
+        if key in arrays:
+            # re-insert the group to mark it as most recently used
+            arrays[key] = arrays.pop(key)
+            _GEOMETRY_CACHE['hits'] += 1
+            return arrays[key]
+
+    group = None
+    if directory is not None:
+        group = _load_arrays(directory, key)
+    if group is None:
+        group = tuple(np.ascontiguousarray(array) for array in compute())
+        if directory is not None:
+            group = _store_arrays(directory, key, group)
+    for array in group:
+        array.flags.writeable = False
+
+    with _GEOMETRY_CACHE_LOCK:
+        _GEOMETRY_CACHE['misses'] += 1
+        # another thread may have added the group in the meantime
+        arrays = _GEOMETRY_CACHE['arrays']
+        group = arrays.pop(key, group)
+        arrays[key] = group
+        _trim_cache()
+    return group
+
+
+def _cache_enabled():
+    """ Return True when the gate coordinate cache is enabled. """
+    return _GEOMETRY_CACHE['enabled']
+
+
+def _trim_cache():
+    """ Discard least recently used groups, the lock must be held. """
+    arrays = _GEOMETRY_CACHE['arrays']
+    while len(arrays) > _GEOMETRY_CACHE['maxsize']:
+        arrays.popitem(last=False)
+
+
+def _array_filenames(directory, key):
+    """ Return the path of the count file and the prefix of the arrays. """
+    prefix = os.path.join(directory, key)
+    return prefix + '.count', prefix
+
+
+def _load_arrays(directory, key):
+    """ Memory-map a group of arrays from a directory, None if missing. """
+    count_file, prefix = _array_filenames(directory, key)
+    try:
+        with open(count_file) as f:
+            count = int(f.read())
+        return tuple(np.load('%s_%d.npy' % (prefix, i), mmap_mode='r')
+                     for i in range(count))
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _store_arrays(directory, key, group):
+    """
+    Store a group of arrays in a directory and return them memory-mapped.
+
+    Each file is written to a temporary file and renamed into place so that
+    other processes never read partially written arrays.  The file
+    recording the number of arrays is written last and marks the group as
+    complete.
+    """
+    count_file, prefix = _array_filenames(directory, key)
+    for i, array in enumerate(group):
+        _atomic_write(directory, '%s_%d.npy' % (prefix, i),
+                      lambda f, array=array: np.save(f, array))
+    _atomic_write(directory, count_file,
+                  lambda f: f.write(str(len(group)).encode('ascii')))
+    loaded = _load_arrays(directory, key)
+    if loaded is None:
+        return group
+    return loaded
+
+
+def _atomic_write(directory, filename, write):
+    """ Write a file by renaming a temporary file into place. """
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        _replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
@@ -31,6 +31,7 @@ from netCDF4 import num2date, date2num
 from ..config import get_metadata
 from ..lazydict import LazyLoadDict
 from .transforms import antenna_vectors_to_cartesian, cartesian_to_geographic
+from .geometry_cache import _cache_enabled, geometry_key, get_cached_arrays
 
 
 class Radar(object):
@@ -896,8 +897,14 @@ def _gate_data_factory(radar, coordinate):
         ranges = radar.range['data']
         azimuths = radar.azimuth['data']
         elevations = radar.elevation['data']
-        cartesian_coords = antenna_vectors_to_cartesian(
-            ranges, azimuths, elevations, edges=False)
+        if _cache_enabled():
+            key = geometry_key('xyz', ranges, azimuths, elevations)
+            cartesian_coords = get_cached_arrays(
+                key, lambda: antenna_vectors_to_cartesian(
+                    ranges, azimuths, elevations, edges=False))
+        else:
+            cartesian_coords = antenna_vectors_to_cartesian(
+                ranges, azimuths, elevations, edges=False)
         # load x, y, and z data except for the coordinate in question
         if coordinate != 0:
             radar.gate_x['data'] = cartesian_coords[0]
@@ -919,7 +926,14 @@ def _gate_lon_lat_data_factory(radar, coordinate):
         if projparams.pop('_include_lon_0_lat_0', False):
             projparams['lon_0'] = radar.longitude['data'][0]
             projparams['lat_0'] = radar.latitude['data'][0]
-        geographic_coords = cartesian_to_geographic(x, y, projparams)
+        if _cache_enabled():
+            key = geometry_key(
+                'lonlat', radar.range['data'], radar.azimuth['data'],
+                radar.elevation['data'], projparams)
+            geographic_coords = get_cached_arrays(
+                key, lambda: cartesian_to_geographic(x, y, projparams))
+        else:
+            geographic_coords = cartesian_to_geographic(x, y, projparams)
         # set the other geographic coordinate
         if coordinate == 0:
             radar.gate_latitude['data'] = geographic_coords[1]
@@ -933,5 +947,12 @@ def _gate_altitude_data_factory(radar):
     """ Return a function which returns the gate altitudes. """
     def _gate_altitude_data():
         """ The function which returns the gate altitudes. """
+        if _cache_enabled():
+            key = geometry_key(
+                'altitude', radar.range['data'], radar.azimuth['data'],
+                radar.elevation['data'], radar.altitude['data'])
+            return get_cached_arrays(
+                key, lambda: (radar.altitude['data'] +
+                              radar.gate_z['data'], ))[0]
         return radar.altitude['data'] + radar.gate_z['data']
     return _gate_altitude_data
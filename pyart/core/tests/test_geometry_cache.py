@@ -0,0 +1,90 @@
+""" Unit Tests for Py-ART's core/geometry_cache.py module. """
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_raises
+import pyart
+
+
+def _make_radar():
+    radar = pyart.testing.make_empty_ppi_radar(5, 4, 2)
+    radar.azimuth['data'][:] = [0, 90, 180, 270, 0, 90, 180, 270]
+    radar.elevation['data'][:] = [0, 0, 0, 0, 10, 10, 10, 10]
+    radar.range['data'][:] = [5, 15, 25, 35, 45]
+    return radar
+
+
+def _gate_coordinates(radar):
+    return [radar.gate_x['data'], radar.gate_y['data'], radar.gate_z['data'],
+            radar.gate_longitude['data'], radar.gate_latitude['data'],
+            radar.gate_altitude['data']]
+
+
+def test_geometry_cache_shares_arrays():
+    expected = _gate_coordinates(_make_radar())
+    pyart.core.enable_geometry_cache()
+    try:
+        radar1 = _make_radar()
+        radar2 = _make_radar()
+        coords1 = _gate_coordinates(radar1)
+        coords2 = _gate_coordinates(radar2)
+        for ref, coord1, coord2 in zip(expected, coords1, coords2):
+            assert_allclose(coord1, ref)
+            assert coord1 is coord2
+            assert not coord1.flags.writeable
+
+        info = pyart.core.geometry_cache_info()
+        assert info['currsize'] == 3
+        assert info['misses'] == 3
+        assert info['hits'] == 3
+    finally:
+        pyart.core.disable_geometry_cache()
+
+
+def test_geometry_cache_distinct_geometry():
+    pyart.core.enable_geometry_cache()
+    try:
+        radar1 = _make_radar()
+        radar2 = _make_radar()
+        radar2.azimuth['data'][0] = 45.
+        radar2.altitude['data'][0] = 150.
+        assert radar1.gate_x['data'] is not radar2.gate_x['data']
+        assert_allclose(radar2.gate_altitude['data'][0, 0], 150.0, atol=0.1)
+        assert_allclose(radar1.gate_altitude['data'][0, 0], 200.0, atol=0.1)
+    finally:
+        pyart.core.disable_geometry_cache()
+
+
+def test_geometry_cache_lru():
+    pyart.core.enable_geometry_cache(maxsize=2)
+    try:
+        for azimuth in [0., 1., 2.]:
+            radar = _make_radar()
+            radar.azimuth['data'][0] = azimuth
+            radar.gate_x['data']
+        assert pyart.core.geometry_cache_info()['currsize'] == 2
+    finally:
+        pyart.core.disable_geometry_cache()
+    assert_raises(ValueError, pyart.core.enable_geometry_cache, 0)
+
+
+def test_geometry_cache_directory():
+    directory = tempfile.mkdtemp()
+    try:
+        pyart.core.enable_geometry_cache(directory=directory)
+        expected = _gate_coordinates(_make_radar())
+        assert len(os.listdir(directory)) > 0
+
+        # arrays are memory-mapped from the directory once cleared
+        pyart.core.clear_geometry_cache()
+        coords = _gate_coordinates(_make_radar())
+        for ref, coord in zip(expected, coords):
+            assert isinstance(coord, np.memmap)
+            assert_allclose(coord, ref)
+        assert pyart.core.geometry_cache_info()['nbytes'] == 0
+    finally:
+        pyart.core.disable_geometry_cache()
+        shutil.rmtree(directory)
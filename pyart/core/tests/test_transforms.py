@@ -196,3 +196,51 @@ def test_cartesian_to_geographic_aeqd():
             x, y, lon_0, lat_0, R)
     assert_almost_equal(lon, -100.0, 3)
     assert_almost_equal(lat, 40.0, 3)
+
+
+def test_antenna_vectors_to_cartesian_dtype():
+    ranges = np.array([0., 1000., 100000.])
+    azimuths = np.array([0., 90., 180., 270.])
+    elevations = np.array([0.5, 0.5, 10., 10.])
+    rg, azg = np.meshgrid(ranges, azimuths)
+    rg, eleg = np.meshgrid(ranges, elevations)
+    x, y, z = transforms.antenna_to_cartesian(rg / 1000., azg, eleg)
+
+    x64, y64, z64 = transforms.antenna_vectors_to_cartesian(
+        ranges, azimuths, elevations)
+    assert x64.dtype == np.float64
+    assert_almost_equal(x64, x, 6)
+    assert_almost_equal(y64, y, 6)
+    assert_almost_equal(z64, z, 6)
+
+    # single precision output is calculated in double precision
+    x32, y32, z32 = transforms.antenna_vectors_to_cartesian(
+        ranges, azimuths, elevations, dtype=np.float32)
+    assert x32.dtype == np.float32
+    assert_almost_equal(x32, x, 2)
+    assert_almost_equal(y32, y, 2)
+    assert_almost_equal(z32, z, 2)
+
+
+def test_antenna_vectors_to_geographic():
+    ranges = np.array([0., 1000., 100000.])
+    azimuths = np.array([0., 90., 180., 270.])
+    elevations = np.array([0.5, 0.5, 10., 10.])
+    x, y, z = transforms.antenna_vectors_to_cartesian(
+        ranges, azimuths, elevations)
+    with warnings.catch_warnings():  # invalid divide is handled by code
+        warnings.simplefilter("ignore")
+        lon, lat = transforms.cartesian_to_geographic_aeqd(x, y, -97., 36.)
+
+    coords = transforms.antenna_vectors_to_geographic(
+        ranges, azimuths, elevations, -97., 36., altitude=300.)
+    for result, expected in zip(coords, [x, y, z, lon, lat, z + 300.]):
+        assert result.shape == (4, 3)
+        assert_almost_equal(result, expected, 6)
+    assert_almost_equal(coords[3][0, 0], -97., 6)
+    assert_almost_equal(coords[4][0, 0], 36., 6)
+
+    coords = transforms.antenna_vectors_to_geographic(
+        ranges, azimuths, elevations, -97., 36., dtype=np.float32)
+    assert all(coord.dtype == np.float32 for coord in coords)
+    assert_almost_equal(coords[4], lat, 4)
@@ -11,6 +11,7 @@ and antenna (azimuth, elevation, range) coordinate systems.
 
     antenna_to_cartesian
     antenna_vectors_to_cartesian
+    antenna_vectors_to_geographic
     antenna_to_cartesian_track_relative
     antenna_to_cartesian_earth_relative
     antenna_to_cartesian_aircraft_relative
@@ -26,6 +27,10 @@ and antenna (azimuth, elevation, range) coordinate systems.
     _interpolate_elevation_edges
     _interpolate_range_edges
     _half_angle_complex
+    _antenna_vectors
+    _ray_blocks
+    _antenna_block_to_cartesian
+    _cartesian_block_to_geographic
 
 
 """
@@ -105,7 +110,8 @@ def antenna_to_cartesian(ranges, azimuths, elevations, debug=False):
     return x, y, z
 
 
-def antenna_vectors_to_cartesian(ranges, azimuths, elevations, edges=False):
+def antenna_vectors_to_cartesian(ranges, azimuths, elevations, edges=False,
+                                 dtype=None):
     """
     Calculate Cartesian coordinate for gates from antenna coordinate vectors.
 
@@ -126,6 +132,10 @@ def antenna_vectors_to_cartesian(ranges, azimuths, elevations, edges=False):
         True to calculate the coordinates of the gate edges by interpolating
         between gates and extrapolating at the boundaries.  False to
         calculate the gate centers.
+    dtype : dtype or None, optional
+        Data type of the returned coordinates.  None uses the floating point
+        type of the input vectors.  The coordinates are always calculated in
+        double precision, np.float32 halves the memory needed to store them.
 
     Returns
     -------
@@ -134,6 +144,102 @@ def antenna_vectors_to_cartesian(ranges, azimuths, elevations, edges=False):
         gate centers or edges.
 
     """
+    ranges, azimuths, elevations, dtype = _antenna_vectors(
+        ranges, azimuths, elevations, edges, dtype)
+    nrays = len(azimuths)
+    ngates = len(ranges)
+    x = np.empty((nrays, ngates), dtype=dtype)
+    y = np.empty((nrays, ngates), dtype=dtype)
+    z = np.empty((nrays, ngates), dtype=dtype)
+    for rays in _ray_blocks(nrays, ngates):
+        x[rays], y[rays], z[rays] = _antenna_block_to_cartesian(
+            ranges, azimuths[rays], elevations[rays])
+    return x, y, z
+
+
+def antenna_vectors_to_geographic(ranges, azimuths, elevations, lon_0,
+                                  lat_0, altitude=0., R=6370997.,
+                                  edges=False, dtype=np.float64):
+    """
+    Calculate Cartesian and geographic coordinates of gates in one pass.
+
+    The Cartesian coordinates are found as in
+    :py:func:`antenna_vectors_to_cartesian` and transformed to geographic
+    coordinates with the azimuthal equidistant projection of
+    :py:func:`cartesian_to_geographic_aeqd` centered on the radar.  The
+    gates are processed in blocks of rays so only the six output arrays are
+    allocated at full size.
+
+    Parameters
+    ----------
+    ranges : array, 1D.
+        Distances to the center of the radar gates (bins) in meters.
+    azimuths : array, 1D.
+        Azimuth angles of the rays in degrees.
+    elevations : array, 1D.
+        Elevation angles of the rays in degrees.
+    lon_0, lat_0 : float
+        Longitude and latitude, in degrees, of the radar and the center of
+        the projection.
+    altitude : float, optional
+        Altitude of the radar in meters.
+    R : float, optional
+        Earth radius used in the projection in meters.
+    edges : bool, optional
+        True to calculate the coordinates of the gate edges, False for the
+        gate centers.
+    dtype : dtype, optional
+        Data type of the returned coordinates.  The coordinates are always
+        calculated in double precision.
+
+    Returns
+    -------
+    x, y, z : array, 2D
+        Cartesian coordinates in meters from the center of the radar.
+    lon, lat : array, 2D
+        Longitude and latitude of the gates in degrees.
+    alt : array, 2D
+        Altitude of the gates in meters.
+
+    """
+    ranges, azimuths, elevations, dtype = _antenna_vectors(
+        ranges, azimuths, elevations, edges, dtype)
+    nrays = len(azimuths)
+    ngates = len(ranges)
+    coords = [np.empty((nrays, ngates), dtype=dtype) for i in range(6)]
+    x, y, z, lon, lat, alt = coords
+    for rays in _ray_blocks(nrays, ngates):
+        x_block, y_block, z_block = _antenna_block_to_cartesian(
+            ranges, azimuths[rays], elevations[rays])
+        x[rays] = x_block
+        y[rays] = y_block
+        lon[rays], lat[rays] = _cartesian_block_to_geographic(
+            x_block, y_block, lon_0, lat_0, R)
+        z[rays] = z_block
+        z_block += altitude
+        alt[rays] = z_block
+    return x, y, z, lon, lat, alt
+
+
+# Maximum number of gates processed together by the blocked transforms, this
+# bounds the size of the double precision temporaries.
+_BLOCK_GATES = 2 ** 18
+
+
+def _antenna_vectors(ranges, azimuths, elevations, edges, dtype):
+    """
+    Prepare antenna coordinate vectors for the blocked transforms.
+
+    Returns the ranges, azimuths and elevations as double precision vectors,
+    with the azimuths and elevations broadcast to the number of rays, and
+    the data type of the output.
+    """
+    ranges = np.atleast_1d(np.asarray(ranges))
+    azimuths = np.atleast_1d(np.asarray(azimuths))
+    elevations = np.atleast_1d(np.asarray(elevations))
+    if dtype is None:
+        dtype = np.result_type(
+            ranges.dtype, azimuths.dtype, elevations.dtype, np.float32)
     if edges:
         if len(ranges) != 1:
             ranges = _interpolate_range_edges(ranges)
@@ -141,9 +247,47 @@ def antenna_vectors_to_cartesian(ranges, azimuths, elevations, edges=False):
             elevations = _interpolate_elevation_edges(elevations)
         if len(azimuths) != 1:
             azimuths = _interpolate_azimuth_edges(azimuths)
-    rg, azg = np.meshgrid(ranges, azimuths)
-    rg, eleg = np.meshgrid(ranges, elevations)
-    return antenna_to_cartesian(rg / 1000., azg, eleg)
+    azimuths, elevations = np.broadcast_arrays(
+        azimuths.astype(np.float64), elevations.astype(np.float64))
+    return ranges.astype(np.float64), azimuths, elevations, dtype
+
+
+def _ray_blocks(nrays, ngates):
+    """ Return slices selecting blocks of rays for the blocked transforms. """
+    rays_per_block = max(_BLOCK_GATES // max(ngates, 1), 1)
+    return [slice(start, start + rays_per_block)
+            for start in range(0, nrays, rays_per_block)]
+
+
+def _antenna_block_to_cartesian(ranges, azimuths, elevations):
+    """
+    Calculate the double precision Cartesian coordinates of a block of rays.
+
+    See :py:func:`antenna_to_cartesian`, ranges are in meters.  Temporaries
+    are updated in-place so that at most two block sized arrays are
+    allocated in addition to the returned coordinates.
+    """
+    theta_e = np.deg2rad(elevations)[:, np.newaxis]
+    theta_a = np.deg2rad(azimuths)[:, np.newaxis]
+    R = 6371.0 * 1000.0 * 4.0 / 3.0     # effective radius of earth in meters.
+
+    # R + z = sqrt(r^2 + R^2 + 2 r R sin(theta_e))
+    r_plus_z = (2.0 * R) * np.sin(theta_e) * ranges
+    r_plus_z += ranges * ranges + R * R
+    np.sqrt(r_plus_z, out=r_plus_z)
+
+    # arc length, s = R * arcsin(r cos(theta_e) / (R + z))
+    s = np.cos(theta_e) * ranges
+    s /= r_plus_z
+    np.arcsin(s, out=s)
+    s *= R
+
+    z = r_plus_z
+    z -= R
+    x = np.sin(theta_a) * s
+    y = s
+    y *= np.cos(theta_a)
+    return x, y, z
 
 
 def _interpolate_range_edges(ranges):
@@ -575,7 +719,8 @@ def cartesian_vectors_to_geographic(x, y, projparams, edges=False):
     return cartesian_to_geographic(x, y, projparams)
 
 
-def cartesian_to_geographic_aeqd(x, y, lon_0, lat_0, R=6370997.):
+def cartesian_to_geographic_aeqd(x, y, lon_0, lat_0, R=6370997.,
+                                 dtype=None):
     """
     Azimuthal equidistant Cartesian to geographic coordinate transform.
 
@@ -611,6 +756,10 @@ def cartesian_to_geographic_aeqd(x, y, lon_0, lat_0, R=6370997.):
     R : float, optional
         Earth radius in the same units as x and y.  The default value is in
         units of meters.
+    dtype : dtype or None, optional
+        Data type of the returned coordinates.  None uses the floating point
+        type of x and y.  The coordinates are always calculated in double
+        precision, in blocks which limit the memory used by temporaries.
 
     Returns
     -------
@@ -625,27 +774,64 @@ def cartesian_to_geographic_aeqd(x, y, lon_0, lat_0, R=6370997.):
     """
     x = np.atleast_1d(np.asarray(x))
     y = np.atleast_1d(np.asarray(y))
+    if dtype is None:
+        dtype = np.result_type(x.dtype, y.dtype, np.float32)
+    x, y = np.broadcast_arrays(x, y)
+
+    # transform the coordinates in blocks to limit the size of temporaries
+    lon_deg = np.empty(x.shape, dtype=dtype)
+    lat_deg = np.empty(x.shape, dtype=dtype)
+    x_flat = x.reshape(-1)
+    y_flat = y.reshape(-1)
+    lon_flat = lon_deg.reshape(-1)
+    lat_flat = lat_deg.reshape(-1)
+    for start in range(0, x.size, _BLOCK_GATES):
+        block = slice(start, start + _BLOCK_GATES)
+        lon_flat[block], lat_flat[block] = _cartesian_block_to_geographic(
+            x_flat[block], y_flat[block], lon_0, lat_0, R)
+    return lon_deg, lat_deg
+
+
+def _cartesian_block_to_geographic(x, y, lon_0, lat_0, R):
+    """
+    Calculate the double precision geographic coordinates of a block of
+    Cartesian coordinates.
+
+    See :py:func:`cartesian_to_geographic_aeqd`.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
 
     lat_0_rad = np.deg2rad(lat_0)
     lon_0_rad = np.deg2rad(lon_0)
 
     rho = np.sqrt(x*x + y*y)
     c = rho / R
+    sin_c = np.sin(c)
+    cos_c = np.cos(c)
 
     with warnings.catch_warnings():
         # division by zero may occur here but is properly addressed below so
         # the warnings can be ignored
         warnings.simplefilter("ignore", RuntimeWarning)
-        lat_rad = np.arcsin(np.cos(c) * np.sin(lat_0_rad) +
-                            y * np.sin(c) * np.cos(lat_0_rad) / rho)
-    lat_deg = np.rad2deg(lat_rad)
+        lat_deg = y * sin_c
+        lat_deg *= np.cos(lat_0_rad)
+        lat_deg /= rho
+        lat_deg += cos_c * np.sin(lat_0_rad)
+        np.arcsin(lat_deg, out=lat_deg)
+    np.rad2deg(lat_deg, out=lat_deg)
     # fix cases where the distance from the center of the projection is zero
     lat_deg[rho == 0] = lat_0
 
-    x1 = x * np.sin(c)
-    x2 = rho*np.cos(lat_0_rad)*np.cos(c) - y*np.sin(lat_0_rad)*np.sin(c)
-    lon_rad = lon_0_rad + np.arctan2(x1, x2)
-    lon_deg = np.rad2deg(lon_rad)
+    x1 = x * sin_c
+    x2 = rho
+    x2 *= np.cos(lat_0_rad) * cos_c
+    sin_c *= y
+    sin_c *= np.sin(lat_0_rad)
+    x2 -= sin_c
+    lon_deg = np.arctan2(x1, x2, out=x1)
+    lon_deg += lon_0_rad
+    np.rad2deg(lon_deg, out=lon_deg)
     # Longitudes should be from -180 to 180 degrees
     lon_deg[lon_deg > 180] -= 360.
     lon_deg[lon_deg < -180] += 360.
@@ -22,8 +22,10 @@ from scipy.integrate import cumtrapz
 
 from ..config import get_metadata, get_field_name, get_fillvalue
 from . import phase_proc
+from ..profiling import profiled
 
 
+@profiled
 def calculate_attenuation(radar, z_offset, debug=False, doc=15, fzl=4000.0,
                           rhv_min=0.8, ncp_min=0.5, a_coef=0.06, beta=0.8,
                           refl_field=None, ncp_field=None, rhv_field=None,
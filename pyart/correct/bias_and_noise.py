@@ -15,8 +15,10 @@ Corrects polarimetric variables for noise
 import numpy as np
 
 from ..config import get_metadata, get_field_name, get_fillvalue
+from ..profiling import profiled
 
 
+@profiled
 def correct_noise_rhohv(radar, urhohv_field=None, snr_field=None,
                         zdr_field=None, nh_field=None, nv_field=None,
                         rhohv_field=None):
@@ -100,6 +102,7 @@ def correct_noise_rhohv(radar, urhohv_field=None, snr_field=None,
     return rhohv
 
 
+@profiled
 def correct_bias(radar, bias=0., field_name=None):
     """
     Corrects a radar data bias. If field name is none the correction is
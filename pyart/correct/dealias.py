@@ -23,8 +23,10 @@ except ImportError:
     _FOURDD_AVAILABLE = False
 from ._common_dealias import _parse_gatefilter, _set_limits
 from ..exceptions import MissingOptionalDependency
+from ..profiling import profiled
 
 
+@profiled
 def dealias_fourdd(
         radar, last_radar=None, sonde_profile=None, gatefilter=False,
         filt=1, rsl_badval=131072.0, keep_original=False, set_limits=True,
@@ -26,6 +26,7 @@ from ..filters.gatefilter import GateFilter
 from scipy.ndimage import label
 from scipy.signal import convolve2d
 from ..config import get_fillvalue
+from ..profiling import profiled
 
 BAD = get_fillvalue() # Get default fill value.
 DELTA = 5.0  # deg, allowable gap between PPI edges to be considered full 360
@@ -33,6 +34,7 @@ DELTA = 5.0  # deg, allowable gap between PPI edges to be considered full 360
 # Testing
 
 
+@profiled
 def find_objects(radar, field, threshold, sweeps=None, smooth=None,
                  gatefilter=None, delta=DELTA):
     """
@@ -98,6 +100,7 @@ def find_objects(radar, field, threshold, sweeps=None, smooth=None,
     return _generate_dict(label_storage)
 
 
+@profiled
 def despeckle_field(radar, field, label_dict=None, threshold=-100,
                     size=10, gatefilter=None, delta=DELTA):
     """
@@ -27,6 +27,7 @@ Adapted by Scott Collis and Scott Giangrande, refactored by Jonathan Helmus
     LP_solver_cvxopt
     LP_solver_pyglpk
     solve_cylp
+    _solve_cylp_block
     LP_solver_cylp_mp
     LP_solver_cylp
     phase_proc_lp
@@ -43,6 +44,8 @@ from numpy import ma
 import scipy.ndimage
 
 from ..config import get_fillvalue, get_field_name, get_metadata
+from ..util.parallel import map_ray_blocks
+from ..profiling import profiled
 
 
 def det_sys_phase(radar, ncp_lev=0.4, rhohv_lev=0.6,
@@ -352,6 +355,7 @@ def noise(line, wl=11):
     return noise
 
 
+@profiled
 def get_phidp_unf(radar, ncp_lev=0.4, rhohv_lev=0.6, debug=False, ncpts=20,
                   doc=-10, overide_sys_phase=False, sys_phase=-135,
                   nowrap=None, refl_field=None, ncp_field=None,
@@ -593,6 +597,7 @@ def construct_B_vectors(phidp_mod, z_mod, filt, coef=0.914, dweight=60000.0):
     return B_vectors
 
 
+@profiled
 def LP_solver_cvxopt(A_Matrix, B_vectors, weights, solver='glpk'):
     """
     Solve the Linear Programming problem given in Giangrande et al, 2012 using
@@ -650,6 +655,7 @@ def LP_solver_cvxopt(A_Matrix, B_vectors, weights, solver='glpk'):
     return mysoln
 
 
+@profiled
 def LP_solver_pyglpk(A_Matrix, B_vectors, weights, it_lim=7000, presolve=True,
                      really_verbose=False):
     """
@@ -775,6 +781,23 @@ def solve_cylp(model, B_vectors, weights, ray, chunksize):
     return soln
 
 
+def _solve_cylp_block(B_vectors, weights, A_Matrix):
+    """ Solve the LP problem for a block of rays using solve_cylp. """
+    from cylp.py.modeling.CyLPModel import CyLPModel, CyLPArray
+
+    # Create CyLPModel and initialize it
+    model = CyLPModel()
+    G = np.matrix(A_Matrix)
+    h = CyLPArray(np.empty(B_vectors.shape[1]))
+    x = model.addVariable('x', G.shape[1])
+    model.addConstraint(G * x >= h)
+    c = CyLPArray(np.empty(weights.shape[1]))
+    model.objective = c * x
+
+    return solve_cylp(model, B_vectors, weights, 0, B_vectors.shape[0])
+
+
+@profiled
 def LP_solver_cylp_mp(A_Matrix, B_vectors, weights, really_verbose=False,
                       proc=1):
     """
@@ -792,7 +815,10 @@ def LP_solver_cylp_mp(A_Matrix, B_vectors, weights, really_verbose=False,
     really_verbose : bool
         True to print CLP messaging. False to suppress.
     proc : int
-        Number of worker processes.
+        Number of worker processes.  The rays are split into proc chunks
+        whose sizes differ by at most one ray which are solved by the
+        persistent pool returned by
+        :py:func:`pyart.util.parallel.get_worker_pool`.
 
     Returns
     -------
@@ -807,69 +833,14 @@ def LP_solver_cylp_mp(A_Matrix, B_vectors, weights, really_verbose=False,
                      process.
 
     """
-    from cylp.cy.CyClpSimplex import CyClpSimplex
-    from cylp.py.modeling.CyLPModel import CyLPModel, CyLPArray
-    import multiprocessing as mp
-
-    n_gates = weights.shape[1] // 2
-    n_rays = B_vectors.shape[0]
-    soln = np.zeros([n_rays, n_gates])
-
-    # Create CyLPModel and initialize it
-    model = CyLPModel()
-    G = np.matrix(A_Matrix)
-    h = CyLPArray(np.empty(B_vectors.shape[1]))
-    x = model.addVariable('x', G.shape[1])
-    model.addConstraint(G * x >= h)
-    c = CyLPArray(np.empty(weights.shape[1]))
-    #c = CyLPArray(np.squeeze(weights[0]))
-    model.objective = c * x
-
-    chunksize = int(n_rays/proc)
-    # check if equal sized chunks can be distributed to worker processes
-    if n_rays % chunksize != 0:
-        print("Problem of %d rays cannot be split to %d worker processes!\n\r"
-              "Fallback to 1 process!" % (n_rays, proc))
-        chunksize = n_rays  # fall back to one process
-        proc = 1
-
-    print("Calculating with %d processes, %d rays per chunk" %
-          (proc, chunksize))
-
-    def worker(model, B_vectors, weights, ray, chunksize, out_q):
-        """
-        The worker function, invoked in a process.
-        The results are placed in a dictionary that's pushed to a queue.
-        """
-        outdict = {}
-        iray = int(ray/chunksize)
-        outdict[iray] = solve_cylp(model, B_vectors, weights, ray, chunksize)
-        out_q.put(outdict)
-
-    # Queue for LP solutions
-    out_q = mp.Queue()
-    procs = []
-
-    # fire off worker processes
-    for raynum in range(0, n_rays, chunksize):
-        p = mp.Process(target=worker, args=(
-            model, B_vectors, weights, raynum, chunksize, out_q))
-        procs.append(p)
-        p.start()
-
-    # collecting results
-    resultdict = {}
-    for raynum in range(0, n_rays, chunksize):
-        resultdict.update(out_q.get())
-
-    # Wait for all worker processes to finish
-    for p in procs:
-        p.join()
-
-    # copy results in output array
-    for raynum in range(0, int(n_rays / chunksize)):
-        soln[raynum * chunksize:raynum * chunksize + chunksize, :] = (
-            resultdict[raynum])
+    # rays are split into balanced chunks, one per worker process, and
+    # passed to the persistent worker pool through shared memory.  Each
+    # worker creates the CyLP model from the shared A matrix.
+    print("Calculating with %d processes" % (proc))
+    blocks = map_ray_blocks(
+        _solve_cylp_block, [np.asarray(B_vectors), np.asarray(weights)],
+        proc, common_arrays=[np.asarray(A_Matrix)])
+    soln = np.concatenate(blocks)
 
     # apply smoothing filter to output array
     soln = smooth_and_trim_scan(soln, window_len=5, window='sg_smooth')
@@ -877,6 +848,7 @@ def LP_solver_cylp_mp(A_Matrix, B_vectors, weights, really_verbose=False,
     return soln
 
 
+@profiled
 def LP_solver_cylp(A_Matrix, B_vectors, weights, really_verbose=False):
     """
     Solve the Linear Programming problem given in Giangrande et al, 2012 using
@@ -943,6 +915,7 @@ def LP_solver_cylp(A_Matrix, B_vectors, weights, really_verbose=False):
     return soln
 
 
+@profiled
 def phase_proc_lp(radar, offset, debug=False, self_const=60000.0,
                   low_z=10.0, high_z=53.0, min_phidp=0.01, min_ncp=0.5,
                   min_rhv=0.8, fzl=4000.0, sys_phase=0.0,
@@ -8,6 +8,9 @@ Region based dealiasing using a dynamic network reduction for region joining.
     :toctree: generated/
 
     dealias_region_based
+    _dealias_sweep
+    _set_shared_sweep_data
+    _dealias_sweep_task
     _find_regions
     _find_sweep_interval_splits
     _combine_regions
@@ -19,10 +22,14 @@ Region based dealiasing using a dynamic network reduction for region joining.
 
     _RegionTracker
     _EdgeTracker
+    _UnionFindRegionTracker
+    _HeapEdgeTracker
 
 """
 
+import heapq
 import warnings
+from functools import partial
 
 import numpy as np
 import scipy.ndimage as ndimage
@@ -31,6 +38,8 @@ from ..config import get_metadata, get_fillvalue
 from ._common_dealias import _parse_fields, _parse_gatefilter, _set_limits
 from ._common_dealias import _parse_rays_wrap_around, _parse_nyquist_vel
 from ._fast_edge_finder import _fast_edge_finder
+from ..profiling import profiled
+from ..util.parallel import balanced_chunks, map_ray_blocks
 
 # Possible future improvements to the region based dealiasing algorithm:
 #
@@ -45,16 +54,18 @@ from ._fast_edge_finder import _fast_edge_finder
 #   excluded by the filter are unfolded using a more elemenary approach.  In
 #   this manner the filter could define only "good" gates which establish the
 #   folding pattern which is then applied to all gates.
-# * Improve perfornace by implementing a priority queue in the _EdgeTracker
-#   object. See comments in the class for details.
+# * Make the 'heap' engine, which uses a priority queue and union-find
+#   structure for the network reduction, the default after more testing.
 
 
+@profiled
 def dealias_region_based(
         radar, ref_vel_field=None, interval_splits=3, interval_limits=None,
         skip_between_rays=100, skip_along_ray=100, centered=True,
         nyquist_vel=None, check_nyquist_uniform=True, gatefilter=False,
         rays_wrap_around=None, keep_original=False, set_limits=True,
-        vel_field=None, corr_vel_field=None, **kwargs):
+        vel_field=None, corr_vel_field=None, engine='array', n_workers=1,
+        executor=None, **kwargs):
     """
     Dealias Doppler velocities using a region based algorithm.
 
@@ -131,6 +142,29 @@ def dealias_region_based(
     corr_vel_field : str, optional
         Name to use for the dealiased Doppler velocity field metadata.  None
         will use the default field name from the Py-ART configuration file.
+    engine : 'array' or 'heap', optional
+        Method used to perform the dynamic network reduction.  'array', the
+        default, finds the edge with the largest weight by searching all
+        edges in the network at each step.  'heap' tracks the edges in a
+        priority queue and the regions in each node using a union-find
+        structure which is considerably faster when a large number of
+        regions are present.  Both methods produce identical results.
+    n_workers : int, optional
+        Number of worker processes used to dealias the sweeps in the volume
+        concurrently.  The persistent pool returned by
+        :py:func:`pyart.util.get_worker_pool` is used and the velocity and
+        filter arrays are passed to the workers in shared memory, the
+        sweeps are split into n_workers blocks of consecutive sweeps.  The
+        default, 1, dealiases the sweeps sequentially in the current
+        process.  Warnings issued by the workers are not reported.  This
+        parameter is ignored when executor is provided.
+    executor : Executor or None, optional
+        An object with a map method, for example a
+        concurrent.futures.ThreadPoolExecutor or ProcessPoolExecutor or a
+        multiprocessing.Pool, used to dealias the sweeps concurrently.  The
+        velocities and filter for each sweep are passed to the executor.
+        A persistent executor avoids the cost of creating worker processes
+        for each volume.  None, the default, uses n_workers.
 
     Returns
     -------
@@ -139,6 +173,9 @@ def dealias_region_based(
         array is stored under the 'data' key.
 
     """
+    if engine not in ['array', 'heap']:
+        raise ValueError("engine must be 'array' or 'heap'")
+
     # parse function parameters
     vel_field, corr_vel_field = _parse_fields(vel_field, corr_vel_field)
     gatefilter = _parse_gatefilter(gatefilter, radar, **kwargs)
@@ -160,62 +197,60 @@ def dealias_region_based(
     vdata = radar.fields[vel_field]['data'].view(np.ndarray)
     data = vdata.copy()     # dealiased velocities
 
-    # loop over sweeps
-    for nsweep, sweep_slice in enumerate(radar.iter_slice()):
-
-        # extract sweep data
-        sdata = vdata[sweep_slice].copy()   # is a copy needed here?
-        scorr = data[sweep_slice]
-        sfilter = gfilter[sweep_slice]
-
-        # find nyquist velocity and interval segmentation limits
-        nyquist_interval = nyquist_vel[nsweep] * 2.
-        if interval_limits is None:
-            nvel = nyquist_vel[nsweep]
-            valid_sdata = sdata[~sfilter]
-            s_interval_limits = _find_sweep_interval_splits(
-                nvel, interval_splits, valid_sdata, nsweep)
-        else:
-            s_interval_limits = interval_limits
-
-        # find regions in original data
-        labels, nfeatures = _find_regions(sdata, sfilter, s_interval_limits)
-        # skip sweep if all gates are masked or only a single region
-        if nfeatures < 2:
-            continue
-        bincount = np.bincount(labels.ravel())
-        num_masked_gates = bincount[0]
-        region_sizes = bincount[1:]
-
-        # find all edges between regions
-        indices, edge_count, velos = _edge_sum_and_count(
-            labels, num_masked_gates, sdata, rays_wrap_around,
-            skip_between_rays, skip_along_ray)
+    # parameters which are the same for all sweeps
+    sweep_kwargs = {
+        'interval_splits': interval_splits,
+        'interval_limits': interval_limits,
+        'rays_wrap_around': rays_wrap_around,
+        'skip_between_rays': skip_between_rays,
+        'skip_along_ray': skip_along_ray,
+        'centered': centered,
+        'engine': engine}
+    sweep_slices = list(radar.iter_slice())
+    tasks = []
+    for nsweep, sweep_slice in enumerate(sweep_slices):
+        task_kwargs = dict(sweep_kwargs)
+        task_kwargs['nyquist_vel'] = nyquist_vel[nsweep]
+        task_kwargs['nsweep'] = nsweep
+        tasks.append((sweep_slice, task_kwargs))
+
+    # find the number of folds at each gate, sweeps are dealiased
+    # independently and can be processed concurrently
+    if executor is not None:
+        sweep_tasks = [((vdata[sweep_slice], gfilter[sweep_slice]), kw)
+                       for sweep_slice, kw in tasks]
+        nwraps = list(executor.map(_dealias_sweep_task, sweep_tasks))
+    elif n_workers > 1:
+        # the sweep number and Nyquist velocity of each ray are passed to
+        # the workers with the velocities and filter.  The sweeps are split
+        # into n_workers blocks of consecutive sweeps.
+        sweep_nyquist_vel = np.asarray(nyquist_vel)
+        ray_nsweep = np.full((len(vdata), ), -1, dtype='int32')
+        ray_nyquist_vel = np.zeros(
+            (len(vdata), ), dtype=sweep_nyquist_vel.dtype)
+        for nsweep, sweep_slice in enumerate(sweep_slices):
+            ray_nsweep[sweep_slice] = nsweep
+            ray_nyquist_vel[sweep_slice] = sweep_nyquist_vel[nsweep]
+        chunks = [(sweep_slices[first].start, sweep_slices[last - 1].stop)
+                  for first, last in balanced_chunks(
+                      len(sweep_slices), n_workers)]
+        blocks = map_ray_blocks(
+            partial(_dealias_sweep_block, **sweep_kwargs),
+            [vdata, gfilter, ray_nyquist_vel, ray_nsweep], chunks=chunks)
+        nwraps = [nwrap for block in blocks for nwrap in block]
+    else:
+        sweep_tasks = [((vdata[sweep_slice], gfilter[sweep_slice]), kw)
+                       for sweep_slice, kw in tasks]
+        nwraps = [_dealias_sweep_task(task) for task in sweep_tasks]
 
-        # no unfolding required if no edges exist between regions
-        if len(edge_count) == 0:
+    for nsweep, (sweep_slice, nwrap) in enumerate(zip(sweep_slices, nwraps)):
+        # skip sweep if no unfolding was performed
+        if nwrap is None:
             continue
 
-        # find the number of folds in the regions
-        region_tracker = _RegionTracker(region_sizes)
-        edge_tracker = _EdgeTracker(indices, edge_count, velos,
-                                    nyquist_interval, nfeatures+1)
-        while True:
-            if _combine_regions(region_tracker, edge_tracker):
-                break
-
-        # center sweep if requested, determine a global sweep unfold number
-        # so that the average number of gate folds is zero.
-        if centered:
-            gates_dealiased = region_sizes.sum()
-            total_folds = np.sum(
-                region_sizes * region_tracker.unwrap_number[1:])
-            sweep_offset = int(round(float(total_folds) / gates_dealiased))
-            if sweep_offset != 0:
-                region_tracker.unwrap_number -= sweep_offset
-
         # dealias the data using the fold numbers
-        nwrap = np.take(region_tracker.unwrap_number, labels)
+        nyquist_interval = nyquist_vel[nsweep] * 2.
+        scorr = data[sweep_slice]
         scorr += nwrap * nyquist_interval
 
         # anchor unfolded velocities against reference velocity
@@ -249,6 +284,99 @@ def dealias_region_based(
     return corr_vel
 
 
+def _dealias_sweep(sdata, sfilter, nyquist_vel, nsweep, interval_splits,
+                   interval_limits, rays_wrap_around, skip_between_rays,
+                   skip_along_ray, centered, engine):
+    """
+    Dealias a single sweep.
+
+    Returns the number of Nyquist intervals to add to each gate in the sweep
+    or None if no unfolding is needed.
+    """
+    if engine == 'array':
+        region_tracker_class = _RegionTracker
+        edge_tracker_class = _EdgeTracker
+    else:
+        region_tracker_class = _UnionFindRegionTracker
+        edge_tracker_class = _HeapEdgeTracker
+
+    # find nyquist velocity and interval segmentation limits
+    nyquist_interval = nyquist_vel * 2.
+    if interval_limits is None:
+        valid_sdata = sdata[~sfilter]
+        s_interval_limits = _find_sweep_interval_splits(
+            nyquist_vel, interval_splits, valid_sdata, nsweep)
+    else:
+        s_interval_limits = interval_limits
+
+    # find regions in original data
+    labels, nfeatures = _find_regions(sdata, sfilter, s_interval_limits)
+    # skip sweep if all gates are masked or only a single region
+    if nfeatures < 2:
+        return None
+    bincount = np.bincount(labels.ravel())
+    num_masked_gates = bincount[0]
+    region_sizes = bincount[1:]
+
+    # find all edges between regions
+    indices, edge_count, velos = _edge_sum_and_count(
+        labels, num_masked_gates, sdata, rays_wrap_around,
+        skip_between_rays, skip_along_ray)
+
+    # no unfolding required if no edges exist between regions
+    if len(edge_count) == 0:
+        return None
+
+    # find the number of folds in the regions
+    region_tracker = region_tracker_class(region_sizes)
+    edge_tracker = edge_tracker_class(indices, edge_count, velos,
+                                      nyquist_interval, nfeatures+1)
+    while True:
+        if _combine_regions(region_tracker, edge_tracker):
+            break
+    unwrap_number = region_tracker.unwrap_number
+
+    # center sweep if requested, determine a global sweep unfold number
+    # so that the average number of gate folds is zero.
+    if centered:
+        gates_dealiased = region_sizes.sum()
+        total_folds = np.sum(region_sizes * unwrap_number[1:])
+        sweep_offset = int(round(float(total_folds) / gates_dealiased))
+        if sweep_offset != 0:
+            unwrap_number -= sweep_offset
+
+    # number of folds at each gate
+    return np.take(unwrap_number, labels)
+
+
+def _dealias_sweep_task(task):
+    """
+    Dealias a sweep described by a task, a 2-tuple of the sweep velocities
+    and filter and a dictionary of keyword arguments to
+    :py:func:`_dealias_sweep`.
+    """
+    (sdata, sfilter), kwargs = task
+    return _dealias_sweep(sdata.copy(), sfilter, **kwargs)
+
+
+def _dealias_sweep_block(sdata, sfilter, snyquist_vel, snsweep, **kwargs):
+    """
+    Dealias the sweeps in a block of rays passed to a worker process by
+    :py:func:`pyart.util.parallel.map_ray_blocks`.  The Nyquist velocity and
+    sweep number are taken from the per-ray arrays of the block, rays with
+    a negative sweep number are not part of a sweep.  Returns a list of the
+    results of :py:func:`_dealias_sweep` for each sweep in the block.
+    """
+    nwraps = []
+    for nsweep in np.unique(snsweep[snsweep >= 0]):
+        in_sweep = snsweep == nsweep
+        nwraps.append(_dealias_sweep(
+            sdata[in_sweep], sfilter[in_sweep],
+            nyquist_vel=snyquist_vel[in_sweep][0], nsweep=int(nsweep),
+            **kwargs))
+    return nwraps
+
+
 def _find_sweep_interval_splits(nyquist, interval_splits, velocities, nsweep):
     """ Return the interval limits for a given sweep. """
     # The Nyquist interval is split into interval_splits  equal sized areas.
@@ -616,3 +744,236 @@ class _EdgeTracker(object):
         if weight < 0:
             return True, None
         return False, (node1, node2, weight, diff, edge_num)
+
+
+class _UnionFindRegionTracker(object):
+    """
+    Tracks the location of radar volume regions contained in each node
+    as the network is reduced using a union-find (disjoint set) structure.
+
+    Each node is the root of a tree of regions.  The number of unwrappings
+    to apply to a region is the sum of the offsets along the path from the
+    region to the root of the tree, allowing nodes to be merged and
+    unwrapped in constant time.
+    """
+
+    def __init__(self, region_sizes):
+        """ initalize. """
+        nregions = len(region_sizes) + 1
+        # number of gates in each node
+        self.node_size = [0] + [int(size) for size in region_sizes]
+        # parent of each region and unwrapping relative to the parent
+        self.parent = list(range(nregions))
+        self.offset = [0] * nregions
+
+    def merge_nodes(self, node_a, node_b):
+        """ Merge node b into node a. """
+        # node_b becomes a child of node_a, unwrappings of node_a do not
+        # apply to the regions in node_b
+        self.parent[node_b] = node_a
+        self.offset[node_b] -= self.offset[node_a]
+
+        # update node sizes
+        self.node_size[node_a] += self.node_size[node_b]
+        self.node_size[node_b] = 0
+        return
+
+    def unwrap_node(self, node, nwrap):
+        """ Unwrap all gates contained a node. """
+        self.offset[node] += nwrap
+        return
+
+    def get_node_size(self, node):
+        """ Return the number of gates in a node. """
+        return self.node_size[node]
+
+    @property
+    def unwrap_number(self):
+        """ Number of unwrappings to apply to dealias each region. """
+        parent = np.array(self.parent, dtype=np.intp)
+        offset = np.array(self.offset, dtype='int32')
+        # sum the offsets along the path to the root by pointer jumping,
+        # total is the sum of the offsets from a region to its ancestor,
+        # excluding the ancestor.
+        total = offset.copy()
+        ancestor = parent.copy()
+        while True:
+            jump, = np.nonzero(parent[ancestor] != ancestor)
+            if len(jump) == 0:
+                break
+            next_total = total[jump] + total[ancestor[jump]]
+            next_ancestor = ancestor[ancestor[jump]]
+            total[jump] = next_total
+            ancestor[jump] = next_ancestor
+        not_root = ancestor != np.arange(len(parent))
+        total[not_root] += offset[ancestor[not_root]]
+        return total
+
+
+class _HeapEdgeTracker(object):
+    """
+    A class for tracking edges in a dynamic network using a priority queue.
+
+    Produces results identical to :py:class:`_EdgeTracker`.  The edge with
+    the largest weight is found using a heap, entries in the heap are
+    invalidated lazily by ignoring entries whose weight does not match the
+    current weight of the edge.  The edges connected to each node are
+    stored in dictionaries keyed by the neighboring node.
+
+    :py:class:`_EdgeTracker` reverses the direction of all edges connected
+    to a base node when the base node changes.  Here the time when each
+    node last became the base node and when each edge last had its direction
+    set are recorded and the direction of an edge is only updated when it
+    is popped.
+    """
+
+    def __init__(self, indices, edge_count, velocities, nyquist_interval,
+                 nnodes):
+        """ initialize """
+
+        nedges = int(len(indices[0]) / 2)
+
+        # node number and different in sum for each edge
+        self.node_alpha = np.zeros(nedges, dtype=np.int32)
+        self.node_beta = np.zeros(nedges, dtype=np.int32)
+        self.sum_diff = np.zeros(nedges, dtype=np.float32)
+
+        # number of connections between the regions
+        self.weight = np.zeros(nedges, dtype=np.int32)
+
+        # edges connected to each node keyed by the neighboring node
+        self.edges_in_node = [{} for i in range(nnodes)]
+
+        # fill out data from the provides indicies, edge counts and velocities
+        edge = 0
+        idx1, idx2 = indices
+        vel1, vel2 = velocities
+        for i, j, count, vel, nvel in zip(idx1, idx2, edge_count, vel1, vel2):
+            if i < j:
+                continue
+            self.node_alpha[edge] = i
+            self.node_beta[edge] = j
+            self.sum_diff[edge] = ((vel - nvel) / nyquist_interval)
+            self.weight[edge] = count
+            self.edges_in_node[i][j] = edge
+            self.edges_in_node[j][i] = edge
+            edge += 1
+
+        # times when nodes became the base node and when edge directions
+        # were set, the time is the number of merges performed.
+        self._time = 0
+        self._base_time = [-1] * nnodes
+        self._edge_time = [-1] * nedges
+        self._last_base_node = -1
+
+        # heap of (-weight, edge), equal weights are ordered by edge number
+        # which matches the order used by _EdgeTracker
+        self.priority_queue = [(-int(weight), edge)
+                               for edge, weight in enumerate(self.weight)]
+        heapq.heapify(self.priority_queue)
+
+    def merge_nodes(self, base_node, merge_node, foo_edge):
+        """ Merge nodes. """
+        self._time += 1
+        base_node = int(base_node)
+        merge_node = int(merge_node)
+        if self._last_base_node != base_node:
+            self._base_time[base_node] = self._time
+        base_edges = self.edges_in_node[base_node]
+        merge_edges = self.edges_in_node[merge_node]
+
+        # remove edge between base and merge nodes
+        self.weight[foo_edge] = -999
+        del base_edges[merge_node]
+        del merge_edges[base_node]
+
+        for neighbor, edge_num in merge_edges.items():
+
+            # reverse edge so that node alpha is the merge_node
+            if self.node_beta[edge_num] == merge_node:
+                self._reverse_edge_direction(edge_num)
+
+            # update all the edges to point to the base node
+            self.node_alpha[edge_num] = base_node
+            self._edge_time[edge_num] = self._time
+
+            # if base_node also has an edge with the neighbor combine them
+            neighbor_edges = self.edges_in_node[neighbor]
+            del neighbor_edges[merge_node]
+            if neighbor in base_edges:
+                self._combine_edges(base_edges[neighbor], edge_num, base_node)
+            else:
+                base_edges[neighbor] = edge_num
+                neighbor_edges[base_node] = edge_num
+
+        self.edges_in_node[merge_node] = {}
+        self._last_base_node = base_node
+        return
+
+    def _combine_edges(self, base_edge, merge_edge, base_node):
+        """ Combine edges into a single edge.  """
+        # Merging nodes MUST be set to alpha prior to calling this function
+        if self.node_beta[base_edge] == base_node:
+            self._reverse_edge_direction(base_edge)
+        self._edge_time[base_edge] = self._time
+
+        # combine edge weights
+        self.weight[base_edge] += self.weight[merge_edge]
+        self.weight[merge_edge] = -999.
+
+        # combine sums
+        self.sum_diff[base_edge] += self.sum_diff[merge_edge]
+
+        # add the updated edge to the priority queue, the previous entry
+        # will be ignored when popped
+        heapq.heappush(self.priority_queue,
+                       (-int(self.weight[base_edge]), base_edge))
+
+    def _reverse_edge_direction(self, edge):
+        """ Reverse an edges direction, change alpha and beta. """
+        # swap nodes
+        old_alpha = int(self.node_alpha[edge])
+        old_beta = int(self.node_beta[edge])
+        self.node_alpha[edge] = old_beta
+        self.node_beta[edge] = old_alpha
+        # swap sums
+        self.sum_diff[edge] = -1. * self.sum_diff[edge]
+        return
+
+    def _update_edge_direction(self, edge):
+        """ Set the direction of an edge to match that of _EdgeTracker. """
+        # the most recent of the base node times of the two nodes and the
+        # edge time determines the direction of the edge.
+        beta_time = self._base_time[self.node_beta[edge]]
+        if (beta_time > self._edge_time[edge] and
+                beta_time > self._base_time[self.node_alpha[edge]]):
+            self._reverse_edge_direction(edge)
+            self._edge_time[edge] = beta_time
+        return
+
+    def unwrap_node(self, node, nwrap):
+        """ Unwrap a node. """
+        if nwrap == 0:
+            return
+        # add weight * nwrap to each edge in node
+        for edge in self.edges_in_node[node].values():
+            weight = self.weight[edge]
+            if node == self.node_alpha[edge]:
+                self.sum_diff[edge] += weight * nwrap
+            else:
+                self.sum_diff[edge] += -weight * nwrap
+        return
+
+    def pop_edge(self):
+        """ Pop edge with largest weight.  Return node numbers and diff """
+        while len(self.priority_queue):
+            neg_weight, edge_num = heapq.heappop(self.priority_queue)
+            weight = self.weight[edge_num]
+            if weight < 0 or -neg_weight != weight:
+                continue    # removed edge or stale entry
+            self._update_edge_direction(edge_num)
+            node1 = self.node_alpha[edge_num]
+            node2 = self.node_beta[edge_num]
+            diff = self.sum_diff[edge_num] / (float(weight))
+            return False, (node1, node2, weight, diff, edge_num)
+        return True, None
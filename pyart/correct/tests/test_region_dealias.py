@@ -7,10 +7,12 @@
 from __future__ import print_function
 
 import warnings
+from multiprocessing.pool import ThreadPool
 
 import pyart
 import numpy as np
 from numpy.testing import assert_allclose, assert_almost_equal
+from numpy.testing import assert_raises
 
 REF_DATA = [0.5, 1.5, 2.5, 3.5, 4.5, 5.5, 6.5, 7.5, 8.5, 9.5, 10.5, 11.5,
             12.5, 13.5, 12.5, 11.5, 10.5, 9.5, 8.5, 7.5, 6.5, 5.5, 4.5, 3.5,
@@ -176,6 +178,83 @@ def test_fillvalue(**kwargs):
     assert dealias_vel['data'].fill_value == 8888.0
 
 
+def test_dealias_region_based_heap_engine():
+    radar, dealias_vel = perform_dealias(engine='heap')
+    assert_allclose(dealias_vel['data'][13, :27], REF_DATA)
+    assert np.ma.is_masked(dealias_vel['data'][13]) is False
+
+
+def test_dealias_region_based_engines_match():
+    # noisy velocities create many regions with edges that are combined
+    radar = pyart.testing.make_velocity_aliased_radar()
+    vdata = radar.fields['velocity']['data']
+    random_state = np.random.RandomState(0)
+    noisy = vdata + random_state.normal(0, 4, vdata.shape)
+    noisy = (noisy + 10) % 20 - 10
+    mask = random_state.uniform(size=vdata.shape) < 0.05
+    radar.fields['velocity']['data'] = np.ma.array(noisy, mask=mask)
+
+    for kwargs in [{}, {'centered': False}, {'interval_splits': 6}]:
+        array_vel = pyart.correct.dealias_region_based(
+            radar, engine='array', **kwargs)
+        heap_vel = pyart.correct.dealias_region_based(
+            radar, engine='heap', **kwargs)
+        assert np.array_equal(array_vel['data'].mask, heap_vel['data'].mask)
+        assert np.array_equal(array_vel['data'].data, heap_vel['data'].data)
+
+
+def test_dealias_region_based_invalid_engine():
+    radar = pyart.testing.make_velocity_aliased_radar()
+    assert_raises(ValueError, pyart.correct.dealias_region_based, radar,
+                  engine='foo')
+
+
+def test_union_find_region_tracker():
+    region_tracker = pyart.correct.region_dealias._RegionTracker(
+        np.array([5, 3, 2, 4]))
+    uf_tracker = pyart.correct.region_dealias._UnionFindRegionTracker(
+        np.array([5, 3, 2, 4]))
+    for tracker in [region_tracker, uf_tracker]:
+        tracker.unwrap_node(2, 1)
+        tracker.merge_nodes(1, 2)
+        tracker.unwrap_node(1, -2)
+        tracker.unwrap_node(4, 3)
+        tracker.merge_nodes(4, 3)
+        tracker.merge_nodes(1, 4)
+        tracker.unwrap_node(1, 1)
+        assert tracker.get_node_size(1) == 14
+    assert_allclose(uf_tracker.unwrap_number, region_tracker.unwrap_number)
+    assert_allclose(uf_tracker.unwrap_number, [0, -1, 0, 1, 4])
+
+
+def test_dealias_region_based_parallel():
+    # split the volume into multiple sweeps
+    radar = pyart.testing.make_velocity_aliased_radar()
+    radar.sweep_start_ray_index['data'] = np.array([0, 90, 180, 270])
+    radar.sweep_end_ray_index['data'] = np.array([89, 179, 269, 359])
+    radar.nsweeps = 4
+    radar.fixed_angle['data'] = np.zeros(4)
+    radar.sweep_number['data'] = np.arange(4)
+    ref_vel = radar.fields['velocity'].copy()
+    ref_vel['data'] = radar.fields['velocity']['data'] + 20.
+    radar.add_field('ref_velocity', ref_vel)
+    kwargs = {'rays_wrap_around': False, 'ref_vel_field': 'ref_velocity'}
+    expected = pyart.correct.dealias_region_based(radar, **kwargs)
+
+    # sweeps are grouped into blocks of consecutive sweeps
+    for n_workers in [2, 3]:
+        dealias_vel = pyart.correct.dealias_region_based(
+            radar, n_workers=n_workers, **kwargs)
+        assert np.array_equal(dealias_vel['data'], expected['data'])
+    pyart.util.close_worker_pool()
+
+    pool = ThreadPool(2)
+    dealias_vel = pyart.correct.dealias_region_based(
+        radar, executor=pool, engine='heap', **kwargs)
+    pool.close()
+    assert np.array_equal(dealias_vel['data'], expected['data'])
+
+
 def main():
 
     radar, dealias_vel = perform_dealias()
@@ -30,8 +30,10 @@ from ._common_dealias import _parse_rays_wrap_around, _parse_nyquist_vel
 from ._unwrap_1d import unwrap_1d
 from ._unwrap_2d import unwrap_2d
 from ._unwrap_3d import unwrap_3d
+from ..profiling import profiled
 
 
+@profiled
 def dealias_unwrap_phase(
         radar, unwrap_unit='sweep', nyquist_vel=None,
         check_nyquist_uniform=True, gatefilter=False,
@@ -14,12 +14,14 @@ Filtering radar data
     :toctree: generated/
 
     GateFilter
+    LazyGateFilter
     moment_based_gate_filter
     moment_and_texture_based_gate_filter
 
 """
 
 from .gatefilter import GateFilter, moment_based_gate_filter
+from .gatefilter import LazyGateFilter
 from .gatefilter import moment_and_texture_based_gate_filter
 from .gatefilter import calculate_velocity_texture
 
@@ -17,10 +17,17 @@ corrections routines in Py-ART.
     :template: dev_template.rst
 
     GateFilter
+    LazyGateFilter
+
+.. autosummary::
+    :toctree: generated/
+
+    _GateExpression
 
 """
 
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 from scipy import ndimage
@@ -28,8 +35,10 @@ from scipy import ndimage
 from ..config import get_field_name, get_metadata
 from ..util import texture_along_ray
 from ..util import angular_texture_2d
+from ..profiling import profiled
 
 
+@profiled
 def moment_based_gate_filter(
         radar, ncp_field=None, rhv_field=None, refl_field=None,
         min_ncp=0.5, min_rhv=None, min_refl=-20., max_refl=100.0):
@@ -117,6 +126,7 @@ def moment_based_gate_filter(
     return gatefilter
 
 
+@profiled
 def moment_and_texture_based_gate_filter(
         radar, zdr_field=None, rhv_field=None, phi_field=None, refl_field=None,
         textzdr_field=None, textrhv_field=None, textphi_field=None,
@@ -252,8 +262,9 @@ def moment_and_texture_based_gate_filter(
     return gatefilter
 
 
+@profiled
 def calculate_velocity_texture(radar, vel_field=None, wind_size=4, nyq=None,
-                               check_nyq_uniform=True):
+                               check_nyq_uniform=True, n_workers=None):
     """
     Derive the texture of the velocity field
 
@@ -267,13 +278,19 @@ def calculate_velocity_texture(radar, vel_field=None, wind_size=4, nyq=None,
     wind_size : int
         The size of the window to calculate texture from. The window is
         defined to be a square of size wind_size by wind_size.
-    nyq : float
+    nyq : float or array-like
         The nyquist velocity of the radar. A value of None will force Py-ART
-        to try and determine this automatically.
+        to try and determine this automatically. An array with one value per
+        sweep computes the texture of each sweep with the nyquist velocity
+        of that sweep.
     check_nyquist_uniform : bool, optional
         True to check if the Nyquist velocities are uniform for all rays
         within a sweep, False will skip this check. This parameter is ignored
         when the nyq parameter is not None.
+    n_workers : int or None, optional
+        Number of threads used to compute the texture of the sweeps
+        concurrently when the nyquist velocity of each sweep is used. None
+        computes the sweeps in the calling thread.
 
     Returns
     -------
@@ -298,12 +315,24 @@ def calculate_velocity_texture(radar, vel_field=None, wind_size=4, nyq=None,
         # Find nyquist velocity if not specified
         nyq = [radar.get_nyquist_vel(i, check_nyq_uniform) for i in
                range(radar.nsweeps)]
-        for i in range(0, radar.nsweeps):
-            start_ray, end_ray = radar.get_start_end(i)
-            inds = range(start_ray, end_ray)
-            vel_sweep = radar.fields[vel_field]['data'][inds]
+    if np.ndim(nyq) == 1:
+        vel = radar.fields[vel_field]['data']
+
+        def sweep_texture(i):
+            inds = radar.get_slice(i)
             vel_texture[inds] = angular_texture_2d(
-                vel_sweep, wind_size, nyq[i])
+                vel[inds], wind_size, nyq[i])
+
+        if n_workers is None:
+            for i in range(radar.nsweeps):
+                sweep_texture(i)
+        else:
+            pool = ThreadPool(n_workers)
+            try:
+                pool.map(sweep_texture, range(radar.nsweeps))
+            finally:
+                pool.terminate()
+                pool.join()
     else:
         vel_texture = angular_texture_2d(
             radar.fields[vel_field]['data'], wind_size, nyq)
@@ -755,3 +784,314 @@ class GateFilter(object):
             raise ValueError("Mask array must be the same size as a field.")
         marked = ~np.array(mask, dtype='bool')
         return self._merge(marked, op, exclude_masked)
+
+
+# Maximum number of gates evaluated together by LazyGateFilter, this bounds
+# the size of the temporaries used when evaluating the recorded operations.
+_BLOCK_GATES = 2 ** 18
+
+
+class _GateExpression(object):
+    """
+    A condition on the radar gates which is evaluated for blocks of rays.
+
+    Expressions are combined using the comparison, ``&``, ``|`` and ``~``
+    operators, giving the same (masked) results as the equivalent operations
+    on the field arrays.
+
+    Parameters
+    ----------
+    evaluate : callable
+        Function which returns the value of the expression for the rays
+        selected by a slice.
+
+    """
+
+    def __init__(self, evaluate):
+        """ initialize the object. """
+        self.evaluate = evaluate
+
+    def _binary(self, other, func):
+        """ Return an expression applying func to self and other. """
+        if isinstance(other, _GateExpression):
+            return _GateExpression(
+                lambda rays: func(self.evaluate(rays), other.evaluate(rays)))
+        return _GateExpression(lambda rays: func(self.evaluate(rays), other))
+
+    def __lt__(self, other):
+        return self._binary(other, lambda a, b: a < b)
+
+    def __le__(self, other):
+        return self._binary(other, lambda a, b: a <= b)
+
+    def __gt__(self, other):
+        return self._binary(other, lambda a, b: a > b)
+
+    def __ge__(self, other):
+        return self._binary(other, lambda a, b: a >= b)
+
+    def __eq__(self, other):
+        return self._binary(other, lambda a, b: a == b)
+
+    def __ne__(self, other):
+        return self._binary(other, lambda a, b: a != b)
+
+    def __and__(self, other):
+        return self._binary(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        return self._binary(other, lambda a, b: a | b)
+
+    def __invert__(self):
+        return _GateExpression(lambda rays: ~self.evaluate(rays))
+
+    __hash__ = None
+
+
+class LazyGateFilter(GateFilter):
+    """
+    A GateFilter which records operations and evaluates them when needed.
+
+    This class provides the same interface and results as
+    :py:class:`GateFilter`.  Rather than updating a boolean array of
+    excluded gates in each exclude or include method, the operations are
+    recorded and evaluated together, one block of rays at a time, the first
+    time the excluded gates are needed.  The result is stored with one bit
+    per gate.
+
+    The field data is read when the operations are evaluated, changes made
+    to the radar fields between recording and evaluating an operation are
+    reflected in the result.
+
+    Parameters
+    ----------
+    radar : Radar
+        Radar object from which gate filter will be build.
+    exclude_based : bool, optional
+        True to begin with all gates included, False to begin with all gates
+        excluded.  See :py:class:`GateFilter`.
+
+    Attributes
+    ----------
+    gate_excluded, gate_included : array, dtype=bool
+        See :py:class:`GateFilter`, a new array is returned on each access.
+    packed_gate_excluded : array, dtype=uint8
+        Read-only view of the excluded gates packed with one bit per gate
+        along the range dimension, see numpy.packbits.
+
+    """
+
+    def __init__(self, radar, exclude_based=True):
+        """ initialize """
+        self._radar = radar
+        self._shape = (radar.nrays, radar.ngates)
+        self._packed = None     # evaluated excluded gates, packed bits
+        self._initial = not exclude_based
+        self._operations = []   # (marked, op, exclude_masked) to evaluate
+
+    def copy(self):
+        """ Return a copy of the gatefilter. """
+        a = LazyGateFilter(self._radar)
+        a._packed = self._packed
+        a._initial = self._initial
+        a._operations = list(self._operations)
+        return a
+
+    ###################################
+    # evaluation and access of result #
+    ###################################
+
+    @property
+    def packed_gate_excluded(self):
+        self._evaluate()
+        return self._packed
+
+    @property
+    def gate_excluded(self):
+        return self.get_gate_excluded()
+
+    @property
+    def gate_included(self):
+        return ~self.get_gate_excluded()
+
+    @property
+    def _gate_excluded(self):
+        return self.get_gate_excluded()
+
+    def get_gate_excluded(self, sweep=None):
+        """
+        Return the excluded gates for the volume or a single sweep.
+
+        Parameters
+        ----------
+        sweep : int or None
+            Sweep number to retrieve the excluded gates of, None for all
+            rays.
+
+        Returns
+        -------
+        excluded : array, dtype=bool
+            Boolean array indicating excluded gates.
+
+        """
+        self._evaluate()
+        if sweep is None:
+            packed = self._packed
+        else:
+            packed = self._packed[self._radar.get_slice(sweep)]
+        return self._unpack(packed)
+
+    def get_gate_included(self, sweep=None):
+        """
+        Return the included gates for the volume or a single sweep.
+
+        See :py:func:`get_gate_excluded`.
+        """
+        return ~self.get_gate_excluded(sweep)
+
+    def _unpack(self, packed):
+        """ Unpack bits into a boolean array of excluded gates. """
+        excluded = np.unpackbits(packed, axis=1)[:, :self._shape[1]]
+        return excluded.astype(bool)
+
+    def _evaluate(self):
+        """ Evaluate the recorded operations. """
+        if self._packed is not None and not self._operations:
+            return
+        nrays, ngates = self._shape
+        operations = self._operations
+
+        # operations before the last 'new' operation have no effect
+        for i in range(len(operations) - 1, -1, -1):
+            if operations[i][1] == 'new':
+                operations = operations[i:]
+                break
+
+        packed = np.empty((nrays, (ngates + 7) // 8), dtype=np.uint8)
+        rays_per_block = max(_BLOCK_GATES // max(ngates, 1), 1)
+        for start in range(0, nrays, rays_per_block):
+            rays = slice(start, start + rays_per_block)
+            nblock = len(range(*rays.indices(nrays)))
+            if self._packed is not None:
+                excluded = self._unpack(self._packed[rays])
+            else:
+                excluded = np.empty((nblock, ngates), dtype=bool)
+                excluded.fill(self._initial)
+            for marked, op, exclude_masked in operations:
+                if isinstance(marked, _GateExpression):
+                    marked = marked.evaluate(rays)
+                else:
+                    marked = marked[rays]
+                marked = np.ma.filled(marked, exclude_masked)
+                if op == 'or':
+                    np.logical_or(excluded, marked, out=excluded)
+                elif op == 'and':
+                    np.logical_and(excluded, marked, out=excluded)
+                else:
+                    excluded[...] = marked
+            packed[rays] = np.packbits(excluded, axis=1)
+        packed.flags.writeable = False
+        self._packed = packed
+        self._operations = []
+
+    #######################
+    # recorded operations #
+    #######################
+
+    def _get_fdata(self, field):
+        """ Check that the field exists and return an expression for it. """
+        self._radar.check_field_exists(field)
+        fields = self._radar.fields
+        return _GateExpression(lambda rays: fields[field]['data'][rays])
+
+    def _merge(self, marked, op, exclude_masked):
+        """ Record merging marked gates with the excluded gates. """
+        if exclude_masked not in [True, False]:
+            raise ValueError("exclude_masked must be 'True' or 'False'")
+        if op not in ['or', 'and', 'new']:
+            raise ValueError("invalid 'op' parameter: ", op)
+        self._operations.append((marked, op, exclude_masked))
+        return
+
+    def _transition_expression(self, trans_value):
+        """ Return an expression marking rays with the transition value. """
+        transition_data = self._radar.antenna_transition['data']
+        ngates = self._shape[1]
+
+        def _in_transition(rays):
+            in_transition = transition_data[rays] == trans_value
+            return np.repeat(np.ma.filled(in_transition, False)[:, None],
+                             ngates, axis=1)
+        return _GateExpression(_in_transition)
+
+    def _set_all(self, excluded):
+        """ Mark all gates as excluded or included. """
+        self._packed = None
+        self._initial = excluded
+        self._operations = []
+
+    def exclude_transition(self, trans_value=1, exclude_masked=True, op='or'):
+        """ Exclude all gates in rays marked as in transition. """
+        if self._radar.antenna_transition is None:
+            marked = _GateExpression(
+                lambda rays: np.zeros(
+                    (len(range(*rays.indices(self._shape[0]))),
+                     self._shape[1]), dtype=bool))
+        else:
+            marked = self._transition_expression(trans_value)
+        return self._merge(marked, op, exclude_masked)
+
+    def exclude_all(self):
+        """ Exclude all gates. """
+        self._set_all(True)
+
+    def exclude_none(self):
+        """ Exclude no gates, include all gates. """
+        self._set_all(False)
+
+    def exclude_masked(self, field, exclude_masked=True, op='or'):
+        """ Exclude gates where a given field is masked. """
+        marked = self._get_fdata(field)
+        return self._merge(
+            _GateExpression(
+                lambda rays: np.ma.getmaskarray(marked.evaluate(rays))),
+            op, exclude_masked)
+
+    def exclude_invalid(self, field, exclude_masked=True, op='or'):
+        """
+        Exclude gates where an invalid value occurs in a field (NaNs or infs).
+        """
+        marked = self._get_fdata(field)
+        return self._merge(
+            _GateExpression(lambda rays: ~np.isfinite(marked.evaluate(rays))),
+            op, exclude_masked)
+
+    def include_not_transition(
+            self, trans_value=0, exclude_masked=True, op='and'):
+        """ Include all gates in rays not marked as in transition. """
+        if self._radar.antenna_transition is None:
+            marked = _GateExpression(
+                lambda rays: np.zeros(
+                    (len(range(*rays.indices(self._shape[0]))),
+                     self._shape[1]), dtype=bool))
+        else:
+            marked = ~self._transition_expression(trans_value)
+        return self._merge(marked, op, exclude_masked)
+
+    def include_all(self):
+        """ Include all gates. """
+        self._set_all(False)
+
+    def include_none(self):
+        """ Include no gates, exclude all gates. """
+        self._set_all(True)
+
+    def include_not_masked(self, field, exclude_masked=True, op='and'):
+        """ Include gates where a given field in not masked. """
+        self.exclude_masked(field, exclude_masked, op)
+
+    def include_valid(self, field, exclude_masked=True, op='and'):
+        """
+        Include gates where a valid value occurs in a field (not NaN or inf).
+        """
+        self.exclude_invalid(field, exclude_masked, op)
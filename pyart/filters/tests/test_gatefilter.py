@@ -413,3 +413,73 @@ def test_gatefilter_calculate_texture():
     texture_field = pyart.filters.calculate_velocity_texture(
         radar, vel_field, wind_size=4, nyq=10)
     assert np.all(texture_field['data'] == 0)
+
+
+def test_gatefilter_calculate_texture_sweeps():
+    radar = pyart.testing.make_empty_ppi_radar(10, 6, 3)
+    vel = np.zeros((18, 10))
+    vel[:6] = np.tile([-9., 9.], 30).reshape(6, 10)
+    vel[12:] = np.tile([-9., 9.], 30).reshape(6, 10)
+    radar.add_field('vel', {'data': vel})
+    nyq = [10., 10., 20.]
+    texture = pyart.filters.calculate_velocity_texture(
+        radar, 'vel', wind_size=3, nyq=nyq)
+    texture_threaded = pyart.filters.calculate_velocity_texture(
+        radar, 'vel', wind_size=3, nyq=nyq, n_workers=2)
+    assert np.all(texture['data'] == texture_threaded['data'])
+    assert np.all(texture['data'][8:10] == 0)
+    # aliased velocities of +/- 9 m/s are smoother with a 10 m/s nyquist
+    assert np.all(texture['data'][2:4] < texture['data'][14:16])
+
+
+def _apply_filter_script(gfilter):
+    gfilter.exclude_transition()
+    gfilter.exclude_below('test_field2', 2)
+    gfilter.exclude_masked('test_field2')
+    gfilter.exclude_invalid('test_field2')
+    gfilter.include_inside('test_field', 7, 8, op='or')
+    gfilter.exclude_outside('test_field2', 1, 6, exclude_masked=False,
+                            op='and')
+    gfilter.include_valid('test_field2', op='or')
+    gfilter.exclude_equal('test_field', 4)
+    gfilter.exclude_gates(fdata == 9)
+
+
+def test_lazy_gatefilter_matches_gatefilter():
+    gfilter = pyart.filters.GateFilter(radar)
+    lazy_gfilter = pyart.filters.LazyGateFilter(radar)
+    _apply_filter_script(gfilter)
+    _apply_filter_script(lazy_gfilter)
+    assert np.array_equal(gfilter.gate_excluded, lazy_gfilter.gate_excluded)
+    assert np.array_equal(gfilter.gate_included, lazy_gfilter.gate_included)
+
+    # further operations are applied to the evaluated gates
+    gfilter.include_above('test_field', 8, op='or')
+    lazy_gfilter.include_above('test_field', 8, op='or')
+    assert np.array_equal(gfilter.gate_excluded, lazy_gfilter.gate_excluded)
+
+    gfilter = pyart.filters.GateFilter(radar, exclude_based=False)
+    lazy_gfilter = pyart.filters.LazyGateFilter(radar, exclude_based=False)
+    gfilter.include_below('test_field', 3)
+    lazy_gfilter.include_below('test_field', 3)
+    assert np.array_equal(gfilter.gate_excluded, lazy_gfilter.gate_excluded)
+
+
+def test_lazy_gatefilter_access():
+    gfilter = pyart.filters.LazyGateFilter(radar)
+    gfilter.exclude_below('test_field', 5)
+    gfilter2 = gfilter.copy()
+    gfilter2.exclude_all()
+
+    packed = gfilter.packed_gate_excluded
+    assert packed.shape == (36, 2)
+    assert not packed.flags.writeable
+    assert np.array_equal(np.unpackbits(packed, axis=1)[:, :10],
+                          fdata < 5)
+    assert np.array_equal(gfilter.get_gate_excluded(0), fdata < 5)
+    assert np.array_equal(gfilter.get_gate_included(0), fdata >= 5)
+    assert np.all(gfilter2.gate_excluded)
+
+    assert_raises(ValueError, gfilter.exclude_below, 'test_field', 5,
+                  op='fuzz')
+    assert_raises(KeyError, gfilter.exclude_below, 'foobar', 5)
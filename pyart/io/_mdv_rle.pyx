@@ -0,0 +1,83 @@
+"""
+pyart.io._mdv_rle
+=================
+
+Decoding of MDV 8-bit run length encoded data.
+
+.. autosummary::
+    :toctree: generated/
+
+    decode_rle8
+
+"""
+
+import numpy as np
+
+cimport cython
+from libc.string cimport memset
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def decode_rle8(const unsigned char[::1] compr_data, int key,
+                Py_ssize_t decompr_size):
+    """
+    Decode 8-bit MDV run length encoding.
+
+    The encoding is described in section 7 of the MDV file format
+    documentation, http://rap.ucar.edu/projects/IHL/RalHtml/protocols/mdv_file/
+    A byte equal to the key is followed by a count and the value which is
+    repeated count times, all other bytes are literal values.  Decoding
+    stops at the end of the encoded data, output past the last decoded byte
+    is zero.  The GIL is released while decoding.
+
+    Parameters
+    ----------
+    compr_data : bytes
+        Run length encoded data.
+    key : int
+        Byte which marks the start of a run.
+    decompr_size : int
+        Size of the decoded data in bytes.
+
+    Returns
+    -------
+    out : array
+        Decoded data as an array of uint8.
+
+    """
+    out = np.zeros((decompr_size, ), dtype='uint8')
+    cdef unsigned char[::1] out_view = out
+    cdef Py_ssize_t nbytes = compr_data.shape[0]
+    cdef Py_ssize_t data_ptr = 0
+    cdef Py_ssize_t out_ptr = 0
+    cdef Py_ssize_t count
+    cdef unsigned char value
+    cdef int error = 0
+
+    with nogil:
+        while data_ptr < nbytes:
+            value = compr_data[data_ptr]
+            if value != key:  # not encoded
+                if out_ptr >= decompr_size:
+                    error = 1
+                    break
+                out_view[out_ptr] = value
+                data_ptr += 1
+                out_ptr += 1
+            else:   # run length encoded
+                if data_ptr + 2 >= nbytes:
+                    error = 1
+                    break
+                count = compr_data[data_ptr + 1]
+                if out_ptr + count > decompr_size:
+                    error = 1
+                    break
+                if count:
+                    memset(&out_view[out_ptr], compr_data[data_ptr + 2],
+                           count)
+                data_ptr += 3
+                out_ptr += count
+    if error:
+        raise ValueError('Invalid MDV run length encoded data')
+    return out
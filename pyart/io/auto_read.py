@@ -26,8 +26,10 @@ from .nexrad_cdm import read_nexrad_cdm
 from .nexradl3_read import read_nexrad_level3
 from .uf import read_uf
 from .chl import read_chl
+from ..profiling import profiled
 
 
+@profiled
 def read(filename, use_rsl=False, **kwargs):
     """
     Read a radar file and return a radar object.
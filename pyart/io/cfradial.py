@@ -9,6 +9,7 @@ Utilities for reading CF/Radial files.
     :template: dev_template.rst
 
     _NetCDFVariableDataExtractor
+    _VariableGateUnpacker
 
 .. autosummary::
     :toctree: generated/
@@ -18,7 +19,12 @@ Utilities for reading CF/Radial files.
     _find_all_meta_group_vars
     _ncvar_to_dict
     _unpack_variable_gate_field_dic
+    _write_fields
+    _prepare_field
+    _pack_field
     _create_ncvar
+    _calculate_scale_and_offset
+    _scale_and_offset
 
 """
 
@@ -26,6 +32,7 @@ import getpass
 import datetime
 import platform
 import warnings
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 import netCDF4
@@ -34,6 +41,7 @@ from ..config import FileMetadata
 from .common import stringarray_to_chararray, _test_arguments
 from ..core.radar import Radar
 from ..lazydict import LazyLoadDict
+from ..profiling import profiled
 
 
 # Variables and dimensions in the instrument_parameter convention and
@@ -68,6 +76,7 @@ _INSTRUMENT_PARAMS_DIMS = {
 }
 
 
+@profiled
 def read_cfradial(filename, field_names=None, additional_metadata=None,
                   file_field_names=False, exclude_fields=None,
                   delay_field_loading=False, **kwargs):
@@ -97,9 +106,9 @@ def read_cfradial(filename, field_names=None, additional_metadata=None,
         True to delay loading of field data from the file until the 'data'
         key in a particular field dictionary is accessed.  In this case
         the field attribute of the returned Radar object will contain
-        LazyLoadDict objects not dict objects.  Delayed field loading will not
-        provide any speedup in file where the number of gates vary between
-        rays (ngates_vary=True) and is not recommended.
+        LazyLoadDict objects not dict objects.  In files where the number of
+        gates vary between rays (ngates_vary=True) the conversion of a field
+        to a 2D array is also delayed until the field data is accessed.
 
     Returns
     -------
@@ -282,6 +291,15 @@ def read_cfradial(filename, field_names=None, additional_metadata=None,
         keys = [k for k, v in ncvars.items()
                 if v.dimensions == ('time', 'range')]
 
+    if 'ray_n_gates' in ncvars:
+        # the scatter index used to unpack the fields is computed once
+        shape = (len(ncvars['time']), len(ncvars['range']))
+        ray_n_gates = ncvars['ray_n_gates'][:]
+        ray_start_index = ncvars['ray_start_index'][:]
+        unpacker = _VariableGateUnpacker(shape, ray_n_gates, ray_start_index)
+    else:
+        unpacker = None
+
     fields = {}
     for key in keys:
         field_name = filemetadata.get_field_name(key)
@@ -289,15 +307,8 @@ def read_cfradial(filename, field_names=None, additional_metadata=None,
             if exclude_fields is not None and key in exclude_fields:
                 continue
             field_name = key
-        fields[field_name] = _ncvar_to_dict(ncvars[key], delay_field_loading)
-
-    if 'ray_n_gates' in ncvars:
-        shape = (len(ncvars['time']), len(ncvars['range']))
-        ray_n_gates = ncvars['ray_n_gates'][:]
-        ray_start_index = ncvars['ray_start_index'][:]
-        for dic in fields.values():
-            _unpack_variable_gate_field_dic(
-                dic, shape, ray_n_gates, ray_start_index)
+        fields[field_name] = _ncvar_to_dict(
+            ncvars[key], delay_field_loading, unpacker)
 
     # 4.5 instrument_parameters sub-convention -> instrument_parameters dict
     # 4.6 radar_parameters sub-convention -> instrument_parameters dict
@@ -342,12 +353,17 @@ def _find_all_meta_group_vars(ncvars, meta_group_name):
             v.meta_group == meta_group_name]
 
 
-def _ncvar_to_dict(ncvar, lazydict=False):
-    """ Convert a NetCDF Dataset variable to a dictionary. """
+def _ncvar_to_dict(ncvar, lazydict=False, unpacker=None):
+    """
+    Convert a NetCDF Dataset variable to a dictionary.
+
+    When unpacker is provided the variable data is converted with it, see
+    :py:class:`_VariableGateUnpacker`.
+    """
     # copy all attribute except for scaling parameters
     d = dict((k, getattr(ncvar, k)) for k in ncvar.ncattrs()
              if k not in ['scale_factor', 'add_offset'])
-    data_extractor = _NetCDFVariableDataExtractor(ncvar)
+    data_extractor = _NetCDFVariableDataExtractor(ncvar, unpacker)
     if lazydict:
         d = LazyLoadDict(d)
         d.set_lazy('data', data_extractor)
@@ -364,12 +380,16 @@ class _NetCDFVariableDataExtractor(object):
     ----------
     ncvar : netCDF4.Variable
         NetCDF Variable from which data will be extracted.
+    unpacker : _VariableGateUnpacker or None
+        Unpacker used to convert variable gate data to a 2D array, None to
+        return the data as stored.
 
     """
 
-    def __init__(self, ncvar):
+    def __init__(self, ncvar, unpacker=None):
         """ initialize the object. """
         self.ncvar = ncvar
+        self.unpacker = unpacker
 
     def __call__(self):
         """ Return an array containing data from the stored variable. """
@@ -386,22 +406,91 @@ class _NetCDFVariableDataExtractor(object):
         # Use atleast_1d to force the array to be at minimum one dimensional,
         # some version of netCDF return scalar or scalar arrays for scalar
         # NetCDF variables.
-        return np.atleast_1d(data)
+        data = np.atleast_1d(data)
+        if self.unpacker is not None:
+            data = self.unpacker(data)
+        return data
 
 
 def _unpack_variable_gate_field_dic(
-        dic, shape, ray_n_gates, ray_start_index):
-    """ Create a 2D array from a 1D field data, dic update in place """
-    fdata = dic['data']
-    data = np.ma.masked_all(shape, dtype=fdata.dtype)
-    for i, (gates, idx) in enumerate(zip(ray_n_gates, ray_start_index)):
-        data[i, :gates] = fdata[idx:idx+gates]
-    dic['data'] = data
+        dic, shape, ray_n_gates, ray_start_index, unpacker=None):
+    """
+    Create a 2D array from a 1D field data, dic update in place.
+
+    An existing unpacker for the same shape and rays may be provided to
+    avoid computing the scatter index again.
+    """
+    if unpacker is None:
+        unpacker = _VariableGateUnpacker(shape, ray_n_gates, ray_start_index)
+    dic['data'] = unpacker(dic['data'])
     return
 
 
+class _VariableGateUnpacker(object):
+    """
+    Class which converts variable gate field data to 2D arrays.
+
+    Fields in CF/Radial files where the number of gates varies between rays
+    are stored as 1D arrays along the n_points dimension.  The index
+    scattering these points into a 2D (ray, gate) array is computed once
+    and reused for every field.  When all rays contain every gate and are
+    stored in order the fields are reshaped without copying or masking,
+    otherwise the unpacked arrays are allocated without filling and the
+    missing gates are masked.
+
+    Parameters
+    ----------
+    shape : 2-tuple
+        Shape of the unpacked (ray, gate) arrays.
+    ray_n_gates : array
+        Number of gates in each ray.
+    ray_start_index : array
+        Index of the first point of each ray in the n_points dimension.
+
+    """
+
+    def __init__(self, shape, ray_n_gates, ray_start_index):
+        """ initialize the object. """
+        nrays, ngates = shape
+        ray_n_gates = np.ma.filled(ray_n_gates, 0).astype(np.intp)
+        ray_start_index = np.ma.filled(ray_start_index, 0).astype(np.intp)
+        self.shape = shape
+        self.npoints = int(ray_n_gates.sum())
+
+        # points stored ray after ray fill the gates which are not missing
+        # in (ray, gate) order, other orderings are gathered into this order
+        ray_offsets = np.cumsum(ray_n_gates) - ray_n_gates
+        if np.array_equal(ray_start_index, ray_offsets):
+            self.src_index = None
+        else:
+            gate = (np.arange(self.npoints) -
+                    np.repeat(ray_offsets, ray_n_gates))
+            self.src_index = np.repeat(ray_start_index, ray_n_gates) + gate
+        self.missing = np.arange(ngates) >= ray_n_gates[:, np.newaxis]
+        self.full = self.src_index is None and not self.missing.any()
+
+    def __call__(self, fdata):
+        """ Return the 2D masked array for 1D field data. """
+        if self.src_index is not None:
+            fdata = fdata[self.src_index]
+        else:
+            fdata = fdata[:self.npoints]
+        if self.full:
+            return np.ma.asarray(fdata).reshape(self.shape)
+
+        present = ~self.missing
+        data = np.empty(self.shape, dtype=fdata.dtype)
+        data[present] = np.ma.getdata(fdata)
+        mask = self.missing.copy()
+        if np.ma.getmask(fdata) is not np.ma.nomask:
+            mask[present] = np.ma.getmask(fdata)
+        return np.ma.masked_array(data, mask=mask)
+
+
+@profiled
 def write_cfradial(filename, radar, format='NETCDF4', time_reference=None,
-                   arm_time_variables=False):
+                   arm_time_variables=False, chunk_by_sweep=False,
+                   pack_dtype=None, n_workers=None):
     """
     Write a Radar object to a CF/Radial compliant netCDF file.
 
@@ -444,6 +533,26 @@ def write_cfradial(filename, radar, format='NETCDF4', time_reference=None,
     arm_time_variables : bool
         True to create the ARM standard time variables base_time and
         time_offset, False will not create these variables.
+    chunk_by_sweep : bool
+        True to store the fields in chunks holding the gates of the rays in
+        a sweep, (maximum rays per sweep, ngates), which matches the typical
+        access pattern of reading a sweep at a time.  Fields with a
+        _ChunkSizes or _Continguous key are not affected.  Ignored for
+        netCDF3 formats.  False uses the netCDF library default chunking.
+    pack_dtype : dtype, dict or None
+        Integer type to pack fields to using a scale_factor and add_offset
+        calculated from the range of the field data.  A dictionary maps field
+        names to types, fields which are not in the dictionary are not
+        packed.  Fields with a _Write_as_dtype key are not affected.  The
+        packing is done in a single vectorized pass and, unlike the
+        _Write_as_dtype key, the field dictionaries of the radar are not
+        modified.  None does not pack the fields.
+    n_workers : int or None
+        Number of threads used to prepare the fields for writing, masking
+        and packing the field data of later fields while earlier fields are
+        written and compressed.  The netCDF library calls are always made
+        one at a time from the calling thread.  None prepares the fields in
+        the calling thread.
 
     """
     dataset = netCDF4.Dataset(filename, 'w', format=format)
@@ -531,8 +640,12 @@ def write_cfradial(filename, radar, format='NETCDF4', time_reference=None,
                       'antenna_transition', ('time', ))
 
     # fields
-    for field, dic in radar.fields.items():
-        _create_ncvar(dic, dataset, field, ('time', 'range'))
+    if chunk_by_sweep and not format.startswith('NETCDF3'):
+        rays = int(np.max(radar.rays_per_sweep['data']))
+        chunksizes = (max(min(rays, radar.nrays), 1), max(radar.ngates, 1))
+    else:
+        chunksizes = None
+    _write_fields(dataset, radar.fields, chunksizes, pack_dtype, n_workers)
 
     # sweep parameters
     _create_ncvar(radar.sweep_number, dataset, 'sweep_number', ('sweep', ))
@@ -689,7 +802,121 @@ def write_cfradial(filename, radar, format='NETCDF4', time_reference=None,
     dataset.close()
 
 
-def _create_ncvar(dic, dataset, name, dimensions):
+def _write_fields(dataset, fields, chunksizes=None, pack_dtype=None,
+                  n_workers=None):
+    """
+    Create and fill the field variables in a netCDF Dataset object.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        NetCDF dataset to create the variables in.
+    fields : dict
+        Dictionary of field dictionaries.
+    chunksizes : tuple or None
+        Chunk sizes for the field variables, None for the default chunking.
+    pack_dtype : dtype, dict or None
+        Integer type to pack the fields to, see :py:func:`write_cfradial`.
+    n_workers : int or None
+        Number of threads used to prepare the fields, None to prepare the
+        fields in the calling thread.
+
+    """
+    names = list(fields.keys())
+    if isinstance(pack_dtype, dict):
+        dtypes = [pack_dtype.get(name) for name in names]
+    else:
+        dtypes = [pack_dtype] * len(names)
+    dics = [fields[name] for name in names]
+
+    if n_workers is None:
+        prepared = (_prepare_field(dic, chunksizes, dtype)
+                    for dic, dtype in zip(dics, dtypes))
+        for name, (dic, packed) in zip(names, prepared):
+            _create_ncvar(dic, dataset, name, ('time', 'range'), not packed)
+        return
+
+    # field data is loaded in this thread as lazily loaded fields may be
+    # read from a netCDF file, the netCDF library is not thread safe.
+    for dic in dics:
+        dic['data']
+    pool = ThreadPool(n_workers)
+    try:
+        prepared = pool.imap(
+            _prepare_field_args,
+            [(dic, chunksizes, dtype) for dic, dtype in zip(dics, dtypes)])
+        for name, (dic, packed) in zip(names, prepared):
+            _create_ncvar(dic, dataset, name, ('time', 'range'), not packed)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _prepare_field_args(args):
+    """ Call _prepare_field with a tuple of arguments. """
+    return _prepare_field(*args)
+
+
+def _prepare_field(dic, chunksizes=None, pack_dtype=None):
+    """
+    Prepare a field dictionary for writing with _create_ncvar.
+
+    Returns the dictionary to write and a flag which is True when the field
+    data has been packed.  The dictionary is returned unmodified when no
+    chunk sizes or packing type are provided, otherwise a copy is returned.
+    Masked gates are replaced with the fill value when known.
+    """
+    if chunksizes is None and pack_dtype is None:
+        return dic, False
+    dic = dict(dic)
+    if ('_ChunkSizes' not in dic and not dic.get('_Continguous', False) and
+            chunksizes is not None):
+        dic['_ChunkSizes'] = chunksizes
+    if pack_dtype is not None and '_Write_as_dtype' not in dic:
+        return _pack_field(dic, np.dtype(pack_dtype)), True
+    if ('_FillValue' in dic and '_Write_as_dtype' not in dic and
+            np.ma.isMaskedArray(dic['data'])):
+        dic['data'] = dic['data'].filled(dic['_FillValue'])
+    return dic, False
+
+
+def _pack_field(dic, dtype):
+    """
+    Pack the data in a field dictionary to an integer type.
+
+    The scale_factor and add_offset are calculated from the range of the
+    valid data and the packed data is found in a single vectorized pass.
+    Masked, non-finite and fill values are packed to the smallest integer
+    which becomes the _FillValue.  A copy of the dictionary is returned.
+    """
+    data = dic['data']
+    values = np.ma.getdata(data)
+    invalid = np.ma.getmaskarray(data) | ~np.isfinite(values)
+    if '_FillValue' in dic:
+        invalid |= values == dic['_FillValue']
+    valid_values = values[~invalid]
+    if valid_values.size:
+        minimum = valid_values.min()
+        maximum = valid_values.max()
+    else:
+        minimum, maximum = 0., 1.
+    scale, offset, fill = _scale_and_offset(minimum, maximum, dtype)
+
+    packed = values.astype(np.float64)
+    packed -= offset
+    packed /= scale
+    np.rint(packed, out=packed)
+    packed[invalid] = fill
+
+    dic = dict(dic)
+    dic['data'] = packed.astype(dtype)
+    dic['scale_factor'] = scale
+    dic['add_offset'] = offset
+    dic['_FillValue'] = fill
+    return dic
+
+
+def _create_ncvar(dic, dataset, name, dimensions, auto_scale=True):
     """
     Create and fill a Variable in a netCDF Dataset object.
 
@@ -703,6 +930,9 @@ def _create_ncvar(dic, dataset, name, dimensions):
         Name of variable to create.
     dimension : tuple of str
         Dimension of variable.
+    auto_scale : bool
+        False when the data has already been packed using the scale_factor
+        and add_offset in the dictionary and is written as is.
 
     """
     # create array from list, etc.
@@ -777,6 +1007,8 @@ def _create_ncvar(dic, dataset, name, dimensions):
         ncvar.setncattr(key, value)
 
     # set the data
+    if not auto_scale:
+        ncvar.set_auto_maskandscale(False)
     if data.shape == ():
         data.shape = (1,)
     if data.dtype == 'S1':  # string/char arrays
@@ -821,7 +1053,15 @@ def _calculate_scale_and_offset(dic, dtype, minimum=None, maximum=None):
         minimum = np.amin(data)
     if maximum is None:
         maximum = np.amax(data)
+    return _scale_and_offset(minimum, maximum, dtype)
 
+
+def _scale_and_offset(minimum, maximum, dtype):
+    """
+    Calculate the 'scale_factor', 'add_offset' and fill value mapping the
+    data range from minimum to maximum to an integer dtype.  See
+    :py:func:`_calculate_scale_and_offset`.
+    """
     if maximum < minimum:
         raise ValueError(
             'Error calculating variable scaling: '
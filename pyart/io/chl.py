@@ -14,10 +14,14 @@ Utilities for reading CSU-CHILL CHL files.
     :toctree: generated/
 
     read_chl
+    _ChlStagedField
+    _gather_structure
+    _structure_dtype
     _unpack_structure
 
 """
 
+import functools
 import struct
 from datetime import datetime
 
@@ -25,12 +29,17 @@ import numpy as np
 
 from ..config import FileMetadata, get_fillvalue
 from ..core.radar import Radar
+from ..lazydict import LazyLoadDict
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
+from .common import _file_buffer
+from ..profiling import profiled
 
 
+@profiled
 def read_chl(filename, field_names=None, additional_metadata=None,
              file_field_names=None, exclude_fields=None,
-             use_file_field_attributes=True, **kwargs):
+             use_file_field_attributes=True, delay_field_loading=False,
+             **kwargs):
     """
     Read a CSU-CHILL CHL file.
 
@@ -63,6 +72,12 @@ def read_chl(filename, field_names=None, additional_metadata=None,
         attribute `long_name`, `units`, `valid_max`, and `valid_min`.  False
         will not set these unless they are defined in the configuration file
         or in `additional_metadata`.
+    delay_field_loading : bool, optional
+        True to delay loading and scaling of field data from the file until
+        the 'data' key in a particular field dictionary is accessed.  In this
+        case the field attribute of the returned Radar object will contain
+        LazyLoadDict objects not dict objects.  Files on disk are
+        memory-mapped so only the fields accessed are read from the file.
 
     Returns
     -------
@@ -78,7 +93,8 @@ def read_chl(filename, field_names=None, additional_metadata=None,
                                 file_field_names, exclude_fields)
 
     # read data
-    chl_file = ChlFile(prepare_for_read(filename))
+    # fields are extracted from the file as they are loaded
+    chl_file = ChlFile(prepare_for_read(filename), delay_field_loading=True)
 
     # time
     time = filemetadata('time')
@@ -99,7 +115,7 @@ def read_chl(filename, field_names=None, additional_metadata=None,
 
     # fields
     fields = {}
-    for i, fdata in chl_file.fields.items():
+    for i in chl_file.field_nums:
 
         field_info = chl_file.field_info[i]
         field_name = filemetadata.get_field_name(field_info['name'])
@@ -107,8 +123,11 @@ def read_chl(filename, field_names=None, additional_metadata=None,
             continue
 
         field_dic = filemetadata(field_name)
-        np.ma.set_fill_value(fdata, get_fillvalue())
-        field_dic['data'] = fdata
+        if delay_field_loading:
+            field_dic = LazyLoadDict(field_dic)
+            field_dic.set_lazy('data', _ChlStagedField(chl_file, i))
+        else:
+            field_dic['data'] = _ChlStagedField(chl_file, i)()
         field_dic['_FillValue'] = get_fillvalue()
 
         if use_file_field_attributes:
@@ -168,6 +187,23 @@ def read_chl(filename, field_names=None, additional_metadata=None,
         instrument_parameters=instrument_parameters)
 
 
+class _ChlStagedField(object):
+    """
+    A class to facilitate on demand loading of field data from a CHL file.
+    """
+
+    def __init__(self, chl_file, field_num):
+        """ initialize. """
+        self.chl_file = chl_file
+        self.field_num = field_num
+
+    def __call__(self):
+        """ Return the array containing the field data. """
+        fdata = self.chl_file.fields[self.field_num]
+        np.ma.set_fill_value(fdata, get_fillvalue())
+        return fdata
+
+
 class ChlFile(object):
     """
     A file object for CHL data.
@@ -183,6 +219,10 @@ class ChlFile(object):
     debug : bool
         True to keep packet data in the _packets attribute to aid in
         debugging.
+    delay_field_loading : bool
+        True to extract and scale the data of each field when it is first
+        accessed in the `fields` attribute, False to extract all fields when
+        the file is read.
 
     Attributes
     ----------
@@ -208,7 +248,9 @@ class ChlFile(object):
         Chill defined scan type for each sweep.
     rays_per_sweep : list of ints
         Number of rays in each sweep.
-    fields : dict
+    field_nums : list of ints
+        Field numbers of the fields in the file.
+    fields : dict or LazyLoadDict
         Dictionary of field data index by field number.
     radar_info : dict
         Radar information recorded in the file.
@@ -217,9 +259,19 @@ class ChlFile(object):
     processor_info : dict
         Porcessor information recorded in the file.
 
+    Notes
+    -----
+    The blocks in the file are indexed in a single pass over the contents of
+    the file, which is memory-mapped when it is a file on disk.  The ray
+    headers are decoded into a structured array and the data of each field
+    is extracted from the mapped file using strided views, one for each
+    group of equally spaced rays, so that fields which are not accessed are
+    not read from the file.
+
     """
 
-    def __init__(self, filename, ns_time=True, debug=False):
+    def __init__(self, filename, ns_time=True, debug=False,
+                 delay_field_loading=False):
 
         # initalize attributes
         self.ngates = None
@@ -232,48 +284,62 @@ class ChlFile(object):
         self.sweep_number = []
         self.scan_types = []
         self.rays_per_sweep = None
-        self.fields = {}
+        self.field_nums = []
+        self.fields = LazyLoadDict({})
         self.radar_info = None
         self.field_info = {}
         self.processor_info = None
         self.first_gate_offset = None
 
         # private attributes
-        self._dstring = b''     # string containing field data.
+        self._buf = None        # file contents, memory-mapped if possible.
+        self._pos = 0           # position of the next block in _buf.
         self._bit_mask = None   # bit mask specifying fields present in file.
         self._dtype = None      # NumPy dtype for a single gate (all fields).
         self._ray_bsize = None  # size in bytes of a single ray (all fields).
         self._packets = []      # List of packets, not set if debug is False.
-        self._field_nums = None     # Field number available in file.
+        self._ray_hdr_pos = []  # position of each ray header in _buf.
+        self._ray_data_pos = []     # position of each ray's data in _buf.
+        self._ray_headers = None    # structured array of ray headers.
         self._rays_in_current_sweep = None  # accumulator for counting rays.
         self._fh = None         # file handler
         self._include_ns_time = ns_time
+        self._debug = debug
 
-        # read all blocks from the file
+        # index all blocks in the file
         if hasattr(filename, 'read'):
             self._fh = filename
         else:
             self._fh = open(filename, "rb")
+        self._buf = _file_buffer(self._fh)
         packet = 1
         while packet is not None:
             packet = self._read_block()
             if debug:
                 self._packets.append(packet)
 
-        self._extract_fields()
+        self._extract_ray_headers()
         self.rays_per_sweep.append(self._rays_in_current_sweep)
+        for field_num in self.field_nums:
+            self.fields.set_lazy(
+                field_num, functools.partial(self._extract_field, field_num))
+        if not delay_field_loading:
+            self.fields = dict(self.fields)
 
     def close(self):
-        """ Close the file. """
+        """
+        Close the file.  Fields which have not been accessed remain
+        available, the memory map is released once the object is deleted.
+        """
         self._fh.close()
 
     def _read_block(self):
-        """ Read a block from an open CHL file """
-        pld = self._fh.read(8)
-        if pld == b'':
+        """ Read a block from the CHL file contents. """
+        if self._pos >= len(self._buf):
             return None
-        block_id, length = struct.unpack("<2i", pld)
-        payload = self._fh.read(length - 8)
+        block_id, length = struct.unpack_from("<2i", self._buf, self._pos)
+        payload = self._buf[self._pos + 8:self._pos + length]
+        self._pos += length
 
         # parse the block
         if block_id == ARCH_ID_FILE_HDR:
@@ -350,53 +416,90 @@ class ChlFile(object):
         return packet
 
     def _parse_ray_hdr_block(self, payload):
-        """ Parse a ray_hdr block. Update associated attributes. """
-        packet = _unpack_structure(payload, ARCH_RAY_HEADER)
-
+        """ Parse a ray_hdr block. Record the location of the ray. """
         if self._bit_mask is None:
             # this is the first ray_hdr block read
+            packet = _unpack_structure(payload, ARCH_RAY_HEADER)
             self.ngates = packet['gates']
             self._bit_mask = packet['bit_mask']
-            self._field_nums = [b for b in range(38) if self._bit_mask & 2**b]
+            self.field_nums = [b for b in range(38) if self._bit_mask & 2**b]
             self._dtype = ','.join([DATA_FORMAT[self.field_info[i]['format']]
-                                    for i in self._field_nums])
+                                    for i in self.field_nums])
             self._ray_bsize = np.dtype(self._dtype).itemsize * packet['gates']
+        elif self._debug:
+            packet = _unpack_structure(payload, ARCH_RAY_HEADER)
         else:
-            # check that the bit_mask and number of gates are constant
-            if packet['bit_mask'] != self._bit_mask:
-                raise NotImplementedError('bit_mask is not consistent.')
-            if packet['gates'] != self.ngates:
-                raise NotImplementedError('number of gates vary.')
-
-        # store ray data and pointing data
-        self._dstring += self._fh.read(self._ray_bsize)
-        if self._include_ns_time:
-            self.time.append(packet['time'] + packet['ns_time']/1e9)
-        else:
-            self.time.append(packet['time'])
-        self.azimuth.append(packet['azimuth'])
-        self.elevation.append(packet['elevation'])
-        self._rays_in_current_sweep += 1
+            # the ray headers are decoded together once the file is indexed
+            packet = {}
 
+        # the ray data follows the ray_hdr block
+        self._ray_hdr_pos.append(self._pos - len(payload))
+        self._ray_data_pos.append(self._pos)
+        self._pos += self._ray_bsize
+        self._rays_in_current_sweep += 1
         return packet
 
-    def _extract_fields(self):
-        """ Extract field data from _dstring attribute post read. """
-        all_data = np.fromstring(self._dstring, dtype=self._dtype)
-        all_data = all_data.reshape(-1, self.ngates)
-        for i, field_num in enumerate(self._field_nums):
-
-            fdata = np.ma.masked_values(all_data[all_data.dtype.names[i]], 0)
-            # apply scale and offset factors to interger data types
-            if issubclass(fdata.dtype.type, np.integer):
-                dat_factor = float(self.field_info[field_num]['dat_factor'])
-                dat_bias = float(self.field_info[field_num]['dat_bias'])
-                fld_factor = float(self.field_info[field_num]['fld_factor'])
-                fdata = (fdata * dat_factor + dat_bias) / fld_factor
-
-            self.fields[field_num] = fdata
+    def _extract_ray_headers(self):
+        """ Decode the ray headers, set pointing and time attributes. """
+        self._ray_hdr_pos = np.array(self._ray_hdr_pos, dtype=np.int64)
+        self._ray_data_pos = np.array(self._ray_data_pos, dtype=np.int64)
+        if len(self._ray_data_pos) and (
+                self._ray_data_pos[-1] + self._ray_bsize > len(self._buf)):
+            raise IOError('CHL file is truncated.')
+        ubuf = np.frombuffer(self._buf, dtype='u1')
+        headers = _gather_structure(ubuf, self._ray_hdr_pos, ARCH_RAY_HEADER)
+        self._ray_headers = headers
+
+        # check that the bit_mask and number of gates are constant
+        if np.any(headers['bit_mask'] != self._bit_mask):
+            raise NotImplementedError('bit_mask is not consistent.')
+        if np.any(headers['gates'] != self.ngates):
+            raise NotImplementedError('number of gates vary.')
+
+        # pointing and time data
+        if self._include_ns_time:
+            self.time = (headers['time'] + headers['ns_time'] / 1e9).tolist()
+        else:
+            self.time = headers['time'].tolist()
+        self.azimuth = headers['azimuth'].tolist()
+        self.elevation = headers['elevation'].tolist()
         return
 
+    def _extract_field(self, field_num):
+        """ Extract and scale the data of a field from the file contents. """
+        gate_dtype = np.dtype(self._dtype)
+        name = gate_dtype.names[self.field_nums.index(field_num)]
+        field_dtype, field_offset = gate_dtype.fields[name][:2]
+        nrays = len(self._ray_data_pos)
+        raw_data = np.empty((nrays, self.ngates), dtype=field_dtype)
+
+        # copy the data from each run of rays located at a constant stride,
+        # sweeps are separated by other blocks
+        data_pos = self._ray_data_pos
+        new_run = np.ones(nrays, dtype=bool)
+        strides = np.diff(data_pos)
+        new_run[2:] = strides[1:] != strides[:-1]
+        runs = np.append(np.nonzero(new_run)[0], nrays)
+        for start, end in zip(runs[:-1], runs[1:]):
+            if end - start > 1:
+                stride = int(data_pos[start + 1] - data_pos[start])
+            else:
+                stride = self._ray_bsize
+            raw_data[start:end] = np.ndarray(
+                (end - start, self.ngates), dtype=field_dtype,
+                buffer=self._buf, offset=int(data_pos[start]) + field_offset,
+                strides=(stride, gate_dtype.itemsize))
+
+        fdata = np.ma.masked_values(raw_data, 0, copy=False)
+        # apply scale and offset factors to interger data types
+        if issubclass(fdata.dtype.type, np.integer):
+            dat_factor = float(self.field_info[field_num]['dat_factor'])
+            dat_bias = float(self.field_info[field_num]['dat_bias'])
+            fld_factor = float(self.field_info[field_num]['fld_factor'])
+            fdata = (fdata * dat_factor + dat_bias) / fld_factor
+        return fdata
+
+
 # CHL packet types
 ARCH_FORMAT_VERSION = 0x00010000
 ARCH_ID_CONTROL = 0x5aa80001
@@ -411,6 +514,7 @@ HSK_ID_SCAN_SEG = 0x5aa50002
 # Additional constants
 SCAN_MODE_NAMES = ['ppi', 'rhi', 'fixed', 'manual ppi', 'manual rhi', 'idle']
 DATA_FORMAT = ['uint8', 'uint64', 'float32', 'uint16']
+STRUCT_DTYPES = {'f': 'f4', 'H': 'u2', 'I': 'u4', 'Q': 'u8', 'i': 'i4'}
 
 ##############
 # Structures #
@@ -423,6 +527,19 @@ def _unpack_structure(string, structure):
     tpl = struct.unpack(fmt, string)
     return dict(zip([i[0] for i in structure], tpl))
 
+
+def _structure_dtype(structure):
+    """ Find the NumPy dtype of a structure. """
+    return np.dtype([(str(name), STRUCT_DTYPES.get(fmt, 'S' + fmt[:-1]))
+                     for name, fmt in structure])
+
+
+def _gather_structure(ubuf, positions, structure):
+    """ Gather structures at positions from a unsigned byte array. """
+    dtype = _structure_dtype(structure)
+    raw = ubuf[positions[:, np.newaxis] + np.arange(dtype.itemsize)]
+    return raw.reshape(-1, dtype.itemsize).view(dtype)[:, 0]
+
 ARCH_FILE_HDR_T = (
     ('version', 'I'),
     ('creation_version', 'I'),
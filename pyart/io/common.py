@@ -10,12 +10,15 @@ Input/output routines common to many file formats.
     prepare_for_read
     stringarray_to_chararray
     _test_arguments
+    _file_buffer
     make_time_unit_str
 
 """
 
 import bz2
 import gzip
+import io
+import mmap
 
 import numpy as np
 import netCDF4
@@ -98,6 +101,20 @@ def _test_arguments(dic):
         warnings.warn('Unexpected arguments: %s' % dic.keys())
 
 
+def _file_buffer(fobj):
+    """
+    Return the contents of a file from the current position.  Files on
+    disk read from the start are memory-mapped, other files are read.
+    """
+    raw = getattr(fobj, 'raw', fobj)
+    if isinstance(raw, io.FileIO) and fobj.tell() == 0:
+        try:
+            return mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            pass  # empty files and some file systems cannot be mapped
+    return fobj.read()
+
+
 def make_time_unit_str(dtobj):
     """ Return a time unit string from a datetime object. """
     return "seconds since " + dtobj.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -21,8 +21,10 @@ import datetime
 from ..core.grid import Grid
 from .cfradial import _ncvar_to_dict, _create_ncvar
 from .common import _test_arguments
+from ..profiling import profiled
 
 
+@profiled
 def read_grid(filename, exclude_fields=None, **kwargs):
     """
     Read a netCDF grid file produced by Py-ART.
@@ -141,6 +143,7 @@ def read_grid(filename, exclude_fields=None, **kwargs):
         radar_time=radar_time)
 
 
+@profiled
 def write_grid(filename, grid, format='NETCDF4',
                write_proj_coord_sys=True, proj_coord_sys=None,
                arm_time_variables=False,
@@ -10,6 +10,8 @@ Functions and classes common between MDV grid and radar files.
 
     MdvFile
     _MdvVolumeDataExtractor
+    _decode_level
+    _decode_rle8
 
 """
 
@@ -23,10 +25,12 @@ import gzip
 import zlib
 from io import BytesIO
 import datetime
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
 from ..core.transforms import antenna_to_cartesian
+from ._mdv_rle import decode_rle8
 
 # mapping from MDV name space to CF-Radial name space
 MDV_METADATA_MAP = {'instrument_name': 'data_set_source',
@@ -122,6 +126,11 @@ class MdvFile(object):
     read_fields : bool
         True to read all field during initalization, False (default) only
         reads metadata.
+    n_threads : int
+        Default number of threads used to decompress field data by
+        `read_a_field`, `read_fields` and `read_all_fields`.  When greater
+        than one the compressed vertical levels of the fields read are
+        decompressed in parallel.
 
     Notes
     -----
@@ -373,8 +382,10 @@ class MdvFile(object):
         ("spare", 58, 72)
     ]
 
-    def __init__(self, filename, debug=False, read_fields=False):
+    def __init__(self, filename, debug=False, read_fields=False,
+                 n_threads=1):
         """ initalize """
+        self.n_threads = n_threads
         if debug:
             print("Opening file for reading: ", filename)
         if filename is None:
@@ -501,7 +512,7 @@ class MdvFile(object):
             print("Writing chunk headers")
         self._write_chunk_headers(self.master_header["nchunks"])
 
-    def read_a_field(self, fnum, debug=False):
+    def read_a_field(self, fnum, debug=False, n_threads=None):
         """
         Read a field from the MDV file.
 
@@ -511,6 +522,9 @@ class MdvFile(object):
             Field number to read.
         debug : bool
             True to print debugging information, False to supress.
+        n_threads : int or None
+            Number of threads used to decompress the vertical levels of the
+            field.  None uses the n_threads attribute of the object.
 
         Returns
         -------
@@ -523,8 +537,6 @@ class MdvFile(object):
         read_all_fields : Read all fields in the MDV file.
 
         """
-
-        field_header = self.field_headers[fnum]
         # if the field has already been read, return it
         if self.fields_data[fnum] is not None:
             if debug:
@@ -534,94 +546,87 @@ class MdvFile(object):
         # field has not yet been read, populate the object and return
         if debug:
             print("No data found in object, populating")
+        self.read_fields([fnum], debug, n_threads)
+        return self.fields_data[fnum]
 
-        nz = field_header['nz']
-        ny = field_header['ny']
-        nx = field_header['nx']
+    def read_fields(self, fnums=None, debug=False, n_threads=None):
+        """
+        Read multiple fields from the MDV file.
 
-        # read the header
-        field_data = np.zeros([nz, ny, nx], dtype='float32')
-        self.fileptr.seek(field_header['field_data_offset'])
-        self._get_levels_info(nz)  # dict not used, but need to seek.
+        The compressed data of the fields is read from the file and then
+        decompressed, in parallel when n_threads is greater than one.  The
+        fields which have the same dimensions are stored in a single
+        preallocated volume array, the field data are views into this array.
 
-        for sw in range(nz):
-            if debug:
-                print("doing levels ", sw)
-
-            # get the compressed level data
-            compr_info = self._get_compression_info()
-            if compr_info['magic_cookie'] == 0xfe0103fd:
-                # Run length encoding only has 20 bytes of compression
-                # information with slightly different order, back up
-                # 4 bytes to read all of the compressed data.
-                self.fileptr.seek(-4, 1)
-                compr_data = self.fileptr.read(compr_info['spare'][0])
-            else:
-                compr_data = self.fileptr.read(compr_info['nbytes_coded'])
-            encoding_type = field_header['encoding_type']
-            if encoding_type == ENCODING_INT8:
-                fmt = '>%iB' % (nx * ny)
-                np_form = '>B'
-            elif encoding_type == ENCODING_INT16:
-                fmt = '>%iH' % (nx * ny)
-                np_form = '>H'
-            elif encoding_type == ENCODING_FLOAT32:
-                fmt = '>%if' % (nx * ny)
-                np_form = '>f'
-            else:
-                raise NotImplementedError('encoding: ', encoding_type)
+        Parameters
+        ----------
+        fnums : list of int or None
+            Field numbers to read.  None reads all fields.  Fields which
+            have already been read are not read again.
+        debug : bool
+            True to print debugging information, False to supress.
+        n_threads : int or None
+            Number of threads used to decompress the fields.  None uses the
+            n_threads attribute of the object.
 
-            # decompress the level data
-            if compr_info['magic_cookie'] == GZIP_COMPRESSED:
-                cd_fobj = BytesIO(compr_data)
-                gzip_file_handle = gzip.GzipFile(fileobj=cd_fobj)
-                decompr_data = gzip_file_handle.read(struct.calcsize(fmt))
-                gzip_file_handle.close()
-            elif compr_info['magic_cookie'] == ZLIB_COMPRESSED:
-                decompr_data = zlib.decompress(compr_data)
-            elif compr_info['magic_cookie'] == BZIP_COMPRESSED:
-                decompr_data = bz2.decompress(compr_data)
-            elif compr_info['magic_cookie'] == TA_NOT_COMPRESSED:
-                decompr_data = compr_data
-            elif compr_info['magic_cookie'] == GZIP_NOT_COMPRESSED:
-                decompr_data = compr_data
-            elif compr_info['magic_cookie'] == ZLIB_NOT_COMPRESSED:
-                decompr_data = compr_data
-            elif compr_info['magic_cookie'] == BZIP_NOT_COMPRESSED:
-                decompr_data = compr_data
-            elif compr_info['magic_cookie'] == RL8_COMPRESSION:
-                # Run length encoding of 8-bit data
-                # Compression info is in a different order, namely
-                # int32 : RL8_FLAG (0xfe0103fd)
-                # int32 : key
-                # int32 : nbytes_array (bytes of encoded data with header)
-                # int32 : nbytes_full (bytes of unencoded data, no header)
-                # int32 : nbytes_coded (bytes of encoded data, no header)
-                key = compr_info['nbytes_uncompressed']
-                decompr_size = compr_info['nbytes_coded']
-                decompr_data = _decode_rle8(compr_data, key, decompr_size)
-            else:
-                raise NotImplementedError('unknown compression mode')
+        """
+        if fnums is None:
+            fnums = range(self.master_header['nfields'])
+        if n_threads is None:
+            n_threads = self.n_threads
+        fnums = [fnum for fnum in fnums if self.fields_data[fnum] is None]
+
+        # group the fields by shape, each group shares a volume array
+        shapes = {}
+        for fnum in fnums:
+            field_header = self.field_headers[fnum]
+            shape = (field_header['nz'], field_header['ny'],
+                     field_header['nx'])
+            shapes.setdefault(shape, []).append(fnum)
+        fields_data = {}
+        for shape, group in shapes.items():
+            volume = np.empty((len(group), ) + shape, dtype='float32')
+            fields_data.update(zip(group, volume))
+
+        # read the compressed data, reading the file is serial
+        tasks = []
+        for fnum in fnums:
+            field_header = self.field_headers[fnum]
+            levels = self._get_compressed_levels(fnum, debug)
+            for sw, (compr_info, compr_data) in enumerate(levels):
+                tasks.append((field_header, compr_info, compr_data,
+                              fields_data[fnum][sw]))
+
+        # decompress the levels, zlib, bz2 and the RLE decoder release the
+        # GIL allowing the levels to be decompressed in parallel
+        if n_threads > 1 and len(tasks) > 1:
+            pool = ThreadPool(min(n_threads, len(tasks)))
+            try:
+                pool.map(_decode_level_task, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for task in tasks:
+                _decode_level_task(task)
 
-            # read the decompressed data, reshape and mask
-            sw_data = np.fromstring(decompr_data, np_form).astype('float32')
-            sw_data.shape = (ny, nx)
-            mask = sw_data == field_header['bad_data_value']
-            np.putmask(sw_data, mask, [np.NaN])
+        # store the fields only once all levels have been decoded so that a
+        # failed read does not leave partially decoded data in the object
+        for fnum, field_data in fields_data.items():
+            self.fields_data[fnum] = field_data
 
-            # scale and offset the data, store in field_data
-            scale = field_header['scale']
-            bias = field_header['bias']
-            field_data[sw, :, :] = sw_data * scale + bias
+    def read_all_fields(self, n_threads=None):
+        """
+        Read all fields, storing data to field name attributes.
 
-        # store data as object attribute and return
-        self.fields_data[fnum] = field_data
-        return field_data
+        Parameters
+        ----------
+        n_threads : int or None
+            Number of threads used to decompress the fields.  None uses the
+            n_threads attribute of the object.
 
-    def read_all_fields(self):
-        """ Read all fields, storing data to field name attributes. """
-        for i in range(self.master_header['nfields']):
-            self.read_a_field(i)
+        """
+        self.read_fields(None, n_threads=n_threads)
 
     def close(self):
         """ Close the MDV file. """
@@ -631,6 +636,33 @@ class MdvFile(object):
     # private methods #
     ###################
 
+    def _get_compressed_levels(self, fnum, debug=False):
+        """
+        Read the compressed data of the vertical levels of a field.
+
+        Returns a list of (compression_info, compressed_data) tuples.
+        """
+        field_header = self.field_headers[fnum]
+        nz = field_header['nz']
+        self.fileptr.seek(field_header['field_data_offset'])
+        self._get_levels_info(nz)  # dict not used, but need to seek.
+
+        levels = []
+        for sw in range(nz):
+            if debug:
+                print("doing levels ", sw)
+            compr_info = self._get_compression_info()
+            if compr_info['magic_cookie'] == RL8_COMPRESSION:
+                # Run length encoding only has 20 bytes of compression
+                # information with slightly different order, back up
+                # 4 bytes to read all of the compressed data.
+                self.fileptr.seek(-4, 1)
+                compr_data = self.fileptr.read(compr_info['spare'][0])
+            else:
+                compr_data = self.fileptr.read(compr_info['nbytes_coded'])
+            levels.append((compr_info, compr_data))
+        return levels
+
     def _write_a_field(self, fnum, debug=False):
         """ write field number 'fnum' to mdv file """
         # the file pointer must be set at the correct location prior to call
@@ -1148,28 +1180,68 @@ class MdvFile(object):
         return [fh[i]['field_name'] for i in range(len(fh))]
 
 
+def _decode_level_task(task):
+    """ Decode a vertical level, task is a tuple of the arguments. """
+    _decode_level(*task)
+
+
+def _decode_level(field_header, compr_info, compr_data, out):
+    """
+    Decompress, scale and offset the data of a vertical level.
+
+    The data is stored in out, a float32 array with shape (ny, nx), bad
+    data is set to NaN.
+    """
+    encoding_type = field_header['encoding_type']
+    if encoding_type == ENCODING_INT8:
+        np_form = '>B'
+    elif encoding_type == ENCODING_INT16:
+        np_form = '>H'
+    elif encoding_type == ENCODING_FLOAT32:
+        np_form = '>f'
+    else:
+        raise NotImplementedError('encoding: ', encoding_type)
+    nbytes = out.size * np.dtype(np_form).itemsize
+
+    # decompress the level data
+    magic_cookie = compr_info['magic_cookie']
+    if magic_cookie == GZIP_COMPRESSED:
+        cd_fobj = BytesIO(compr_data)
+        gzip_file_handle = gzip.GzipFile(fileobj=cd_fobj)
+        decompr_data = gzip_file_handle.read(nbytes)
+        gzip_file_handle.close()
+    elif magic_cookie == ZLIB_COMPRESSED:
+        decompr_data = zlib.decompress(compr_data)
+    elif magic_cookie == BZIP_COMPRESSED:
+        decompr_data = bz2.decompress(compr_data)
+    elif magic_cookie in (TA_NOT_COMPRESSED, GZIP_NOT_COMPRESSED,
+                          ZLIB_NOT_COMPRESSED, BZIP_NOT_COMPRESSED):
+        decompr_data = compr_data
+    elif magic_cookie == RL8_COMPRESSION:
+        # Run length encoding of 8-bit data
+        # Compression info is in a different order, namely
+        # int32 : RL8_FLAG (0xfe0103fd)
+        # int32 : key
+        # int32 : nbytes_array (bytes of encoded data with header)
+        # int32 : nbytes_full (bytes of unencoded data, no header)
+        # int32 : nbytes_coded (bytes of encoded data, no header)
+        key = compr_info['nbytes_uncompressed']
+        decompr_size = compr_info['nbytes_coded']
+        decompr_data = _decode_rle8(compr_data, key, decompr_size)
+    else:
+        raise NotImplementedError('unknown compression mode')
+
+    # read the decompressed data, mask, scale and offset
+    out[:] = np.frombuffer(decompr_data, np_form, out.size).reshape(
+        out.shape)
+    out[out == field_header['bad_data_value']] = np.nan
+    out *= field_header['scale']
+    out += field_header['bias']
+
+
 def _decode_rle8(compr_data, key, decompr_size):
-    """ Decode 8-bit MDV run length encoding. """
-    # Encoding is described in section 7 of:
-    # http://rap.ucar.edu/projects/IHL/RalHtml/protocols/mdv_file/
-    # This function would benefit greate by being rewritten in Cython
-    data = np.fromstring(compr_data, dtype='>B')
-    out = np.empty((decompr_size, ), dtype='uint8')
-    data_ptr = 0
-    out_ptr = 0
-    while data_ptr != len(data):
-        v = data[data_ptr]
-        if v != key:  # not encoded
-            out[out_ptr] = v
-            data_ptr += 1
-            out_ptr += 1
-        else:   # run length encoded
-            count = data[data_ptr+1]
-            value = data[data_ptr+2]
-            out[out_ptr:out_ptr+count] = value
-            data_ptr += 3
-            out_ptr += count
-    return out.tostring()
+    """ Decode 8-bit MDV run length encoding, returns a uint8 array. """
+    return decode_rle8(compr_data, key, decompr_size)
 
 
 class _MdvVolumeDataExtractor(object):
@@ -25,8 +25,10 @@ from ..core.grid import Grid
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from ..lazydict import LazyLoadDict
 from . import mdv_common
+from ..profiling import profiled
 
 
+@profiled
 def write_grid_mdv(filename, grid, mdv_field_names=None,
                    field_write_order=None):
     """
@@ -230,9 +232,10 @@ def write_grid_mdv(filename, grid, mdv_field_names=None,
     mdv.write(filename)
 
 
+@profiled
 def read_grid_mdv(filename, field_names=None, additional_metadata=None,
                   file_field_names=False, exclude_fields=None,
-                  delay_field_loading=False, **kwargs):
+                  delay_field_loading=False, n_threads=1, **kwargs):
     """
     Read a MDV file to a Grid Object.
 
@@ -266,6 +269,10 @@ def read_grid_mdv(filename, field_names=None, additional_metadata=None,
         key in a particular field dictionary is accessed.  In this case
         the field attribute of the returned Radar object will contain
         LazyLoadDict objects not dict objects.
+    n_threads : int, optional
+        Number of threads used to decompress the field data.  When greater
+        than one the compressed levels of the fields are decompressed in
+        parallel.
 
     Returns
     -------
@@ -299,7 +306,8 @@ def read_grid_mdv(filename, field_names=None, additional_metadata=None,
     # create metadata retrieval object
     filemetadata = FileMetadata('mdv', field_names, additional_metadata,
                                 file_field_names, exclude_fields)
-    mdv = mdv_common.MdvFile(prepare_for_read(filename))
+    mdv = mdv_common.MdvFile(
+        prepare_for_read(filename), n_threads=n_threads)
 
     # time dictionaries
     units = make_time_unit_str(mdv.times['time_begin'])
@@ -375,6 +383,7 @@ def read_grid_mdv(filename, field_names=None, additional_metadata=None,
     # fields
     fields = {}
     mdv_fields = mdv._make_fields_list()
+    extractors = {}
     for mdv_field in set(mdv_fields):
         field_name = filemetadata.get_field_name(mdv_field)
         if field_name is None:
@@ -388,9 +397,14 @@ def read_grid_mdv(filename, field_names=None, additional_metadata=None,
             field_dic = LazyLoadDict(field_dic)
             field_dic.set_lazy('data', dataextractor)
         else:
-            field_dic['data'] = dataextractor()
+            extractors[field_name] = dataextractor
         fields[field_name] = field_dic
 
+    # read the fields together so they can be decompressed in parallel
+    mdv.read_fields([e.field_num for e in extractors.values()])
+    for field_name, dataextractor in extractors.items():
+        fields[field_name]['data'] = dataextractor()
+
     if not delay_field_loading:
         mdv.close()
     return Grid(time, fields, metadata,
@@ -19,11 +19,13 @@ from ..core.radar import Radar
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from ..lazydict import LazyLoadDict
 from . import mdv_common
+from ..profiling import profiled
 
 
+@profiled
 def read_mdv(filename, field_names=None, additional_metadata=None,
              file_field_names=False, exclude_fields=None,
-             delay_field_loading=False, **kwargs):
+             delay_field_loading=False, n_threads=1, **kwargs):
     """
     Read a MDV file.
 
@@ -58,6 +60,10 @@ def read_mdv(filename, field_names=None, additional_metadata=None,
         the field attribute of the returned Radar object will contain
         LazyLoadDict objects not dict objects. Not all file types support this
         parameter.
+    n_threads : int, optional
+        Number of threads used to decompress the field data.  When greater
+        than one the compressed levels of the fields are decompressed in
+        parallel.
 
     Returns
     -------
@@ -77,7 +83,8 @@ def read_mdv(filename, field_names=None, additional_metadata=None,
     filemetadata = FileMetadata('mdv', field_names, additional_metadata,
                                 file_field_names, exclude_fields)
 
-    mdvfile = mdv_common.MdvFile(prepare_for_read(filename))
+    mdvfile = mdv_common.MdvFile(
+        prepare_for_read(filename), n_threads=n_threads)
 
     # value attributes
     az_deg, range_km, el_deg = mdvfile._calc_geometry()
@@ -104,6 +111,7 @@ def read_mdv(filename, field_names=None, additional_metadata=None,
 
     # fields
     fields = {}
+    extractors = {}
     for mdv_field in set(mdvfile.fields):
         field_name = filemetadata.get_field_name(mdv_field)
         if field_name is None:
@@ -118,9 +126,14 @@ def read_mdv(filename, field_names=None, additional_metadata=None,
             field_dic = LazyLoadDict(field_dic)
             field_dic.set_lazy('data', dataextractor)
         else:
-            field_dic['data'] = dataextractor()
+            extractors[field_name] = dataextractor
         fields[field_name] = field_dic
 
+    # read the fields together so they can be decompressed in parallel
+    mdvfile.read_fields([e.field_num for e in extractors.values()])
+    for field_name, dataextractor in extractors.items():
+        fields[field_name]['data'] = dataextractor()
+
     # metadata
     metadata = filemetadata('metadata')
     for meta_key, mdv_key in mdv_common.MDV_METADATA_MAP.items():
@@ -31,12 +31,14 @@ from .nexrad_level2 import NEXRADLevel2File
 from ..lazydict import LazyLoadDict
 from .nexrad_common import get_nexrad_location
 from .nexrad_interpolate import _fast_interpolate_scan
+from ..profiling import profiled
 
 
+@profiled
 def read_nexrad_archive(filename, field_names=None, additional_metadata=None,
                         file_field_names=False, exclude_fields=None,
                         delay_field_loading=False, station=None, scans=None,
-                        linear_interp=True, **kwargs):
+                        linear_interp=True, n_threads=1, **kwargs):
     """
     Read a NEXRAD Level 2 Archive file.
 
@@ -80,13 +82,17 @@ def read_nexrad_archive(filename, field_names=None, additional_metadata=None,
         in older NEXRAD message 1 files.
     scans : list or None, optional
         Read only specified scans from the file.  None (the default) will read
-        all scans.
+        all scans.  When reading specific scans from a file with compressed
+        records only the records containing these scans are decompressed.
     linear_interp : bool, optional
         True (the default) to perform linear interpolation between valid pairs
         of gates in low resolution rays in files mixed resolution rays.
         False will perform a nearest neighbor interpolation.  This parameter is
         not used if the resolution of all rays in the file or requested sweeps
         is constant.
+    n_threads : int, optional
+        Number of threads used to decompress the records in files with
+        compressed records.
 
     Returns
     -------
@@ -108,8 +114,10 @@ def read_nexrad_archive(filename, field_names=None, additional_metadata=None,
                                 additional_metadata, file_field_names,
                                 exclude_fields)
 
-    # open the file and retrieve scan information
-    nfile = NEXRADLevel2File(prepare_for_read(filename))
+    # open the file and retrieve scan information, radial records are decoded
+    # as needed.
+    nfile = NEXRADLevel2File(prepare_for_read(filename), lazy=True,
+                             scans=scans, n_threads=n_threads)
     scan_info = nfile.scan_info(scans)
 
     # time
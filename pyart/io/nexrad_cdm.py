@@ -24,8 +24,10 @@ from .nexrad_common import get_nexrad_location
 from ..config import FileMetadata, get_fillvalue
 from ..core.radar import Radar
 from .common import make_time_unit_str, _test_arguments
+from ..profiling import profiled
 
 
+@profiled
 def read_nexrad_cdm(filename, field_names=None, additional_metadata=None,
                     file_field_names=False, exclude_fields=None,
                     station=None, **kwargs):
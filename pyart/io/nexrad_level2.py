@@ -7,14 +7,25 @@ pyart.io.nexrad_level2
     :template: dev_template.rst
 
     NEXRADLevel2File
+    _LazyRadialRecords
 
 .. autosummary::
     :toctree: generated/
 
     _decompress_records
+    _join_records
+    _find_ldm_records
+    _select_ldm_records
+    _first_elevation_number
+    _find_records_in_buf
+    _msg31_ray_index
+    _strided_runs
+    _gather_structure
+    _index_array
     _get_record_from_buf
     _get_msg31_data_block
     _structure_size
+    _structure_dtype
     _unpack_from_buf
     _unpack_structure
 
@@ -77,6 +88,7 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 import bz2
 import struct
 from datetime import datetime, timedelta
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
@@ -95,11 +107,28 @@ class NEXRADLevel2File(object):
     ----------
     filename : str
         Filename of Archive II file to read.
+    lazy : bool, optional
+        True to decode the radial (message 31) records on demand.  In this
+        mode only the message headers are examined when the file is read and
+        a structured array indexing the rays is created.  Moment data is
+        decoded from the buffer when requested by :py:func:`get_data`.
+        False, the default, decodes all records when the file is read.
+        Files containing message 1 radial records are always decoded when
+        read.
+    scans : list or None, optional
+        Scans (0 based) which will be accessed.  When provided only the LDM
+        records of a compressed file which may contain these scans are
+        decompressed and the remaining scans in the volume may be missing
+        or incomplete.  None, the default, decompresses all records.
+    n_threads : int, optional
+        Number of threads used to decompress the LDM records of a
+        compressed file.
 
     Attributes
     ----------
     radial_records : list
-        Radial (1 or 31) messages in the file.
+        Radial (1 or 31) messages in the file.  In lazy mode a sequence
+        which decodes the records as they are accessed.
     nscans : int
         Number of scans in the file.
     scan_msgs : list of arrays
@@ -110,11 +139,20 @@ class NEXRADLevel2File(object):
     vcp : dict
         VCP information dictionary.
     _records : list
-        A list of all records (message) in the file.
+        A list of all records (message) in the file.  In lazy mode only
+        the non-radial records.
     _fh : file-like
         File like object from which data is read.
     _msg_type : '31' or '1':
         Type of radial messages in file
+    _ray_index : structured array or None
+        Index of the message 31 radial records containing the location of
+        each record in the buffer, selected header elements and the
+        pointers to the data blocks in the record.  None for message 1
+        files.
+    _buf : bytes or None
+        Buffer containing the decompressed records from which message 31
+        moment data is read.  None for message 1 files.
 
     References
     ----------
@@ -123,7 +161,7 @@ class NEXRADLevel2File(object):
     .. [3] http://thredds.ucar.edu/thredds/catalog.html
 
     """
-    def __init__(self, filename):
+    def __init__(self, filename, lazy=False, scans=None, n_threads=1):
         """ initalize the object. """
         # read in the volume header and compression_record
         if hasattr(filename, 'read'):
@@ -138,7 +176,11 @@ class NEXRADLevel2File(object):
         compression_slice = slice(CONTROL_WORD_SIZE, CONTROL_WORD_SIZE + 2)
         compression_or_ctm_info = compression_record[compression_slice]
         if compression_or_ctm_info == b'BZ':
-            buf = _decompress_records(fh)
+            if scans is None:
+                elevation_numbers = None
+            else:
+                elevation_numbers = [scan + 1 for scan in scans]
+            buf = _decompress_records(fh, elevation_numbers, n_threads)
         # The 12-byte compression record previously held the Channel Terminal
         # Manager (CTM) information. Bytes 4 through 6 contain the size of the
         # record (2432) as a big endian unsigned short, which is encoded as
@@ -150,26 +192,43 @@ class NEXRADLevel2File(object):
             raise IOError('unknown compression record')
         self._fh = fh
 
-        # read the records from the buffer
-        self._records = []
-        buf_length = len(buf)
-        pos = 0
-        while pos < buf_length:
-            pos, dic = _get_record_from_buf(buf, pos)
-            self._records.append(dic)
-
-        # pull out radial records (1 or 31) which contain the moment data.
-        self.radial_records = [r for r in self._records
-                               if r['header']['type'] == 31]
-        self._msg_type = '31'
-        if len(self.radial_records) == 0:
+        # locate the records in the buffer
+        msg_types, msg_positions = _find_records_in_buf(buf)
+        msg31_positions = msg_positions[msg_types == 31]
+        lazy = lazy and len(msg31_positions) > 0
+
+        # read the records from the buffer, in lazy mode the radial records
+        # are only decoded when accessed.
+        if lazy:
+            self._records = [_get_record_from_buf(buf, pos)[1]
+                             for pos in msg_positions[msg_types != 31]]
+            self.radial_records = _LazyRadialRecords(buf, msg31_positions)
+            self._msg_type = '31'
+        else:
+            self._records = [_get_record_from_buf(buf, pos)[1]
+                             for pos in msg_positions]
+
+            # pull out radial records (1 or 31) which contain the moment data.
             self.radial_records = [r for r in self._records
-                                   if r['header']['type'] == 1]
-            self._msg_type = '1'
-        if len(self.radial_records) == 0:
-            raise ValueError('No MSG31 records found, cannot read file')
-        elev_nums = np.array([m['msg_header']['elevation_number']
-                              for m in self.radial_records])
+                                   if r['header']['type'] == 31]
+            self._msg_type = '31'
+            if len(self.radial_records) == 0:
+                self.radial_records = [r for r in self._records
+                                       if r['header']['type'] == 1]
+                self._msg_type = '1'
+            if len(self.radial_records) == 0:
+                raise ValueError('No MSG31 records found, cannot read file')
+
+        # index the message 31 records, moment data is read from the buffer
+        if self._msg_type == '31':
+            self._ray_index = _msg31_ray_index(buf, msg31_positions)
+            self._buf = buf
+            elev_nums = self._ray_index['elevation_number']
+        else:
+            self._ray_index = None
+            self._buf = None
+            elev_nums = np.array([m['msg_header']['elevation_number']
+                                  for m in self.radial_records])
         self.scan_msgs = [np.where(elev_nums == i + 1)[0]
                           for i in range(elev_nums.max())]
         self.nscans = len(self.scan_msgs)
@@ -313,6 +372,8 @@ class NEXRADLevel2File(object):
         Return an array of radial header elements for all rays in scans.
         """
         msg_nums = self._msg_nums(scans)
+        if self._ray_index is not None and key in RAY_INDEX_HEADER_KEYS:
+            return _index_array(self._ray_index[key][msg_nums])
         temp = [self.radial_records[i]['msg_header'][key] for i in msg_nums]
         return np.array(temp)
 
@@ -321,6 +382,8 @@ class NEXRADLevel2File(object):
         Return an array of RAD or msg_header elements for all rays in scans.
         """
         msg_nums = self._msg_nums(scans)
+        if self._ray_index is not None and key in RAY_INDEX_RAD_KEYS:
+            return _index_array(self._ray_index[key][msg_nums])
         if self._msg_type == '31':
             tmp = [self.radial_records[i]['RAD'][key] for i in msg_nums]
         else:
@@ -521,12 +584,16 @@ class NEXRADLevel2File(object):
             data = np.ones((nrays, max_ngates), dtype='u1')
         else:
             data = np.ones((nrays, max_ngates), dtype='u2')
-        for i, msg_num in enumerate(msg_nums):
-            msg = self.radial_records[msg_num]
-            if moment not in msg.keys():
-                continue
-            ngates = msg[moment]['ngates']
-            data[i, :ngates] = msg[moment]['data']
+        if self._buf is not None:
+            # gather the data directly from the buffer
+            self._gather_moment(moment, msg_nums, data)
+        else:
+            for i, msg_num in enumerate(msg_nums):
+                msg = self.radial_records[msg_num]
+                if moment not in msg.keys():
+                    continue
+                ngates = msg[moment]['ngates']
+                data[i, :ngates] = msg[moment]['data']
 
         # return raw data if requested
         if raw_data:
@@ -540,29 +607,325 @@ class NEXRADLevel2File(object):
             if moment in msg.keys():
                 offset = np.float32(msg[moment]['offset'])
                 scale = np.float32(msg[moment]['scale'])
-                mask = data <= 1
-                scaled_data = (data - offset) / scale
-                return np.ma.array(scaled_data, mask=mask)
+                # scale and offset in place, no temporaries are created
+                scaled_data = np.subtract(data, offset, dtype=np.float32)
+                scaled_data /= scale
+                return np.ma.array(scaled_data, mask=data <= 1)
 
         # moment is not present in any scan, mask all values
         return np.ma.masked_less_equal(data, 1)
 
+    def _gather_moment(self, moment, msg_nums, data):
+        """
+        Gather raw moment data for the message 31 records in msg_nums from
+        the buffer into the rows of data.
+
+        Moment data from consecutive records with the same number of gates
+        located at a constant stride in the buffer is copied from a single
+        strided view of the buffer.
+        """
+        if moment not in MSG31_DATA_BLOCKS:
+            return
+        index = self._ray_index[msg_nums]
+        rows = np.nonzero(index[moment])[0]
+        if len(rows) == 0:
+            return
+
+        ubuf = np.frombuffer(self._buf, dtype='u1')
+        block_starts = (index['pos'][rows] + _structure_size(MSG_HEADER) +
+                        index[moment][rows])
+        blocks = _gather_structure(ubuf, block_starts, GENERIC_DATA_BLOCK)
+        ngates = blocks['ngates'].astype(np.int64)
+        data_starts = block_starts + _structure_size(GENERIC_DATA_BLOCK)
+
+        dtype = np.dtype(data.dtype).newbyteorder('>')
+        runs = _strided_runs(data_starts, ngates)
+        for start, end in zip(runs[:-1], runs[1:]):
+            run_ngates = int(ngates[start])
+            if end - start > 1:
+                stride = int(data_starts[start + 1] - data_starts[start])
+            else:
+                stride = run_ngates * dtype.itemsize
+            view = np.ndarray(
+                (end - start, run_ngates), dtype=dtype, buffer=self._buf,
+                offset=int(data_starts[start]),
+                strides=(stride, dtype.itemsize))
+            data[rows[start:end], :run_ngates] = view
+        return
+
+
+class _LazyRadialRecords(object):
+    """
+    A sequence of radial records which are decoded from a buffer on access.
+    """
+
+    def __init__(self, buf, positions):
+        """ initialize. """
+        self._buf = buf
+        self._positions = positions
 
-def _decompress_records(file_handler):
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        return _get_record_from_buf(self._buf, int(self._positions[key]))[1]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _decompress_records(file_handler, elevation_numbers=None, n_threads=1):
     """
     Decompressed the records from an BZ2 compressed Archive 2 file.
+
+    When elevation_numbers is provided only the first (metadata) LDM record
+    and the LDM records which may contain radials with these elevation
+    numbers are decompressed.  When the LDM records can be located using
+    their control words the records are decompressed in parallel using
+    n_threads threads.
     """
     file_handler.seek(0)
     cbuf = file_handler.read()    # read all data from the file
+    records = _find_ldm_records(cbuf)
+    if records is not None:
+        decompressed = {}
+        if elevation_numbers is None:
+            selected = list(range(len(records)))
+        else:
+            selected = _select_ldm_records(
+                cbuf, records, elevation_numbers, decompressed)
+        remaining = [i for i in selected if i not in decompressed]
+        streams = [cbuf[records[i][0]:records[i][1]] for i in remaining]
+        if n_threads > 1 and len(streams) > 1:
+            # bz2 releases the GIL while decompressing
+            pool = ThreadPool(min(n_threads, len(streams)))
+            try:
+                results = pool.map(bz2.decompress, streams)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [bz2.decompress(stream) for stream in streams]
+        decompressed.update(zip(remaining, results))
+        return _join_records([decompressed[i] for i in selected])
+
+    # the records could not be located using the control words,
+    # decompress the chained streams.
     decompressor = bz2.BZ2Decompressor()
     skip = _structure_size(VOLUME_HEADER) + CONTROL_WORD_SIZE
-    buf = decompressor.decompress(cbuf[skip:])
+    chunks = [decompressor.decompress(cbuf[skip:])]
     while len(decompressor.unused_data):
         cbuf = decompressor.unused_data
         decompressor = bz2.BZ2Decompressor()
-        buf += decompressor.decompress(cbuf[CONTROL_WORD_SIZE:])
+        chunks.append(decompressor.decompress(cbuf[CONTROL_WORD_SIZE:]))
+    return _join_records(chunks)
+
+
+def _join_records(records):
+    """
+    Join decompressed LDM records into a single preallocated buffer,
+    removing the CTM information from the start of the first record.
+    """
+    records = [memoryview(record) for record in records]
+    records[0] = records[0][COMPRESSION_RECORD_SIZE:]
+    buf = bytearray(sum(len(record) for record in records))
+    pos = 0
+    for record in records:
+        buf[pos:pos + len(record)] = record
+        pos += len(record)
+    return buf
+
+
+def _find_ldm_records(cbuf):
+    """
+    Find the BZ2 compressed LDM records in an Archive 2 file.
+
+    Returns a list of (start, end) tuples giving the location of each
+    compressed record in cbuf or None if the records cannot be located
+    using the control words which precede each record.
+    """
+    records = []
+    pos = _structure_size(VOLUME_HEADER)
+    cbuf_length = len(cbuf)
+    while pos + CONTROL_WORD_SIZE <= cbuf_length:
+        # the size may be negative, the absolute value is the record size
+        size = abs(struct.unpack('>i', cbuf[pos:pos + CONTROL_WORD_SIZE])[0])
+        start = pos + CONTROL_WORD_SIZE
+        end = start + size
+        if end > cbuf_length or cbuf[start:start + 3] != b'BZh':
+            return None
+        records.append((start, end))
+        pos = end
+    if pos != cbuf_length or len(records) == 0:
+        return None
+    return records
+
+
+def _select_ldm_records(cbuf, records, elevation_numbers, decompressed):
+    """
+    Select the LDM records which may contain the given elevation numbers.
+
+    The elevation number of the first radial in a record is found by
+    decompressing the record, these are stored in the decompressed
+    dictionary keyed by the record number.  The elevation numbers of the
+    radials records are assumed to be non-decreasing. All records are
+    selected if the elevation numbers cannot be determined.
+    """
+    all_records = list(range(len(records)))
+
+    def first_elevation_number(i):
+        if i not in decompressed:
+            start, end = records[i]
+            decompressed[i] = bz2.decompress(cbuf[start:end])
+        return _first_elevation_number(decompressed[i])
+
+    if len(records) == 1:
+        return all_records
+    first = min(elevation_numbers)
+    last = max(elevation_numbers)
+
+    # find the first record which starts with an elevation number of at
+    # least first, the record before this may contain the start of the scan.
+    elevation_number = first_elevation_number(1)
+    if elevation_number is None:
+        return all_records
+    lo, hi = 1, len(records)
+    if elevation_number < first:
+        lo = 2
+        while lo < hi:
+            mid = (lo + hi) // 2
+            elevation_number = first_elevation_number(mid)
+            if elevation_number is None:
+                return all_records
+            if elevation_number < first:
+                lo = mid + 1
+            else:
+                hi = mid
+    start = max(lo - 1, 1)
+
+    # select records until one starts after the last elevation number
+    selected = [0]
+    for i in range(start, len(records)):
+        elevation_number = first_elevation_number(i)
+        if elevation_number is None:
+            return all_records
+        if elevation_number > last:
+            break
+        selected.append(i)
+    return selected
+
+
+def _first_elevation_number(record):
+    """
+    Return the elevation number of the first message in a decompressed LDM
+    record or None if the first message is not a message 31 record.
+    """
+    # each record begins with the 12-byte CTM information
+    header_pos = COMPRESSION_RECORD_SIZE
+    msg31_pos = header_pos + _structure_size(MSG_HEADER)
+    if len(record) < msg31_pos + _structure_size(MSG_31):
+        return None
+    header = _unpack_from_buf(record, header_pos, MSG_HEADER)
+    if header['type'] != 31:
+        return None
+    return _unpack_from_buf(record, msg31_pos, MSG_31)['elevation_number']
+
+
+def _find_records_in_buf(buf):
+    """
+    Find the type and location of all records (messages) in a buffer.
+
+    The records are located using the same rules used by
+    :py:func:`_get_record_from_buf` without decoding the records.
+    """
+    msg_header_size = _structure_size(MSG_HEADER)
+    msg_types = []
+    msg_positions = []
+    buf_length = len(buf)
+    pos = 0
+    while pos < buf_length:
+        size, _, msg_type = struct.unpack_from('>HBB', buf, pos)
+        msg_types.append(msg_type)
+        msg_positions.append(pos)
+        if msg_type == 31:
+            pos += msg_header_size + size * 2 - 4
+        else:
+            pos += RECORD_SIZE
+    return (np.array(msg_types, dtype=np.int64),
+            np.array(msg_positions, dtype=np.int64))
 
-    return buf[COMPRESSION_RECORD_SIZE:]
+
+def _msg31_ray_index(buf, positions):
+    """
+    Create a structured array indexing the message 31 records in a buffer.
+    """
+    ubuf = np.frombuffer(buf, dtype='u1')
+    nrays = len(positions)
+    starts = positions + _structure_size(MSG_HEADER)
+    header = _gather_structure(ubuf, starts, MSG_31)
+
+    index = np.zeros(nrays, dtype=RAY_INDEX_DTYPE)
+    index['pos'] = positions
+    for key in RAY_INDEX_HEADER_KEYS:
+        index[key] = header[key]
+
+    # the order of the data blocks varies, match the pointers to the block
+    # names, when a name is repeated the last block is used.
+    nblocks = len(MSG31_DATA_BLOCKS)
+    pointers = np.column_stack(
+        [header['block_pointer_%d' % (i + 1)] for i in range(nblocks)])
+    pointers = pointers.astype(np.int64)
+    valid = pointers > 0
+    name_pos = starts[:, np.newaxis] + np.where(valid, pointers, 0) + 1
+    names = ubuf[name_pos[..., np.newaxis] + np.arange(3)]
+    names = names.view('S3')[..., 0]
+    rays = np.arange(nrays)
+    for block_name in MSG31_DATA_BLOCKS:
+        match = valid & (names == block_name.ljust(3).encode('ascii'))
+        last_match = nblocks - 1 - np.argmax(match[:, ::-1], axis=1)
+        index[block_name] = np.where(
+            match.any(axis=1), pointers[rays, last_match], 0)
+
+    # radial data constants
+    has_rad = index['RAD'] > 0
+    rad = _gather_structure(
+        ubuf, starts[has_rad] + index['RAD'][has_rad], RADIAL_DATA_BLOCK)
+    for key in RAY_INDEX_RAD_KEYS:
+        index[key][has_rad] = rad[key]
+    return index
+
+
+def _strided_runs(starts, lengths):
+    """
+    Find runs of items with equal lengths located at a constant, positive
+    stride.  Returns the index of the first item in each run followed by the
+    total number of items.
+    """
+    strides = np.diff(starts)
+    new_run = np.ones(len(starts), dtype=bool)
+    new_run[1:] = (lengths[1:] != lengths[:-1]) | (strides <= 0)
+    new_run[2:] |= strides[1:] != strides[:-1]
+    return np.append(np.nonzero(new_run)[0], len(starts))
+
+
+def _gather_structure(ubuf, positions, structure):
+    """ Gather structures at positions from a unsigned byte array. """
+    dtype = _structure_dtype(structure)
+    raw = ubuf[positions[:, np.newaxis] + np.arange(dtype.itemsize)]
+    return raw.view(dtype)[:, 0]
+
+
+def _index_array(values):
+    """
+    Convert values from the ray index to the type returned when values
+    decoded from the records are collected into an array.
+    """
+    if values.dtype.kind == 'f':
+        return values.astype(np.float64)
+    return values.astype(np.int64)
 
 
 def _get_record_from_buf(buf, pos):
@@ -614,9 +977,9 @@ def _get_msg31_data_block(buf, ptr):
         ngates = dic['ngates']
         ptr2 = ptr + _structure_size(GENERIC_DATA_BLOCK)
         if block_name == 'PHI':
-            data = np.fromstring(buf[ptr2: ptr2 + ngates * 2], '>u2')
+            data = np.frombuffer(buf[ptr2: ptr2 + ngates * 2], '>u2').copy()
         else:
-            data = np.fromstring(buf[ptr2: ptr2 + ngates], '>u1')
+            data = np.frombuffer(buf[ptr2: ptr2 + ngates], '>u1').copy()
         dic['data'] = data
     else:
         dic = {}
@@ -642,7 +1005,7 @@ def _get_msg1_from_buf(buf, pos, dic):
 
     if msg1_header['sur_pointer']:
         offset = pos + msg_header_size + msg1_header['sur_pointer']
-        data = np.fromstring(buf[offset:offset+sur_nbins], '>u1')
+        data = np.frombuffer(buf[offset:offset+sur_nbins], '>u1').copy()
         dic['REF'] = {
             'ngates': sur_nbins,
             'gate_spacing': sur_step,
@@ -653,7 +1016,7 @@ def _get_msg1_from_buf(buf, pos, dic):
         }
     if msg1_header['vel_pointer']:
         offset = pos + msg_header_size + msg1_header['vel_pointer']
-        data = np.fromstring(buf[offset:offset+doppler_nbins], '>u1')
+        data = np.frombuffer(buf[offset:offset+doppler_nbins], '>u1').copy()
         dic['VEL'] = {
             'ngates': doppler_nbins,
             'gate_spacing': doppler_step,
@@ -667,7 +1030,7 @@ def _get_msg1_from_buf(buf, pos, dic):
             dic['VEL']['scale'] = 1.
     if msg1_header['width_pointer']:
         offset = pos + msg_header_size + msg1_header['width_pointer']
-        data = np.fromstring(buf[offset:offset+doppler_nbins], '>u1')
+        data = np.frombuffer(buf[offset:offset+doppler_nbins], '>u1').copy()
         dic['SW'] = {
             'ngates': doppler_nbins,
             'gate_spacing': doppler_step,
@@ -698,6 +1061,12 @@ def _structure_size(structure):
     return struct.calcsize('>' + ''.join([i[1] for i in structure]))
 
 
+def _structure_dtype(structure):
+    """ Find the NumPy dtype of a structure. """
+    return np.dtype([(name, STRUCTURE_DTYPES.get(fmt, 'S' + fmt[:-1]))
+                     for name, fmt in structure])
+
+
 def _unpack_from_buf(buf, pos, structure):
     """ Unpack a structure from a buffer. """
     size = _structure_size(structure)
@@ -737,6 +1106,19 @@ SINT1 = 'b'
 SINT2 = 'h'
 SINT4 = 'i'
 
+# NumPy equivalent of the structure element formats, strings, 'Ns', map
+# to 'SN'
+STRUCTURE_DTYPES = {
+    'B': 'u1',
+    'H': '>u2',
+    'I': '>u4',
+    'f': '>f4',
+    'd': '>f8',
+    'b': 'i1',
+    'h': '>i2',
+    'i': '>i4',
+}
+
 # Figure 1 in Interface Control Document for the Archive II/User
 # page 7-2
 VOLUME_HEADER = (
@@ -929,3 +1311,28 @@ RADIAL_DATA_BLOCK = (
     ('nyquist_vel', SINT2),
     ('spare', '2s')
 )
+
+# Data blocks which can be found in a message 31 record, in the order
+# typically found in a record.
+MSG31_DATA_BLOCKS = ('VOL', 'ELV', 'RAD', 'REF', 'VEL', 'SW', 'ZDR', 'PHI',
+                     'RHO')
+
+# Structure of the index of message 31 records, contains the position of
+# the record in the buffer, selected elements from the MSG_31 and
+# RADIAL_DATA_BLOCK structures and the pointer to each data block (0 when
+# the block is not present).
+RAY_INDEX_HEADER_KEYS = ('collect_ms', 'collect_date', 'azimuth_number',
+                         'azimuth_angle', 'elevation_number',
+                         'elevation_angle')
+RAY_INDEX_RAD_KEYS = ('unambig_range', 'nyquist_vel')
+RAY_INDEX_DTYPE = np.dtype(
+    [('pos', 'i8'),
+     ('collect_ms', 'u4'),
+     ('collect_date', 'u2'),
+     ('azimuth_number', 'u2'),
+     ('azimuth_angle', 'f4'),
+     ('elevation_number', 'u1'),
+     ('elevation_angle', 'f4'),
+     ('unambig_range', 'i2'),
+     ('nyquist_vel', 'i2')] +
+    [(block_name, 'u4') for block_name in MSG31_DATA_BLOCKS])
@@ -17,8 +17,10 @@ from ..config import FileMetadata, get_fillvalue
 from ..core.radar import Radar
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from .nexrad_level3 import NEXRADLevel3File
+from ..profiling import profiled
 
 
+@profiled
 def read_nexrad_level3(filename, field_names=None, additional_metadata=None,
                        file_field_names=False, exclude_fields=None, **kwargs):
     """
@@ -8,6 +8,7 @@ Write a Py-ART Grid object to a GeoTIFF file.
     :toctree: generated/
 
     write_grid_geotiff
+    _get_level_data
     _get_rgb_values
     _create_sld
 
@@ -20,16 +21,21 @@ import matplotlib.colors as colors
 import os
 import shutil
 from ..exceptions import MissingOptionalDependency
+from ..profiling import profiled
 try:
     from osgeo import gdal
     IMPORT_FLAG = True
 except ImportError:
     IMPORT_FLAG = False
 
+# rows and columns in each tile of tiled GeoTIFFs
+TILE_SIZE = 256
 
+
+@profiled
 def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
                        cmap='viridis', vmin=0, vmax=75, color_levels=None,
-                       warp=False, sld=False):
+                       warp=False, sld=False, tiled=False):
     """
     Write a Py-ART Grid object to a GeoTIFF file.
 
@@ -43,6 +49,8 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
     output an SLD file based on the user-specified inputs. User can specify
     the 2D vertical level to be output. If this is not specified, a 2D
     composite is created. User also can specify the field to output.
+    Multiple fields and levels can be written as the bands of a single
+    GeoTIFF.
 
     This function requires GDAL Python libraries to be installed. These are
     available via conda; e.g., 'conda install gdal'
@@ -53,8 +61,9 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
         Grid object to write to file.
     filename : str
         Filename for the GeoTIFF.
-    field : str
-        Field name to output to file.
+    field : str or list of str
+        Field name to output to file.  When a list is provided each field is
+        written to separate bands, in order.
 
     Other Parameters
     ----------------
@@ -64,9 +73,11 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
         False - Output single-channel, float-valued GeoTIFF. For display,
                 likely will need an SLD file to provide a color table.
 
-    level: int or None, optional
+    level: int, None or list, optional
         Index for z-axis plane to output. None gives composite values
-        (i.e., max in each vertical column).
+        (i.e., max in each vertical column).  A list of indices, which may
+        include None, writes each level of each field to separate bands,
+        the levels of the first field are written first.
     cmap : str or matplotlib.colors.Colormap object, optional
         Colormap to use for RGB output or SLD file.
     vmin : int or float, optional
@@ -89,13 +100,30 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
 
         False - Don't do this.
 
+    tiled : bool, optional
+        True - Output a tiled GeoTIFF. The grid is processed and written
+               TILE_SIZE rows at a time so that only a strip of the output
+               is held in memory, suitable for very large composites.
+
+        False - Output a striped GeoTIFF written in a single pass.
+
     """
     if not IMPORT_FLAG:
         raise MissingOptionalDependency(
             'GDAL not detected, GeoTIFF output failure!')
 
-    if field not in grid.fields.keys():
-        raise KeyError('Failed -', field, 'field not found in Grid object.')
+    if isinstance(field, (list, tuple)):
+        fields = list(field)
+    else:
+        fields = [field]
+    if isinstance(level, (list, tuple)):
+        levels = list(level)
+    else:
+        levels = [level]
+    for field in fields:
+        if field not in grid.fields.keys():
+            raise KeyError(
+                'Failed -', field, 'field not found in Grid object.')
 
     # Determine whether filename template already contains a suffix
     # If not, append an appropriate one.
@@ -105,19 +133,11 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
         ofile = name + "." + end
     else:
         ofile = filename
-    nz, ny, nx = grid.fields[field]['data'].shape
+    nz, ny, nx = grid.fields[fields[0]]['data'].shape
     dist = max(grid.x['data'])
     rangestep = grid.x['data'][1] - grid.x['data'][2]
     lat = grid.origin_latitude['data'][0]
     lon = grid.origin_longitude['data'][0]
-    # Check if masked array; if so, fill missing data
-    filled = np.ma.filled(grid.fields[field]['data'], fill_value=-32768)
-    if level is None:
-        data = np.amax(filled, 0)
-    else:
-        data = filled[level]
-    data = data.astype(float)
-    data[data == -32768] = np.nan
 
     iproj = 'PROJCS["unnamed",GEOGCS["WGS 84",DATUM["unknown",' + \
         'SPHEROID["WGS84",6378137,298.257223563]],' + \
@@ -130,32 +150,52 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
         'PARAMETER["false_northing",0],' + \
         'UNIT["metre",1,AUTHORITY["EPSG","9001"]]]'
     out_driver = gdal.GetDriverByName("GTiff")
+    nbands = len(fields) * len(levels)
+    if tiled:
+        block_rows = TILE_SIZE
+        tile_options = ['TILED=YES', 'BLOCKXSIZE=%d' % TILE_SIZE,
+                        'BLOCKYSIZE=%d' % TILE_SIZE]
+    else:
+        block_rows = ny
+        tile_options = []
 
     # Output dataset depends on rgb flag
     if not rgb:
         # Single-channel, floating-point output
-        dst_options = ['COMPRESS=LZW', 'ALPHA=YES']
+        dst_options = ['COMPRESS=LZW', 'ALPHA=YES'] + tile_options
         dst_ds = out_driver.Create(
-            ofile, data.shape[1], data.shape[0], 1,
-            gdal.GDT_Float32, dst_options)
+            ofile, nx, ny, nbands, gdal.GDT_Float32, dst_options)
     else:
-        # Assign data RGB levels based on value relative to vmax/vmin
-        rarr, garr, barr = _get_rgb_values(
-            data, vmin, vmax, color_levels, cmap)
-        dst_ds = out_driver.Create(ofile, data.shape[1],
-                                   data.shape[0], 3, gdal.GDT_Byte)
+        # Three RGB bands for each field and level
+        dst_ds = out_driver.Create(
+            ofile, nx, ny, 3 * nbands, gdal.GDT_Byte, tile_options)
 
     # Common Projection and GeoTransform
     dst_ds.SetGeoTransform([-dist, -rangestep, 0, dist, 0, rangestep])
     dst_ds.SetProjection(iproj)
 
-    # Final output depends on rgb flag
-    if not rgb:
-        dst_ds.GetRasterBand(1).WriteArray(data[::-1, :])
-    else:
-        dst_ds.GetRasterBand(1).WriteArray(rarr[::-1, :])
-        dst_ds.GetRasterBand(2).WriteArray(garr[::-1, :])
-        dst_ds.GetRasterBand(3).WriteArray(barr[::-1, :])
+    # Output rows are written from the north, the last row of the grid, in
+    # blocks which match the tiles when the output is tiled
+    for yoff in range(0, ny, block_rows):
+        start = max(ny - yoff - block_rows, 0)
+        stop = ny - yoff
+        band = 1
+        for field in fields:
+            for level in levels:
+                data = _get_level_data(
+                    grid.fields[field]['data'], level, start, stop)
+                # Final output depends on rgb flag
+                if not rgb:
+                    arrays = [data]
+                else:
+                    # Assign data RGB levels based on value relative to
+                    # vmax/vmin
+                    arrays = _get_rgb_values(
+                        data, vmin, vmax, color_levels, cmap)
+                for array in arrays:
+                    dst_ds.GetRasterBand(band).WriteArray(
+                        array[::-1, :], 0, yoff)
+                    band += 1
     dst_ds.FlushCache()
     dst_ds = None
 
@@ -171,6 +211,23 @@ def write_grid_geotiff(grid, filename, field, rgb=False, level=None,
         shutil.move(ofile+'_tmp.tif', ofile)
 
 
+def _get_level_data(fdata, level, start, stop):
+    """
+    Return rows start to stop of a level of a field, or of the composite
+    of the field when level is None, as floats with missing data as
+    numpy.nan.
+    """
+    # Check if masked array; if so, fill missing data
+    if level is None:
+        filled = np.ma.filled(fdata[:, start:stop], fill_value=-32768)
+        data = np.amax(filled, 0)
+    else:
+        data = np.ma.filled(fdata[level, start:stop], fill_value=-32768)
+    data = data.astype(float)
+    data[data == -32768] = np.nan
+    return data
+
+
 def _get_rgb_values(data, vmin, vmax, color_levels, cmap):
     """
     Get RGB values for later output to GeoTIFF, given a 2D data field,
@@ -201,32 +258,22 @@ def _get_rgb_values(data, vmin, vmax, color_levels, cmap):
         Green channel indices (range = 0-255)
 
     """
-    frac = (data - vmin) / np.float(vmax-vmin)
+    frac = (data - vmin) / float(vmax-vmin)
     if color_levels is None:
         color_levels = 255
-    index = (frac * color_levels).ravel()
+    index = frac * color_levels
+    missing = np.isnan(index)
     # Out-of-bounds values will be lowest/highest colors
-    index[index < 0] = 0
-    index[index > 255] = 255
-    rarr = []
-    garr = []
-    barr = []
+    index = np.round(np.clip(np.where(missing, 0, index), 0, 255))
+
+    # Colors of the 256 possible indices, looked up for all values at once
     cmap = plt.cm.get_cmap(cmap)
-    for val in index:
-        if not np.isnan(val):
-            ind = np.int(np.round(val))
-            r, g, b, t = cmap(ind)
-            rarr.append(np.int(np.round(r * 255)))
-            garr.append(np.int(np.round(g * 255)))
-            barr.append(np.int(np.round(b * 255)))
-        else:
-            rarr.append(np.nan)
-            garr.append(np.nan)
-            barr.append(np.nan)
-    rarr = np.reshape(rarr, data.shape)
-    garr = np.reshape(garr, data.shape)
-    barr = np.reshape(barr, data.shape)
-    return rarr, garr, barr
+    lut = np.round(cmap(np.arange(256))[:, :3] * 255).astype(int)
+    rgb = lut[index.astype(int)]
+    if missing.any():
+        rgb = rgb.astype(float)
+        rgb[missing] = np.nan
+    return rgb[..., 0], rgb[..., 1], rgb[..., 2]
 
 
 def _create_sld(cmap, vmin, vmax, filename, color_levels=None):
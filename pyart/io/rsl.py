@@ -34,8 +34,10 @@ from ..core.radar import Radar
 from .common import make_time_unit_str
 from ..lazydict import LazyLoadDict
 from ..exceptions import MissingOptionalDependency
+from ..profiling import profiled
 
 
+@profiled
 def read_rsl(filename, field_names=None, additional_metadata=None,
              file_field_names=False, exclude_fields=None,
              delay_field_loading=False,
@@ -81,6 +81,10 @@ def configuration(parent_package='', top_path=None):
                          sources=['nexrad_interpolate.c'],
                          include_dirs=[get_include()])
 
+    config.add_extension('_mdv_rle',
+                         sources=['_mdv_rle.c'],
+                         include_dirs=[get_include()])
+
     return config
 
 if __name__ == '__main__':
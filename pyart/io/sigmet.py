@@ -30,10 +30,12 @@ from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from ._sigmetfile import SigmetFile, bin4_to_angle, bin2_to_angle
 from . import _sigmet_noaa_hh
 from ..util import mean_of_two_angles_deg
+from ..profiling import profiled
 
 SPEED_OF_LIGHT = 299793000.0
 
 
+@profiled
 def read_sigmet(filename, field_names=None, additional_metadata=None,
                 file_field_names=False, exclude_fields=None,
                 time_ordered='none', full_xhdr=None, noaa_hh_hdr=None,
@@ -281,6 +281,43 @@ def test_write_ppi():
         dset.close()
 
 
+def test_write_ppi_chunked_parallel():
+    # fields written by sweep sized chunks using worker threads
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_ppi_chunked.nc'
+        radar = pyart.io.read_cfradial(pyart.testing.CFRADIAL_PPI_FILE)
+        pyart.io.write_cfradial(
+            tmpfile, radar, chunk_by_sweep=True, n_workers=2)
+        ref = netCDF4.Dataset(pyart.testing.CFRADIAL_PPI_FILE)
+        dset = netCDF4.Dataset(tmpfile)
+        check_dataset_to_ref(dset, ref)
+        assert dset.variables['reflectivity_horizontal'].chunking() == [
+            40, 42]
+        dset.close()
+
+
+def test_write_ppi_pack_dtype():
+    with pyart.testing.InTemporaryDirectory():
+        tmpfile = 'tmp_ppi_packed.nc'
+        radar = pyart.io.read_cfradial(pyart.testing.CFRADIAL_PPI_FILE)
+        field = 'reflectivity_horizontal'
+        radar.fields[field]['data'][0, 0] = np.ma.masked
+        pyart.io.write_cfradial(
+            tmpfile, radar, pack_dtype={field: 'int16'}, n_workers=2)
+        assert 'scale_factor' not in radar.fields[field]
+
+        radar2 = pyart.io.read_cfradial(tmpfile)
+        dset = netCDF4.Dataset(tmpfile)
+        assert dset.variables[field].dtype == np.dtype('int16')
+        dset.close()
+        data = radar.fields[field]['data']
+        data2 = radar2.fields[field]['data']
+        assert data2[0, 0] is np.ma.masked
+        assert_array_equal(np.ma.getmaskarray(data),
+                           np.ma.getmaskarray(data2))
+        assert np.ma.allclose(data, data2, atol=0.01)
+
+
 def test_write_ppi_unicode():
     # GitHub issue #381, unicode dtypes cause write to fail
     # CF/Radial example file -> Radar object -> netCDF file
@@ -547,3 +584,42 @@ def test_calculate_scale_and_offset():
         pyart.io.cfradial._calculate_scale_and_offset(
             {'data': data}, np.dtype('u1'), 100, 100)
         assert len(w) == 1
+
+
+def test_unpack_variable_gate_field_dic():
+    # rays are stored out of order, the third ray has no gates
+    ray_n_gates = np.array([2, 3, 0, 1])
+    ray_start_index = np.array([4, 0, 3, 3])
+    fdata = np.ma.array([10, 11, 12, 30, 0, 1], mask=[0, 1, 0, 0, 0, 0])
+    dic = {'data': fdata}
+    pyart.io.cfradial._unpack_variable_gate_field_dic(
+        dic, (4, 3), ray_n_gates, ray_start_index)
+
+    data = dic['data']
+    assert isinstance(data, MaskedArray)
+    assert_array_equal(data.filled(-1), [[0, 1, -1], [10, -1, 12],
+                                         [-1, -1, -1], [30, -1, -1]])
+
+    # rays in order with all gates are reshaped without masked gates
+    unpacker = pyart.io.cfradial._VariableGateUnpacker(
+        (2, 3), [3, 3], [0, 3])
+    data = unpacker(np.arange(6))
+    assert_array_equal(data, [[0, 1, 2], [3, 4, 5]])
+    assert not np.ma.is_masked(data)
+
+
+def test_ncvar_to_dict_variable_gates_lazy():
+    with pyart.testing.InTemporaryDirectory():
+        dset = netCDF4.Dataset('tmp_n_points.nc', mode='w')
+        dset.createDimension('n_points', 5)
+        ncvar = dset.createVariable('foo', 'f4', ('n_points', ))
+        ncvar[:] = np.arange(5)
+
+        unpacker = pyart.io.cfradial._VariableGateUnpacker(
+            (2, 3), np.array([3, 2]), np.array([0, 3]))
+        dic = pyart.io.cfradial._ncvar_to_dict(ncvar, True, unpacker)
+        assert isinstance(dic, pyart.lazydict.LazyLoadDict)
+        data = dic['data']
+        assert data.shape == (2, 3)
+        assert_array_equal(data.filled(-1), [[0, 1, 2], [3, 4, -1]])
+        dset.close()
@@ -309,3 +309,44 @@ def test_read_chl_time():
 
     cfile = pyart.io.chl.ChlFile(pyart.testing.CHL_RHI_FILE, ns_time=False)
     assert cfile.time[1] == 1341529304
+
+
+def test_read_chl_delay_field_loading():
+    lazy_radar = pyart.io.read_chl(
+        pyart.testing.CHL_RHI_FILE, delay_field_loading=True)
+    assert isinstance(lazy_radar.fields['reflectivity'],
+                      pyart.lazydict.LazyLoadDict)
+    for field in radar.fields:
+        data = lazy_radar.fields[field]['data']
+        ref_data = radar.fields[field]['data']
+        assert np.array_equal(data.data, ref_data.data)
+        assert np.array_equal(np.ma.getmaskarray(data),
+                              np.ma.getmaskarray(ref_data))
+        assert data.fill_value == ref_data.fill_value
+
+
+def test_chl_file_delay_field_loading():
+    cfile = pyart.io.chl.ChlFile(pyart.testing.CHL_RHI_FILE)
+    assert isinstance(cfile.fields, dict)
+    lazy_cfile = pyart.io.chl.ChlFile(
+        pyart.testing.CHL_RHI_FILE, delay_field_loading=True)
+    assert isinstance(lazy_cfile.fields, pyart.lazydict.LazyLoadDict)
+    assert sorted(lazy_cfile.fields.keys()) == sorted(cfile.field_nums)
+    lazy_cfile.close()
+    for field_num in cfile.field_nums:
+        data = lazy_cfile.fields[field_num]
+        assert data.shape == (2, 800)
+        assert np.array_equal(data, cfile.fields[field_num])
+    cfile.close()
+
+
+def test_chl_file_ray_headers():
+    with open(pyart.testing.CHL_RHI_FILE, 'rb') as fh:
+        cfile = pyart.io.chl.ChlFile(fh, debug=True)
+    ray_packets = [p for p in cfile._packets if p is not None and
+                   p['block_id'] == pyart.io.chl.ARCH_ID_RAY_HDR]
+    assert len(ray_packets) == 2
+    for i, packet in enumerate(ray_packets):
+        assert_almost_equal(cfile.azimuth[i], packet['azimuth'])
+        assert_almost_equal(cfile.elevation[i], packet['elevation'])
+        assert cfile._ray_headers['time'][i] == packet['time']
@@ -3,6 +3,7 @@
 from __future__ import print_function
 
 import warnings
+import zlib
 from datetime import datetime
 from io import BytesIO
 
@@ -312,6 +313,75 @@ def test_read_all_fields_on_creation():
     mdvfile2.close()
 
 
+def test_read_fields_threaded():
+    # write a grid with several fields and levels, read it back in threads
+    grid = pyart.testing.make_target_grid()
+    grid.fields['reflectivity2'] = {
+        'data': grid.fields['reflectivity']['data'] * 2.}
+    inmemfile = BytesIO()
+    pyart.io.write_grid_mdv(inmemfile, grid, mdv_field_names={
+        'reflectivity': 'DBZ', 'reflectivity2': 'DBZ2'})
+
+    inmemfile.seek(0)
+    serial = MdvFile(inmemfile, read_fields=True)
+    inmemfile.seek(0)
+    threaded = MdvFile(inmemfile, n_threads=4)
+    assert threaded.fields_data == [None, None]
+    threaded.read_fields([1])
+    assert threaded.fields_data[0] is None
+    threaded.read_all_fields()
+    for field_data, ref in zip(threaded.fields_data, serial.fields_data):
+        assert field_data.shape == (2, 400, 320)
+        assert np.array_equal(field_data, ref)
+    # fields of the same shape share a volume array
+    assert threaded.fields_data[0].base is not None
+
+
+def test_read_fields_decode_error():
+    # a failed decode must not leave partially decoded fields in the object
+    mdvfile = MdvFile(pyart.testing.MDV_PPI_FILE)
+    decode_level = pyart.io.mdv_common._decode_level
+
+    def bad_decode_level(field_header, compr_info, compr_data, out):
+        out[:] = -9999.
+        raise zlib.error('Error -3 while decompressing data')
+
+    pyart.io.mdv_common._decode_level = bad_decode_level
+    try:
+        assert_raises(zlib.error, mdvfile.read_a_field, 0)
+    finally:
+        pyart.io.mdv_common._decode_level = decode_level
+    assert mdvfile.fields_data[0] is None
+
+    sweeps = mdvfile.read_a_field(0)
+    assert sweeps.shape == (1, 360, 110)
+    assert_almost_equal(sweeps[0, 1, 2], 13.19, 2)
+    mdvfile.close()
+
+
+def test_read_mdv_n_threads():
+    radar = pyart.io.read_mdv(pyart.testing.MDV_PPI_FILE)
+    radar2 = pyart.io.read_mdv(pyart.testing.MDV_PPI_FILE, n_threads=2)
+    for field in radar.fields:
+        assert np.ma.allequal(
+            radar.fields[field]['data'], radar2.fields[field]['data'])
+
+
+def test_decode_rle8():
+    key = 0xff
+    encoded = np.array([1, 2, key, 4, 7, 3, key, 0, 9, 5],
+                       dtype='uint8').tobytes()
+    decoded = pyart.io.mdv_common._decode_rle8(encoded, key, 9)
+    assert decoded.dtype == np.uint8
+    assert list(decoded) == [1, 2, 7, 7, 7, 7, 3, 5, 0]
+
+    # runs past the decoded size or truncated runs are invalid
+    assert_raises(ValueError, pyart.io.mdv_common._decode_rle8,
+                  encoded, key, 4)
+    assert_raises(ValueError, pyart.io.mdv_common._decode_rle8,
+                  encoded[:-2], key, 9)
+
+
 def test_mdvfile_radar_stubs():
     mdvfile = pyart.io.mdv_common.MdvFile(None)
     # These methods are included in MdvFile as a stub for a future
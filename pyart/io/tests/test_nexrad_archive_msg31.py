@@ -283,3 +283,18 @@ def test_compressed_archive():
     assert_almost_equal(rdata[2, 0], 9.5, 1)
     assert 'velocity' not in radar.fields.keys()
     assert 'spectrum_width' not in radar.fields.keys()
+
+
+def test_read_scans():
+    radar_scans = pyart.io.read_nexrad_archive(
+        pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE, scans=[4, 5],
+        field_names={'REF': 'reflectivity'})
+    assert radar_scans.nsweeps == 2
+    assert list(radar_scans.fields.keys()) == ['reflectivity']
+    start = radar.sweep_start_ray_index['data'][4]
+    end = radar.sweep_end_ray_index['data'][5] + 1
+    ngates = radar_scans.ngates
+    assert_almost_equal(radar_scans.azimuth['data'],
+                        radar.azimuth['data'][start:end])
+    ref = radar.fields['reflectivity']['data'][start:end, :ngates]
+    assert_almost_equal(radar_scans.fields['reflectivity']['data'], ref)
@@ -2,6 +2,7 @@
 
 import datetime
 import bz2
+import struct
 from io import BytesIO
 
 import numpy as np
@@ -223,6 +224,106 @@ def test_scan_info():
     assert scan_info[15]['ngates'] == [240, 240, 240, 240, 240, 240]
 
 
+def test_lazy_file():
+    uncompressed_file = bz2.BZ2File(
+        pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE, 'rb')
+    lfile = nexrad_level2.NEXRADLevel2File(uncompressed_file, lazy=True)
+    lfile.close()
+
+    assert len(lfile.radial_records) == 7200
+    assert lfile.nscans == 16
+    assert_array_equal(lfile.scan_msgs[10], nfile.scan_msgs[10])
+    assert lfile.scan_info() == nfile.scan_info()
+    assert lfile.location() == nfile.location()
+    assert lfile.radial_records[10]['REF']['ngates'] == 1832
+
+    time_start, times = lfile.get_times()
+    assert time_start == nfile.get_times()[0]
+    assert_array_equal(times, nfile.get_times()[1])
+    for method in ['get_azimuth_angles', 'get_elevation_angles',
+                   'get_target_angles', 'get_nyquist_vel',
+                   'get_unambigous_range']:
+        angles = getattr(lfile, method)()
+        assert angles.dtype == getattr(nfile, method)().dtype
+        assert_array_equal(angles, getattr(nfile, method)())
+
+    for moment in ['REF', 'VEL', 'SW', 'ZDR', 'PHI', 'RHO']:
+        for raw_data in [True, False]:
+            data = lfile.get_data(moment, 1832, [0, 1, 4], raw_data)
+            ref = nfile.get_data(moment, 1832, [0, 1, 4], raw_data)
+            assert data.dtype == ref.dtype
+            assert_array_equal(np.ma.getmaskarray(data),
+                               np.ma.getmaskarray(ref))
+            assert_array_equal(data, ref)
+
+
+def _make_multiple_record_file():
+    # create a compressed file with 120 radials in each LDM record from
+    # the uncompressed test file.
+    uncompressed_file = bz2.BZ2File(
+        pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE, 'rb')
+    data = uncompressed_file.read()
+    uncompressed_file.close()
+    msg_types, positions = nexrad_level2._find_records_in_buf(data[36:])
+    bounds = list(positions) + [len(data) - 24]
+    first_radial = np.argmax(msg_types == 31)
+    groups = [(0, first_radial)] + [
+        (i, min(i + 120, len(positions)))
+        for i in range(first_radial, len(positions), 120)]
+
+    compressed_file = BytesIO()
+    compressed_file.write(data[:24])
+    for start, end in groups:
+        record = bz2.compress(data[24 + bounds[start]:24 + bounds[end]], 1)
+        compressed_file.write(struct.pack('>i', len(record)))
+        compressed_file.write(record)
+    compressed_file.seek(0)
+    return compressed_file
+
+
+def test_partial_decompression():
+    compressed_file = _make_multiple_record_file()
+    records = nexrad_level2._find_ldm_records(compressed_file.getvalue())
+    assert len(records) == 62
+
+    # all records
+    mfile = nexrad_level2.NEXRADLevel2File(compressed_file)
+    assert len(mfile.radial_records) == 7200
+    assert_array_equal(mfile.get_data('REF', 1832),
+                       nfile.get_data('REF', 1832))
+
+    for scans in [[0], [2, 3], [15]]:
+        compressed_file.seek(0)
+        sfile = nexrad_level2.NEXRADLevel2File(
+            compressed_file, lazy=True, scans=scans)
+        assert len(sfile.radial_records) < 7200
+        assert sfile.scan_info(scans) == nfile.scan_info(scans)
+        assert_array_equal(sfile.get_azimuth_angles(scans),
+                           nfile.get_azimuth_angles(scans))
+        assert_array_equal(sfile.get_data('REF', 1832, scans),
+                           nfile.get_data('REF', 1832, scans))
+
+
+def test_decompress_records():
+    compressed_file = _make_multiple_record_file()
+    buf = nexrad_level2._decompress_records(compressed_file)
+    buf_threaded = nexrad_level2._decompress_records(
+        compressed_file, n_threads=4)
+    assert buf_threaded == buf
+
+    uncompressed_file = bz2.BZ2File(
+        pyart.testing.NEXRAD_ARCHIVE_MSG31_FILE, 'rb')
+    assert buf == uncompressed_file.read()[36:]
+    uncompressed_file.close()
+
+    # zero the control words, the chained streams are decompressed
+    cbuf = bytearray(compressed_file.getvalue())
+    for start, end in nexrad_level2._find_ldm_records(bytes(cbuf)):
+        cbuf[start - 4:start] = b'\x00\x00\x00\x00'
+    assert nexrad_level2._find_ldm_records(bytes(cbuf)) is None
+    assert nexrad_level2._decompress_records(BytesIO(bytes(cbuf))) == buf
+
+
 # create a NEXRADLevel2File from a COMPRESSED file
 # pyart/testing/data/example_nexrad_archive_compressed.ar2v
 COMPRESSED_FILE = pyart.testing.NEXRAD_ARCHIVE_MSG31_COMPRESSED_FILE
@@ -326,6 +427,29 @@ def test_compressed_scan_info():
     assert scan_info[0]['nrays'] == 120
 
 
+def test_compressed_get_data_matches_records():
+    for moment in ['REF', 'ZDR', 'PHI', 'RHO']:
+        data = cfile.get_data(moment, 1832, [0], True)
+        for i, msg in enumerate(cfile.radial_records):
+            ngates = msg[moment]['ngates']
+            assert_array_equal(data[i, :ngates], msg[moment]['data'])
+            assert np.all(data[i, ngates:] == 1)
+
+        offset = np.float32(cfile.radial_records[0][moment]['offset'])
+        scale = np.float32(cfile.radial_records[0][moment]['scale'])
+        scaled_data = cfile.get_data(moment, 1832, [0])
+        assert scaled_data.dtype == np.float32
+        assert_array_equal(scaled_data.mask, data <= 1)
+        assert_array_equal(scaled_data.data, (data - offset) / scale)
+
+
+def test_strided_runs():
+    starts = np.array([0, 10, 20, 30, 45, 60, 75, 80, 85, 90])
+    lengths = np.array([5, 5, 5, 5, 5, 5, 5, 5, 3, 3])
+    runs = nexrad_level2._strided_runs(starts, lengths)
+    assert_array_equal(runs, [0, 4, 7, 8, 10])
+
+
 def test_bad_compression_header():
 
     # read the beginning of the compressed file
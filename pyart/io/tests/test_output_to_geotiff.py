@@ -6,7 +6,7 @@ import pyart
 
 import numpy as np
 from numpy.testing.decorators import skipif
-from numpy.testing import assert_raises
+from numpy.testing import assert_raises, assert_array_equal
 
 
 # TODO : inspect the output file to verify their contents, currently only the
@@ -24,6 +24,30 @@ def test__get_rgb_values_nan():
     assert np.isnan(garr[5])
 
 
+def test__get_rgb_values():
+    data = np.array([[-10., 0., 10.], [37.5, 75., 100.]])
+    rarr, garr, barr = pyart.io.output_to_geotiff._get_rgb_values(
+        data, 0, 75, None, 'jet')
+    assert rarr.shape == (2, 3)
+    assert rarr.dtype.kind == 'i'
+    cmap = pyart.io.output_to_geotiff.plt.cm.get_cmap('jet')
+    for value, r, g, b in zip(data.flat, rarr.flat, garr.flat, barr.flat):
+        index = int(np.round(min(max(value / 75. * 255, 0), 255)))
+        color = cmap(index)
+        assert r == int(np.round(color[0] * 255))
+        assert g == int(np.round(color[1] * 255))
+        assert b == int(np.round(color[2] * 255))
+
+
+def test__get_rgb_values_color_levels():
+    data = np.array([0., 1., 2., 3., 4., 5.])
+    rarr, garr, barr = pyart.io.output_to_geotiff._get_rgb_values(
+        data, 0, 5, 5, 'jet')
+    cmap = pyart.io.output_to_geotiff.plt.cm.get_cmap('jet')
+    for i in range(6):
+        assert rarr[i] == int(np.round(cmap(i)[0] * 255))
+
+
 def test_raise_missingoptionaldepedency():
     backup = bool(pyart.io.output_to_geotiff.IMPORT_FLAG)
     pyart.io.output_to_geotiff.IMPORT_FLAG = False
@@ -121,3 +145,179 @@ def test_write_grid_geotiff_missing_field():
     grid = make_tiny_grid()
     assert_raises(
         KeyError, pyart.io.write_grid_geotiff, grid, 'test.foo', 'foobar')
+
+
+@skipif(not pyart.io.output_to_geotiff.IMPORT_FLAG)
+def test_write_grid_geotiff_tiled():
+    grid = make_tiny_grid()
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_grid_geotiff(
+            grid, 'test.tif', 'reflectivity', tiled=True)
+        dataset = pyart.io.output_to_geotiff.gdal.Open('test.tif')
+        data = dataset.GetRasterBand(1).ReadAsArray()
+        dataset = None
+    assert data.shape == (10, 8)
+    assert np.allclose(data[::-1], grid.fields['reflectivity']['data'][1])
+
+
+@skipif(not pyart.io.output_to_geotiff.IMPORT_FLAG)
+def test_write_grid_geotiff_multiple_bands():
+    grid = make_tiny_grid()
+    grid.fields['reflectivity_copy'] = grid.fields['reflectivity']
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_grid_geotiff(
+            grid, 'test.tif', ['reflectivity', 'reflectivity_copy'],
+            level=[0, None])
+        dataset = pyart.io.output_to_geotiff.gdal.Open('test.tif')
+        assert dataset.RasterCount == 4
+        level0 = dataset.GetRasterBand(1).ReadAsArray()
+        composite = dataset.GetRasterBand(2).ReadAsArray()
+        dataset = None
+    fdata = grid.fields['reflectivity']['data']
+    assert np.allclose(level0[::-1], fdata[0])
+    assert np.allclose(composite[::-1], fdata.max(axis=0))
+
+    with pyart.testing.InTemporaryDirectory():
+        pyart.io.write_grid_geotiff(
+            grid, 'test.tif', ['reflectivity', 'reflectivity_copy'],
+            rgb=True)
+        dataset = pyart.io.output_to_geotiff.gdal.Open('test.tif')
+        assert dataset.RasterCount == 6
+        dataset = None
+
+
+class _RecordingBand(object):
+    """ Raster band of a stand-in GDAL dataset, records the writes. """
+
+    def __init__(self, nx, ny, writes):
+        self.data = np.full((ny, nx), -1.)
+        self.writes = writes
+
+    def WriteArray(self, array, xoff=0, yoff=0):
+        ny, nx = array.shape
+        self.data[yoff:yoff + ny, xoff:xoff + nx] = array
+        self.writes.append((self, yoff, ny))
+
+
+class _RecordingDataset(object):
+    """ Stand-in for a GDAL dataset which records the writes to its bands. """
+
+    def __init__(self, filename, nx, ny, nbands, dtype, options):
+        self.options = options
+        self.writes = []
+        self.bands = [_RecordingBand(nx, ny, self.writes)
+                      for i in range(nbands)]
+
+    def GetRasterBand(self, band):
+        return self.bands[band - 1]
+
+    def SetGeoTransform(self, transform):
+        pass
+
+    def SetProjection(self, projection):
+        pass
+
+    def FlushCache(self):
+        pass
+
+
+class _RecordingGdal(object):
+    """ Stand-in for the gdal module, keeps the datasets created. """
+    GDT_Float32 = 'float32'
+    GDT_Byte = 'uint8'
+
+    def __init__(self):
+        self.datasets = []
+
+    def GetDriverByName(self, name):
+        return self
+
+    def Create(self, *args):
+        dataset = _RecordingDataset(*args)
+        self.datasets.append(dataset)
+        return dataset
+
+
+def _write_recorded_geotiff(grid, field, **kwargs):
+    """ Write a GeoTIFF with a tile size of 16 using a stand-in gdal. """
+    module = pyart.io.output_to_geotiff
+    backup = (module.IMPORT_FLAG, getattr(module, 'gdal', None),
+              module.TILE_SIZE)
+    fake_gdal = _RecordingGdal()
+    module.IMPORT_FLAG = True
+    module.gdal = fake_gdal
+    module.TILE_SIZE = 16
+    try:
+        pyart.io.write_grid_geotiff(grid, 'test.tif', field, **kwargs)
+    finally:
+        module.IMPORT_FLAG, module.gdal, module.TILE_SIZE = backup
+    assert len(fake_gdal.datasets) == 1
+    return fake_gdal.datasets[0]
+
+
+def make_tall_grid():
+    """ Make a grid with two fields with more rows than a 16 row tile. """
+    grid_shape = (3, 40, 7)
+    grid_limits = ((0, 1000), (-400000, 400000), (-300000, 300000))
+    grid = pyart.testing.make_empty_grid(grid_shape, grid_limits)
+    fdata = np.ma.masked_array(
+        np.arange(3 * 40 * 7, dtype='float32').reshape(3, 40, 7) % 71.)
+    fdata[1, 5:25, 3] = np.ma.masked
+    grid.fields = {
+        'reflectivity': {'data': fdata},
+        'reflectivity2': {'data': fdata[::-1] * 0.5}}
+    return grid
+
+
+def test_write_grid_geotiff_tiled_strips():
+    grid = make_tall_grid()
+    dataset = _write_recorded_geotiff(
+        grid, ['reflectivity', 'reflectivity2'], level=[1, None], tiled=True)
+    assert 'TILED=YES' in dataset.options
+    assert 'BLOCKYSIZE=16' in dataset.options
+
+    # the bands of each strip are written before the next strip, from the
+    # northern most rows
+    bands = dataset.bands
+    assert len(bands) == 4
+    assert [(yoff, ny) for band, yoff, ny in dataset.writes] == (
+        [(0, 16)] * 4 + [(16, 16)] * 4 + [(32, 8)] * 4)
+    assert [band for band, yoff, ny in dataset.writes] == bands * 3
+
+    # bands are ordered by field then level
+    for band, (field, level) in zip(bands, [
+            ('reflectivity', 1), ('reflectivity', None),
+            ('reflectivity2', 1), ('reflectivity2', None)]):
+        fdata = grid.fields[field]['data']
+        if level is None:
+            expected = fdata.max(axis=0)
+        else:
+            expected = fdata[level]
+        assert_array_equal(band.data, expected.filled(np.nan)[::-1])
+
+    # output is identical to a striped GeoTIFF
+    striped = _write_recorded_geotiff(
+        grid, ['reflectivity', 'reflectivity2'], level=[1, None])
+    assert 'TILED=YES' not in striped.options
+    assert [(yoff, ny) for band, yoff, ny in striped.writes] == [(0, 40)] * 4
+    for band, striped_band in zip(bands, striped.bands):
+        assert_array_equal(band.data, striped_band.data)
+
+
+def test_write_grid_geotiff_tiled_strips_rgb():
+    grid = make_tall_grid()
+    dataset = _write_recorded_geotiff(
+        grid, ['reflectivity', 'reflectivity2'], level=1, rgb=True,
+        vmin=0, vmax=70, tiled=True)
+    bands = dataset.bands
+    assert len(bands) == 6
+    assert [(yoff, ny) for band, yoff, ny in dataset.writes] == (
+        [(0, 16)] * 6 + [(16, 16)] * 6 + [(32, 8)] * 6)
+
+    # three colour bands for each field, missing data is NaN
+    for i, field in enumerate(['reflectivity', 'reflectivity2']):
+        data = grid.fields[field]['data'][1].filled(np.nan)
+        rgb = pyart.io.output_to_geotiff._get_rgb_values(
+            data, 0, 70, None, 'viridis')
+        for band, expected in zip(bands[3 * i:3 * i + 3], rgb):
+            assert_array_equal(band.data, expected[::-1])
@@ -1,5 +1,6 @@
 """ Unit Tests for Py-ART's io/uf.py and io/uffile.py modules. """
 
+import mmap
 from datetime import datetime
 try:
     from StringIO import StringIO
@@ -177,3 +178,55 @@ def test_range_start_nonzero():
     radar2 = pyart.io.read_uf(in_mem)
     assert_almost_equal(radar2.range['meters_to_center_of_first_gate'], 1530)
     assert_almost_equal(radar2.range['data'][0], 1530)
+
+
+def _compare_ufiles(ufile, ref):
+    assert ufile.nrays == ref.nrays
+    assert ufile.nsweeps == ref.nsweeps
+    for method in ['get_azimuths', 'get_elevations', 'get_sweep_rates',
+                   'get_pulse_widths', 'get_prts', 'get_nyquists',
+                   'get_sweep_fixed_angles', 'get_sweep_polarizations']:
+        data = getattr(ufile, method)()
+        ref_data = getattr(ref, method)()
+        assert data.dtype == ref_data.dtype
+        assert np.array_equal(data, ref_data)
+    assert ufile.get_datetimes() == ref.get_datetimes()
+    for field_number in range(len(ref.rays[0].field_positions)):
+        data = ufile.get_field_data(field_number)
+        ref_data = ref.get_field_data(field_number)
+        assert np.array_equal(data.data, ref_data.data)
+        assert np.array_equal(data.mask, ref_data.mask)
+
+
+def test_indexed():
+    with open(pyart.testing.UF_FILE, 'rb') as fh:
+        data = fh.read() * 3
+    ufile = UFFile(StringIO(data), indexed=True)
+    assert ufile._buf is not None
+    assert ufile.nrays == 3
+    assert len(ufile.rays) == 3
+    assert isinstance(ufile.rays[-1], UFRay)
+    _compare_ufiles(ufile, UFFile(StringIO(data)))
+
+
+def test_indexed_mmap():
+    ufile = UFFile(pyart.testing.UF_FILE, indexed=True)
+    assert isinstance(ufile._buf, mmap.mmap)
+    _compare_ufiles(ufile, UFFile(pyart.testing.UF_FILE))
+    ufile.close()
+
+
+def test_indexed_truncated():
+    # records which cannot be indexed are read ray by ray
+    with open(pyart.testing.UF_FILE, 'rb') as fh:
+        data = fh.read() * 2
+    data = data[:-100]
+    ufile = UFFile(StringIO(data), indexed=True)
+    assert ufile._buf is None
+    assert ufile.nrays == 2
+    _compare_ufiles(ufile, UFFile(StringIO(data)))
+
+
+def test_indexed_raises_ioerror():
+    fake_bad_file = StringIO(b'XXXXXXXX')
+    assert_raises(IOError, UFFile, fake_bad_file, indexed=True)
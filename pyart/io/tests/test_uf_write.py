@@ -397,3 +397,56 @@ def test_range_start():
     field_header = ufile.rays[0].field_headers[0]
     assert field_header['range_start_km'] == 1
     assert field_header['range_start_m'] == 500
+
+
+def test_make_volume():
+    radar = pyart.testing.make_target_radar()
+    radar.range['meters_to_center_of_first_gate'] = 0.
+    radar.range['meters_between_gates'] = 1000.
+    refl = np.ma.masked_less(radar.fields['reflectivity']['data'], 10)
+    radar.fields['reflectivity']['data'] = refl
+    radar.add_field_like('reflectivity', 'velocity', refl / 5.)
+    radar.azimuth['data'] = radar.azimuth['data'] + 0.3
+    radar.instrument_parameters = {
+        'nyquist_velocity': {'data': np.linspace(10, 20, radar.nrays)},
+        'prt': {'data': np.full(radar.nrays, 1e-3, dtype='float32')},
+        'polarization_mode': {'data': np.array(['vertical'])},
+    }
+    field_mapping = {'reflectivity': 'DZ', 'velocity': 'VR'}
+    ufraycreator = UFRayCreator(
+        radar, field_mapping, ['reflectivity', 'velocity'])
+    records = ufraycreator.make_volume()
+    assert len(records) == radar.nrays
+
+    pad = struct.pack(b'>i', ufraycreator.record_length * 2)
+    ref = b''.join([pad + ufraycreator.make_ray(i) + pad
+                    for i in range(radar.nrays)])
+    assert records.view('u1').tobytes() == ref
+
+    in_mem = StringIO()
+    write_uf(in_mem, radar, uf_field_names=field_mapping,
+             field_write_order=['reflectivity', 'velocity'])
+    assert in_mem.getvalue() == ref
+
+
+def test_make_volume_header_overflow():
+    radar = pyart.testing.make_target_radar()
+    radar.range['meters_to_center_of_first_gate'] = 0.
+    radar.range['meters_between_gates'] = 1000.
+    radar.fields['reflectivity']['data'] = np.ma.masked_array(
+        radar.fields['reflectivity']['data'])
+    # a PRT of 40 ms does not fit in the 16-bit prt_ms element
+    radar.instrument_parameters = {
+        'prt': {'data': np.full(radar.nrays, 40e-3, dtype='float32')}}
+    field_mapping = {'reflectivity': 'DZ'}
+    ufraycreator = UFRayCreator(radar, field_mapping, ['reflectivity'])
+    assert_raises(struct.error, ufraycreator.make_ray, 0)
+    assert_raises(ValueError, ufraycreator.make_volume)
+    assert_raises(ValueError, write_uf, StringIO(), radar,
+                  uf_field_names=field_mapping)
+
+    # as do azimuths which are not finite
+    radar.instrument_parameters = None
+    radar.azimuth['data'][3] = np.nan
+    ufraycreator = UFRayCreator(radar, field_mapping, ['reflectivity'])
+    assert_raises(ValueError, ufraycreator.make_volume)
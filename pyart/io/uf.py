@@ -22,6 +22,7 @@ from ..config import FileMetadata, get_fillvalue
 from ..core.radar import Radar
 from .common import make_time_unit_str, _test_arguments, prepare_for_read
 from .uffile import UFFile
+from ..profiling import profiled
 
 _LIGHT_SPEED = 2.99792458e8  # speed of light in meters per second
 _UF_SWEEP_MODES = {
@@ -48,6 +49,7 @@ _SWEEP_MODE_STR = {
 }
 
 
+@profiled
 def read_uf(filename, field_names=None, additional_metadata=None,
             file_field_names=False, exclude_fields=None,
             delay_field_loading=False, **kwargs):
@@ -95,7 +97,7 @@ def read_uf(filename, field_names=None, additional_metadata=None,
                                 file_field_names, exclude_fields)
 
     # Open UF file and get handle
-    ufile = UFFile(prepare_for_read(filename))
+    ufile = UFFile(prepare_for_read(filename), indexed=True)
     first_ray = ufile.rays[0]
 
     # time
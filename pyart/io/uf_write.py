@@ -16,6 +16,8 @@ Functions for writing UF files.
     write_uf
     _d_to_dms
     _pack_structure
+    _fill_structure
+    _round_scaled
 
 """
 
@@ -37,8 +39,12 @@ from .uffile import UF_FIELD_POSITION
 from .uffile import UF_FIELD_HEADER
 from .uffile import UF_FSI_VEL
 from .uffile import POLARIZATION_STR
+from .uffile import INT16
+from .uffile import _structure_dtype
+from ..profiling import profiled
 
 
+@profiled
 def write_uf(filename, radar, uf_field_names=None, radar_field_names=False,
              exclude_fields=None, field_write_order=None, volume_start=None,
              templates_extra=None):
@@ -116,14 +122,9 @@ def write_uf(filename, radar, uf_field_names=None, radar_field_names=False,
         radar, field_mapping, field_write_order, volume_start=volume_start,
         templates_extra=templates_extra)
 
-    for ray_num in range(radar.nrays):
-
-        ray_bytes = raycreator.make_ray(ray_num)
-        pad = struct.pack(b'>i', raycreator.record_length * 2)
-
-        fhandle.write(pad)
-        fhandle.write(ray_bytes)
-        fhandle.write(pad)
+    # the records of all rays, including the padding, are written at once
+    records = raycreator.make_volume()
+    fhandle.write(records.view('u1'))
 
     if close:
         fhandle.close()
@@ -348,6 +349,150 @@ class UFRayCreator(object):
 
         return ray
 
+    def make_volume(self):
+        """
+        Return the records of all rays in the volume.
+
+        The headers and data of all rays are created using array operations
+        rather than packing each ray.  Each record is identical to the ray
+        returned by :py:func:`make_ray` preceded and followed by four bytes
+        containing the record length in bytes.
+
+        Returns
+        -------
+        records : array
+            Structured array containing the record of each ray.  The bytes of
+            the volume are given by ``records.view('u1')``.
+
+        """
+        radar = self.radar
+        sweep_nums = self.ray_num_to_sweep_num
+        field_positions = self.make_field_position_list()
+        records = np.zeros(
+            (radar.nrays, ), dtype=self._record_dtype(field_positions))
+        records['pad_start'] = self.record_length * 2
+        records['pad_end'] = self.record_length * 2
+
+        # mandatory header
+        header = dict(self.mandatory_header_template)
+        ray_times = num2date(radar.time['data'], radar.time['units'])
+        header['year'] = np.array(
+            [ray_time.year - 2000 for ray_time in ray_times])
+        for key in ['month', 'day', 'hour', 'minute', 'second']:
+            header[key] = np.array(
+                [getattr(ray_time, key) for ray_time in ray_times])
+        header['record_number'] = np.arange(1, radar.nrays + 1)
+        header['ray_number'] = header['record_number']
+        header['sweep_number'] = sweep_nums + 1
+        header['azimuth'] = _round_scaled(radar.azimuth['data'], 64)
+        header['elevation'] = _round_scaled(radar.elevation['data'], 64)
+        header['fixed_angle'] = _round_scaled(
+            radar.fixed_angle['data'], 64)[sweep_nums]
+        if radar.scan_rate is not None:
+            header['sweep_rate'] = _round_scaled(radar.scan_rate['data'], 64)
+        else:
+            header['sweep_rate'] = UF_MISSING_VALUE
+        header['sweep_mode'] = self._get_sweep_mode_number()
+        header['record_length'] = self.record_length
+        _fill_structure(
+            records['mandatory_header'], header, UF_MANDATORY_HEADER)
+
+        # optional and data headers
+        _fill_structure(records['optional_header'],
+                        self.optional_header_template, UF_OPTIONAL_HEADER)
+        data_header = UF_DATA_HEADER_TEMPLATE.copy()
+        data_header['ray_nfields'] = len(field_positions)
+        data_header['record_nfields'] = len(field_positions)
+        _fill_structure(records['data_header'], data_header, UF_DATA_HEADER)
+
+        # field positions
+        positions = records['field_positions']
+        for i, field_position in enumerate(field_positions):
+            _fill_structure(
+                positions[:, i], field_position, UF_FIELD_POSITION)
+
+        # field header parameters which vary between rays
+        iparams = radar.instrument_parameters
+        if iparams is not None and 'pulse_width' in iparams:
+            pulse_width_m = _round_scaled(
+                iparams['pulse_width']['data'], _LIGHT_SPEED)
+        else:
+            pulse_width_m = UF_MISSING_VALUE
+
+        if iparams is not None and 'prt' in iparams:
+            prt_ms = _round_scaled(iparams['prt']['data'], 1.e6)
+        else:
+            prt_ms = UF_MISSING_VALUE
+
+        polarization = 1  # default to horizontal polarization
+        if iparams is not None and 'polarization_mode' in iparams:
+            sweep_polarization = np.array([
+                POLARIZATION_STR.index(str(mode))
+                if str(mode) in POLARIZATION_STR else 1
+                for mode in iparams['polarization_mode']['data']])
+            polarization = sweep_polarization[sweep_nums]
+
+        # field headers, FSI velocity structures and data
+        for i, field_info in enumerate(field_positions):
+            record_field = records['field_%d' % i]
+            radar_field = field_info['radar_field']
+            if '_UF_scale_factor' in radar.fields[radar_field]:
+                scale = radar.fields[radar_field]['_UF_scale_factor']
+            else:
+                scale = UF_DEFAULT_SCALE_FACTOR
+
+            data_offset = field_info['offset_field_header'] + 19
+            if field_info['data_type'] in UF_VEL_DATA_TYPES:
+                data_offset += 2
+                fsi_vel = UF_FSI_VEL_TEMPLATE.copy()
+                if iparams is not None and 'nyquist_velocity' in iparams:
+                    fsi_vel['nyquist'] = _round_scaled(
+                        iparams['nyquist_velocity']['data'], scale)
+                else:
+                    fsi_vel['nyquist'] = UF_MISSING_VALUE
+                _fill_structure(record_field['fsi_vel'], fsi_vel, UF_FSI_VEL)
+
+            field_header = dict(self.field_header_template)
+            field_header['nbins'] = radar.ngates
+            field_header['data_offset'] = data_offset
+            field_header['scale_factor'] = scale
+            field_header['pulse_width_m'] = pulse_width_m
+            field_header['prt_ms'] = prt_ms
+            field_header['polarization'] = polarization
+            _fill_structure(record_field['header'], field_header,
+                            UF_FIELD_HEADER)
+
+            field_data = np.round(radar.fields[radar_field]['data'] * scale)
+            record_field['data'] = field_data.filled(-32768).astype('>i2')
+        return records
+
+    def _record_dtype(self, field_positions):
+        """ Return the NumPy dtype of a record including padding. """
+        fields = [
+            (str('pad_start'), str('>i4')),
+            (str('mandatory_header'), _structure_dtype(UF_MANDATORY_HEADER)),
+            (str('optional_header'), _structure_dtype(UF_OPTIONAL_HEADER)),
+            (str('data_header'), _structure_dtype(UF_DATA_HEADER)),
+            (str('field_positions'), _structure_dtype(UF_FIELD_POSITION),
+             (len(field_positions), ))]
+        for i, field_info in enumerate(field_positions):
+            field = [(str('header'), _structure_dtype(UF_FIELD_HEADER))]
+            if field_info['data_type'] in UF_VEL_DATA_TYPES:
+                field.append((str('fsi_vel'), _structure_dtype(UF_FSI_VEL)))
+            field.append((str('data'), str('>i2'), (self.radar.ngates, )))
+            fields.append((str('field_%d' % i), field))
+        fields.append((str('pad_end'), str('>i4')))
+        return np.dtype(fields)
+
+    def _get_sweep_mode_number(self):
+        """ Return the UF sweep mode number of the radar scan type. """
+        if self.radar.scan_type in UF_SWEEP_MODES:
+            return UF_SWEEP_MODES[self.radar.scan_type]
+        warnings.warn(
+            'Unknown scan_type: %s, defaulting to PPI' %
+            (self.radar.scan_type))
+        return UF_SWEEP_MODES['ppi']
+
     def make_mandatory_header(self, ray_num):
         """ Return a byte string representing a UF mandatory header. """
 
@@ -383,14 +528,7 @@ class UFRayCreator(object):
             scan_rate = UF_MISSING_VALUE / 64
         header['sweep_rate'] = int(round(scan_rate * 64))
 
-        if self.radar.scan_type in UF_SWEEP_MODES:
-            sweep_mode_number = UF_SWEEP_MODES[self.radar.scan_type]
-        else:
-            warnings.warn(
-                'Unknown scan_type: %s, defaulting to PPI' %
-                (self.radar.scan_type))
-            sweep_mode_number = UF_SWEEP_MODES['ppi']
-        header['sweep_mode'] = sweep_mode_number
+        header['sweep_mode'] = self._get_sweep_mode_number()
 
         header['record_length'] = self.record_length
 
@@ -504,6 +642,34 @@ def _pack_structure(dic, structure):
     return struct.pack(fmt, *values)
 
 
+def _fill_structure(array, dic, structure):
+    """
+    Set the elements of a structured array from a dictionary.  A ValueError
+    is raised if a value does not fit in a 16-bit integer element, these
+    values would otherwise be silently wrapped.
+    """
+    for name, fmt in structure:
+        value = dic[name]
+        if fmt == INT16:
+            check = np.asarray(value)
+            if (not np.all(np.isfinite(check)) or
+                    np.any(check < -32768) or np.any(check > 32767)):
+                raise ValueError(
+                    'UF %s value out of range of a 16-bit integer' % (name))
+        array[name] = value
+
+
+def _round_scaled(values, factor):
+    """
+    Return values multiplied by a factor and rounded.  The product is
+    computed with the precision used when multiplying a single value so that
+    the results match those of the scalar operation.
+    """
+    values = np.asarray(values)
+    dtype = np.asarray(values.dtype.type(0) * factor).dtype
+    return np.round(values.astype(dtype) * factor)
+
+
 # Constants
 UF_MISSING_VALUE = -32768
 UF_DEFAULT_SCALE_FACTOR = 100   # default field scale factor
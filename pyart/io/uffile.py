@@ -14,7 +14,13 @@ Low level class for reading Universal Format (UF) files.
 .. autosummary::
     :toctree: generated/
 
+    _LazyUFRays
+    _find_records
+    _gather_structure
+    _strided_runs
+    _make_datetime
     _structure_size
+    _structure_dtype
     _unpack_from_buf
     _unpack_structure
 
@@ -75,11 +81,14 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
+import mmap
 import struct
 import datetime
 
 import numpy as np
 
+from .common import _file_buffer
+
 
 class UFFile(object):
     """
@@ -89,21 +98,41 @@ class UFFile(object):
     ----------
     filename : str or file-like
         Filename or file-like object containing data in Universal format (UF).
+    indexed : bool, optional
+        True to index the records of the file rather than decoding each ray.
+        In this mode the file is memory-mapped when possible, the record
+        boundaries are found in a single pass and the mandatory and field
+        headers are decoded into structured arrays.  Fields are extracted
+        from the buffer with strided copies and the rays in the `rays`
+        attribute are decoded on access.  Files whose records cannot be
+        indexed are read ray by ray.  False, the default, decodes every ray
+        when the file is read.
 
     Attributes
     ----------
     rays : list of UFRay objects
-        List of rays within the UF file.
+        List of rays within the UF file.  In indexed mode a sequence which
+        decodes the rays as they are accessed, only available until the file
+        is closed.
     nrays, nsweeps : int
         Number of rays and sweep in the file.
     ray_sweep_numbers : array
         Sweep number of each ray in the file.
     first_ray_in_sweep, last_ray_in_sweep : array
         Indices of the first and last ray in each sweep.
+    _buf : bytes, mmap or None
+        Contents of the file in indexed mode, None otherwise.
+    _record_starts, _record_ends : array or None
+        Location of each record in the buffer in indexed mode.
+    _mandatory_header : structured array or None
+        Mandatory header of each ray in indexed mode.
+    _field_index : dict
+        Field positions and headers of each ray by field number, filled as
+        fields are accessed in indexed mode.
 
     """
 
-    def __init__(self, filename):
+    def __init__(self, filename, indexed=False):
         """ initialize. """
 
         # open the file if file object not passed
@@ -121,6 +150,45 @@ class UFFile(object):
         # size of each record, but is not used here, rather the size indicated
         # by the 'record_length' structure elements is used.
 
+        self._buf = None
+        self._record_starts = self._record_ends = None
+        self._mandatory_header = None
+        self._field_index = {}
+        if indexed:
+            start = fobj.tell()
+            buf = _file_buffer(fobj)
+            records = _find_records(buf)
+            if records is None:
+                # the records could not be indexed, read ray by ray
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+                fobj.seek(start)
+            else:
+                self._buf = buf
+                self._record_starts, self._record_ends = records
+
+        if self._buf is not None:
+            ubuf = np.frombuffer(self._buf, dtype='u1')
+            self._mandatory_header = _gather_structure(
+                ubuf, self._record_starts, UF_MANDATORY_HEADER)
+            self.rays = _LazyUFRays(
+                self._buf, self._record_starts, self._record_ends)
+        else:
+            self.rays = self._read_rays(fobj)
+
+        # determine volume size statistics
+        self.nrays = len(self.rays)
+
+        # determine sweep information
+        self.ray_sweep_numbers = self._get_ray_sweep_numbers()
+        self.nsweeps = len(np.unique(self.ray_sweep_numbers))
+        first_ray_in_sweep, last_ray_in_sweep = self._get_sweep_limits()
+        self.first_ray_in_sweep = first_ray_in_sweep
+        self.last_ray_in_sweep = last_ray_in_sweep
+
+    @staticmethod
+    def _read_rays(fobj):
+        """ Read the records in a file, returning a list of UFRays. """
         # determine padding around records
         buf = fobj.read(8)
         try:
@@ -129,7 +197,7 @@ class UFFile(object):
             raise IOError('file in not a valid UF file')
 
         # read in the records, store as a list of rays
-        self.rays = []
+        rays = []
         while len(buf) == 8:  # read until EOF reached
 
             # record size stored as a 2-byte int start at byte 2
@@ -141,30 +209,30 @@ class UFFile(object):
             record = buf[-bytes_read:] + fobj.read(bytes_to_read)
 
             # convert record into UFRay
-            self.rays.append(UFRay(record))
+            rays.append(UFRay(record))
 
             # read post record padding
             fobj.read(padding)
 
             # read in the first eight bytes of the next record
             buf = fobj.read(8)
-
-        # determine volume size statistics
-        self.nrays = len(self.rays)
-
-        # determine sweep information
-        self.ray_sweep_numbers = self._get_ray_sweep_numbers()
-        self.nsweeps = len(np.unique(self.ray_sweep_numbers))
-        first_ray_in_sweep, last_ray_in_sweep = self._get_sweep_limits()
-        self.first_ray_in_sweep = first_ray_in_sweep
-        self.last_ray_in_sweep = last_ray_in_sweep
+        return rays
 
     def close(self):
         """ Close the file. """
+        if isinstance(self._buf, mmap.mmap):
+            # release the arrays which reference the memory map
+            self._mandatory_header = None
+            self._field_index = {}
+            self.rays = []
+            self._buf.close()
+        self._buf = None
         self._fh.close()
 
     def _get_ray_sweep_numbers(self):
         """ Return an array of the sweep_number stored in each ray. """
+        if self._buf is not None:
+            return self._mandatory_header['sweep_number'].astype('int32')
         ray_sweep_numbers = np.empty((self.nrays, ), dtype='int32')
         for i, ray in enumerate(self.rays):
             ray_sweep_numbers[i] = ray.mandatory_header['sweep_number']
@@ -181,12 +249,67 @@ class UFFile(object):
             last_ray_in_sweep[i] = matches[0][-1]
         return first_ray_in_sweep, last_ray_in_sweep
 
+    def _get_field_index(self, field_number):
+        """
+        Return the data types, field header positions and field headers of
+        a field in each ray, None when not all rays contain the field.
+        """
+        if field_number in self._field_index:
+            return self._field_index[field_number]
+        ubuf = np.frombuffer(self._buf, dtype='u1')
+        starts = self._record_starts
+        header = self._mandatory_header
+        index = None
+
+        # all structures must lie within the record
+        data_header_pos = starts + (
+            header['offset_data_header'].astype(np.int64) - 1) * 2
+        position_pos = data_header_pos + 6 + field_number * 4
+        if np.all(position_pos + 4 <= self._record_ends):
+            data_header = _gather_structure(
+                ubuf, data_header_pos, UF_DATA_HEADER)
+            positions = _gather_structure(
+                ubuf, position_pos, UF_FIELD_POSITION)
+            field_header_pos = starts + (
+                positions['offset_field_header'].astype(np.int64) - 1) * 2
+            field_header_end = (field_header_pos +
+                                _structure_size(UF_FIELD_HEADER))
+            if (np.all(data_header['record_nfields'] > field_number) and
+                    np.all(field_header_pos >= starts) and
+                    np.all(field_header_end <= self._record_ends)):
+                field_headers = _gather_structure(
+                    ubuf, field_header_pos, UF_FIELD_HEADER)
+                index = (positions['data_type'], field_header_pos,
+                         field_headers)
+        self._field_index[field_number] = index
+        return index
+
+    def _get_first_field_headers(self):
+        """ Return the header of the first field of each ray. """
+        index = None
+        if self._buf is not None:
+            index = self._get_field_index(0)
+        if index is None:
+            return None
+        return index[2]
+
     def get_field_data(self, field_number):
         """ Return a 2D array of scale/masked field data for the volume. """
         # Assumes that no rays contain more gates than the first ray and
         # that the missing_data_value and scale_factor are identical for all
         # rays.  Additional the order and number of the fields are assumed to
         # be identical between rays.
+        if self._buf is not None:
+            raw_data = self._get_raw_field_data(field_number)
+            if raw_data is not None:
+                missing_data_value = (
+                    self._mandatory_header['missing_data_value'][0])
+                scale_factor = (
+                    self._field_index[field_number][2]['scale_factor'][0])
+                data = raw_data / float(scale_factor)
+                mask = raw_data == missing_data_value
+                return np.ma.masked_array(data, mask)
+
         first_ray = self.rays[0]
         ngates = len(first_ray.field_raw_data[field_number])
         missing_data_value = first_ray.mandatory_header['missing_data_value']
@@ -203,8 +326,52 @@ class UFFile(object):
         mask = raw_data == missing_data_value
         return np.ma.masked_array(data, mask)
 
+    def _get_raw_field_data(self, field_number):
+        """
+        Return the raw data of a field gathered from the buffer, None when
+        the field cannot be extracted from the index.
+
+        Data from consecutive rays with the same number of gates located at
+        a constant stride in the buffer is copied from a single strided view
+        of the buffer, byte swapping as it is copied.
+        """
+        index = self._get_field_index(field_number)
+        if index is None:
+            return None
+        data_types, field_header_pos, field_headers = index
+        if np.any(data_types != data_types[0]):
+            return None
+        nbins = field_headers['nbins'].astype(np.int64)
+        ngates = int(nbins[0])
+        data_starts = self._record_starts + (
+            field_headers['data_offset'].astype(np.int64) - 1) * 2
+        if (np.any(nbins > ngates) or np.any(nbins < 0) or
+                np.any(data_starts < self._record_starts) or
+                np.any(data_starts + nbins * 2 > self._record_ends)):
+            return None
+
+        missing_data_value = self._mandatory_header['missing_data_value'][0]
+        raw_data = np.empty((self.nrays, ngates), 'int16')
+        dtype = np.dtype('>i2')
+        runs = _strided_runs(data_starts, nbins)
+        for start, end in zip(runs[:-1], runs[1:]):
+            run_nbins = int(nbins[start])
+            if end - start > 1:
+                stride = int(data_starts[start + 1] - data_starts[start])
+            else:
+                stride = run_nbins * dtype.itemsize
+            view = np.ndarray(
+                (end - start, run_nbins), dtype=dtype, buffer=self._buf,
+                offset=int(data_starts[start]),
+                strides=(stride, dtype.itemsize))
+            raw_data[start:end, :run_nbins] = view
+            raw_data[start:end, run_nbins:] = missing_data_value
+        return raw_data
+
     def get_azimuths(self):
         """ Return an array of azimuth angles for each ray in degrees. """
+        if self._buf is not None:
+            return (self._mandatory_header['azimuth'] / 64.).astype('float32')
         azimuth = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             azimuth[i] = ray.mandatory_header['azimuth'] / 64.
@@ -212,6 +379,9 @@ class UFFile(object):
 
     def get_elevations(self):
         """ Return an array of elevation angles for each ray in degrees. """
+        if self._buf is not None:
+            elevation = self._mandatory_header['elevation'] / 64.
+            return elevation.astype('float32')
         elevation = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             elevation[i] = ray.mandatory_header['elevation'] / 64.
@@ -219,6 +389,9 @@ class UFFile(object):
 
     def get_sweep_rates(self):
         """ Return an array of sweep rates for each ray in degrees/sec. """
+        if self._buf is not None:
+            sweep_rates = self._mandatory_header['sweep_rate'] / 64.
+            return sweep_rates.astype('float32')
         sweep_rates = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             sweep_rates[i] = ray.mandatory_header['sweep_rate'] / 64.
@@ -226,6 +399,9 @@ class UFFile(object):
 
     def get_pulse_widths(self):
         """ Return an array of pulse widths for each ray in meters. """
+        field_headers = self._get_first_field_headers()
+        if field_headers is not None:
+            return field_headers['pulse_width_m'].astype('float32')
         pulse_widths = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             pulse_widths[i] = ray.field_headers[0]['pulse_width_m']
@@ -233,6 +409,9 @@ class UFFile(object):
 
     def get_prts(self):
         """ Return an array of prts for each ray in microseconds. """
+        field_headers = self._get_first_field_headers()
+        if field_headers is not None:
+            return field_headers['prt_ms'].astype('float32')
         prts = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             prts[i] = ray.field_headers[0]['prt_ms']
@@ -249,6 +428,23 @@ class UFFile(object):
             field_idx = ['nyquist' in fh for fh in field_headers].index(True)
         except ValueError:
             return None  # True not in list
+
+        if self._buf is not None:
+            index = self._get_field_index(field_idx)
+            if index is not None:
+                data_types, field_header_pos, field_headers = index
+                data_pos = self._record_starts + (
+                    field_headers['data_offset'].astype(np.int64) - 1) * 2
+                if not (np.all(np.in1d(data_types, UF_VELOCITY_TYPES)) and
+                        np.all(data_pos - field_header_pos == 42)):
+                    return None  # nyquist not in field header
+                ubuf = np.frombuffer(self._buf, dtype='u1')
+                vel_headers = _gather_structure(
+                    ubuf, field_header_pos + 38, UF_FSI_VEL)
+                nyquist = (vel_headers['nyquist'] /
+                           field_headers['scale_factor'])
+                return nyquist.astype('float32')
+
         nyquist = np.empty((self.nrays, ), dtype='float32')
         for i, ray in enumerate(self.rays):
             scale = ray.field_headers[field_idx]['scale_factor']
@@ -260,6 +456,10 @@ class UFFile(object):
 
     def get_sweep_fixed_angles(self):
         """ Return an array of fixed angles for each sweep in degrees. """
+        if self._buf is not None:
+            fixed = self._mandatory_header['fixed_angle'][
+                self.first_ray_in_sweep] / 64.
+            return fixed.astype('float32')
         fixed = np.empty((self.nsweeps, ), dtype='float32')
         for i, ray_num in enumerate(self.first_ray_in_sweep):
             fixed[i] = self.rays[ray_num].mandatory_header['fixed_angle'] / 64.
@@ -267,6 +467,12 @@ class UFFile(object):
 
     def get_sweep_polarizations(self):
         """ Return an array of polarization modes for each sweep. """
+        field_headers = self._get_first_field_headers()
+        if field_headers is not None:
+            polarizations = field_headers['polarization'][
+                self.first_ray_in_sweep]
+            return np.array([POLARIZATION_STR[min(polarization, 3)]
+                             for polarization in polarizations])
         modes = []
         for ray_num in self.first_ray_in_sweep:
             ray = self.rays[ray_num]
@@ -278,6 +484,11 @@ class UFFile(object):
 
     def get_datetimes(self):
         """ Return a list of datetimes for each ray. """
+        if self._buf is not None:
+            header = self._mandatory_header
+            columns = [header[key].tolist() for key in
+                       ['year', 'month', 'day', 'hour', 'minute', 'second']]
+            return [_make_datetime(*values) for values in zip(*columns)]
         return [ray.get_datetime() for ray in self.rays]
 
 
@@ -354,7 +565,7 @@ class UFRay(object):
         data_offset = (field_header['data_offset'] - 1) * 2
 
         # read in field specific parameters
-        if position['data_type'] in [b'VF', b'VE', b'VR', b'VT', b'VP']:
+        if position['data_type'] in UF_VELOCITY_TYPES:
             if (data_offset - offset) == 42:
                 vel_header = _unpack_from_buf(self._buf, offset+38, UF_FSI_VEL)
                 field_header.update(vel_header)
@@ -365,26 +576,10 @@ class UFRay(object):
 
     def get_datetime(self):
         """ Return a datetime object for the ray. """
-        year = self.mandatory_header['year']
-        if year < 1900:
-            year += 2000   # years after 2000, 11 -> 2011
-        month = self.mandatory_header['month']
-        day = self.mandatory_header['day']
-        hour = self.mandatory_header['hour']
-        minute = self.mandatory_header['minute']
-        second = self.mandatory_header['second']
-        if hour == 24:
-            # Some UF writers incorrectly specify midnight as 24:00:00
-            # rather than 00:00:00.  Handle this case explicitly
-            assert minute == 0
-            assert second == 0
-            hour = 23
-            minute = 59
-            second = 59
-            dt = datetime.datetime(year, month, day, hour, minute, second)
-            return dt + datetime.timedelta(seconds=1)
-
-        return datetime.datetime(year, month, day, hour, minute, second)
+        header = self.mandatory_header
+        return _make_datetime(
+            header['year'], header['month'], header['day'], header['hour'],
+            header['minute'], header['second'])
 
     def get_location(self):
         """ Return the latitude, longitude and height of the ray. """
@@ -403,11 +598,120 @@ class UFRay(object):
         return latitude, longitude, height
 
 
+class _LazyUFRays(object):
+    """
+    A sequence of UF rays which are decoded from a buffer on access.
+    """
+
+    def __init__(self, buf, starts, ends):
+        """ initialize. """
+        self._buf = buf
+        self._starts = starts
+        self._ends = ends
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError('ray index out of range')
+        return UFRay(self._buf[self._starts[key]:self._ends[key]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _make_datetime(year, month, day, hour, minute, second):
+    """ Return a datetime object from the time in a UF mandatory header. """
+    if year < 1900:
+        year += 2000   # years after 2000, 11 -> 2011
+    if hour == 24:
+        # Some UF writers incorrectly specify midnight as 24:00:00
+        # rather than 00:00:00.  Handle this case explicitly
+        assert minute == 0
+        assert second == 0
+        hour = 23
+        minute = 59
+        second = 59
+        dt = datetime.datetime(year, month, day, hour, minute, second)
+        return dt + datetime.timedelta(seconds=1)
+
+    return datetime.datetime(year, month, day, hour, minute, second)
+
+
+def _find_records(buf):
+    """
+    Find the start and end of each record in a buffer, None if the records
+    cannot be located or do not all start with the UF string.
+
+    The records are located using the same rules used when reading the
+    records from a file ray by ray.
+    """
+    padding = buf[:8].find(b'UF')
+    if padding < 0:
+        raise IOError('file in not a valid UF file')
+    starts = []
+    ends = []
+    nbytes = len(buf)
+    pos = 0
+    while pos + 8 <= nbytes:
+        # record size stored as a 2-byte int start at byte 2
+        start = pos + padding
+        record_size = struct.unpack_from('>h', buf, start + 2)[0] * 2
+        if record_size < 8 or start + record_size > nbytes:
+            return None
+        starts.append(start)
+        ends.append(start + record_size)
+        pos = start + record_size + padding
+    starts = np.array(starts, dtype=np.int64)
+    ends = np.array(ends, dtype=np.int64)
+
+    ubuf = np.frombuffer(buf, dtype='u1')
+    if not np.all(_gather_structure(ubuf, starts, (('uf', '2s'), ))['uf'] ==
+                  b'UF'):
+        return None
+    header_size = _structure_size(UF_MANDATORY_HEADER)
+    if np.any(ends - starts < header_size):
+        return None
+    return starts, ends
+
+
+def _strided_runs(starts, lengths):
+    """
+    Find runs of items with equal lengths located at a constant, positive
+    stride.  Returns the index of the first item in each run followed by the
+    total number of items.
+    """
+    strides = np.diff(starts)
+    new_run = np.ones(len(starts), dtype=bool)
+    new_run[1:] = (lengths[1:] != lengths[:-1]) | (strides <= 0)
+    new_run[2:] |= strides[1:] != strides[:-1]
+    return np.append(np.nonzero(new_run)[0], len(starts))
+
+
+def _gather_structure(ubuf, positions, structure):
+    """ Gather structures at positions from a unsigned byte array. """
+    dtype = _structure_dtype(structure)
+    raw = ubuf[positions[:, np.newaxis] + np.arange(dtype.itemsize)]
+    return raw.view(dtype)[:, 0]
+
+
 def _structure_size(structure):
     """ Find the size of a structure in bytes. """
     return struct.calcsize('>' + ''.join([i[1] for i in structure]))
 
 
+def _structure_dtype(structure):
+    """ Find the NumPy dtype of a structure, UF is big-endian. """
+    return np.dtype([(name, '>i2' if fmt == INT16 else 'S' + fmt[:-1])
+                     for name, fmt in structure])
+
+
 def _unpack_from_buf(buf, pos, structure):
     """ Unpack a structure from a buffer. """
     size = _structure_size(structure)
@@ -530,6 +834,9 @@ UF_FSI_VEL = (
     ('spare', INT16),
 )
 
+# data types of velocity fields which include the UF_FSI_VEL structure
+UF_VELOCITY_TYPES = [b'VF', b'VE', b'VR', b'VT', b'VP']
+
 # This structure is defined but not used in Py-ART
 # No sample file which contain the structure could be found.
 UF_FSI_DM = (
@@ -14,6 +14,8 @@ coordinates to Cartesian coordinates.
     grid_from_radars
     map_to_grid
     map_gates_to_grid
+    GateToGridPlan
+    read_gate_to_grid_plan
     example_roi_func_constant
     example_roi_func_dist
     example_roi_func_dist_beam
@@ -25,5 +27,6 @@ from .grid_mapper import example_roi_func_constant
 from .grid_mapper import example_roi_func_dist
 from .grid_mapper import example_roi_func_dist_beam
 from .gates_to_grid import map_gates_to_grid
+from .gates_to_grid_plan import GateToGridPlan, read_gate_to_grid_plan
 
 __all__ = [s for s in dir() if not s.startswith('_')]
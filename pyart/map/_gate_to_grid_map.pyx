@@ -17,6 +17,10 @@ a uniform grid.
 
 """
 
+import threading
+
+import numpy as np
+
 from libc.math cimport sqrt, exp, ceil, floor, sin, cos, tan, asin
 from cython.view cimport array as cvarray
 
@@ -231,12 +235,13 @@ cdef class GateToGridMapper:
     @cython.boundscheck(False)
     @cython.wraparound(False)
     def map_gates_to_grid(
-            self, 
+            self,
             int ngates, int nrays,
-            float[:, ::1] gate_z, float[:, ::1] gate_y, float[:, ::1] gate_x, 
+            float[:, ::1] gate_z, float[:, ::1] gate_y, float[:, ::1] gate_x,
             float[:, :, ::1] field_data,
             char[:, :, ::1] field_mask, char[:, ::1] excluded_gates,
-            float toa, RoIFunction roi_func, int weighting_function):
+            float toa, RoIFunction roi_func, int weighting_function,
+            int n_threads=1):
         """
         Map radar gates unto the regular grid.
 
@@ -267,13 +272,87 @@ cdef class GateToGridMapper:
         weighting_function : int
             Function to use for weighting gates based upon distance.
             0 for Barnes, 1 for Cressman weighting.
+        n_threads : int
+            Number of threads used to map the gates.  The grid is divided
+            into bands along the y dimension and each thread maps all gates
+            onto its own band with the GIL released.  Every grid point
+            receives the gate contributions in the same order regardless of
+            the number of threads so the results are identical to those
+            from a single thread.
+
+        """
+        cdef int nray, ngate, i
+        cdef float[:, ::1] roi_array
+
+        # the radius of influence is found while holding the GIL as
+        # roi_func may be implemented in Python.
+        roi_array = cvarray(
+            shape=(nrays, ngates), itemsize=sizeof(float), format='f')
+        for nray in range(nrays):
+            for ngate in range(ngates):
+                if excluded_gates[nray, ngate]:
+                    continue
+                roi_array[nray, ngate] = roi_func.get_roi(
+                    gate_z[nray, ngate], gate_y[nray, ngate],
+                    gate_x[nray, ngate])
+
+        if n_threads > self.ny:
+            n_threads = self.ny
+        if n_threads <= 1:
+            self.map_gates_to_band(
+                ngates, nrays, gate_z, gate_y, gate_x, roi_array,
+                field_data, field_mask, excluded_gates, weighting_function,
+                0, self.ny - 1)
+            return
+
+        threads = []
+        for i in range(n_threads):
+            y_lo = (self.ny * i) // n_threads
+            y_hi = (self.ny * (i + 1)) // n_threads - 1
+            threads.append(threading.Thread(
+                target=self.map_gates_to_band,
+                args=(ngates, nrays, gate_z, gate_y, gate_x, roi_array,
+                      field_data, field_mask, excluded_gates,
+                      weighting_function, y_lo, y_hi)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def map_gates_to_band(
+            self,
+            int ngates, int nrays,
+            float[:, ::1] gate_z, float[:, ::1] gate_y, float[:, ::1] gate_x,
+            float[:, ::1] roi_array, float[:, :, ::1] field_data,
+            char[:, :, ::1] field_mask, char[:, ::1] excluded_gates,
+            int weighting_function, int y_lo, int y_hi):
+        """
+        Map radar gates unto the grid points with y indices between y_lo and
+        y_hi, inclusive, without holding the GIL.
+
+        Parameters are the same as :py:func:`map_gates_to_grid` except
+        roi_array, a 2D float32 array containing the radius of influence of
+        each gate which is not excluded.
 
         """
+        with nogil:
+            self._map_gates_to_band(
+                ngates, nrays, gate_z, gate_y, gate_x, roi_array,
+                field_data, field_mask, excluded_gates, weighting_function,
+                y_lo, y_hi)
 
-        cdef float roi
-        cdef float[:] values
-        cdef char[:] masks
-        cdef float x, y, z
+    @cython.initializedcheck(False)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef void _map_gates_to_band(
+            self,
+            int ngates, int nrays,
+            float[:, ::1] gate_z, float[:, ::1] gate_y, float[:, ::1] gate_x,
+            float[:, ::1] roi_array, float[:, :, ::1] field_data,
+            char[:, :, ::1] field_mask, char[:, ::1] excluded_gates,
+            int weighting_function, int y_lo, int y_hi) nogil:
+        """ Map radar gates unto a band of the grid. """
+        cdef int nray, ngate
 
         for nray in range(nrays):
             for ngate in range(ngates):
@@ -282,27 +361,108 @@ cdef class GateToGridMapper:
                 if excluded_gates[nray, ngate]:
                     continue
 
-                x = gate_x[nray, ngate]
-                y = gate_y[nray, ngate]
-                z = gate_z[nray, ngate]
-                roi = roi_func.get_roi(z, y, x)
-                values = field_data[nray, ngate]
-                masks = field_mask[nray, ngate]
+                self.map_gate(
+                    gate_x[nray, ngate], gate_y[nray, ngate],
+                    gate_z[nray, ngate], roi_array[nray, ngate],
+                    field_data, field_mask, nray, ngate,
+                    weighting_function, y_lo, y_hi)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def find_gate_weights(
+            self, int ngates, int nrays,
+            float[:, ::1] gate_z, float[:, ::1] gate_y, float[:, ::1] gate_x,
+            RoIFunction roi_func, int weighting_function):
+        """
+        Find the grid points and weights which each radar gate contributes to.
+
+        Parameters
+        ----------
+        ngates, nrays : int
+            Number of gates and rays in the radar volume.
+        gate_z, gate_y, gate_x : 2D float32 array
+            Cartesian locations of the gates in meters.
+        roi_func : RoIFunction
+            Object whose get_roi method returns the radius of influence.
+        weighting_function : int
+            Function to use for weighting gates based upon distance.
+            0 for Barnes, 1 for Cressman weighting.
+
+        Returns
+        -------
+        gate_index : 1D int64 array
+            Flat index, ray * ngates + gate, of the gate for each weight.
+        grid_index : 1D int64 array
+            Flat index, (z * ny + y) * nx + x, of the grid point for each
+            weight.
+        weights : 1D float32 array
+            Weight of the gate at the grid point.
 
-                self.map_gate(x, y, z, roi, values, masks, weighting_function)
+        """
+        cdef int nray, ngate
+        cdef long long count
+        cdef float[:, ::1] roi_array
+        cdef long long[::1] gate_index, grid_index
+        cdef float[::1] weights
+
+        roi_array = cvarray(
+            shape=(nrays, ngates), itemsize=sizeof(float), format='f')
+        for nray in range(nrays):
+            for ngate in range(ngates):
+                roi_array[nray, ngate] = roi_func.get_roi(
+                    gate_z[nray, ngate], gate_y[nray, ngate],
+                    gate_x[nray, ngate])
+
+        # first pass counts the weights, the second records them
+        gate_index = np.empty((0, ), dtype=np.int64)
+        grid_index = np.empty((0, ), dtype=np.int64)
+        weights = np.empty((0, ), dtype=np.float32)
+        count = 0
+        with nogil:
+            for nray in range(nrays):
+                for ngate in range(ngates):
+                    count += self.gate_weights(
+                        gate_x[nray, ngate], gate_y[nray, ngate],
+                        gate_z[nray, ngate], roi_array[nray, ngate],
+                        weighting_function, nray * ngates + ngate,
+                        gate_index, grid_index, weights, count, 0)
+
+        gate_index_array = np.empty((count, ), dtype=np.int64)
+        grid_index_array = np.empty((count, ), dtype=np.int64)
+        weights_array = np.empty((count, ), dtype=np.float32)
+        gate_index = gate_index_array
+        grid_index = grid_index_array
+        weights = weights_array
+
+        count = 0
+        with nogil:
+            for nray in range(nrays):
+                for ngate in range(ngates):
+                    count += self.gate_weights(
+                        gate_x[nray, ngate], gate_y[nray, ngate],
+                        gate_z[nray, ngate], roi_array[nray, ngate],
+                        weighting_function, nray * ngates + ngate,
+                        gate_index, grid_index, weights, count, 1)
+        return gate_index_array, grid_index_array, weights_array
 
     @cython.initializedcheck(False)
     @cython.cdivision(True)
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cdef int map_gate(self, float x, float y, float z, float roi,
-                      float[:] values, char[:] masks,
-                      int weighting_function):
-        """ Map a single gate to the grid. """
+    cdef long long gate_weights(
+            self, float x, float y, float z, float roi,
+            int weighting_function, long long gate,
+            long long[::1] gate_index, long long[::1] grid_index,
+            float[::1] weights, long long start, int record) nogil:
+        """
+        Count, and when record is non-zero record, the grid points and
+        weights of a single gate.
+        """
 
-        cdef float xg, yg, zg, dist, weight, roi2, dist2
+        cdef float xg, yg, zg, weight, roi2, dist2
         cdef int x_min, x_max, y_min, y_max, z_min, z_max
         cdef int xi, yi, zi
+        cdef long long count = 0
 
         # shift positions so that grid starts at 0
         x -= self.x_start
@@ -330,6 +490,74 @@ cdef class GateToGridMapper:
         if z_max < 0:
             return 0
 
+        roi2 = roi * roi
+        for xi in range(x_min, x_max+1):
+            for yi in range(y_min, y_max+1):
+                for zi in range(z_min, z_max+1):
+                    xg = self.x_step * xi
+                    yg = self.y_step * yi
+                    zg = self.z_step * zi
+                    dist2 = (xg-x)*(xg-x) + (yg-y)*(yg-y) + (zg-z)*(zg-z)
+
+                    if dist2 > roi2:
+                        continue
+
+                    if record:
+                        if weighting_function == BARNES:
+                            weight = exp(-(dist2) / (2*roi2)) + 1e-5
+                        else:   # CRESSMAN
+                            weight = (roi2 - dist2) / (roi2 + dist2)
+                        gate_index[start + count] = gate
+                        grid_index[start + count] = (
+                            (<long long>zi * self.ny + yi) * self.nx + xi)
+                        weights[start + count] = weight
+                    count += 1
+        return count
+
+    @cython.initializedcheck(False)
+    @cython.cdivision(True)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int map_gate(self, float x, float y, float z, float roi,
+                      float[:, :, ::1] field_data, char[:, :, ::1] field_mask,
+                      int nray, int ngate, int weighting_function,
+                      int y_lo, int y_hi) nogil:
+        """ Map a single gate to the grid points between y_lo and y_hi. """
+
+        cdef float xg, yg, zg, dist, weight, roi2, dist2
+        cdef int x_min, x_max, y_min, y_max, z_min, z_max
+        cdef int xi, yi, zi, i
+
+        # shift positions so that grid starts at 0
+        x -= self.x_start
+        y -= self.y_start
+        z -= self.z_start
+
+        x_min = find_min(x, roi, self.x_step)
+        if x_min > self.nx-1:
+            return 0
+        x_max = find_max(x, roi, self.x_step, self.nx)
+        if x_max < 0:
+            return 0
+
+        y_min = find_min(y, roi, self.y_step)
+        if y_min < y_lo:
+            y_min = y_lo
+        if y_min > y_hi:
+            return 0
+        y_max = find_max(y, roi, self.y_step, self.ny)
+        if y_max > y_hi:
+            y_max = y_hi
+        if y_max < y_lo:
+            return 0
+
+        z_min = find_min(z, roi, self.z_step)
+        if z_min > self.nz-1:
+            return 0
+        z_max = find_max(z, roi, self.z_step, self.nz)
+        if z_max < 0:
+            return 0
+
         roi2 = roi * roi
         for xi in range(x_min, x_max+1):
             for yi in range(y_min, y_max+1):
@@ -347,15 +575,16 @@ cdef class GateToGridMapper:
                     else:   # CRESSMAN
                         weight = (roi2 - dist2) / (roi2 + dist2)
                     for i in range(self.nfields):
-                        if masks[i]:
+                        if field_mask[nray, ngate, i]:
                             continue
-                        self.grid_sum[zi, yi, xi, i] += weight * values[i]
+                        self.grid_sum[zi, yi, xi, i] += (
+                            weight * field_data[nray, ngate, i])
                         self.grid_wsum[zi, yi, xi, i] += weight
         return 1
 
 
 @cython.cdivision(True)
-cdef int find_min(float a, float roi, float step):
+cdef int find_min(float a, float roi, float step) nogil:
     """ Find the mimumum gate index for a dimension. """
     cdef int a_min
     if step == 0:
@@ -367,7 +596,7 @@ cdef int find_min(float a, float roi, float step):
 
 
 @cython.cdivision(True)
-cdef int find_max(float a, float roi, float step, int na):
+cdef int find_max(float a, float roi, float step, int na) nogil:
     """ Find the maximum gate index for a dimension. """
     cdef int a_max
     if step == 0:
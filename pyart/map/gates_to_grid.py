@@ -25,15 +25,17 @@ from ..filters import GateFilter, moment_based_gate_filter
 
 from ._gate_to_grid_map import GateToGridMapper
 from ._gate_to_grid_map import RoIFunction, ConstantRoI, DistBeamRoI, DistRoI
+from ..profiling import profiled
 
 
+@profiled
 def map_gates_to_grid(
         radars, grid_shape, grid_limits, grid_origin=None,
         grid_origin_alt=None, grid_projection=None,
         fields=None, gatefilters=False, map_roi=True,
         weighting_function='Barnes', toa=17000.0, roi_func='dist_beam',
         constant_roi=500., z_factor=0.05, xy_factor=0.02, min_radius=500.0,
-        h_factor=1.0, nb=1.5, bsp=1.0, **kwargs):
+        h_factor=1.0, nb=1.5, bsp=1.0, n_threads=1, **kwargs):
     """
     Map gates from one or more radars to a Cartesian grid.
 
@@ -65,6 +67,11 @@ def map_gates_to_grid(
         A custom RoIFunction can be defined using the RoIFunction class
         and defining a get_roi method which returns the radius.  For efficient
         mapping this class should be implemented in Cython.
+    n_threads : int
+        Number of threads to use when mapping the gates onto the grid.  The
+        grid is divided into bands along the y dimension which are filled
+        concurrently with the GIL released.  The results are identical
+        regardless of the number of threads used.
 
     Returns
     -------
@@ -143,7 +150,7 @@ def map_gates_to_grid(
             radar.ngates, radar.nrays, gate_z.astype('float32'),
             gate_y.astype('float32'), gate_x.astype('float32'),
             field_data, field_mask, excluded_gates,
-            toa, roi_func, cy_weighting_function)
+            toa, roi_func, cy_weighting_function, n_threads)
 
     # create and return the grid dictionary
     mweight = np.ma.masked_equal(grid_wsum, 0)
@@ -0,0 +1,340 @@
+"""
+pyart.map.gates_to_grid_plan
+============================
+
+Reusable mappings of radar gates to a Cartesian grid for radars which
+repeatedly sample the same set of gate locations.
+
+.. autosummary::
+    :toctree: generated/
+
+    read_gate_to_grid_plan
+    _radar_geometry
+
+.. autosummary::
+    :toctree: generated/
+    :template: dev_template.rst
+
+    GateToGridPlan
+
+"""
+
+import numpy as np
+import scipy.sparse
+
+from ..core.radar import Radar
+from ..core.transforms import geographic_to_cartesian
+from ..filters import GateFilter, moment_based_gate_filter
+from ._gate_to_grid_map import GateToGridMapper
+from .gates_to_grid import _detemine_cy_weighting_func, _find_projparams
+from .gates_to_grid import _parse_gatefilters, _determine_fields
+from .gates_to_grid import _find_offsets, _find_grid_params, _parse_roi_func
+
+
+class GateToGridPlan(object):
+    """
+    A reusable mapping of radar gates onto a Cartesian grid.
+
+    The projection of the gates, the radius of influence and the distance
+    weighting performed by :py:func:`map_gates_to_grid` depend only on the
+    geometry of the radar volume(s) and the grid.  This class performs these
+    calculations once and stores the result as a sparse matrix containing the
+    weight of each gate at every grid point.  Volumes which share the same
+    geometry, for example those collected by a radar repeating a fixed scan
+    strategy, can then be mapped to the grid using a single sparse
+    matrix-vector product per field.
+
+    The parameters used to construct the plan are identical to those in
+    :py:func:`map_gates_to_grid`.  Gates are not filtered when the plan is
+    created, filtering is performed when fields are mapped using the plan.
+
+    Parameters
+    ----------
+    radars : Radar or tuple of Radar objects.
+        Radar objects whose geometry will be used to create the plan.
+    grid_shape : 3-tuple of floats
+        Number of points in the grid (z, y, x).
+    grid_limits : 3-tuple of 2-tuples
+        Minimum and maximum grid location (inclusive) in meters for the
+        z, y, x coordinates.
+    angle_tolerance : float
+        Maximum difference in degrees between the azimuth and elevation
+        angles of a volume and those used to create the plan for the volume
+        to be considered to have the same geometry.
+
+    Attributes
+    ----------
+    grid_shape : 3-tuple of ints
+        Shape of the grid, (z, y, x).
+    grid_limits : 3-tuple of 2-tuples
+        Minimum and maximum grid location in meters.
+    weights : scipy.sparse.csr_matrix
+        Sparse matrix of shape (number of grid points, number of gates) with
+        the weight of each gate at each grid point.  Gates from multiple
+        radars are ordered by radar, ray and then gate.
+    roi : 3D float32 array
+        Radius of influence at each grid point in meters.
+    geometry : list of dict
+        Geometry of the radar volumes used to create the plan.
+    angle_tolerance : float
+        Tolerance in degrees used when comparing radar geometries.
+
+    """
+
+    def __init__(self, radars, grid_shape, grid_limits, grid_origin=None,
+                 grid_origin_alt=None, grid_projection=None,
+                 weighting_function='Barnes', roi_func='dist_beam',
+                 constant_roi=500., z_factor=0.05, xy_factor=0.02,
+                 min_radius=500.0, h_factor=1.0, nb=1.5, bsp=1.0,
+                 angle_tolerance=0.1):
+        """ initialize. """
+        self.grid_shape = tuple(int(i) for i in grid_shape)
+        self.grid_limits = tuple(tuple(float(i) for i in l)
+                                 for l in grid_limits)
+        self.angle_tolerance = angle_tolerance
+
+        # make a tuple if passed a radar object as the first argument
+        if isinstance(radars, Radar):
+            radars = (radars, )
+
+        skip_transform = False
+        if (len(radars) == 1 and grid_origin_alt is None and
+                grid_origin is None):
+            skip_transform = True
+
+        if grid_origin_alt is None:
+            grid_origin_alt = float(radars[0].altitude['data'])
+
+        cy_weighting_function = _detemine_cy_weighting_func(
+            weighting_function)
+        projparams = _find_projparams(grid_origin, radars, grid_projection)
+        grid_starts, grid_steps = _find_grid_params(grid_shape, grid_limits)
+        offsets = _find_offsets(radars, projparams, grid_origin_alt)
+        roi_func = _parse_roi_func(roi_func, constant_roi, z_factor,
+                                   xy_factor, min_radius, h_factor, nb, bsp,
+                                   offsets)
+
+        # the mapper does not accumulate anything, empty arrays are used
+        empty = np.zeros((1, 1, 1, 0), dtype=np.float32)
+        gatemapper = GateToGridMapper(
+            grid_shape, grid_starts, grid_steps, empty, empty)
+
+        # find the weights of the gates from each radar
+        gate_indices = []
+        grid_indices = []
+        weights = []
+        gate_offset = 0
+        for radar in radars:
+            if skip_transform:
+                gate_x = radar.gate_x['data']
+                gate_y = radar.gate_y['data']
+            else:
+                gate_x, gate_y = geographic_to_cartesian(
+                    radar.gate_longitude['data'],
+                    radar.gate_latitude['data'], projparams)
+            gate_z = radar.gate_altitude['data'] - grid_origin_alt
+
+            gate_index, grid_index, weight = gatemapper.find_gate_weights(
+                radar.ngates, radar.nrays, gate_z.astype('float32'),
+                gate_y.astype('float32'), gate_x.astype('float32'),
+                roi_func, cy_weighting_function)
+            gate_indices.append(gate_index + gate_offset)
+            grid_indices.append(grid_index)
+            weights.append(weight)
+            gate_offset += radar.nrays * radar.ngates
+
+        ngrid = int(np.prod(self.grid_shape))
+        self.weights = scipy.sparse.csr_matrix(
+            (np.concatenate(weights),
+             (np.concatenate(grid_indices), np.concatenate(gate_indices))),
+            shape=(ngrid, gate_offset))
+
+        self.roi = np.empty(grid_shape, dtype=np.float32)
+        gatemapper.find_roi_for_grid(self.roi, roi_func)
+        self.geometry = [_radar_geometry(radar) for radar in radars]
+
+    def check_geometry(self, radars):
+        """
+        Check that radar volumes have the geometry used to create the plan.
+
+        Parameters
+        ----------
+        radars : Radar or tuple of Radar objects.
+            Radar objects to check.
+
+        Returns
+        -------
+        same : bool
+            True when the geometry of the radars matches the geometry used
+            to create the plan, False otherwise.
+
+        """
+        if isinstance(radars, Radar):
+            radars = (radars, )
+        if len(radars) != len(self.geometry):
+            return False
+        for radar, geometry in zip(radars, self.geometry):
+            other = _radar_geometry(radar)
+            if other['azimuth'].shape != geometry['azimuth'].shape:
+                return False
+            if other['range'].shape != geometry['range'].shape:
+                return False
+            if not np.allclose(other['range'], geometry['range']):
+                return False
+            if not np.allclose(other['location'], geometry['location']):
+                return False
+            # azimuth differences are found on the circle
+            diff = np.abs(other['azimuth'] - geometry['azimuth']) % 360.
+            diff = np.minimum(diff, 360. - diff)
+            if np.any(diff > self.angle_tolerance):
+                return False
+            diff = np.abs(other['elevation'] - geometry['elevation'])
+            if np.any(diff > self.angle_tolerance):
+                return False
+        return True
+
+    def map_gates_to_grid(self, radars, fields=None, gatefilters=False,
+                          map_roi=True, **kwargs):
+        """
+        Map gates from one or more radars to the grid using the plan.
+
+        Parameters
+        ----------
+        radars : Radar or tuple of Radar objects.
+            Radar objects to map to the grid.  The geometry of these
+            volumes must match those used to create the plan.
+        fields, gatefilters, map_roi :
+            Identical to the parameters in :py:func:`map_gates_to_grid`.
+            Additional arguments are passed to
+            :py:func:`moment_based_gate_filter` when gatefilters is None.
+
+        Returns
+        -------
+        grids : dict
+            Dictionary of mapped fields.  The keys of the dictionary are
+            given by parameter fields.  Each elements is a `grid_size` float32
+            array containing the interpolated grid for that field.
+
+        """
+        if isinstance(radars, Radar):
+            radars = (radars, )
+        if not self.check_geometry(radars):
+            raise ValueError(
+                'Geometry of the radar volumes does not match the plan')
+
+        gatefilters = _parse_gatefilters(gatefilters, radars)
+        fields = _determine_fields(fields, radars)
+        nfields = len(fields)
+
+        # collect the gate values and inclusion flags from all radars
+        values = []
+        included = []
+        for radar, gatefilter in zip(radars, gatefilters):
+            if gatefilter is False:
+                gatefilter = GateFilter(radar)  # include all gates
+            elif gatefilter is None:
+                gatefilter = moment_based_gate_filter(radar, **kwargs)
+            gate_included = gatefilter.gate_included.ravel()
+
+            shape = (radar.nrays * radar.ngates, nfields)
+            radar_values = np.empty(shape, dtype=np.float64)
+            radar_included = np.empty(shape, dtype=np.float64)
+            for i, field in enumerate(fields):
+                fdata = radar.fields[field]['data']
+                finclude = np.logical_and(
+                    gate_included, ~np.ma.getmaskarray(fdata).ravel())
+                radar_included[:, i] = finclude
+                radar_values[:, i] = np.where(
+                    finclude, np.ma.getdata(fdata).ravel(), 0)
+            values.append(radar_values)
+            included.append(radar_included)
+
+        grid_sum = self.weights.dot(np.concatenate(values))
+        grid_wsum = self.weights.dot(np.concatenate(included))
+
+        shape = self.grid_shape + (nfields, )
+        grid_sum = grid_sum.reshape(shape).astype(np.float32)
+        grid_wsum = grid_wsum.reshape(shape).astype(np.float32)
+
+        mweight = np.ma.masked_equal(grid_wsum, 0)
+        msum = np.ma.masked_array(grid_sum, mweight.mask)
+        grids = dict(
+            [(f, msum[..., i] / mweight[..., i])
+             for i, f in enumerate(fields)])
+        if map_roi:
+            grids['ROI'] = self.roi.copy()
+        return grids
+
+    def write(self, filename):
+        """
+        Write the plan to a NumPy .npz file.
+
+        Parameters
+        ----------
+        filename : str
+            Filename to write the plan to.
+
+        """
+        arrays = {
+            'grid_shape': np.array(self.grid_shape),
+            'grid_limits': np.array(self.grid_limits),
+            'angle_tolerance': np.array(self.angle_tolerance),
+            'weights_data': self.weights.data,
+            'weights_indices': self.weights.indices,
+            'weights_indptr': self.weights.indptr,
+            'weights_shape': np.array(self.weights.shape),
+            'roi': self.roi,
+            'nradars': np.array(len(self.geometry))}
+        for i, geometry in enumerate(self.geometry):
+            for key, value in geometry.items():
+                arrays['radar%d_%s' % (i, key)] = value
+        with open(filename, 'wb') as f:
+            np.savez(f, **arrays)
+
+
+def read_gate_to_grid_plan(filename):
+    """
+    Read a gate to grid plan from a file created by
+    :py:func:`GateToGridPlan.write`.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of the stored plan.
+
+    Returns
+    -------
+    plan : GateToGridPlan
+        Plan read from the file.
+
+    """
+    with np.load(filename) as f:
+        weights = scipy.sparse.csr_matrix(
+            (f['weights_data'], f['weights_indices'], f['weights_indptr']),
+            shape=tuple(f['weights_shape']))
+        geometry = []
+        for i in range(int(f['nradars'])):
+            geometry.append(dict(
+                [(key, f['radar%d_%s' % (i, key)])
+                 for key in ['location', 'range', 'azimuth', 'elevation']]))
+        plan = GateToGridPlan.__new__(GateToGridPlan)
+        plan.grid_shape = tuple(int(i) for i in f['grid_shape'])
+        plan.grid_limits = tuple(tuple(float(i) for i in l)
+                                 for l in f['grid_limits'])
+        plan.angle_tolerance = float(f['angle_tolerance'])
+        plan.weights = weights
+        plan.roi = f['roi']
+        plan.geometry = geometry
+    return plan
+
+
+def _radar_geometry(radar):
+    """ Return a dictionary describing the geometry of a radar volume. """
+    location = np.array([
+        float(radar.latitude['data'][0]), float(radar.longitude['data'][0]),
+        float(radar.altitude['data'][0])])
+    return {
+        'location': location,
+        'range': np.array(radar.range['data'], dtype=np.float64),
+        'azimuth': np.array(radar.azimuth['data'], dtype=np.float64),
+        'elevation': np.array(radar.elevation['data'], dtype=np.float64)}
@@ -13,6 +13,8 @@ Utilities for mapping radar objects to Cartesian grids.
     example_roi_func_dist
     _unify_times_for_radars
     _load_nn_field_data
+    _interpolate_batched
+    _roi_for_points
     _gen_roi_func_constant
     _gen_roi_func_dist
     _gen_roi_func_dist_beam
@@ -25,6 +27,8 @@ Utilities for mapping radar objects to Cartesian grids.
 
 """
 
+import itertools
+
 import numpy as np
 import scipy.spatial
 import netCDF4
@@ -38,10 +42,13 @@ from ..io.common import make_time_unit_str
 from ._load_nn_field_data import _load_nn_field_data
 from .ckdtree import cKDTree
 from .gates_to_grid import map_gates_to_grid
+from ..profiling import profiled
 
 
+@profiled
 def grid_from_radars(radars, grid_shape, grid_limits,
-                     gridding_algo='map_gates_to_grid', **kwargs):
+                     gridding_algo='map_gates_to_grid', n_threads=1,
+                     **kwargs):
     """
     Map one or more radars to a Cartesian grid returning a Grid object.
 
@@ -57,11 +64,15 @@ def grid_from_radars(radars, grid_shape, grid_limits,
     grid_limits : 3-tuple of 2-tuples
         Minimum and maximum grid location (inclusive) in meters for the
         z, y, x coordinates.
-    gridding_algo : 'map_to_grid' or 'map_gates_to_grid'
+    gridding_algo : 'map_to_grid', 'map_to_grid_batched' or 'map_gates_to_grid'
         Algorithm to use for gridding.  'map_to_grid' finds all gates within
-        a radius of influence for each grid point, 'map_gates_to_grid' maps
-        each radar gate onto the grid using a radius of influence and is
-        typically significantly faster.
+        a radius of influence for each grid point, 'map_to_grid_batched'
+        does the same but finds the gates for blocks of grid points at once,
+        'map_gates_to_grid' maps each radar gate onto the grid using a radius
+        of influence and is typically significantly faster.
+    n_threads : int
+        Number of threads used to map the gates onto the grid. Only used
+        when gridding_algo is 'map_gates_to_grid'.
 
     Returns
     -------
@@ -83,8 +94,13 @@ def grid_from_radars(radars, grid_shape, grid_limits,
     # map the radar(s) to a cartesian grid
     if gridding_algo == 'map_to_grid':
         grids = map_to_grid(radars, grid_shape, grid_limits, **kwargs)
+    elif gridding_algo == 'map_to_grid_batched':
+        batch_size = kwargs.pop('batch_size', 10000)
+        grids = map_to_grid(radars, grid_shape, grid_limits,
+                            batch_size=batch_size, **kwargs)
     elif gridding_algo == 'map_gates_to_grid':
-        grids = map_gates_to_grid(radars, grid_shape, grid_limits, **kwargs)
+        grids = map_gates_to_grid(radars, grid_shape, grid_limits,
+                                  n_threads=n_threads, **kwargs)
     else:
         raise ValueError('invalid gridding_algo')
 
@@ -247,7 +263,43 @@ class NNLocator:
 
             return ind, dist
 
+    def find_all_neighbors_and_dists(self, qs, r):
+        """
+        Find all neighbors and distances within a given distance of a
+        number of points.
+
+        Parameters
+        ----------
+        qs : array_like, (n_points, n_dimensions)
+            Points to query.
+        r : float
+            Distance within which neighbors are returned.
 
+        Returns
+        -------
+        q_ind : array of intergers
+            Indices of the query point for each neighbor.
+        ind : array of intergers
+            Indices of the neighbors.
+        dist : array of floats
+            Distances between the query points and the neighbors.
+
+        """
+        if self._algorithm == 'kd_tree':
+            qs = np.ascontiguousarray(qs, dtype=np.float64)
+            neighbors = cKDTree(qs).query_ball_tree(self.tree, r)
+            counts = np.fromiter(
+                map(len, neighbors), dtype=np.intp, count=len(neighbors))
+            ind = np.fromiter(
+                itertools.chain.from_iterable(neighbors), dtype=np.intp,
+                count=counts.sum())
+            q_ind = np.repeat(np.arange(len(qs)), counts)
+            dist = scipy.spatial.minkowski_distance(
+                qs[q_ind], self.tree.data[ind])
+            return q_ind, ind, dist
+
+
+@profiled
 def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
                 grid_origin_alt=None, grid_projection=None,
                 fields=None, gatefilters=False,
@@ -255,7 +307,7 @@ def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
                 copy_field_data=True, algorithm='kd_tree', leafsize=10.,
                 roi_func='dist_beam', constant_roi=500.,
                 z_factor=0.05, xy_factor=0.02, min_radius=500.0,
-                h_factor=1.0, nb=1.5, bsp=1.0, **kwargs):
+                h_factor=1.0, nb=1.5, bsp=1.0, batch_size=None, **kwargs):
     """
     Map one or more radars to a Cartesian grid.
 
@@ -372,6 +424,16 @@ def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
         to store the tree. The optimal value depends on the nature of the
         problem. This value should only effect the speed of the gridding,
         not the results.
+    batch_size : int or None
+        None, the default, finds the neighbors and interpolates each grid
+        point in turn.  An integer finds the neighbors for this number of
+        grid points with a single query and performs the weighting and
+        interpolation using array operations, this is significantly faster
+        for large grids but requires more memory.  Grid points are grouped by
+        their radius of influence so that each query uses a similar radius.
+        The results are the same as those when this parameter is None
+        except that field data is always copied, `copy_field_data` is
+        ignored.
 
     Returns
     -------
@@ -446,6 +508,10 @@ def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
 
     offsets = []    # offsets from the grid origin, in meters, for each radar
 
+    # the batched interpolation is always performed on a copy of the data
+    if batch_size is not None:
+        copy_field_data = True
+
     # create a field lookup tables
     if copy_field_data:
         # copy_field_data == True, lookups are performed on a 2D copy of
@@ -582,6 +648,16 @@ def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
         else:
             raise ValueError('unknown roi_func: %s' % roi_func)
 
+    if batch_size is not None:
+        grid_data, roi = _interpolate_batched(
+            nnlocator, filtered_field_data, grid_shape,
+            (z_start, y_start, x_start), (z_step, y_step, x_step),
+            roi_func, weighting_function, batch_size, badval)
+        grids = dict([(f, grid_data[..., i]) for i, f in enumerate(fields)])
+        if map_roi:
+            grids['ROI'] = roi
+        return grids
+
     # create array to hold interpolated grid data and roi if requested
     grid_data = np.ma.empty((nz, ny, nx, nfields), dtype=np.float64)
     grid_data.set_fill_value(badval)
@@ -645,6 +721,88 @@ def map_to_grid(radars, grid_shape, grid_limits, grid_origin=None,
     return grids
 
 
+def _interpolate_batched(nnlocator, field_data, grid_shape, grid_starts,
+                         grid_steps, roi_func, weighting_function,
+                         batch_size, badval):
+    """
+    Interpolate field data onto the grid finding neighbors for batches of
+    grid points at once.
+
+    Returns the interpolated field data with dimensions z, y, x, fields and
+    the radius of influence at each grid point.
+    """
+    nz, ny, nx = grid_shape
+    z_start, y_start, x_start = grid_starts
+    z_step, y_step, x_step = grid_steps
+    npoints = nz * ny * nx
+    nfields = field_data.shape[1]
+
+    # grid point locations, ordered as np.ndindex(nz, ny, nx)
+    iz, iy, ix = np.unravel_index(np.arange(npoints), grid_shape)
+    z = z_start + z_step * iz
+    y = y_start + y_step * iy
+    x = x_start + x_step * ix
+    del iz, iy, ix
+    roi = _roi_for_points(roi_func, z, y, x)
+
+    field_values = np.ma.getdata(field_data)
+    field_valid = ~np.ma.getmaskarray(field_data)
+    grid_sum = np.zeros((npoints, nfields), dtype=np.float64)
+    grid_wsum = np.zeros((npoints, nfields), dtype=np.float64)
+
+    # grid points with similar radius of influence are queried together
+    order = np.argsort(roi, kind='mergesort')
+    for start in range(0, npoints, batch_size):
+        points = order[start:start + batch_size]
+        r = roi[points]
+        r_max = r.max()
+        qs = np.column_stack((z[points], y[points], x[points]))
+        q_ind, ind, dist = nnlocator.find_all_neighbors_and_dists(qs, r_max)
+
+        # remove neighbors outside the radius of each grid point
+        r = r[q_ind]
+        if np.any(r < r_max):
+            in_roi = dist <= r
+            q_ind, ind, dist, r = (
+                q_ind[in_roi], ind[in_roi], dist[in_roi], r[in_roi])
+
+        dist2 = dist * dist
+        r2 = r * r
+        if weighting_function.upper() == 'CRESSMAN':
+            weights = (r2 - dist2) / (r2 + dist2)
+        elif weighting_function.upper() == 'BARNES':
+            weights = np.exp(-dist2 / (2.0 * r2)) + 1e-5
+
+        nqs = len(points)
+        for i in range(nfields):
+            valid_weights = weights * field_valid[ind, i]
+            grid_wsum[points, i] = np.bincount(
+                q_ind, weights=valid_weights, minlength=nqs)
+            grid_sum[points, i] = np.bincount(
+                q_ind, weights=valid_weights * field_values[ind, i],
+                minlength=nqs)
+
+    # grid points without any neighbors with valid data are masked
+    mask = grid_wsum == 0
+    grid_wsum[mask] = 1
+    grid_data = np.ma.masked_array(grid_sum / grid_wsum, mask)
+    grid_data.data[mask] = badval
+    grid_data.set_fill_value(badval)
+    grid_data.shape = (nz, ny, nx, nfields)
+    return grid_data, roi.reshape(grid_shape)
+
+
+def _roi_for_points(roi_func, z, y, x):
+    """ Return the radius of influence at a number of points. """
+    vectorized_roi_func = getattr(roi_func, 'vectorized', None)
+    if vectorized_roi_func is not None:
+        return vectorized_roi_func(z, y, x)
+    roi = np.empty(z.shape, dtype=np.float64)
+    for i in range(len(z)):
+        roi[i] = roi_func(z[i], y[i], x[i])
+    return roi
+
+
 # Radius of Influence (RoI) functions
 
 
@@ -678,6 +836,11 @@ def _gen_roi_func_constant(constant_roi):
         """ constant radius of influence function. """
         return constant_roi
 
+    def vectorized(zg, yg, xg):
+        """ constant radius of influence function for arrays. """
+        return np.full(np.shape(zg), constant_roi, dtype=np.float64)
+
+    roi.vectorized = vectorized
     return roi
 
 
@@ -730,6 +893,16 @@ def _gen_roi_func_dist(z_factor, xy_factor, min_radius, offsets):
             min_radius)
         return min(r)
 
+    def vectorized(zg, yg, xg):
+        """ dist radius of influence function for arrays. """
+        zg, yg, xg = zg[:, np.newaxis], yg[:, np.newaxis], xg[:, np.newaxis]
+        r = np.maximum(
+            z_factor * (zg - zg_off) +
+            xy_factor * np.sqrt((xg - xg_off)**2 + (yg - yg_off)**2),
+            min_radius)
+        return r.min(axis=1)
+
+    roi.vectorized = vectorized
     return roi
 
 
@@ -786,4 +959,14 @@ def _gen_roi_func_dist_beam(h_factor, nb, bsp, min_radius, offsets):
                 np.tan(nb * bsp * np.pi / 180.0), min_radius)
         return min(r)
 
+    def vectorized(zg, yg, xg):
+        """ dist_beam radius of influence function for arrays. """
+        zg, yg, xg = zg[:, np.newaxis], yg[:, np.newaxis], xg[:, np.newaxis]
+        r = np.maximum(
+                h_factor * ((zg - zg_off) / 20.0) +
+                np.sqrt((yg - yg_off)**2 + (xg - xg_off)**2) *
+                np.tan(nb * bsp * np.pi / 180.0), min_radius)
+        return r.min(axis=1)
+
+    roi.vectorized = vectorized
     return roi
@@ -126,6 +126,22 @@ def test_map_to_grid_tiny_grid():
     assert abs(np.round(grids['reflectivity'][0]) - 40.0) < 0.01
 
 
+def test_map_to_grid_n_threads():
+    radar = pyart.testing.make_target_radar()
+    radar.fields['reflectivity']['data'] += np.random.uniform(
+        0, 1, size=(radar.nrays, radar.ngates))
+    grid_args = dict(COMMON_MAP_TO_GRID_ARGS)
+    grid_args['constant_roi'] = 300.
+    single = pyart.map.map_gates_to_grid((radar,), **grid_args)
+    for n_threads in [2, 3, 9, 20]:
+        grids = pyart.map.map_gates_to_grid(
+            (radar,), n_threads=n_threads, **grid_args)
+        assert np.array_equal(grids['reflectivity'].mask,
+                              single['reflectivity'].mask)
+        assert np.array_equal(grids['reflectivity'].data,
+                              single['reflectivity'].data)
+
+
 def test_grid_from_radars_gates_to_grid():
     radar = pyart.testing.make_target_radar()
     grid = pyart.map.grid_from_radars(
@@ -143,6 +159,15 @@ def test_grid_from_radars_gates_to_grid():
     assert_almost_equal(grid.z['data'], np.linspace(-400, 400, 3))
 
 
+def test_grid_from_radars_n_threads():
+    radar = pyart.testing.make_target_radar()
+    grid = pyart.map.grid_from_radars(
+        (radar,), gridding_algo='map_gates_to_grid', n_threads=4,
+        **COMMON_MAP_TO_GRID_ARGS)
+    center_slice = grid.fields['reflectivity']['data'][1, 4, :]
+    assert_almost_equal(np.round(center_slice), EXPECTED_CENTER_SLICE)
+
+
 def test_map_to_grid_errors():
     radar = pyart.testing.make_target_radar()
 
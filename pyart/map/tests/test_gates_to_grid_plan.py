@@ -0,0 +1,82 @@
+""" Unit Tests for Py-ART's map/gates_to_grid_plan.py. """
+
+from __future__ import print_function
+
+import numpy as np
+from numpy.testing import assert_almost_equal, assert_raises
+
+import pyart
+
+EXPECTED_CENTER_SLICE = [40, 30, 20, 10, 0, 0, 10, 20, 30, 40]
+
+COMMON_PLAN_ARGS = {
+    'grid_shape': (3, 9, 10),
+    'grid_limits': ((-400.0, 400.0), (-900.0, 900.0), (-900, 900)),
+    'roi_func': 'constant',
+    'constant_roi': 30., }
+
+
+def test_plan_map_gates_to_grid():
+    radar = pyart.testing.make_target_radar()
+    plan = pyart.map.GateToGridPlan(radar, **COMMON_PLAN_ARGS)
+    grids = plan.map_gates_to_grid(radar)
+    center_slice = grids['reflectivity'][1, 4, :]
+    assert_almost_equal(np.round(center_slice), EXPECTED_CENTER_SLICE)
+    assert 'ROI' in grids
+    assert np.all(grids['ROI'] == 30.)
+
+
+def test_plan_matches_map_gates_to_grid():
+    radar = pyart.testing.make_target_radar()
+    radar.fields['reflectivity']['data'] = np.ma.masked_greater(
+        radar.fields['reflectivity']['data'] + np.random.uniform(
+            0, 1, size=(radar.nrays, radar.ngates)), 40.5)
+    gatefilter = pyart.filters.GateFilter(radar)
+    gatefilter.exclude_below('reflectivity', 5.)
+
+    for weighting_function in ['Barnes', 'Cressman']:
+        grid_args = dict(COMMON_PLAN_ARGS)
+        grid_args['constant_roi'] = 300.
+        grid_args['weighting_function'] = weighting_function
+        plan = pyart.map.GateToGridPlan((radar, radar), **grid_args)
+        grids = plan.map_gates_to_grid(
+            (radar, radar), gatefilters=(gatefilter, gatefilter))
+        expected = pyart.map.map_gates_to_grid(
+            (radar, radar), gatefilters=(gatefilter, gatefilter),
+            **grid_args)
+        assert np.array_equal(grids['reflectivity'].mask,
+                              expected['reflectivity'].mask)
+        assert_almost_equal(grids['reflectivity'], expected['reflectivity'],
+                            4)
+
+
+def test_plan_write_read():
+    radar = pyart.testing.make_target_radar()
+    plan = pyart.map.GateToGridPlan(radar, **COMMON_PLAN_ARGS)
+    with pyart.testing.InTemporaryDirectory():
+        plan.write('plan.npz')
+        plan2 = pyart.map.read_gate_to_grid_plan('plan.npz')
+    assert plan2.grid_shape == plan.grid_shape
+    assert plan2.grid_limits == plan.grid_limits
+    assert (plan2.weights != plan.weights).nnz == 0
+    grids = plan2.map_gates_to_grid(radar)
+    center_slice = grids['reflectivity'][1, 4, :]
+    assert_almost_equal(np.round(center_slice), EXPECTED_CENTER_SLICE)
+
+
+def test_plan_geometry_mismatch():
+    radar = pyart.testing.make_target_radar()
+    plan = pyart.map.GateToGridPlan(radar, **COMMON_PLAN_ARGS)
+    assert plan.check_geometry(radar)
+
+    # small changes in the antenna angles are allowed
+    radar.azimuth['data'] += 0.05
+    assert plan.check_geometry(radar)
+
+    radar.azimuth['data'] += 1.0
+    assert not plan.check_geometry(radar)
+    assert_raises(ValueError, plan.map_gates_to_grid, radar)
+
+    assert not plan.check_geometry(pyart.testing.make_empty_ppi_radar(
+        10, 360, 1))
+    assert not plan.check_geometry((radar, radar))
@@ -148,6 +148,46 @@ def test_map_to_grid_no_copy_two_radars():
     assert_almost_equal(center_slice, EXPECTED_CENTER_SLICE)
 
 
+def test_map_to_grid_batched():
+    radar = pyart.testing.make_target_radar()
+    fdata = radar.fields['reflectivity']['data'] + np.random.uniform(
+        0, 1, size=(radar.nrays, radar.ngates))
+    radar.fields['reflectivity']['data'] = np.ma.masked_greater(fdata, 40.5)
+
+    grid_shape = (3, 19, 20)
+    grid_limits = ((-400.0, 400.0), (-900.0, 900.0), (-900, 900))
+    for roi_func in ['constant', 'dist', 'dist_beam', lambda z, y, x: 200.]:
+        for weighting_function in ['Barnes', 'Cressman']:
+            grid_args = {
+                'roi_func': roi_func, 'constant_roi': 150.,
+                'min_radius': 100., 'weighting_function': weighting_function}
+            grids = pyart.map.map_to_grid(
+                (radar,), grid_shape, grid_limits, **grid_args)
+            batched = pyart.map.map_to_grid(
+                (radar,), grid_shape, grid_limits, batch_size=50,
+                **grid_args)
+            assert np.array_equal(batched['reflectivity'].mask,
+                                  grids['reflectivity'].mask)
+            assert_almost_equal(batched['reflectivity'],
+                                grids['reflectivity'])
+            assert_almost_equal(batched['ROI'], grids['ROI'])
+
+
+def test_map_to_grid_batched_map_gates_to_grid():
+    radar = pyart.testing.make_target_radar()
+    grid_args = {
+        'grid_shape': (3, 19, 20),
+        'grid_limits': ((-400.0, 400.0), (-900.0, 900.0), (-900, 900)),
+        'roi_func': 'constant', 'constant_roi': 150.}
+    batched = pyart.map.map_to_grid((radar,), batch_size=100, **grid_args)
+    gates_to_grid = pyart.map.map_gates_to_grid((radar,), **grid_args)
+    assert np.array_equal(batched['reflectivity'].mask,
+                          gates_to_grid['reflectivity'].mask)
+    # map_gates_to_grid accumulates in single precision
+    assert_almost_equal(batched['reflectivity'],
+                        gates_to_grid['reflectivity'], 1)
+
+
 def test_map_to_grid_tiny_grid():
     radar = pyart.testing.make_target_radar()
     grids = pyart.map.map_to_grid(
@@ -212,6 +252,15 @@ def test_grid_from_radars():
     assert grid.nradar == 1
 
 
+def test_grid_from_radars_batched():
+    radar = pyart.testing.make_target_radar()
+    grid_args = dict(COMMON_MAP_TO_GRID_ARGS)
+    grid_args['gridding_algo'] = 'map_to_grid_batched'
+    grid = pyart.map.grid_from_radars((radar,), **grid_args)
+    center_slice = grid.fields['reflectivity']['data'][1, 4, :]
+    assert_almost_equal(center_slice, EXPECTED_CENTER_SLICE)
+
+
 def test_unify_times_for_radars():
     radar1 = pyart.testing.make_target_radar()
     radar2 = pyart.testing.make_target_radar()
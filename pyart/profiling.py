@@ -0,0 +1,405 @@
+"""
+pyart.profiling
+===============
+
+Instrumentation of the Py-ART processing functions.
+
+The readers in :py:mod:`pyart.io` and the main functions of
+:py:mod:`pyart.correct`, :py:mod:`pyart.retrieve`, :py:mod:`pyart.filters`
+and :py:mod:`pyart.map` are instrumented.  When profiling is active each
+call records its wall time, CPU time, the bytes of array data passed in and
+returned and, optionally, the memory allocated.  Records are passed to
+registered callbacks, for example to forward them to a metrics system, and
+collected by :py:func:`profile_volume` to report on the processing of a
+single volume::
+
+    with pyart.profiling.profile_volume('KATX') as report:
+        radar = pyart.io.read(filename)
+        pyart.correct.dealias_region_based(radar)
+    print(report)
+
+When profiling is not active the instrumented functions only check a flag
+before calling the underlying function.
+
+.. autosummary::
+    :toctree: generated/
+
+    enable_profiling
+    disable_profiling
+    profiling_enabled
+    profile_volume
+    profile_stage
+    profiled
+    ProfileReport
+    _array_bytes
+    _Frame
+
+"""
+
+from __future__ import print_function
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2, memory allocations are not recorded
+    tracemalloc = None
+
+
+# wall and CPU clocks, the Python 3 clocks are monotonic and more precise
+try:
+    _wall_time = time.perf_counter
+    _cpu_time = time.process_time
+except AttributeError:
+    _wall_time = time.time
+    _cpu_time = time.clock
+
+_PROFILING = {
+    'enabled': False,       # profiling enabled for all threads
+    'scopes': 0,            # number of open profile_volume scopes
+    'callbacks': [],
+    'memory': False,
+}
+_PROFILING_LOCK = threading.Lock()
+_local = threading.local()
+
+
+def enable_profiling(callback=None, memory=False):
+    """
+    Enable profiling of the instrumented functions in all threads.
+
+    Parameters
+    ----------
+    callback : callable or None
+        Function called with the record dictionary of each completed call,
+        see :py:class:`ProfileReport` for the keys.  Callbacks are called in
+        the thread that made the call and must be thread safe.  None only
+        enables profiling, records are then collected by
+        :py:func:`profile_volume`.
+    memory : bool
+        True to record the memory allocated during each call using the
+        tracemalloc module.  Tracing allocations slows down Python code
+        significantly.  Not available in Python 2.
+
+    """
+    if memory and tracemalloc is None:
+        raise ValueError('memory profiling requires the tracemalloc module')
+    with _PROFILING_LOCK:
+        _PROFILING['enabled'] = True
+        if callback is not None and callback not in _PROFILING['callbacks']:
+            _PROFILING['callbacks'].append(callback)
+        if memory and not _PROFILING['memory']:
+            _PROFILING['memory'] = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+
+def disable_profiling():
+    """
+    Disable profiling and remove all callbacks.
+
+    Calls made within an open :py:func:`profile_volume` scope are still
+    recorded in its report.
+    """
+    with _PROFILING_LOCK:
+        _PROFILING['enabled'] = False
+        _PROFILING['callbacks'] = []
+        if _PROFILING['memory']:
+            _PROFILING['memory'] = False
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def profiling_enabled():
+    """ Return True when profiling is active in any thread. """
+    return _PROFILING['enabled'] or _PROFILING['scopes'] > 0
+
+
+class ProfileReport(object):
+    """
+    Records of the calls to instrumented functions.
+
+    Each record is a dictionary with the keys:
+
+    'stage' : str
+        Package of the function, 'io', 'correct', 'retrieve', 'filters' or
+        'map', or the name given to :py:func:`profile_stage`.
+    'name' : str
+        Name of the function or sub-stage.
+    'depth' : int
+        Nesting level, 0 for calls not made from another instrumented
+        function or stage.
+    'wall_time', 'cpu_time' : float
+        Elapsed wall and process CPU time in seconds.  The CPU time includes
+        the time of all threads of the process.
+    'input_bytes', 'output_bytes' : int
+        Bytes of array data in the arguments and in the returned value.
+        The fields of Radar and Grid objects are included.
+    'allocated_bytes', 'peak_bytes' : int or None
+        Net memory allocated by the call and the peak memory allocated
+        during the call above the memory in use when it started.  None
+        unless memory profiling is enabled, the peak is only available in
+        Python 3.9 and later.
+
+    Attributes
+    ----------
+    name : str or None
+        Name of the report, for example the volume processed.
+    records : list of dict
+        Records in the order the calls completed.
+    wall_time, cpu_time : float
+        Total wall and CPU time spent in the scope of the report.
+
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.records = []
+        self.wall_time = 0.
+        self.cpu_time = 0.
+
+    def summary(self):
+        """
+        Return the records aggregated by stage and name.
+
+        Returns
+        -------
+        summary : dict
+            Dictionary keyed by (stage, name) tuples whose values are
+            dictionaries with the number of 'calls' and the summed
+            'wall_time', 'cpu_time', 'input_bytes' and 'output_bytes'.
+
+        """
+        summary = {}
+        for record in self.records:
+            key = (record['stage'], record['name'])
+            totals = summary.setdefault(key, {
+                'calls': 0, 'wall_time': 0., 'cpu_time': 0.,
+                'input_bytes': 0, 'output_bytes': 0})
+            totals['calls'] += 1
+            for item in ['wall_time', 'cpu_time', 'input_bytes',
+                         'output_bytes']:
+                totals[item] += record[item]
+        return summary
+
+    def __str__(self):
+        lines = ['Profile %s: %.3f s wall, %.3f s CPU' % (
+            self.name or '', self.wall_time, self.cpu_time)]
+        lines.append('%-45s %6s %10s %10s %10s' % (
+            'stage', 'calls', 'wall (s)', 'CPU (s)', 'out (MB)'))
+        summary = self.summary()
+        for key in sorted(summary, key=lambda k: -summary[k]['wall_time']):
+            totals = summary[key]
+            lines.append('%-45s %6d %10.3f %10.3f %10.1f' % (
+                '.'.join(key), totals['calls'], totals['wall_time'],
+                totals['cpu_time'], totals['output_bytes'] / 1e6))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile_volume(name=None, callback=None):
+    """
+    Context manager which profiles the calls made in its scope.
+
+    Calls to instrumented functions made by the current thread within the
+    scope are recorded even if profiling is not enabled with
+    :py:func:`enable_profiling`.  Calls made by other threads, for example
+    by thread pools used within a function, are included in the time of
+    the calling function but are not recorded separately.
+
+    Parameters
+    ----------
+    name : str or None
+        Name of the report, for example the name of the file processed.
+    callback : callable or None
+        Function called with each record of the scope as it completes.
+
+    Yields
+    ------
+    report : ProfileReport
+        Report collecting the records of the scope, complete once the scope
+        exits.
+
+    """
+    report = ProfileReport(name)
+    scopes = _thread_scopes()
+    scopes.append((report, callback))
+    with _PROFILING_LOCK:
+        _PROFILING['scopes'] += 1
+    wall_start = _wall_time()
+    cpu_start = _cpu_time()
+    try:
+        yield report
+    finally:
+        report.wall_time = _wall_time() - wall_start
+        report.cpu_time = _cpu_time() - cpu_start
+        with _PROFILING_LOCK:
+            _PROFILING['scopes'] -= 1
+        scopes.remove((report, callback))
+
+
+@contextmanager
+def profile_stage(stage, name=None):
+    """
+    Context manager which records a stage within a function.
+
+    Used to time the parts of long running functions, the stage is recorded
+    nested within the instrumented function calling it.  Nothing is
+    recorded when profiling is not active.
+
+    Parameters
+    ----------
+    stage : str
+        Name of the stage.
+    name : str or None
+        Name of the sub-stage, defaults to stage.
+
+    """
+    if not (_PROFILING['enabled'] or _PROFILING['scopes']):
+        yield
+        return
+    frame = _Frame(stage, name or stage)
+    try:
+        yield
+    finally:
+        frame.finish(0, 0)
+
+
+def profiled(func=None, stage=None):
+    """
+    Decorator which instruments a function.
+
+    Parameters
+    ----------
+    func : callable
+        Function to instrument.
+    stage : str or None
+        Stage recorded for the function.  None uses the name of the Py-ART
+        sub-package of the function, for example 'io' for
+        pyart.io.cfradial.read_cfradial.
+
+    """
+    if func is None:
+        return functools.partial(profiled, stage=stage)
+    if stage is None:
+        parts = func.__module__.split('.')
+        stage = parts[1] if len(parts) > 1 else parts[0]
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not (_PROFILING['enabled'] or _PROFILING['scopes']):
+            return func(*args, **kwargs)
+        input_bytes = sum(_array_bytes(arg) for arg in args)
+        input_bytes += sum(_array_bytes(arg) for arg in kwargs.values())
+        frame = _Frame(stage, name)
+        output = None
+        try:
+            output = func(*args, **kwargs)
+        finally:
+            frame.finish(input_bytes, _array_bytes(output))
+        return output
+    return wrapper
+
+
+class _Frame(object):
+    """ Measurements of one call, started on creation. """
+
+    def __init__(self, stage, name):
+        self.stage = stage
+        self.name = name
+        frames = _thread_frames()
+        self.depth = len(frames)
+        frames.append(self)
+        self.memory = _PROFILING['memory'] and tracemalloc.is_tracing()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak of the enclosing call is carried over as the tracing
+            # peak is reset at the start of each nested call
+            self.peak_seen = current
+            if self.depth:
+                parent = frames[-2]
+                parent.peak_seen = max(parent.peak_seen, peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            self.memory_start = current
+        self.wall_start = _wall_time()
+        self.cpu_start = _cpu_time()
+
+    def finish(self, input_bytes, output_bytes):
+        """ Complete the measurements and dispatch the record. """
+        wall_time = _wall_time() - self.wall_start
+        cpu_time = _cpu_time() - self.cpu_start
+        frames = _thread_frames()
+        frames.remove(self)
+        allocated_bytes = peak_bytes = None
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            allocated_bytes = current - self.memory_start
+            if hasattr(tracemalloc, 'reset_peak'):
+                peak = max(peak, self.peak_seen)
+                peak_bytes = peak - self.memory_start
+                if frames and frames[-1].memory:
+                    parent = frames[-1]
+                    parent.peak_seen = max(parent.peak_seen, peak)
+        record = {
+            'stage': self.stage,
+            'name': self.name,
+            'depth': self.depth,
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'input_bytes': input_bytes,
+            'output_bytes': output_bytes,
+            'allocated_bytes': allocated_bytes,
+            'peak_bytes': peak_bytes,
+        }
+        for report, callback in _thread_scopes():
+            report.records.append(record)
+            if callback is not None:
+                callback(record)
+        if _PROFILING['enabled']:
+            for callback in list(_PROFILING['callbacks']):
+                callback(record)
+
+
+def _thread_frames():
+    """ Return the stack of active frames of the current thread. """
+    try:
+        return _local.frames
+    except AttributeError:
+        _local.frames = []
+        return _local.frames
+
+
+def _thread_scopes():
+    """ Return the open profile_volume scopes of the current thread. """
+    try:
+        return _local.scopes
+    except AttributeError:
+        _local.scopes = []
+        return _local.scopes
+
+
+def _array_bytes(obj):
+    """
+    Return the bytes of array data in an object.
+
+    Arrays, the 'data' of field dictionaries, the fields of Radar and Grid
+    objects and the items of lists and tuples are counted.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return _array_bytes(obj.get('data'))
+    if isinstance(obj, (list, tuple)):
+        return sum(_array_bytes(item) for item in obj)
+    fields = getattr(obj, 'fields', None)
+    if isinstance(fields, dict):
+        return sum(_array_bytes(field) for field in fields.values())
+    return 0
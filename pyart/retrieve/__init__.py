@@ -22,6 +22,7 @@ Radar retrievals
     fetch_radar_time_profile
     map_profile_to_gates
     steiner_conv_strat
+    steiner_conv_strat_array
     hydroclass_semisupervised
     get_freq_band
     texture_of_complex_phase
@@ -38,7 +39,8 @@ Radar retrievals
 """
 
 from .kdp_proc import kdp_maesaka, kdp_schneebeli, kdp_vulpiani
-from .echo_class import steiner_conv_strat, hydroclass_semisupervised
+from .echo_class import steiner_conv_strat, steiner_conv_strat_array
+from .echo_class import hydroclass_semisupervised
 from .echo_class import get_freq_band
 from .gate_id import map_profile_to_gates, fetch_radar_time_profile
 from .simple_moment_calculations import calculate_snr_from_reflectivity
@@ -8,9 +8,15 @@ Functions for echo classification
     :toctree: generated/
 
     steiner_conv_strat
+    steiner_conv_strat_array
     hydroclass_semisupervised
     _standardize
     _assign_to_class
+    _assign_to_class_blocked
+    _assign_block_to_class
+    _steiner_background
+    _steiner_disk
+    _steiner_dilate
     _get_mass_centers
     _mass_centers_table
     _data_limits_table
@@ -18,10 +24,13 @@ Functions for echo classification
 
 """
 
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
 
 from ..config import get_fillvalue, get_field_name, get_metadata
 from ..exceptions import MissingOptionalDependency
+from ..profiling import profiled
 try:
     from . import _echo_steiner
     _F90_EXTENSIONS_AVAILABLE = True
@@ -30,11 +39,32 @@ except ImportError:
 
 from warnings import warn
 
+# Number of gates classified together by the blocked engine of
+# hydroclass_semisupervised
+BLOCK_GATES = 2**17
+
+# Background reflectivity thresholds (dBZ) and convective radii (m) of the
+# Steiner et al. (1995) convective area relations
+_STEINER_AREA_RELATIONS = {
+    'small': ([30., 35., 40., 45.], [1000., 2000., 3000., 4000., 5000.]),
+    'medium': ([25., 30., 35., 40.], [1000., 2000., 3000., 4000., 5000.]),
+    'large': ([20., 25., 30., 35.], [1000., 2000., 3000., 4000., 5000.]),
+    'sgp': ([40., 45., 50., 55.], [0., 1000., 2000., 6000., 8000.]),
+}
+
+# Peakedness below 0 dBZ and above 42.43 dBZ of the peakedness relations
+_STEINER_PEAK_RELATIONS = {
+    'default': (10., 0.),
+    'sgp': (14., 4.),
+}
+
+
+@profiled
 def steiner_conv_strat(grid, dx=None, dy=None, intense=42.0,
                        work_level=3000.0, peak_relation='default',
                        area_relation='medium', bkg_rad=11000.0,
                        use_intense=True, fill_value=None,
-                       refl_field=None):
+                       refl_field=None, engine='fortran'):
     """
     Partition reflectivity into convective-stratiform using the Steiner et
     al. (1995) algorithm.
@@ -73,6 +103,14 @@ def steiner_conv_strat(grid, dx=None, dy=None, intense=42.0,
          Field in grid to use as the reflectivity during partitioning. None
          will use the default reflectivity field name from the Py-ART
          configuration file.
+    engine : 'fortran' or 'array'
+        Implementation of the algorithm. 'fortran', the default, uses the
+        Fortran extension which averages the background reflectivity of each
+        grid point separately. 'array' uses
+        :py:func:`steiner_conv_strat_array` which computes the background
+        reflectivity of all grid points with running sums and is much
+        faster for large grids and background radii. It does not require
+        the Fortran extension and assumes a regular grid.
 
     Returns
     -------
@@ -86,10 +124,12 @@ def steiner_conv_strat(grid, dx=None, dy=None, intense=42.0,
     Radar and Rain Gauge Data. J. Appl. Meteor., 34, 1978-2007.
     """
     # check that Fortran extensions is available
-    if not _F90_EXTENSIONS_AVAILABLE:
+    if engine == 'fortran' and not _F90_EXTENSIONS_AVAILABLE:
         raise MissingOptionalDependency(
             "Py-ART must be built on a system with a Fortran compiler to "
             "use the steiner_conv_strat function.")
+    if engine not in ('fortran', 'array'):
+        raise ValueError("engine must be 'fortran' or 'array'")
 
     # Get fill value
     if fill_value is None:
@@ -114,12 +154,21 @@ def steiner_conv_strat(grid, dx=None, dy=None, intense=42.0,
     ze = np.ma.copy(grid.fields[refl_field]['data'])
     ze = np.ma.filled(ze, fill_value).astype(np.float64)
 
-    # Call Fortran routine
-    eclass = _echo_steiner.classify(
-        ze, x, y, z, dx=dx, dy=dy, bkg_rad=bkg_rad, work_level=work_level,
-        intense=intense, peak_relation=peak_relation,
-        area_relation=area_relation, use_intense=use_intense,
-        fill_value=fill_value)
+    if engine == 'array':
+        # constant height cross section of reflectivity at the working level
+        ze_s = ze[np.argmin(np.abs(z - work_level))]
+        eclass = steiner_conv_strat_array(
+            np.ma.masked_equal(ze_s, fill_value), dx, dy, intense=intense,
+            work_level=work_level, peak_relation=peak_relation,
+            area_relation=area_relation, bkg_rad=bkg_rad,
+            use_intense=use_intense)
+    else:
+        # Call Fortran routine
+        eclass = _echo_steiner.classify(
+            ze, x, y, z, dx=dx, dy=dy, bkg_rad=bkg_rad,
+            work_level=work_level, intense=intense,
+            peak_relation=peak_relation, area_relation=area_relation,
+            use_intense=use_intense, fill_value=fill_value)
 
     return {'data': eclass.astype(np.int32),
             'standard_name': 'echo_classification',
@@ -133,11 +182,254 @@ def steiner_conv_strat(grid, dx=None, dy=None, intense=42.0,
                           '2 = Convective')}
 
 
+@profiled
+def steiner_conv_strat_array(refl, dx, dy, intense=42.0,
+                             work_level=3000.0, peak_relation='default',
+                             area_relation='medium', bkg_rad=11000.0,
+                             use_intense=True):
+    """
+    Partition reflectivity arrays into convective-stratiform using the
+    Steiner et al. (1995) algorithm.
+
+    The mean background reflectivity of every grid point is computed at
+    once from running sums of the linear reflectivity over the rows of the
+    background disk, and the intensity and peakedness criteria are
+    evaluated as array operations. The classification is identical to that
+    of :py:func:`steiner_conv_strat` on regular grids, including the order
+    in which the convective areas are assigned, except where rounding
+    changes the background reflectivity across a threshold.
+
+    Parameters
+    ----------
+    refl : array
+        Reflectivity at the working level in dBZ, either a single grid with
+        dimensions (y, x) or a stack of grids with dimensions (time, y, x).
+        Masked and non-finite points are not classified.
+    dx, dy : float
+        The x- and y-dimension resolutions in meters, respectively.
+
+    Other Parameters
+    ----------------
+    intense, peak_relation, area_relation, bkg_rad, use_intense :
+        See :py:func:`steiner_conv_strat`.
+    work_level : float
+        Not used, the reflectivity is provided at the working level.
+        Accepted for compatibility with :py:func:`steiner_conv_strat`.
+
+    Returns
+    -------
+    eclass : array
+        Steiner convective-stratiform classification with the same
+        dimensions as refl. 0 = Undefined, 1 = Stratiform, 2 = Convective.
+
+    References
+    ----------
+    Steiner, M. R., R. A. Houze Jr., and S. E. Yuter, 1995: Climatological
+    Characterization of Three-Dimensional Storm Structure from Operational
+    Radar and Rain Gauge Data. J. Appl. Meteor., 34, 1978-2007.
+
+    """
+    if area_relation not in _STEINER_AREA_RELATIONS:
+        raise ValueError(
+            'Unknown area_relation: ' + str(area_relation) + '. Valid ' +
+            'relations are: ' + ', '.join(sorted(_STEINER_AREA_RELATIONS)))
+    if peak_relation not in _STEINER_PEAK_RELATIONS:
+        raise ValueError(
+            'Unknown peak_relation: ' + str(peak_relation) + '. Valid ' +
+            'relations are: ' + ', '.join(sorted(_STEINER_PEAK_RELATIONS)))
+
+    refl = np.ma.asarray(refl)
+    shape = refl.shape
+    if refl.ndim == 2:
+        refl = refl.reshape((1, ) + shape)
+    elif refl.ndim != 3:
+        raise ValueError('refl must have dimensions (y, x) or (time, y, x)')
+    ze_s = np.ma.getdata(refl).astype('float64')
+    valid = ~np.ma.getmaskarray(refl) & np.isfinite(ze_s)
+    ze_s[~valid] = 0.
+
+    # mean background reflectivity, averaged in linear units
+    ze_bkg = _steiner_background(ze_s, valid, dx, dy, bkg_rad)
+
+    # convective radius and required peakedness of each grid point
+    thresholds, radii = _STEINER_AREA_RELATIONS[area_relation]
+    radius_index = np.searchsorted(thresholds, ze_bkg, side='right')
+    peak_low, peak_high = _STEINER_PEAK_RELATIONS[peak_relation]
+    peak = np.where(ze_bkg < 42.43, peak_low - ze_bkg**2 / 180., peak_high)
+    peak[ze_bkg < 0] = peak_low
+
+    # convective centers meeting the intensity or peakedness criteria
+    if use_intense:
+        intense_center = valid & (ze_s >= intense)
+    else:
+        intense_center = np.zeros(ze_s.shape, dtype=bool)
+    peak_center = valid & ~intense_center & (ze_s - ze_bkg >= peak)
+
+    eclass = np.where(valid, 1, 0).astype(np.int32)
+    for i in range(ze_s.shape[0]):
+        convective = _steiner_dilate(
+            intense_center[i], peak_center[i], radius_index[i], valid[i],
+            radii, dx, dy, bkg_rad)
+        eclass[i][convective] = 2
+    return eclass.reshape(shape)
+
+
+def _steiner_background(ze_s, valid, dx, dy, bkg_rad):
+    """
+    Mean background reflectivity of a stack of grids.
+
+    Parameters
+    ----------
+    ze_s : array
+        Reflectivity in dBZ with dimensions (time, y, x).
+    valid : array
+        True for grid points with valid reflectivity.
+    dx, dy, bkg_rad : float
+        Grid resolutions and background radius in meters.
+
+    Returns
+    -------
+    ze_bkg : array
+        Mean of the linear reflectivity of the valid grid points within the
+        background radius, in dBZ. Undefined at invalid grid points.
+
+    """
+    ntime, ny, nx = ze_s.shape
+    zlin = np.where(valid, 10. ** (ze_s / 10.), 0.)
+
+    # the background disk is the union of one row segment per y offset
+    disk = _steiner_disk(bkg_rad, dx, dy)
+    half_y = disk.shape[0] // 2
+    half_widths = np.count_nonzero(disk, axis=1) // 2
+    pad = half_widths.max()
+
+    # running sums along x padded so that the sum over a row segment,
+    # clipped to the grid, is the difference of two slices
+    def running_sum(data):
+        padded = np.empty((ntime, ny, nx + 1 + 2 * pad))
+        padded[..., :pad + 1] = 0.
+        np.cumsum(data, axis=2, out=padded[..., pad + 1:pad + 1 + nx])
+        padded[..., pad + 1 + nx:] = padded[..., pad + nx:pad + 1 + nx]
+        return padded
+
+    sum_x = running_sum(zlin)
+    count_x = running_sum(valid)
+    sum_ze = np.zeros((ntime, ny, nx))
+    n = np.zeros((ntime, ny, nx))
+    for half_width in np.unique(half_widths):
+        start = slice(pad - half_width, pad - half_width + nx)
+        stop = slice(pad + half_width + 1, pad + half_width + 1 + nx)
+        segment_ze = sum_x[..., stop] - sum_x[..., start]
+        segment_n = count_x[..., stop] - count_x[..., start]
+        for offset in np.nonzero(half_widths == half_width)[0] - half_y:
+            src = slice(max(offset, 0), ny + min(offset, 0))
+            dst = slice(max(-offset, 0), ny + min(-offset, 0))
+            sum_ze[:, dst] += segment_ze[:, src]
+            n[:, dst] += segment_n[:, src]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 10. * np.log10(sum_ze / n)
+
+
+def _steiner_disk(radius, dx, dy, box=None):
+    """
+    Grid points within a radius of the central grid point.
+
+    Parameters
+    ----------
+    radius, dx, dy : float
+        Radius and grid resolutions in meters.
+    box : float or None
+        Radius in meters defining the box of grid point offsets searched by
+        the Fortran implementation, -ceil(box / dx) to int(box / dx).
+        None uses the radius.
+
+    Returns
+    -------
+    disk : array
+        Boolean array with odd dimensions (y, x), True for the grid points
+        within the radius of the central point.
+
+    """
+    if box is None:
+        box = radius
+    half_x = int(radius / dx)
+    half_y = int(radius / dy)
+    x_off = np.arange(-half_x, half_x + 1) * dx
+    y_off = np.arange(-half_y, half_y + 1) * dy
+    disk = np.sqrt(x_off**2 + y_off[:, np.newaxis]**2) <= radius
+    disk[:, x_off < -np.ceil(box / dx) * dx] = False
+    disk[:, x_off > int(box / dx) * dx] = False
+    disk[y_off < -np.ceil(box / dy) * dy] = False
+    disk[y_off > int(box / dy) * dy] = False
+    return disk
+
+
+def _steiner_dilate(intense_center, peak_center, radius_index, valid, radii,
+                    dx, dy, bkg_rad):
+    """
+    Mark the grid points within the convective radius of convective centers.
+
+    The convective centers are visited in the order of the Fortran
+    implementation, x index first. A center which lies within the
+    convective radius of an earlier center is already convective and does
+    not extend the convective area.
+
+    Parameters
+    ----------
+    intense_center, peak_center : array
+        Grid points with dimensions (y, x) which meet the intensity or the
+        peakedness criteria.
+    radius_index : array
+        Index of the convective radius of each grid point in radii.
+    valid : array
+        True for grid points with valid reflectivity.
+    radii : list
+        Convective radii in meters.
+    dx, dy, bkg_rad : float
+        Grid resolutions and background radius in meters.
+
+    Returns
+    -------
+    convective : array
+        True for convective grid points.
+
+    """
+    ny, nx = valid.shape
+    convective = np.zeros((ny, nx), dtype=bool)
+    disks = {}
+    centers = np.nonzero((intense_center | peak_center).T)
+    for i, j in zip(*centers):
+        if convective[j, i]:
+            continue
+        peak = bool(peak_center[j, i])
+        key = (radius_index[j, i], peak)
+        if key not in disks:
+            # the Fortran implementation only searches the background box
+            # when the peakedness criteria is met
+            radius = radii[key[0]]
+            disks[key] = _steiner_disk(
+                radius, dx, dy, box=bkg_rad if peak else None)
+        disk = disks[key]
+        half_y = disk.shape[0] // 2
+        half_x = disk.shape[1] // 2
+        j0 = max(j - half_y, 0)
+        j1 = min(j + half_y + 1, ny)
+        i0 = max(i - half_x, 0)
+        i1 = min(i + half_x + 1, nx)
+        convective[j0:j1, i0:i1] |= (
+            disk[j0 - j + half_y:j1 - j + half_y,
+                 i0 - i + half_x:i1 - i + half_x] & valid[j0:j1, i0:i1])
+    return convective
+
+
+@profiled
 def hydroclass_semisupervised(radar, mass_centers=None,
                               weights=np.array([1., 1., 1., 0.75, 0.5]),
                               refl_field=None, zdr_field=None, rhv_field=None,
                               kdp_field=None, temp_field=None,
-                              hydro_field=None):
+                              hydro_field=None, engine='array',
+                              n_workers=None):
     """
     Classifies precipitation echoes following the approach by
     Besic et al (2016)
@@ -165,6 +457,16 @@ def hydroclass_semisupervised(radar, mass_centers=None,
         Output. Field name which represents the hydrometeor class field.
         A value of None will use the default field name as defined in the
         Py-ART configuration file.
+    engine : 'array' or 'blocked'
+        Method used to assign the gates to the classes. 'array', the
+        default, computes the distances to all centroids for the entire
+        volume at once using masked arrays. 'blocked' processes blocks of
+        rays, finding the closest centroid of each gate with plain arrays
+        and a validity mask, which uses considerably less memory and time.
+        Both methods produce identical results.
+    n_workers : int or None
+        Number of threads used to classify the blocks of rays when engine
+        is 'blocked'. None classifies the blocks in the calling thread.
 
     Returns
     -------
@@ -238,9 +540,16 @@ def hydroclass_semisupervised(radar, mass_centers=None,
     mc_std[:, 4] = _standardize(mass_centers[:, 4], 'relH')
 
     # assign to class
-    hydroclass_data, min_dist = _assign_to_class(
-        refl_std, zdr_std, kdp_std, rhohv_std, relh_std, mc_std,
-        weights=weights)
+    if engine == 'array':
+        hydroclass_data, min_dist = _assign_to_class(
+            refl_std, zdr_std, kdp_std, rhohv_std, relh_std, mc_std,
+            weights=weights)
+    elif engine == 'blocked':
+        hydroclass_data, min_dist = _assign_to_class_blocked(
+            refl_std, zdr_std, kdp_std, rhohv_std, relh_std, mc_std,
+            weights=weights, n_workers=n_workers)
+    else:
+        raise ValueError("engine must be 'array' or 'blocked'")
 
     # prepare output fields
     hydro = get_metadata(hydro_field)
@@ -355,6 +664,132 @@ def _assign_to_class(zh, zdr, kdp, rhohv, relh, mass_centers,
     return hydroclass, min_dist
 
 
+def _assign_to_class_blocked(zh, zdr, kdp, rhohv, relh, mass_centers,
+                             weights=np.array([1., 1., 1., 0.75, 0.5]),
+                             block_gates=BLOCK_GATES, n_workers=None):
+    """
+    assigns an hydrometeor class to a radar range bin computing
+    the distance between the radar variables an a centroid, processing
+    the volume in blocks of rays
+
+    The results are identical to those of :py:func:`_assign_to_class`.
+
+    Parameters
+    ----------
+    zh,zdr,kdp,rhohv,relh : radar field
+        variables used for assigment normalized to [-1, 1] values
+
+    mass_centers : matrix
+        centroids normalized to [-1, 1] values
+
+    weights : array
+        optional. The weight given to each variable
+
+    block_gates : int
+        optional. The approximate number of gates in each block of rays
+
+    n_workers : int or None
+        optional. The number of threads used to process the blocks. None
+        processes the blocks in the calling thread
+
+    Returns
+    -------
+    hydroclass : int array
+        the index corresponding to the assigned class
+    mind_dist : float array
+        the minimum distance to the centroids
+    """
+    nrays, nbins = zh.shape
+    fields = [zh, zdr, kdp, rhohv, relh]
+    mass_centers = np.asarray(mass_centers, dtype='float64')
+    weights = np.asarray(weights, dtype='float64')
+
+    hydroclass = np.empty((nrays, nbins), dtype=np.intp)
+    min_dist = np.empty((nrays, nbins), dtype='float64')
+    no_data = np.empty((nrays, nbins), dtype=bool)
+
+    block_rays = max(1, block_gates // max(nbins, 1))
+    blocks = [(start, min(start + block_rays, nrays))
+              for start in range(0, nrays, block_rays)]
+
+    def classify(block):
+        start, stop = block
+        _assign_block_to_class(
+            [field[start:stop] for field in fields], mass_centers, weights,
+            hydroclass[start:stop], min_dist[start:stop], no_data[start:stop])
+
+    if n_workers is None or len(blocks) < 2:
+        for block in blocks:
+            classify(block)
+    else:
+        # the numpy operations release the GIL, so threads classify the
+        # blocks concurrently and write directly into the output arrays
+        pool = ThreadPool(min(n_workers, len(blocks)))
+        try:
+            pool.map(classify, blocks)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    return hydroclass, np.ma.masked_where(no_data, min_dist, copy=False)
+
+
+def _assign_block_to_class(fields, mass_centers, weights, hydroclass,
+                           min_dist, no_data):
+    """
+    assigns an hydrometeor class to the range bins of a block of rays
+
+    Parameters
+    ----------
+    fields : list of radar field
+        blocks of the variables used for the assignment normalized to
+        [-1, 1] values
+
+    mass_centers : matrix
+        centroids normalized to [-1, 1] values
+
+    weights : array
+        the weight given to each variable
+
+    hydroclass, min_dist, no_data : arrays
+        output. The index of the assigned class, the minimum distance to
+        the centroids and whether none of the variables are valid
+    """
+    nclasses = mass_centers.shape[0]
+    shape = hydroclass.shape
+
+    # masked and non-finite entries do not contribute to the distance
+    data = []
+    valid = []
+    for field in fields:
+        field_data = np.ma.getdata(field)
+        data.append(field_data)
+        valid.append(~np.ma.getmaskarray(field) & np.isfinite(field_data))
+
+    # the squared distances are accumulated variable by variable in the
+    # same order as _assign_to_class so that the distances are identical
+    dist = np.zeros((nclasses, ) + shape, dtype='float64')
+    term = np.empty(shape, dtype='float64')
+    for i in range(nclasses):
+        for j, (field_data, field_valid) in enumerate(zip(data, valid)):
+            np.subtract(mass_centers[i, j], field_data, out=term)
+            term *= term
+            term *= weights[j]
+            np.add(dist[i], term, out=dist[i], where=field_valid)
+    np.sqrt(dist, out=dist)
+
+    class_index = dist.argmin(axis=0)
+    hydroclass[:] = class_index + 1
+    dist.min(axis=0, out=min_dist)
+
+    np.logical_not(valid[0], out=no_data)
+    for field_valid in valid[1:]:
+        no_data &= ~field_valid
+
+    # Entries with non-valid reflectivity values are set to 0 (No class)
+    hydroclass[np.ma.getmaskarray(fields[0])] = 0
+
+
 def _get_mass_centers(freq):
     """
     get mass centers for a particular frequency
@@ -19,6 +19,12 @@ of propagation differential phase (PHIDP), backscatter differential phase
     _kdp_estimation_backward_fixed
     _kdp_estimation_backward_fixed
     _kdp_kalman_profile
+    _kdp_kalman_parameters
+    _kdp_kalman_padded_profile
+    _kdp_kalman_compile
+    _kdp_kalman_block
+    _kdp_kalman_batch
+    _kdp_estimation_batch
     _kdp_vulpiani_profile
     _cost_maesaka
     _jac_maesaka
@@ -35,6 +41,8 @@ from functools import partial
 from scipy import optimize, stats, interpolate, linalg, signal
 from . import _kdp_proc
 from ..config import get_field_name, get_metadata, get_fillvalue
+from ..util.parallel import map_ray_blocks
+from ..profiling import profiled, profile_stage
 
 
 # Constants in the Kalman filter retrieval method (generally no need to
@@ -44,11 +52,14 @@ SCALERS = [0.1, 10**(-0.8), 10**(-0.6), 10**(-0.4), 10**(-0.2), 1,
 
 PADDING = 50  # Noise padding of the psidp signal (before and after signal)
 SHIFT = 13  # Shifting of the final signal
+BATCH_RAYS = 128  # Number of rays processed together by the batched method
 
 
+@profiled
 def kdp_schneebeli(radar, gatefilter=None, fill_value=None, psidp_field=None,
                    kdp_field=None, phidp_field=None, band='C', rcov=0, pcov=0,
-                   prefilter_psidp=False, filter_opt=None, parallel=True):
+                   prefilter_psidp=False, filter_opt=None, parallel=True,
+                   method='profile'):
     """
     Estimates Kdp with the Kalman filter method by Schneebeli and al. (2014)
     for a set of psidp measurements.
@@ -88,7 +99,16 @@ def kdp_schneebeli(radar, gatefilter=None, fill_value=None, psidp_field=None,
         The arguments for the prefilter_psidp method, if empty, the defaults
         arguments of this method will be used
     parallel : bool, optional
-        Flag to enable parallel computation (one core for every psidp profile)
+        Flag to enable parallel computation.  The rays are split into
+        balanced blocks which are processed by the persistent pool of worker
+        processes returned by :py:func:`pyart.util.parallel.get_worker_pool`.
+    method : 'profile' or 'batched', optional
+        Method used to run the Kalman filters.  'profile' runs the filters
+        one ray at a time.  'batched' advances the filters for many rays and
+        all ensemble members together along the range axis, which is
+        considerably faster and typically does not require parallel
+        computation.  The methods give the same results up to floating point
+        rounding.
 
     Returns
     -------
@@ -108,12 +128,6 @@ def kdp_schneebeli(radar, gatefilter=None, fill_value=None, psidp_field=None,
 
     """
 
-    # create parallel computing instance
-    if parallel:
-        import multiprocessing as mp
-
-        pool = mp.Pool(processes=mp.cpu_count(), maxtasksperchild=1)
-
     # parse fill value
     if fill_value is None:
         fill_value = get_fillvalue()
@@ -145,30 +159,29 @@ def kdp_schneebeli(radar, gatefilter=None, fill_value=None, psidp_field=None,
     if gatefilter is not None:
         psidp_o = np.ma.masked_where(gatefilter.gate_excluded, psidp_o)
 
-    func = partial(_kdp_kalman_profile, dr=dr, band=band, rcov=rcov,
-                   pcov=pcov)
-
-    all_psidp_prof = list(psidp_o)
+    if method == 'profile':
+        block_func = _kdp_kalman_block
+    elif method == 'batched':
+        block_func = _kdp_kalman_batch
+    else:
+        raise ValueError("method must be 'profile' or 'batched'")
+    func = partial(block_func, dr=dr, band=band, rcov=rcov, pcov=pcov)
 
     if parallel:
-        list_est = pool.map(func, all_psidp_prof)
+        # blocks of rays are processed by the persistent worker pool,
+        # masked gates are passed as NaNs
+        psidp_filled = np.ma.filled(
+            np.ma.asarray(psidp_o, dtype=np.float64), np.nan)
+        blocks = map_ray_blocks(func, [psidp_filled])
+        kdp, kdp_stdev, phidp_rec = [
+            np.concatenate([block[i] for block in blocks]) for i in range(3)]
     else:
-        list_est = map(func, all_psidp_prof)
+        kdp, kdp_stdev, phidp_rec = func(psidp_o)
 
-    kdp = np.zeros(psidp_o.shape) * np.nan
     kdp = np.ma.masked_array(kdp, fill_value=fill_value)
-
-    kdp_stdev = np.zeros(psidp_o.shape) * np.nan
     kdp_stdev = np.ma.masked_array(kdp_stdev, fill_value=fill_value)
-
-    phidp_rec = np.zeros(psidp_o.shape) * np.nan
     phidp_rec = np.ma.masked_array(phidp_rec, fill_value=fill_value)
 
-    for i, l in enumerate(list_est):
-        kdp[i, 0:len(l[0])] = l[0]
-        kdp_stdev[i, 0:len(l[1])] = l[1]
-        phidp_rec[i, 0:len(l[2])] = l[2]
-
     # Mask the estimated Kdp and reconstructed Phidp with the mask of original
     # psidp
     if isinstance(psidp_o, np.ma.masked_array):
@@ -196,12 +209,189 @@ def kdp_schneebeli(radar, gatefilter=None, fill_value=None, psidp_field=None,
     kdp_stdev_dict['data'] = kdp_stdev
     kdp_stdev_dict['valid_min'] = 0.0
 
-    if parallel:
-        pool.close()
-
     return kdp_dict, kdp_stdev_dict, phidpr_dict
 
 
+def _kdp_kalman_block(psidp, dr, band='X', rcov=0, pcov=0):
+    """
+    Estimate Kdp with the Kalman filter method for a block of rays.
+
+    Parameters are the same as :py:func:`_kdp_kalman_profile` except psidp
+    is a two-dimensional array of psidp profiles.  Returns the retrieved
+    Kdp, Kdp standard deviation and differential phase as float arrays with
+    the shape of psidp, gates without a retrieval are set to NaN.
+    """
+    kdp = np.zeros(psidp.shape) * np.nan
+    kdp_stdev = np.zeros(psidp.shape) * np.nan
+    phidp_rec = np.zeros(psidp.shape) * np.nan
+    for i, psidp_prof in enumerate(psidp):
+        l = _kdp_kalman_profile(psidp_prof, dr, band=band, rcov=rcov,
+                                pcov=pcov)
+        kdp[i, 0:len(l[0])] = l[0]
+        kdp_stdev[i, 0:len(l[1])] = l[1]
+        phidp_rec[i, 0:len(l[2])] = l[2]
+    return kdp, kdp_stdev, phidp_rec
+
+
+def _kdp_kalman_batch(psidp, dr, band='X', rcov=0, pcov=0):
+    """
+    Estimate Kdp with the Kalman filter method for a block of rays, running
+    the Kalman filters for all rays together.
+
+    Parameters and return values are the same as
+    :py:func:`_kdp_kalman_block`.  The rays are processed in batches of
+    BATCH_RAYS rays, within a batch the forward and backward filters for all
+    scalers and rays are advanced together along the range axis by
+    :py:func:`_kdp_estimation_batch`.
+    """
+    kdp = np.zeros(psidp.shape) * np.nan
+    kdp_stdev = np.zeros(psidp.shape) * np.nan
+    phidp_rec = np.zeros(psidp.shape) * np.nan
+
+    dr = dr / 1000.  # Convert rad. res. to km
+    (rcov, pcov, f, f_transposed, h_plus,
+     c1, c2, b1, b2, kdp_th) = _kdp_kalman_parameters(dr, band, rcov, pcov)
+
+    # the smallest scaler and SCALERS, 1 appears twice in SCALERS and is
+    # only estimated once
+    scalers = np.unique([10 ** (-2.)] + SCALERS)
+    scaler_index = np.searchsorted(scalers, SCALERS)
+    small_index = np.searchsorted(scalers, 10 ** (-2.))
+
+    for start in range(0, len(psidp), BATCH_RAYS):
+        # prepare the profiles in ray order, rays without finite psidp
+        # are skipped
+        rays = []
+        profiles = []
+        for ray in range(start, min(start + BATCH_RAYS, len(psidp))):
+            psidp_in = np.ma.filled(psidp[ray], np.nan)
+            if not np.isfinite(psidp_in).any():
+                continue
+            rays.append(ray)
+            profiles.append(_kdp_kalman_padded_profile(psidp_in))
+        if len(rays) == 0:
+            continue
+
+        # forward and backward input profiles aligned at the first gate and
+        # extended with their final value
+        nprof = len(rays)
+        nn = max(len(profile[0]) for profile in profiles)
+        psidp_batch = np.empty([2, nprof, nn])
+        for i, (psidp_long, offset, nrg, mpsidp) in enumerate(profiles):
+            n = len(psidp_long)
+            psidp_batch[0, i, :n] = psidp_long
+            psidp_batch[0, i, n:] = psidp_long[-1]
+            psidp_batch[1, i, :n] = mpsidp - psidp_long[::-1]
+            psidp_batch[1, i, n:] = psidp_batch[1, i, n - 1]
+
+        # run the filters for each scaler, direction and profile, only the
+        # shifted estimates at the unpadded gates are needed
+        nrg_max = max(profile[2] for profile in profiles)
+        nscalers = len(scalers)
+        kdp_raw = _kdp_estimation_batch(
+            np.tile(psidp_batch.reshape(2 * nprof, nn), (nscalers, 1)),
+            np.repeat(scalers, 2 * nprof), rcov, pcov, f, h_plus,
+            c1, c2, b1, b2, kdp_th, PADDING + SHIFT + nrg_max)
+        kdp_raw = kdp_raw.reshape(nscalers, 2, nprof, -1)
+
+        # compile the final estimate for each profile
+        first = PADDING + SHIFT
+        for i, (psidp_long, offset, nrg, mpsidp) in enumerate(profiles):
+            forward = kdp_raw[:, 0, i, first:first + nrg]
+            backward = kdp_raw[:, 1, i, first:first + nrg][:, ::-1]
+            kdp_mat = np.zeros([nrg, 2 * len(SCALERS)])
+            kdp_mat[:, 0::2] = forward[scaler_index].T
+            kdp_mat[:, 1::2] = backward[scaler_index].T
+            l = _kdp_kalman_compile(
+                kdp_mat, backward[small_index], forward[small_index],
+                psidp_long, offset, dr)
+            ray = rays[i]
+            kdp[ray, 0:len(l[0])] = l[0]
+            kdp_stdev[ray, 0:len(l[1])] = l[1]
+            phidp_rec[ray, 0:len(l[2])] = l[2]
+    return kdp, kdp_stdev, phidp_rec
+
+
+def _kdp_estimation_batch(psidp, scalers, rcov, pcov, f, h_plus,
+                          c1, c2, b1, b2, kdp_th, ngates):
+    """
+    Processing a batch of Psidp profiles and estimating Kdp with the KFE
+    algorithm described in Schneebeli et al, 2014 IEEE_TGRS.
+
+    The filters for all profiles are advanced together along the range axis.
+    Each filter is identical to that used in
+    :py:func:`_kdp_estimation_forward_fixed`, the backward estimates are
+    found by providing the inverted profiles.
+
+    Parameters
+    ----------
+    psidp : ndarray
+        two-dimensional array of shape (nprofiles, nrg) containing the input
+        psidp profiles [degrees].
+    scalers : ndarray
+        Scaling of the state transition error covariance matrix for each
+        profile.
+    rcov : 3x3 float array
+        Measurement error covariance matrix
+    pcov  : 4x4 float array
+        State transition error covariance matrix
+    f : 4x4 float array
+        Forward state prediction matrix [4x4]
+    h_plus : 4x3 float array
+        Measurement prediction matrix [4x3]
+    c1, c2, b1, b2, kdp_th : floats
+        the values of the intercept of the relation c  = b*Kdp - delta.
+        This relation uses b1, c1 IF kdp is lower than a kdp_th and b2, c2
+        otherwise.
+    ngates : int
+        Number of gates to estimate.
+
+    Returns
+    -------
+    kdp: ndarray
+        Unshifted Kdp estimates [degrees/km] of shape (nprofiles, ngates).
+
+    """
+    nprof = len(psidp)
+    kdp = np.zeros([nprof, ngates])
+
+    # measurement prediction matrices for each Kdp regime
+    h_low = h_plus.copy()
+    h_low[2, 0] = b1
+    h_high = h_plus.copy()
+    h_high[2, 0] = b2
+
+    pcov_scale = scalers[:, np.newaxis, np.newaxis] * pcov
+    f_transposed = f.T
+
+    # Initialize the state vectors, error and measurement vectors
+    s = np.zeros([nprof, 4, 1])
+    p = np.tile(np.eye(4) * 4., (nprof, 1, 1))
+    z = np.zeros([nprof, 3, 1])
+
+    for ii in range(0, ngates):
+        z[:, 0, 0] = psidp[:, ii]
+        z[:, 1, 0] = psidp[:, ii + 1]
+
+        s_pred = np.matmul(f, s)  # state prediction
+        p_pred = np.matmul(np.matmul(f, p), f_transposed) + pcov_scale
+
+        high = s_pred[:, 0, 0] > kdp_th
+        h = np.where(high[:, np.newaxis, np.newaxis], h_high, h_low)
+        z[:, 2, 0] = np.where(high, c2, c1)
+
+        b_mat = np.matmul(h, p_pred)
+        aludc = np.matmul(b_mat, h.transpose(0, 2, 1)) + rcov
+        k = np.linalg.solve(aludc, b_mat).transpose(0, 2, 1)
+
+        # Update state and error
+        s = np.matmul(k, z - np.matmul(h, s_pred)) + s_pred
+        p = p_pred - np.matmul(k, b_mat)
+
+        kdp[:, ii] = s[:, 0, 0]
+    return kdp
+
+
 def _kdp_estimation_backward_fixed(
         psidp_in, rcov, pcov_scale, f, f_transposed, h_plus,
         c1, c2, b1, b2, kdp_th, mpsidp):
@@ -310,7 +500,8 @@ def _kdp_estimation_backward_fixed(
     n = len(kdp)
     dummy = np.copy(kdp)
     kdp[np.arange(SHIFT) + len(kdp) - SHIFT] = 0
-    kdp[range(n - 1 - SHIFT)] = dummy[range(n - 1 - SHIFT) + SHIFT]
+    kdp[np.arange(n - 1 - SHIFT)] = (
+        dummy[np.arange(n - 1 - SHIFT) + SHIFT])
 
     # Reverse the estimates (backward direction)
     kdp = kdp[::-1]
@@ -476,6 +667,67 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
     if not np.isfinite(psidp_in).any():
         return psidp_in, psidp_in, psidp_in  # Return the NaNs...
 
+    (rcov, pcov, f, f_transposed, h_plus,
+     c1, c2, b1, b2, kdp_th) = _kdp_kalman_parameters(dr, band, rcov, pcov)
+
+    psidp, offset, nrg, mpsidp = _kdp_kalman_padded_profile(psidp_in)
+
+    kdp_mat = np.zeros([nrg, 2 * len(SCALERS)])
+
+    '''
+    Smallest scaler
+    '''
+    scaler = 10 ** (-2.)
+
+    # Backward
+    kdp_dummy_b2, _ = _kdp_estimation_backward_fixed(psidp, rcov,
+                                                     pcov * scaler, f,
+                                                     f_transposed, h_plus,
+                                                     c1, c2, b1, b2,
+                                                     kdp_th, mpsidp)
+    kdp002 = kdp_dummy_b2[PADDING:nrg + PADDING]
+
+    # Forward
+    kdp_dummy_b2, _, _ = _kdp_estimation_forward_fixed(psidp, rcov,
+                                                       pcov * scaler, f,
+                                                       f_transposed, h_plus,
+                                                       c1, c2, b1, b2, kdp_th)
+    kdp002f = kdp_dummy_b2[PADDING:nrg + PADDING]
+
+    '''
+    Generate the ensemble of Kalman filters estimates in backward and
+    Forward directions
+    '''
+    for i, sc in enumerate(SCALERS):  # Loop on scalers
+        # Forward
+        kdp_dummy_f2, _, _ = _kdp_estimation_forward_fixed(psidp,
+                                                           rcov, pcov * sc,
+                                                           f, f_transposed,
+                                                           h_plus, c1, c2,
+                                                           b1, b2, kdp_th)
+        kdp_mat[:, 2 * i] = kdp_dummy_f2[PADDING:nrg + PADDING]
+
+        # Backward
+        kdp_dummy_b2, _ = _kdp_estimation_backward_fixed(psidp, rcov,
+                                                         pcov * sc, f,
+                                                         f_transposed, h_plus,
+                                                         c1, c2, b1, b2,
+                                                         kdp_th, mpsidp)
+        kdp_mat[:, 2 * i + 1] = kdp_dummy_b2[PADDING:nrg + PADDING]
+
+    return _kdp_kalman_compile(kdp_mat, kdp002, kdp002f, psidp, offset, dr)
+
+
+def _kdp_kalman_parameters(dr, band, rcov, pcov):
+    """
+    Return the parameters of the Kalman filter method.
+
+    The range resolution, dr, is in kilometers.  Returns the measurement and
+    scaled state transition error covariance matrices, the state prediction
+    matrix and its transpose, the measurement prediction matrix and the
+    intercepts and slopes, c1, c2, b1 and b2, of the delta=b*Kdp+c relation
+    and the Kdp threshold separating the two regimes of the relation.
+    """
     # Set default of the error covariance matrices
     if not isinstance(pcov, np.ndarray):
         pcov = np.array([[(0.11 + 1.56 * dr)**2,
@@ -524,14 +776,6 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
         b2 = 0.019
         kdp_th = 1.1
 
-    # Parameters for the final selection from the KF ensemble members
-    fac1 = 1.2
-    fac2 = 3.
-
-    th1_comp = -0.15
-    th2_comp = 0.15
-    th1_final = -0.25
-
     # Kalman matrices
     # State matrix
     f = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1],
@@ -543,6 +787,19 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
     h_plus = np.array(
         [[-2 * dr, 1, 0, 1], [2 * dr, 1, 1, 0], [0, -1, 0, 0]], dtype=float)
 
+    return rcov, pcov, f, f_transposed, h_plus, c1, c2, b1, b2, kdp_th
+
+
+def _kdp_kalman_padded_profile(psidp_in):
+    """
+    Prepare a psidp profile for the Kalman filter method.
+
+    The profile, which must contain at least one finite value, is trimmed to
+    the first and last finite gates, padded with noise at both ends and
+    missing gates are filled.  Returns the padded profile, the offset of the
+    first finite gate, the number of gates in the trimmed profile and the
+    last finite psidp value.
+    """
     # Define the input
     psidp = psidp_in
     # Get indices of finite data
@@ -558,13 +815,6 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
 
     nrg = len(psidp)
 
-    # Define the output
-    kdp_filter_out = np.zeros([nrg, ])
-
-    kdp_mat = np.zeros([nrg, 2 * len(SCALERS)])
-    kdp_sim = np.zeros([nrg, len(SCALERS)])
-    phidp_filter_out = np.zeros([nrg])
-
     '''
     Prepare a longer array with some extra gates on each side
     '''
@@ -599,49 +849,34 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
     if len(nan):
         psidp_interp[nan] = psidp_interp[nan] + 2 * np.random.randn(len(nan))
 
-    # Define the final input and output
-    psidp = psidp_interp
+    return psidp_interp, offset, nrg, mpsidp
 
-    '''
-    Smallest scaler
-    '''
-    scaler = 10 ** (-2.)
 
-    # Backward
-    kdp_dummy_b2, _ = _kdp_estimation_backward_fixed(psidp, rcov,
-                                                     pcov * scaler, f,
-                                                     f_transposed, h_plus,
-                                                     c1, c2, b1, b2,
-                                                     kdp_th, mpsidp)
-    kdp002 = kdp_dummy_b2[PADDING:nrg + PADDING]
+def _kdp_kalman_compile(kdp_mat, kdp002, kdp002f, psidp, offset, dr):
+    """
+    Compile the final Kdp estimate from the ensemble of Kalman filter
+    estimates.
+
+    kdp_mat contains the forward and backward estimates for each scaler in
+    alternating columns and kdp002 and kdp002f the backward and forward
+    estimates using the smallest scaler.  psidp is the padded profile,
+    offset the index of the first finite gate in the original profile and
+    dr the range resolution in kilometers.  Returns the same values as
+    :py:func:`_kdp_kalman_profile`.
+    """
+    nrg = len(kdp_mat)
 
-    # Forward
-    kdp_dummy_b2, _, _ = _kdp_estimation_forward_fixed(psidp, rcov,
-                                                       pcov * scaler, f,
-                                                       f_transposed, h_plus,
-                                                       c1, c2, b1, b2, kdp_th)
-    kdp002f = kdp_dummy_b2[PADDING:nrg + PADDING]
+    # Parameters for the final selection from the KF ensemble members
+    fac1 = 1.2
+    fac2 = 3.
 
-    '''
-    Generate the ensemble of Kalman filters estimates in backward and
-    Forward directions
-    '''
-    for i, sc in enumerate(SCALERS):  # Loop on scalers
-        # Forward
-        kdp_dummy_f2, _, _ = _kdp_estimation_forward_fixed(psidp,
-                                                           rcov, pcov * sc,
-                                                           f, f_transposed,
-                                                           h_plus, c1, c2,
-                                                           b1, b2, kdp_th)
-        kdp_mat[:, 2 * i] = kdp_dummy_f2[PADDING:nrg + PADDING]
+    th1_comp = -0.15
+    th2_comp = 0.15
+    th1_final = -0.25
 
-        # Backward
-        kdp_dummy_b2, _ = _kdp_estimation_backward_fixed(psidp, rcov,
-                                                         pcov * sc, f,
-                                                         f_transposed, h_plus,
-                                                         c1, c2, b1, b2,
-                                                         kdp_th, mpsidp)
-        kdp_mat[:, 2 * i + 1] = kdp_dummy_b2[PADDING:nrg + PADDING]
+    # Define the output
+    kdp_filter_out = np.zeros([nrg, ])
+    kdp_sim = np.zeros([nrg, len(SCALERS)])
 
     '''
     Compile the final estimate
@@ -682,8 +917,9 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
 
         weight2 = np.tile(weight2, (len(SCALERS), 1)).T
 
-        kdp_dummy = (1 - weight2) * kdp_mat[:, range(len(SCALERS)) * 2 + 1] \
-            + weight2 * kdp_mat[:, np.arange(len(SCALERS)) * 2]
+        kdp_dummy = ((1 - weight2) *
+                     kdp_mat[:, np.arange(len(SCALERS)) * 2 + 1] +
+                     weight2 * kdp_mat[:, np.arange(len(SCALERS)) * 2])
         kdp_sim[condi, :] = kdp_dummy[condi, :]
 
     # Now we reduced to 11 ensemble members: compile the final one
@@ -704,12 +940,16 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
     upper_bound = np.maximum(upper_bound, 0)
     upper_bound = np.minimum(upper_bound, len(SCALERS) - 1)
 
-    # Final selection of the ensemble members
-    for uu in range(0, nrg - 1):
-        selection_vector = np.arange(
-            upper_bound[uu] - lower_bound[uu] + 1) + lower_bound[uu]
-        selection_vector = selection_vector.astype(int)
-        kdp_filter_out[uu] = np.mean(kdp_sim[uu, selection_vector])
+    # Final selection of the ensemble members, the mean of the members
+    # between the lower and upper bounds is found from cumulative sums
+    lower = lower_bound[:nrg - 1].astype(int)
+    upper = upper_bound[:nrg - 1].astype(int)
+    kdp_sim_sum = np.zeros([nrg, len(SCALERS) + 1])
+    kdp_sim_sum[:, 1:] = np.cumsum(kdp_sim, axis=1)
+    uu = np.arange(nrg - 1)
+    kdp_filter_out[:nrg - 1] = (
+        (kdp_sim_sum[uu, upper + 1] - kdp_sim_sum[uu, lower]) /
+        (upper - lower + 1))
 
     # Final filtering of excessively negative values:
     # TO DO: It would be better to get rid of this filtering
@@ -739,6 +979,7 @@ def _kdp_kalman_profile(psidp_in, dr, band='X', rcov=0, pcov=0):
     return kdp_filter_out, kdp_std, phidp_filter_out
 
 
+@profiled
 def kdp_vulpiani(radar, gatefilter=None, fill_value=None, psidp_field=None,
                  kdp_field=None, phidp_field=None, band='C', windsize=10,
                  n_iter=10, interp=False, prefilter_psidp=False,
@@ -1114,6 +1355,7 @@ def filter_psidp(radar, psidp_field=None, rhohv_field=None, minsize_seq=5,
 #   function of iteration.
 
 
+@profiled
 def kdp_maesaka(radar, gatefilter=None, method='cg', backscatter=None,
                 Clpf=1.0, length_scale=None, first_guess=0.01,
                 finite_order='low', fill_value=None, proc=1, psidp_field=None,
@@ -1302,10 +1544,11 @@ def kdp_maesaka(radar, gatefilter=None, method='cg', backscatter=None,
         start = time.time()
 
     # minimize the cost functional
-    xopt = optimize.minimize(
-        _cost_maesaka, x0, args=args, method=method, jac=_jac_maesaka,
-        hess=None, hessp=None, bounds=None, constraints=None, callback=None,
-        options=options)
+    with profile_stage('retrieve', 'kdp_maesaka.minimization'):
+        xopt = optimize.minimize(
+            _cost_maesaka, x0, args=args, method=method, jac=_jac_maesaka,
+            hess=None, hessp=None, bounds=None, constraints=None,
+            callback=None, options=options)
 
     if debug:
         elapsed = time.time() - start
@@ -27,8 +27,10 @@ import numpy as np
 
 from ..config import get_metadata, get_field_name, get_fillvalue
 from .echo_class import get_freq_band
+from ..profiling import profiled
 
 
+@profiled
 def est_rain_rate_zpoly(radar, refl_field=None, rr_field=None):
     """
     Estimates rainfall rate from reflectivity using a polynomial Z-R relation
@@ -74,6 +76,7 @@ def est_rain_rate_zpoly(radar, refl_field=None, rr_field=None):
     return rain
 
 
+@profiled
 def est_rain_rate_z(radar, alpha=0.0376, beta=0.6112, refl_field=None,
                     rr_field=None):
     """
@@ -117,6 +120,7 @@ def est_rain_rate_z(radar, alpha=0.0376, beta=0.6112, refl_field=None,
     return rain
 
 
+@profiled
 def est_rain_rate_kdp(radar, alpha=None, beta=None, kdp_field=None,
                       rr_field=None):
     """
@@ -173,6 +177,7 @@ def est_rain_rate_kdp(radar, alpha=None, beta=None, kdp_field=None,
     return rain
 
 
+@profiled
 def est_rain_rate_a(radar, alpha=None, beta=None, a_field=None,
                     rr_field=None):
     """
@@ -240,6 +245,7 @@ def est_rain_rate_a(radar, alpha=None, beta=None, a_field=None,
     return rain
 
 
+@profiled
 def est_rain_rate_zkdp(radar, alphaz=0.0376, betaz=0.6112, alphakdp=None,
                        betakdp=None, refl_field=None, kdp_field=None,
                        rr_field=None, master_field=None, thresh=None,
@@ -334,6 +340,7 @@ def est_rain_rate_zkdp(radar, alphaz=0.0376, betaz=0.6112, alphakdp=None,
     return rain_master
 
 
+@profiled
 def est_rain_rate_za(radar, alphaz=0.0376, betaz=0.6112, alphaa=None,
                      betaa=None, refl_field=None, a_field=None, rr_field=None,
                      master_field=None, thresh=None, thresh_max=False):
@@ -427,6 +434,7 @@ def est_rain_rate_za(radar, alphaz=0.0376, betaz=0.6112, alphaa=None,
     return rain_master
 
 
+@profiled
 def est_rain_rate_hydro(radar, alphazr=0.0376, betazr=0.6112, alphazs=0.1,
                         betazs=0.5, alphaa=None, betaa=None, mp_factor=0.6,
                         refl_field=None, a_field=None, hydro_field=None,
@@ -19,8 +19,10 @@ import numpy as np
 
 from ..config import get_metadata, get_field_name, get_fillvalue
 from ..core.transforms import antenna_to_cartesian
+from ..profiling import profiled
 
 
+@profiled
 def calculate_snr_from_reflectivity(
         radar, refl_field=None, snr_field=None, toa=25000.):
     """
@@ -112,6 +114,7 @@ def compute_noisedBZ(nrays, noisedBZ_val, range, ref_dist,
     return noisedBZ
 
 
+@profiled
 def compute_snr(radar, refl_field=None, noise_field=None, snr_field=None):
     """
     Computes SNR from a reflectivity field and the noise in dBZ.
@@ -159,6 +162,7 @@ def compute_snr(radar, refl_field=None, noise_field=None, snr_field=None):
     return snr
 
 
+@profiled
 def compute_l(radar, rhohv_field=None, l_field=None):
     """
     Computes Rhohv in logarithmic scale according to L=-log10(1-RhoHV)
@@ -201,6 +205,7 @@ def compute_l(radar, rhohv_field=None, l_field=None):
     return l
 
 
+@profiled
 def compute_cdr(radar, rhohv_field=None, zdr_field=None, cdr_field=None):
     """
     Computes the Circular Depolarization Ratio
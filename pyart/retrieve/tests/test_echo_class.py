@@ -13,3 +13,98 @@ def test_steiner_conv_strat():
     assert np.all(eclass['data'][25] == np.array(
         [0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
          2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0]))
+
+
+def test_hydroclass_semisupervised_blocked():
+    radar = pyart.testing.make_empty_ppi_radar(50, 40, 1)
+    rng = np.random.RandomState(0)
+    shape = (40, 50)
+    fields = {
+        'reflectivity': np.ma.masked_less(rng.uniform(-20, 60, shape), -10),
+        'differential_reflectivity': np.ma.masked_array(
+            rng.uniform(-2, 5, shape)),
+        'cross_correlation_ratio': rng.uniform(0.7, 1., shape),
+        'specific_differential_phase': rng.uniform(-1, 5, shape),
+        'temperature': rng.uniform(-30, 20, shape)}
+    fields['differential_reflectivity'][3] = np.ma.masked
+    zdr_masked = np.ma.getmaskarray(fields['differential_reflectivity'])
+    assert zdr_masked[3].all()
+    for name, data in fields.items():
+        radar.add_field(name, {'data': data})
+    mass_centers = pyart.retrieve.echo_class._mass_centers_table()['C']
+
+    hydro = pyart.retrieve.hydroclass_semisupervised(
+        radar, mass_centers=mass_centers, temp_field='temperature')
+    for n_workers in [None, 2]:
+        hydro_blocked = pyart.retrieve.hydroclass_semisupervised(
+            radar, mass_centers=mass_centers, temp_field='temperature',
+            engine='blocked', n_workers=n_workers)
+        assert np.all(hydro_blocked['data'] == hydro['data'])
+        # gates with masked differential reflectivity are classified
+        # without it
+        assert np.all(hydro_blocked['data'][zdr_masked] ==
+                      hydro['data'][zdr_masked])
+    assert np.all(hydro['data'][fields['reflectivity'].mask] == 0)
+    assert np.any(hydro['data'][zdr_masked] != 0)
+
+    # blocks of a few rays
+    zh = np.ma.masked_less(rng.uniform(-1, 1, shape), -0.9)
+    data = [zh] + [np.ma.masked_array(rng.uniform(-1, 1, shape))
+                   for i in range(4)]
+    data[1][0, :5] = np.ma.masked
+    data[2][0, :5] = np.nan
+    assert np.ma.getmaskarray(data[1])[0, :5].all()
+    mc_std = rng.uniform(-1, 1, (9, 5))
+    hydroclass, min_dist = pyart.retrieve.echo_class._assign_to_class(
+        *data, mass_centers=mc_std)
+    hydroclass_blocked, min_dist_blocked = (
+        pyart.retrieve.echo_class._assign_to_class_blocked(
+            *data, mass_centers=mc_std, block_gates=120, n_workers=3))
+    assert np.all(hydroclass_blocked == hydroclass)
+    assert np.allclose(min_dist_blocked, min_dist)
+    assert np.all(hydroclass_blocked[0, :5] == hydroclass[0, :5])
+    assert np.allclose(min_dist_blocked[0, :5], min_dist[0, :5])
+
+
+def test_steiner_conv_strat_array():
+    grid = pyart.testing.make_storm_grid()
+    eclass = pyart.retrieve.steiner_conv_strat(grid, engine='array')
+    assert eclass['data'].dtype == np.int32
+    assert np.all(eclass['data'][25] == np.array(
+        [0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+         2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0]))
+
+    # stack of grids
+    refl = grid.fields['reflectivity']['data'][0]
+    stack = np.ma.array([refl, refl - 15., refl[::-1]])
+    eclass_stack = pyart.retrieve.steiner_conv_strat_array(
+        stack, 1000., 1000.)
+    for i in range(3):
+        eclass_grid = pyart.retrieve.steiner_conv_strat_array(
+            stack[i], 1000., 1000.)
+        assert np.all(eclass_stack[i] == eclass_grid)
+    assert np.all(eclass_stack[0][refl.mask] == 0)
+
+
+def _make_steiner_grid():
+    grid = pyart.testing.make_empty_grid(
+        (2, 60, 50), ((0, 3000), (-29500, 29500), (-24500, 24500)))
+    rng = np.random.RandomState(0)
+    refl = 24 + 12 * np.sin(np.arange(50) / 4.) * np.cos(np.arange(60) / 6.)[
+        :, np.newaxis] + rng.uniform(-5, 5, (60, 50))
+    refl[rng.uniform(size=refl.shape) < 0.05] += 15.
+    refl = np.ma.masked_less(np.round(refl, 1), 15)
+    grid.fields = {'reflectivity': {'data': np.ma.array([refl, refl])}}
+    return grid
+
+
+@skipif(not pyart.retrieve.echo_class._F90_EXTENSIONS_AVAILABLE)
+def test_steiner_conv_strat_engines():
+    grid = _make_steiner_grid()
+    for kwargs in [{}, {'area_relation': 'sgp', 'peak_relation': 'sgp'},
+                   {'area_relation': 'sgp', 'bkg_rad': 5000.},
+                   {'area_relation': 'large', 'use_intense': False}]:
+        eclass = pyart.retrieve.steiner_conv_strat(grid, **kwargs)
+        eclass_array = pyart.retrieve.steiner_conv_strat(
+            grid, engine='array', **kwargs)
+        assert np.all(eclass['data'] == eclass_array['data'])
@@ -1,11 +1,13 @@
 """ Unit tests for pyart.retrieve.kdp_proc module. """
 
 import numpy as np
+from numpy.testing import assert_allclose
 
 from pyart.retrieve import kdp_proc
 from pyart.filters import GateFilter
 from pyart.testing import sample_objects
 from pyart.config import get_field_name
+from pyart.util import parallel
 
 
 def test_kdp_maesaka_linear_psidp(slope=0.002, maxiter=100):
@@ -56,3 +58,64 @@ def _make_linear_psidp_radar(slope=0.002):
     radar.add_field(get_field_name('differential_phase'), psidp_dict)
 
     return radar
+
+
+_KDP_KALMAN_PADDED_PROFILE = kdp_proc._kdp_kalman_padded_profile
+
+
+def _seeded_padded_profile(psidp_in):
+    """ Pad a psidp profile with the same noise for every profile. """
+    np.random.seed(0)
+    return _KDP_KALMAN_PADDED_PROFILE(psidp_in)
+
+
+def test_kdp_schneebeli_parallel():
+    radar = sample_objects.make_empty_ppi_radar(101, 5, 1)
+    random_state = np.random.RandomState(0)
+    psidp = np.linspace(0.0, 20.0, radar.ngates) + random_state.normal(
+        0, 2, (radar.nrays, radar.ngates))
+    psidp = np.ma.masked_greater(psidp, 19.)
+    radar.add_field(get_field_name('differential_phase'), {'data': psidp})
+
+    # the retrieval pads profiles with random noise, the padding is seeded
+    # so that the serial and parallel retrievals have the same input.  The
+    # worker processes are started after the padding is replaced and
+    # inherit it.
+    parallel.close_worker_pool()
+    kdp_proc._kdp_kalman_padded_profile = _seeded_padded_profile
+    try:
+        serial = kdp_proc.kdp_schneebeli(radar, parallel=False)
+        result = kdp_proc.kdp_schneebeli(radar, parallel=True)
+    finally:
+        kdp_proc._kdp_kalman_padded_profile = _KDP_KALMAN_PADDED_PROFILE
+        parallel.close_worker_pool()
+    for expected, field in zip(serial, result):
+        assert field['data'].shape == (5, 101)
+        assert np.array_equal(np.ma.getmaskarray(expected['data']),
+                              np.ma.getmaskarray(field['data']))
+        assert_allclose(field['data'].filled(np.nan),
+                        expected['data'].filled(np.nan))
+
+
+def test_kdp_schneebeli_batched():
+    radar = sample_objects.make_empty_ppi_radar(101, 5, 1)
+    random_state = np.random.RandomState(0)
+    psidp = np.linspace(0.0, 20.0, radar.ngates) + random_state.normal(
+        0, 2, (radar.nrays, radar.ngates))
+    psidp = np.ma.masked_greater(psidp, 19.)
+    psidp[1] = np.ma.masked
+    psidp[2, :20] = np.ma.masked
+    radar.add_field(get_field_name('differential_phase'), {'data': psidp})
+
+    # the noise padding is drawn from the global random state, seeding it
+    # gives the same padding for both methods
+    np.random.seed(0)
+    profile = kdp_proc.kdp_schneebeli(radar, parallel=False)
+    np.random.seed(0)
+    batched = kdp_proc.kdp_schneebeli(
+        radar, parallel=False, method='batched')
+    for expected, result in zip(profile, batched):
+        assert np.array_equal(np.ma.getmaskarray(expected['data']),
+                              np.ma.getmaskarray(result['data']))
+        assert np.allclose(expected['data'].filled(0),
+                           result['data'].filled(0), equal_nan=True)
@@ -0,0 +1,96 @@
+""" Unit Tests for Py-ART's profiling.py module. """
+
+import numpy as np
+from numpy.testing import assert_raises
+import pyart
+from pyart.profiling import profiled, profile_stage
+
+
+@profiled(stage='test')
+def _outer(data):
+    with profile_stage('test', 'outer.stage'):
+        _inner(data)
+    return data * 2
+
+
+@profiled(stage='test')
+def _inner(data):
+    return np.ones(10)
+
+
+def _names(records):
+    return [record['name'] for record in records]
+
+
+def test_profile_volume():
+    data = np.zeros(100)
+    with pyart.profiling.profile_volume('volume') as report:
+        _outer(data)
+    assert report.name == 'volume'
+    assert _names(report.records) == ['_inner', 'outer.stage', '_outer']
+    assert [r['depth'] for r in report.records] == [2, 1, 0]
+    inner, stage, outer = report.records
+    assert inner['input_bytes'] == 800
+    assert inner['output_bytes'] == 80
+    assert outer['output_bytes'] == 800
+    assert outer['wall_time'] >= stage['wall_time'] >= inner['wall_time']
+    assert outer['allocated_bytes'] is None
+    assert report.wall_time >= outer['wall_time']
+
+    summary = report.summary()
+    assert summary[('test', '_outer')]['calls'] == 1
+    assert '_outer' in str(report)
+
+    # nothing is recorded outside of the scope
+    assert not pyart.profiling.profiling_enabled()
+    _outer(data)
+    assert len(report.records) == 3
+
+
+def test_enable_profiling_callback():
+    records = []
+    pyart.profiling.enable_profiling(records.append)
+    try:
+        assert pyart.profiling.profiling_enabled()
+        _inner(None)
+    finally:
+        pyart.profiling.disable_profiling()
+    _inner(None)
+    assert _names(records) == ['_inner']
+
+
+def test_profiled_radar_functions():
+    radar = pyart.testing.make_target_radar()
+    with pyart.profiling.profile_volume() as report:
+        rain = pyart.retrieve.est_rain_rate_z(
+            radar, refl_field='reflectivity', rr_field='rain_rate')
+    record = report.records[-1]
+    assert record['stage'] == 'retrieve'
+    assert record['name'] == 'est_rain_rate_z'
+    assert record['input_bytes'] == radar.fields['reflectivity']['data'].nbytes
+    assert record['output_bytes'] == rain['data'].nbytes
+    assert pyart.retrieve.est_rain_rate_z.__name__ == 'est_rain_rate_z'
+
+
+def test_profiling_exception():
+    @profiled
+    def fails():
+        raise ValueError
+
+    with pyart.profiling.profile_volume() as report:
+        assert_raises(ValueError, fails)
+    assert _names(report.records) == ['fails']
+    assert report.records[0]['output_bytes'] == 0
+
+
+def test_profiling_memory():
+    pyart.profiling.enable_profiling(memory=True)
+    try:
+        with pyart.profiling.profile_volume() as report:
+            _outer(np.zeros(100000))
+    finally:
+        pyart.profiling.disable_profiling()
+    outer = report.records[-1]
+    assert outer['allocated_bytes'] >= 800000
+    if outer['peak_bytes'] is not None:
+        assert outer['peak_bytes'] >= outer['allocated_bytes']
@@ -39,6 +39,15 @@ Miscellaneous functions
     join_radar
     simulated_vel_from_profile
 
+Parallel processing
+===================
+
+.. autosummary::
+    :toctree: generated/
+
+    get_worker_pool
+    close_worker_pool
+
 """
 
 from .circular_stats import angular_mean, angular_std
@@ -49,7 +58,8 @@ from .xsect import cross_section_ppi, cross_section_rhi
 from .hildebrand_sekhon import estimate_noise_hs74
 from .radar_utils import is_vpt, to_vpt, join_radar
 from .simulated_vel import simulated_vel_from_profile
-from .sigmath import texture_along_ray
+from .sigmath import texture_along_ray, rolling_texture
 from .sigmath import angular_texture_2d
+from .parallel import get_worker_pool, close_worker_pool
 
 __all__ = [s for s in dir() if not s.startswith('_')]
@@ -0,0 +1,217 @@
+"""
+pyart.util.parallel
+===================
+
+A shared execution backend for algorithms which process radar rays
+independently.  Worker processes are kept alive between calls and blocks of
+rays are passed to the workers using shared memory.
+
+.. autosummary::
+    :toctree: generated/
+
+    get_worker_pool
+    close_worker_pool
+    balanced_chunks
+    map_ray_blocks
+    _share_array
+    _process_ray_block
+
+"""
+
+import atexit
+import multiprocessing
+
+import numpy as np
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+    _SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    # Python < 3.8, arrays are passed to the workers by pickling
+    _SHARED_MEMORY_AVAILABLE = False
+
+
+_WORKER_POOL = {'pool': None, 'processes': None}
+
+
+def get_worker_pool(processes=None):
+    """
+    Return the persistent pool of worker processes.
+
+    The pool is created the first time it is requested and reused by all
+    later calls, removing the cost of starting worker processes each time a
+    parallel algorithm is run.  The pool is never resized, algorithms limit
+    the number of workers they use by the number of blocks of rays passed
+    to :py:func:`map_ray_blocks`.
+
+    Parameters
+    ----------
+    processes : int or None
+        Number of worker processes used when the pool is created.  None
+        uses the number of CPUs.  Ignored when the pool already exists, use
+        :py:func:`close_worker_pool` before requesting a pool of a different
+        size.
+
+    Returns
+    -------
+    pool : multiprocessing.Pool
+        Pool of worker processes.
+
+    """
+    if _WORKER_POOL['pool'] is None:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if _SHARED_MEMORY_AVAILABLE:
+            # workers must share the resource tracker of this process,
+            # otherwise shared memory blocks they attach to are reported
+            # as leaked and removed when the workers exit.
+            resource_tracker.ensure_running()
+        _WORKER_POOL['pool'] = multiprocessing.Pool(processes)
+        _WORKER_POOL['processes'] = processes
+    return _WORKER_POOL['pool']
+
+
+def close_worker_pool():
+    """ Close the persistent pool of worker processes if it exists. """
+    pool = _WORKER_POOL['pool']
+    if pool is not None:
+        pool.close()
+        pool.join()
+    _WORKER_POOL['pool'] = None
+    _WORKER_POOL['processes'] = None
+
+
+atexit.register(close_worker_pool)
+
+
+def balanced_chunks(nitems, nchunks):
+    """
+    Split items into contiguous chunks whose sizes differ by at most one.
+
+    Parameters
+    ----------
+    nitems : int
+        Number of items to split.
+    nchunks : int
+        Number of chunks requested, fewer are returned if there are fewer
+        items than chunks.
+
+    Returns
+    -------
+    chunks : list of 2-tuples
+        Start and stop index of each chunk.
+
+    """
+    nchunks = max(min(nchunks, nitems), 1)
+    bounds = np.linspace(0, nitems, nchunks + 1).round().astype(int)
+    return [(int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def map_ray_blocks(func, arrays, nchunks=None, pool=None,
+                   common_arrays=None, chunks=None):
+    """
+    Apply a function to blocks of rays using a pool of worker processes.
+
+    The arrays are split along the first (ray) axis into balanced blocks.
+    Where available the arrays are placed in shared memory and each worker
+    reads its block of rays from the shared memory, otherwise the blocks
+    are pickled.
+
+    Parameters
+    ----------
+    func : callable
+        Function called as ``func(*(blocks + common_arrays))`` where blocks
+        are the blocks of rays from each of arrays.  Must be picklable, for
+        example a module level function or a functools.partial of one.
+    arrays : list of ndarray
+        Arrays with the same number of rays to split into blocks.  Masked
+        arrays are not supported.
+    nchunks : int or None
+        Number of blocks to split the rays into, which limits the number of
+        workers processing the blocks concurrently.  None uses the number of
+        processes in the pool.
+    pool : multiprocessing.Pool or None
+        Pool used to process the blocks.  None uses the persistent pool
+        returned by :py:func:`get_worker_pool`.
+    common_arrays : list of ndarray or None
+        Arrays which are passed, in their entirety, to every call of func
+        after the blocks of rays.  These are shared in the same manner as
+        arrays.
+    chunks : list of 2-tuples or None
+        Start and stop ray of each block, for example the rays in each sweep.
+        None splits the rays into nchunks balanced blocks.
+
+    Returns
+    -------
+    results : list
+        Result of func for each block, in ray order.
+
+    """
+    if pool is None:
+        pool = get_worker_pool()
+    if nchunks is None:
+        nchunks = getattr(pool, '_processes', multiprocessing.cpu_count())
+    if common_arrays is None:
+        common_arrays = []
+    nsplit = len(arrays)
+    if chunks is None:
+        chunks = balanced_chunks(len(arrays[0]), nchunks)
+
+    if not _SHARED_MEMORY_AVAILABLE:
+        tasks = [(func, [array[start:stop] for array in arrays] +
+                  list(common_arrays), None, None)
+                 for start, stop in chunks]
+        return pool.map(_process_ray_block, tasks, chunksize=1)
+
+    arrays = list(arrays) + list(common_arrays)
+    shared = [_share_array(array) for array in arrays]
+    try:
+        descriptions = [(shm.name, array.shape, array.dtype.str, i < nsplit)
+                        for i, (shm, array) in enumerate(zip(shared, arrays))]
+        tasks = [(func, descriptions, start, stop) for start, stop in chunks]
+        return pool.map(_process_ray_block, tasks, chunksize=1)
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+
+
+def _share_array(array):
+    """ Copy an array into a new shared memory block. """
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared_array = np.ndarray(array.shape, array.dtype, buffer=shm.buf)
+    shared_array[...] = array
+    del shared_array
+    return shm
+
+
+def _process_ray_block(task):
+    """
+    Apply a function to a block of rays in a worker process.
+
+    The task is a 4-tuple of the function, a list describing the arrays and
+    the start and stop ray of the block.  The list contains the arguments
+    to the function when start and stop are None, otherwise the name, shape,
+    dtype and a flag indicating if the array is split into blocks of rays
+    for each of the shared memory blocks holding the arrays.
+    """
+    func, descriptions, start, stop = task
+    if start is None:
+        return func(*descriptions)
+
+    shared = [shared_memory.SharedMemory(name=description[0])
+              for description in descriptions]
+    try:
+        blocks = []
+        for shm, (name, shape, dtype, split) in zip(shared, descriptions):
+            array = np.ndarray(shape, dtype, buffer=shm.buf)
+            if split:
+                array = array[start:stop]
+            blocks.append(array.copy())
+            del array
+    finally:
+        for shm in shared:
+            shm.close()
+    return func(*blocks)
@@ -7,7 +7,6 @@ Put more stuff in here
 """
 
 from __future__ import print_function
-from scipy import signal
 import numpy as np
 
 
@@ -49,20 +48,42 @@ def angular_texture_2d(image, N, interval):
     x = np.cos(im)
     y = np.sin(im)
 
-    # Calculate convolution
-    kernel = np.ones((N, N))
-    xs = signal.convolve2d(x, kernel, mode="same", boundary="symm")
-    ys = signal.convolve2d(y, kernel, mode="same", boundary="symm")
+    # Calculate the sums over the window, equivalent to a convolution
+    # with an N by N kernel of ones and symmetric boundaries
+    xs = _box_sum_2d(x, N)
+    ys = _box_sum_2d(y, N)
     ns = N**2
 
-    # Calculate norm over specified window
+    # Calculate norm over specified window, rounding can produce norms
+    # slightly above one in uniform regions
     xmean = xs/ns
     ymean = ys/ns
-    norm = np.sqrt(xmean**2 + ymean**2)
+    norm = np.minimum(np.sqrt(xmean**2 + ymean**2), 1.)
     std_dev = np.sqrt(-2 * np.log(norm)) * (half_width) / np.pi
     return std_dev
 
 
+def _box_sum_2d(image, N):
+    """
+    Sum of an image over an N by N window centered around each pixel.
+
+    Equivalent to ``scipy.signal.convolve2d(image, np.ones((N, N)),
+    mode='same', boundary='symm')`` but computed as two one dimensional
+    sums of shifted slices, which is faster and releases the GIL.
+    """
+    nrows, ncols = image.shape
+    lo = N // 2
+    hi = N - 1 - lo
+    padded = np.pad(image, ((lo, hi), (lo, hi)), mode='symmetric')
+    rows = padded[:nrows].copy()
+    for k in range(1, N):
+        rows += padded[k:k + nrows]
+    sums = rows[:, :ncols].copy()
+    for k in range(1, N):
+        sums += rows[:, k:k + ncols]
+    return sums
+
+
 def rolling_window(a, window):
     """ create a rolling window object for application of functions
     eg: result=np.ma.std(array, 11), 1)"""
@@ -76,14 +97,7 @@ def texture(myradar, var):
     texarray=texture(pyradarobj, field)
     """
     fld = myradar.fields[var]['data']
-    print(fld.shape)
-    tex = np.ma.zeros(fld.shape)
-    for timestep in range(tex.shape[0]):
-        ray = np.ma.std(rolling_window(fld[timestep, :], 11), 1)
-        tex[timestep, 5:-5] = ray
-        tex[timestep, 0:4] = np.ones(4) * ray[0]
-        tex[timestep, -5:] = np.ones(5) * ray[-1]
-    return tex
+    return rolling_texture(fld, wind_size=11, masked=False)
 
 
 def texture_along_ray(myradar, var, wind_size=7):
@@ -106,12 +120,79 @@ def texture_along_ray(myradar, var, wind_size=7):
         the texture of the specified field
 
     """
-    half_wind = int((wind_size-1)/2)
     fld = myradar.fields[var]['data']
-    tex = np.ma.zeros(fld.shape)
-    for timestep in range(tex.shape[0]):
-        ray = np.ma.std(rolling_window(fld[timestep, :], wind_size), 1)
-        tex[timestep, half_wind:-half_wind] = ray
-        tex[timestep, 0:half_wind] = np.ones(half_wind) * ray[0]
-        tex[timestep, -half_wind:] = np.ones(half_wind) * ray[-1]
+    return rolling_texture(fld, wind_size=wind_size, masked=False)
+
+
+def rolling_texture(data, wind_size=7, masked=True):
+    """
+    Compute the texture along the rays of an entire volume.
+
+    The texture is the standard deviation of the gates in a rolling window
+    along the last axis of the data, computed for all rays at once.  The
+    gates at each end of the ray, where the window is not complete, are set
+    to the texture of the first or last complete window.
+
+    Parameters
+    ----------
+    data : array
+        Field data, the last axis is the range axis.
+    wind_size : int
+        Optional. Size of the rolling window used
+    masked : bool
+        Optional. True to exclude masked gates from the texture, windows
+        without any valid gates are masked.  False uses the data of all
+        gates, including masked gates, as :py:func:`texture_along_ray`.
+
+    Returns
+    -------
+    tex : masked array
+        The texture of the data.
+
+    """
+    nbins = data.shape[-1]
+    nwindows = nbins - wind_size + 1
+    if nwindows < 1:
+        raise ValueError('wind_size larger than the number of gates')
+    half_wind = int((wind_size - 1) / 2)
+
+    values = np.ma.getdata(data).astype('float64')
+    if masked:
+        valid = ~np.ma.getmaskarray(data)
+        values[~valid] = 0.
+        count = _rolling_sum(valid.astype('float64'), wind_size)
+    else:
+        valid = None
+        count = float(wind_size)
+
+    # two pass standard deviation, as np.ma.std
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = _rolling_sum(values, wind_size) / count
+    var = np.zeros(mean.shape, dtype='float64')
+    anom = np.empty(mean.shape, dtype='float64')
+    for k in range(wind_size):
+        np.subtract(values[..., k:k + nwindows], mean, out=anom)
+        anom *= anom
+        if valid is not None:
+            anom[~valid[..., k:k + nwindows]] = 0.
+        var += anom
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var /= count
+    std = np.sqrt(var)
+    if masked:
+        std = np.ma.masked_where(count == 0, std, copy=False)
+
+    tex = np.ma.zeros(data.shape)
+    tex[..., half_wind:half_wind + nwindows] = std
+    tex[..., :half_wind] = std[..., :1]
+    tex[..., half_wind + nwindows:] = std[..., -1:]
     return tex
+
+
+def _rolling_sum(values, wind_size):
+    """ Sum of a rolling window along the last axis of an array. """
+    nwindows = values.shape[-1] - wind_size + 1
+    sums = values[..., :nwindows].copy()
+    for k in range(1, wind_size):
+        sums += values[..., k:k + nwindows]
+    return sums
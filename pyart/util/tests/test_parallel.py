@@ -0,0 +1,45 @@
+""" Unit tests for the parallel.py module. """
+
+from functools import partial
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from pyart.util import parallel
+
+
+def test_balanced_chunks():
+    chunks = parallel.balanced_chunks(10, 3)
+    assert chunks == [(0, 3), (3, 7), (7, 10)]
+    assert parallel.balanced_chunks(2, 4) == [(0, 1), (1, 2)]
+    assert parallel.balanced_chunks(0, 4) == []
+    sizes = [stop - start for start, stop in parallel.balanced_chunks(361, 4)]
+    assert sum(sizes) == 361
+    assert max(sizes) - min(sizes) <= 1
+
+
+def _block_sum(block, common, offset=0):
+    return block.sum(axis=1) + common.sum() + offset
+
+
+def test_map_ray_blocks():
+    data = np.arange(70, dtype='float32').reshape(7, 10)
+    common = np.ones((2, 3))
+    func = partial(_block_sum, offset=1)
+    pool = parallel.get_worker_pool(2)
+    assert parallel.get_worker_pool(2) is pool
+    # the persistent pool is not replaced by requests for other sizes
+    assert parallel.get_worker_pool(3) is pool
+    assert parallel.get_worker_pool() is pool
+
+    results = parallel.map_ray_blocks(func, [data], 3,
+                                      common_arrays=[common])
+    assert len(results) == 3
+    assert_array_equal(np.concatenate(results), data.sum(axis=1) + 7)
+
+    results = parallel.map_ray_blocks(func, [data], common_arrays=[common],
+                                      chunks=[(0, 2), (5, 7)])
+    assert len(results) == 2
+    assert_array_equal(results[0], data[:2].sum(axis=1) + 7)
+    assert_array_equal(results[1], data[5:].sum(axis=1) + 7)
+    parallel.close_worker_pool()
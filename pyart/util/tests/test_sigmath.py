@@ -0,0 +1,44 @@
+""" Unit Tests for Py-ART's util/sigmath.py module. """
+
+import numpy as np
+from numpy.testing import assert_almost_equal, assert_raises
+
+import pyart
+
+
+def test_texture_along_ray():
+    radar = pyart.testing.make_empty_ppi_radar(20, 4, 1)
+    data = np.tile(np.arange(20.) ** 2, 4).reshape(4, 20)
+    data[1] = 3.
+    radar.add_field('field', {'data': data})
+
+    tex = pyart.util.texture_along_ray(radar, 'field', wind_size=5)
+    assert tex.shape == (4, 20)
+    ray = [np.std(data[0, i:i + 5]) for i in range(16)]
+    assert_almost_equal(tex[0, 2:-2], ray)
+    assert_almost_equal(tex[0, :2], ray[0])
+    assert_almost_equal(tex[0, -2:], ray[-1])
+    assert_almost_equal(tex[1], 0)
+
+
+def test_rolling_texture_masked():
+    data = np.ma.masked_array(np.tile(np.arange(10.), 3).reshape(3, 10))
+    data[0, 4] = 1000.
+    data[0, 4] = np.ma.masked
+    data[1, 2:7] = np.ma.masked
+    data[2, :] = np.ma.masked
+
+    tex = pyart.util.rolling_texture(data, wind_size=3)
+    assert_almost_equal(tex[0, 1:-1], [
+        np.ma.std(data[0, i:i + 3]) for i in range(8)])
+    assert tex[0, 4] == 1.
+    assert np.all(tex.mask[1] == [
+        False, False, False, True, True, True, False, False, False, False])
+    assert np.all(tex.mask[2])
+
+    # masked gates are used when masked is False
+    tex = pyart.util.rolling_texture(data, wind_size=3, masked=False)
+    assert tex[0, 4] > 100
+    assert not np.any(tex.mask)
+
+    assert_raises(ValueError, pyart.util.rolling_texture, data, 11)